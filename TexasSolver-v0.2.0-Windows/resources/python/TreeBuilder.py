@@ -2,10 +2,8 @@ import numpy as np
 import os
 import sys
 import json
-from copy import deepcopy
-import networkx as nx
-import matplotlib.pyplot as plt
-from networkx.drawing.nx_agraph import graphviz_layout
+from array import array
+from copy import copy, deepcopy
 
 class Struct:
     def __init__(self, **entries):
@@ -90,6 +88,80 @@ def check_number_this_round(root):
     else:
         raise
 
+def possible_betting_sizes(rule,committed,player,next_player,typeofbet):
+    if typeofbet == "bet":
+        illegal_bets = rule.bet_sizes
+    elif typeofbet == "raise":
+        illegal_bets = rule.raise_sizes
+    else:
+        raise
+
+    bets = []
+    for one_bet in illegal_bets:
+        assert('_pot' in one_bet or one_bet == "all-in")
+        if '_pot' in one_bet:
+            one_bet = one_bet.replace("_pot","")
+            one_bet = float(one_bet)
+        elif 'all-in' == one_bet:
+            pass
+        bets.append(one_bet)
+
+    # 池里的数额实际上等于双方最小下注 * 2, 这里*2实际上是限定了玩家人数只能是2,多出来的那些是还没进池里的筹码(没有
+    #     被call过)
+    # pot = min(committed) * 2
+    # 第二种计算方式，pod 值仅仅等于committed之和
+    pot = max(committed) * 2
+
+    # 根据conf计算下注数额，比如3x pot,2x pot, 0.5x pot
+    possible_amounts = []
+
+    def round_nearest(number,round_num):
+        round_num = 1 / round_num
+        return round((number * round_num)) / round_num
+    sb = rule.small_blind
+    bb = rule.big_blind
+
+    for one_bet in bets:
+        if type(one_bet) is float or type(one_bet) is int:
+            if committed[player] == sb:
+                # 当德州扑克开始时，在第一个玩家动作时（sb位置玩家）,视作对手先下注一个bb,这个时候下注要扣除自己的sb
+                amount = one_bet * committed[next_player]  - sb
+                amount = round_nearest(amount,sb)
+            elif committed[player] == bb and committed[next_player] == bb:
+                # 当德州扑克开始时，在第一个玩家call 的时候第二个玩家要 raise的时候,需要特殊处理
+                amount = one_bet * bb
+                amount = round_nearest(amount,sb)
+            else:
+                # 其他时候，下注数额 总是和pot有关(比如2x pot,0.5x pot这种)
+                amount = one_bet * pot
+                amount = round_nearest(amount,bb)
+            if typeofbet == "raise":
+                amount += (committed[next_player] - committed[player])
+            if amount + committed[player] > rule.initial_effective_stack * rule.allin_threshold:
+                amount = -1
+        elif type(one_bet) == str:
+            assert(one_bet == 'all-in')
+            amount = rule.stack - committed[player]
+        if amount > 0:
+            possible_amounts.append(amount)
+
+    if committed[player] != sb: # 一开始的possible bet amount不能简单取整
+        possible_amounts = [int(i) for i in possible_amounts if i > 0]
+    if committed[player] == sb:
+        possible_amounts = [i for i in possible_amounts if i >= bb]
+    elif committed[player] == bb and committed[next_player] == bb:
+        possible_amounts = [i for i in possible_amounts if i >= bb]
+    else:
+        # 如果不是开局情况，需要过滤掉一些过小的 amount
+        gap = committed[next_player] - committed[player]
+        assert(gap >= 0)
+        possible_amounts = [i for i in possible_amounts if i >= gap * 2]
+
+        # 同样，需要过滤掉一些过大的bet size
+        possible_amounts = [i for i in possible_amounts if i <= rule.stack - committed[player]]
+
+    return possible_amounts
+
 class TreeBuilder:
     def __init__(self,rule):
         self.rule = rule
@@ -109,6 +181,10 @@ class TreeBuilder:
     def plot_tree(self,jupyter=True,depth_limit = 50,show=False):
         # not jupyter plot not supportted
         assert jupyter
+        # 画图依赖只在这里用到
+        import networkx as nx
+        import matplotlib.pyplot as plt
+        from networkx.drawing.nx_agraph import graphviz_layout
 
         tree_tovis = self.format_tree(depth_limit=depth_limit)
         G = nx.DiGraph()
@@ -205,7 +281,8 @@ class TreeBuilder:
             text = "Chance [DealCard]\nround:{}".format(one_json["meta"]["round"])
             one_json["data"]["text"] = text
 
-            new_root = deepcopy(root)
+            # 只改 betting_round, 浅拷贝即可, deepcopy 会顺着 parent 复制整棵树
+            new_root = copy(root)
             new_root.betting_round += 1
             child_json = self.__gen_km_json(new_root,depth + 1,limit,root)
             children.append(child_json)
@@ -237,80 +314,7 @@ class FiveCardTexasTreeBuilder(TreeBuilder):
         return root
 
     def get_possible_betting_sizes(self,root,player,next_player,typeofbet,rule):
-        committed = root.committed
-        if typeofbet == "bet":
-            illegal_bets = self.rule.bet_sizes
-        elif typeofbet == "raise":
-            illegal_bets = self.rule.raise_sizes
-        else:
-            raise
-
-        bets = []
-        for one_bet in illegal_bets:
-            assert('_pot' in one_bet or one_bet == "all-in")
-            if '_pot' in one_bet:
-                one_bet = one_bet.replace("_pot","")
-                one_bet = float(one_bet)
-            elif 'all-in' == one_bet:
-                pass
-            bets.append(one_bet)
-
-        # 池里的数额实际上等于双方最小下注 * 2, 这里*2实际上是限定了玩家人数只能是2,多出来的那些是还没进池里的筹码(没有
-        #     被call过)
-        # pot = min(committed) * 2
-        # 第二种计算方式，pod 值仅仅等于committed之和
-        pot = max(committed) * 2
-
-        # 根据conf计算下注数额，比如3x pot,2x pot, 0.5x pot
-        possible_amounts = []
-
-        def round_nearest(number,round_num):
-            round_num = 1 / round_num
-            return round((number * round_num)) / round_num
-        sb = self.rule.small_blind
-        bb = self.rule.big_blind
-
-        for one_bet in bets:
-            if type(one_bet) is float or type(one_bet) is int:
-                if committed[player] == sb:
-                    # 当德州扑克开始时，在第一个玩家动作时（sb位置玩家）,视作对手先下注一个bb,这个时候下注要扣除自己的sb
-                    amount = one_bet * committed[next_player]  - sb
-                    amount = round_nearest(amount,sb)
-                elif committed[player] == bb and committed[next_player] == bb:
-                    # 当德州扑克开始时，在第一个玩家call 的时候第二个玩家要 raise的时候,需要特殊处理
-                    amount = one_bet * bb
-                    amount = round_nearest(amount,sb)
-                else:
-                    # 其他时候，下注数额 总是和pot有关(比如2x pot,0.5x pot这种)
-                    amount = one_bet * pot
-                    amount = round_nearest(amount,bb)
-                if typeofbet == "raise":
-                    amount += (committed[next_player] - committed[player])
-                if amount + committed[player] > rule.initial_effective_stack * rule.allin_threshold:
-                    amount = -1
-            elif type(one_bet) == str:
-                assert(one_bet == 'all-in')
-                amount = self.rule.stack - committed[player]
-            if amount > 0:
-                possible_amounts.append(amount)
-
-        if committed[player] != sb: # 一开始的possible bet amount不能简单取整
-            possible_amounts = [int(i) for i in possible_amounts if i > 0]
-        if committed[player] == sb:
-            possible_amounts = [i for i in possible_amounts if i >= bb]
-        elif committed[player] == bb and committed[next_player] == bb:
-            possible_amounts = [i for i in possible_amounts if i >= bb]
-        else:
-            # 如果不是开局情况，需要过滤掉一些过小的 amount
-            gap = committed[next_player] - committed[player]
-            assert(gap >= 0)
-            possible_amounts = [i for i in possible_amounts if i >= gap * 2]
-
-            # 同样，需要过滤掉一些过大的bet size
-            possible_amounts = [i for i in possible_amounts if i <= self.rule.stack - committed[player]]
-
-        return possible_amounts
-
+        return possible_betting_sizes(rule,root.committed,player,next_player,typeofbet)
 
     def build_action(self,root):
         # players list
@@ -449,6 +453,288 @@ class PartGameTreeBuilder(FiveCardTexasTreeBuilder):
             raise
         return root
 
+ACTION_NODE, DEALCARD_NODE, SHOWDOWN_NODE, TERMINAL_NODE = range(4)
+ROUND_NAMES = {1:"preflop",2:"flop",3:"turn",4:"river"}
+
+def _number(value):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+class ArrayTreeBuilder:
+    """
+    the tree of PartGameTreeBuilder stored as flat arrays instead of Node objects
+
+    node i is described by parent[i], first_child[i], child_count[i], action[i],
+    player[i], betting_round[i], kind[i] and committed[i]. the root is node 0,
+    siblings are stored next to each other and actions[action[i]] is the name of
+    the action leading to node i, such as 'bet_4'.
+    """
+    def __init__(self,rule):
+        self.rule = rule
+        self.players = list(range(rule.players))
+        self.actions = []
+        self.action_ids = {}
+        self.build_tree()
+
+    def __len__(self):
+        return len(self.kind)
+
+    def build_tree(self):
+        rule = self.rule
+        self.parent = array('i')
+        self.first_child = array('i')
+        self.child_count = array('h')
+        self.action = array('h')
+        self.player = array('b')
+        self.betting_round = array('b')
+        self.kind = array('b')
+        self.committed = array('d')
+
+        commit = tuple(rule.current_commit)
+        self.__add(-1,'roundbegin',rule.current_player,rule.current_round,ACTION_NODE,commit)
+        # 待展开的节点: (node, last action, committed, 本轮 check 数, 本轮 raise 数)
+        stack = [(0,'roundbegin',commit,0,0)]
+        while stack:
+            node,last_action,committed,checks,raises = stack.pop()
+            children = self.__expand(node,last_action,committed,checks,raises)
+            if not children:
+                continue
+            # 子节点连续存放, 所以只需要记录第一个子节点和个数
+            self.first_child[node] = len(self.kind)
+            self.child_count[node] = len(children)
+            expand = []
+            for one_action,player,betting_round,kind,child_commit in children:
+                child = self.__add(node,one_action,player,betting_round,kind,child_commit)
+                if kind == ACTION_NODE:
+                    expand.append((child,one_action,child_commit,checks + ('check' in one_action),raises + ('raise' in one_action)))
+                elif kind == DEALCARD_NODE:
+                    expand.append((child,one_action,child_commit,0,0))
+            stack.extend(reversed(expand))
+
+        self.parent = np.frombuffer(self.parent,dtype=np.int32)
+        self.first_child = np.frombuffer(self.first_child,dtype=np.int32)
+        self.child_count = np.frombuffer(self.child_count,dtype=np.int16)
+        self.action = np.frombuffer(self.action,dtype=np.int16)
+        self.player = np.frombuffer(self.player,dtype=np.int8)
+        self.betting_round = np.frombuffer(self.betting_round,dtype=np.int8)
+        self.kind = np.frombuffer(self.kind,dtype=np.int8)
+        self.committed = np.frombuffer(self.committed).reshape(-1,len(self.players))
+        return 0
+
+    def __add(self,parent,one_action,player,betting_round,kind,committed):
+        action_id = self.action_ids.get(one_action)
+        if action_id is None:
+            action_id = self.action_ids[one_action] = len(self.actions)
+            self.actions.append(one_action)
+        self.parent.append(parent)
+        self.first_child.append(-1)
+        self.child_count.append(0)
+        self.action.append(action_id)
+        self.player.append(player)
+        self.betting_round.append(betting_round)
+        self.kind.append(kind)
+        self.committed.extend(committed)
+        return len(self.kind) - 1
+
+    def __expand(self,node,last_action,committed,checks,raises):
+        # 和 FiveCardTexasTreeBuilder.build_action 的规则一样
+        rule = self.rule
+        player = self.player[node]
+        betting_round = self.betting_round[node]
+        next_player = (player + 1) % len(self.players)
+        if self.kind[node] == DEALCARD_NODE:
+            possible_actions = rule.legal_actions_after['roundbegin']
+        else:
+            possible_actions = rule.legal_actions_after[last_action.split('_')[0]]
+        if possible_actions is None:
+            return []
+
+        children = []
+        for one_action in possible_actions:
+            if one_action == 'check':
+                if (last_action == 'call' and betting_round == 1) or checks >= rule.check_limit - 1:
+                    if betting_round == rule.rounds:
+                        children.append((one_action,next_player,betting_round,SHOWDOWN_NODE,committed))
+                    else:
+                        children.append((one_action,1,betting_round + 1,DEALCARD_NODE,committed))
+                else:
+                    children.append((one_action,next_player,betting_round,ACTION_NODE,committed))
+            elif one_action in ('bet','raise'):
+                if one_action == 'raise':
+                    # 只有第一轮开局的 call 和 check 之后才可以 raise
+                    at_top = self.parent[node] == 0
+                    if last_action == 'call' and not at_top:
+                        continue
+                    if last_action == 'check' and not (at_top and betting_round == 1):
+                        continue
+                    if raises >= rule.raise_limit:
+                        continue
+                for one_betting_size in possible_betting_sizes(rule,committed,player,next_player,one_action):
+                    child_commit = list(committed)
+                    child_commit[player] += one_betting_size
+                    children.append((one_action + "_" + str(one_betting_size),next_player,betting_round,ACTION_NODE,tuple(child_commit)))
+            elif one_action == 'call':
+                child_commit = list(committed)
+                child_commit[player] = committed[next_player]
+                child_commit = tuple(child_commit)
+                if last_action == 'begin':
+                    children.append((one_action,next_player,betting_round,ACTION_NODE,child_commit))
+                elif betting_round == rule.rounds or any(rule.stack - i <= 0 for i in committed):
+                    children.append((one_action,next_player,betting_round,SHOWDOWN_NODE,child_commit))
+                else:
+                    children.append((one_action,1,betting_round + 1,DEALCARD_NODE,child_commit))
+            elif one_action == 'fold':
+                children.append((one_action,next_player,betting_round,TERMINAL_NODE,committed))
+            else:
+                raise ValueError(one_action)
+
+        # 相同的下注额只保留一个, 和 children 字典的行为一致
+        unique = {}
+        for child in children:
+            unique.setdefault(child[0],child)
+        return list(unique.values())
+
+    def children(self,node):
+        first = self.first_child[node]
+        if first < 0:
+            return range(0)
+        return range(first,first + self.child_count[node])
+
+    def child(self,node,one_action):
+        """
+        the child of node reached by one_action, such as 'bet_4'
+        """
+        action_id = self.action_ids.get(one_action)
+        for one_child in self.children(node):
+            if self.action[one_child] == action_id:
+                return int(one_child)
+        raise KeyError(one_action)
+
+    def find(self,path):
+        node = 0
+        for one_action in path:
+            node = self.child(node,one_action)
+        return node
+
+    def bet_history(self,node):
+        history = []
+        while node > 0:
+            history.append(self.actions[self.action[node]])
+            node = self.parent[node]
+        return history[::-1]
+
+    def pot(self,node):
+        return _number(self.committed[node].sum())
+
+    def to_string(self,node,bet_history=None):
+        if bet_history is None:
+            bet_history = self.bet_history(node)
+        player = int(self.player[node])
+        if len(self.players) == 2:
+            opponent = (player + 1) % 2
+        else:
+            opponent = list(set(self.players) - set([player,]))
+        text = "{}-{}\n{} \n ".format(
+            "player: " + str(opponent),
+            self.actions[self.action[node]],
+            "pot:" + "-".join([str(_number(i)) for i in self.committed[node]]),
+        )
+        kind = self.kind[node]
+        if kind == SHOWDOWN_NODE:
+            text = "[++showdown++]\n" + text + str(self.payoffs(node)) + " \n "
+        elif kind == DEALCARD_NODE:
+            text = "[++dealcard++]\n" + text + str(self.payoffs(node)) + " \n "
+        elif kind == TERMINAL_NODE:
+            text = "[--terminal--]\n" + text + str(self.payoff(node)) + " \n "
+        return text + str(hash(''.join(bet_history)) % 10000)
+
+    def payoffs(self,node):
+        committed = self.committed[node]
+        pot = committed.sum()
+        payoffs = {}
+        for i in self.players:
+            payoffs[i] = [_number(-c) for c in committed]
+            payoffs[i][i] = _number(pot - committed[i])
+        payoffs['tie'] = [float(-c + pot / 2) for c in committed]
+        return payoffs
+
+    def payoff(self,node):
+        payoff = [_number(-c) for c in self.committed[node]]
+        player = self.player[node]
+        payoff[player] = _number(self.committed[node].sum() - self.committed[node][player])
+        return payoff
+
+    def gen_km_json(self,json_file,path_prefix=[],limit=np.inf,ret_json=False):
+        """
+        write the tree in the format of TreeBuilder.gen_km_json, node by node
+        """
+        with open(json_file,'w') as whdl:
+            self.write_km_json(whdl,path_prefix,limit)
+        if ret_json == True:
+            with open(json_file) as rhdl:
+                return json.load(rhdl)['root']
+
+    def write_km_json(self,fhdl,path_prefix=[],limit=np.inf):
+        node = self.find(path_prefix)
+        fhdl.write('{"root": ')
+        self.__write_km_json(fhdl,node,0,limit,self.bet_history(node),self.betting_round[node],False)
+        fhdl.write('}')
+
+    def __write_km_json(self,fhdl,node,depth,limit,bet_history,betting_round,parent_dealcard):
+        kind = self.kind[node]
+        text = self.to_string(node,bet_history)
+        node_type = "Action"
+
+        if kind == DEALCARD_NODE and parent_dealcard:
+            text = "Chance [DealCard]"
+        text += "\nround: {}".format(ROUND_NAMES[betting_round])
+        if kind == DEALCARD_NODE and not parent_dealcard:
+            node_type = "Chance"
+        if kind == TERMINAL_NODE:
+            node_type = "Terminal"
+        elif kind == SHOWDOWN_NODE:
+            node_type = "Showdown" if betting_round == 4 else "Chance"
+
+        meta = {
+            "round": ROUND_NAMES[betting_round],
+            "player": int(self.player[node]),
+            "pot": self.pot(node),
+            "node_type": node_type,
+        }
+        if kind == SHOWDOWN_NODE:
+            meta["payoffs"] = self.payoffs(node)
+        elif kind == TERMINAL_NODE:
+            meta["payoff"] = self.payoff(node)
+        if kind == SHOWDOWN_NODE and betting_round < 4:
+            meta["round"] = ROUND_NAMES[betting_round + 1]
+            text = "Chance [DealCard]\nround:{}".format(meta["round"])
+
+        fhdl.write('{"data": {"text": ' + json.dumps(text) + '}, "children": [')
+        children_actions = []
+        if limit is None or depth + 1 <= limit:
+            if node_type == "Chance" and kind == DEALCARD_NODE:
+                # 发牌节点把自己当作唯一的子节点
+                self.__write_km_json(fhdl,node,depth + 1,limit,bet_history,betting_round,True)
+                children_actions.append("dealcard")
+            elif kind == ACTION_NODE or kind == DEALCARD_NODE:
+                for one_child in self.children(node):
+                    if children_actions:
+                        fhdl.write(', ')
+                    one_action = self.actions[self.action[one_child]]
+                    self.__write_km_json(fhdl,one_child,depth + 1,limit,bet_history + [one_action],self.betting_round[one_child],kind == DEALCARD_NODE)
+                    children_actions.append(one_action)
+        if kind == SHOWDOWN_NODE and betting_round < 4:
+            # 没打完的回合 all-in 之后直接发下一张牌
+            if children_actions:
+                fhdl.write(', ')
+            if limit is None or depth + 1 <= limit:
+                self.__write_km_json(fhdl,node,depth + 1,limit,bet_history,betting_round + 1,False)
+            else:
+                fhdl.write('null')
+            children_actions.append("dealcard")
+        fhdl.write('], "children_actions": ' + json.dumps(children_actions))
+        fhdl.write(', "font-weight": "bold", "background": "#73a1bf", "resource": [], "meta": ' + json.dumps(meta) + '}')
+
 
 class Node(object):
     def __init__(self, parent, committed, players, player,  bet_history,betting_round=None,**kwargs):
@@ -1,113 +1,235 @@
 """Helper utilities for AI calculations using PokerKit."""
 
-from concurrent.futures import ProcessPoolExecutor
+import atexit
+from concurrent.futures import Executor, ProcessPoolExecutor
+import os
 import random
-import tempfile
+import threading
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Iterable, List, Mapping, Tuple
 
-from engine import PokerEngine
+from engine import PokerEngine, card_to_id
 
 
+from batch_equity import calculate_equities_batch
 from pokerkit import (
     calculate_equities,
-    calculate_hand_strength,
-    parse_range,
+    count_deals,
+    parse_weighted_range,
 )
 from pokerkit.pokerkit.hands import StandardHighHand
 from pokerkit.pokerkit.utilities import Card as PKCard
 from pokerkit.pokerkit.utilities import Deck
+import solver_cache
 import texas_solver
 
 
+# Deals enumerated at most by ``exact="auto"``. Heads-up river spots (990
+# deals against a random hand) and turn spots against narrow ranges are
+# enumerated, but a turn spot against a random hand (45,540 deals) takes
+# about fifty times as long as sampling it and is sampled.
+_ENUMERATION_LIMIT = 10000
+
+_pool_lock = threading.Lock()
+_pool: ProcessPoolExecutor | None = None
+_pool_size: int | None = None
+_shutdown_registered = False
+
+
+def _warm_worker() -> None:
+    """Build the lookup tables once per worker instead of once per task."""
+    StandardHighHand.lookup.get_max_entry_from_ids(range(7))
+
+
+def set_pool_size(max_workers: int | None) -> None:
+    """Set the number of worker processes used by the estimators.
+
+    A running pool is shut down and replaced on next use. With ``0``, no
+    pool is started and the estimators run in the calling process, which
+    suits callers that already run in worker processes of their own.
+
+    Parameters
+    ----------
+    max_workers : int or None
+        Number of worker processes, ``None`` for one per CPU.
+    """
+    global _pool_size
+
+    shutdown_pool()
+    _pool_size = max_workers
+
+
+def get_pool_size() -> int:
+    """Return the number of worker processes of the shared pool.
+
+    This is the size set by :func:`set_pool_size`, one per CPU by default,
+    and ``0`` if the estimators run in the calling process.
+    """
+    if _pool_size is None:
+        return os.cpu_count() or 1
+
+    return _pool_size
+
+
+def get_executor() -> Executor | None:
+    """Return the shared worker pool, starting it on first use.
+
+    The workers are started once and reused by every estimator call, with
+    pokerkit imported and its lookup tables built in each worker. ``None``
+    is returned if the pool size is ``0``.
+    """
+    global _pool, _shutdown_registered
+
+    with _pool_lock:
+        if _pool_size == 0:
+            return None
+
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=get_pool_size(), initializer=_warm_worker
+            )
+
+            if not _shutdown_registered:
+                atexit.register(shutdown_pool)
+                _shutdown_registered = True
+
+        return _pool
+
+
+def shutdown_pool(wait: bool = True) -> None:
+    """Shut down the shared worker pool if it is running.
+
+    This runs automatically at interpreter exit. The pool is started again
+    by the next estimator call.
+    """
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+def _to_cards(cards: Iterable[str | PKCard]) -> List[PKCard]:
+    """Return ``cards`` as pokerkit cards, parsing any strings."""
+    return [next(PKCard.parse(c)) if isinstance(c, str) else c for c in cards]
+
+
+def _engine_cards(cards: Iterable[Tuple[int, int]]) -> Tuple[PKCard, ...]:
+    """Convert engine ``(rank, suit)`` tuples to pokerkit cards by card id."""
+    return PKCard.from_ids(map(card_to_id, cards))
+
+
+def _calculate_equities(ranges, board, sample_count, exact):
+    """Enumerate the equities exactly or sample them in NumPy batches.
+
+    Enumeration runs on the shared pool, in one chunk per worker, while the
+    samples are dealt and evaluated in arrays by
+    :func:`batch_equity.calculate_equities_batch`, which is much faster than
+    sampling one deal at a time.
+    """
+    args = (ranges, board, 2, 5, Deck.STANDARD)
+
+    if exact == "auto":
+        exact = count_deals(*args, limit=_ENUMERATION_LIMIT) <= _ENUMERATION_LIMIT
+
+    if exact:
+        return calculate_equities(
+            *args,
+            (StandardHighHand,),
+            sample_count=sample_count,
+            executor=get_executor(),
+            chunk_count=get_pool_size() or None,
+            exact=True,
+        )
+
+    return calculate_equities_batch(
+        *args, (StandardHighHand,), sample_count=sample_count
+    )
+
+
 def estimate_equity(
-    ranges: Iterable[str], board_cards: Iterable[str] = (), sample_count: int = 1000
+    ranges: Iterable[str | Mapping[frozenset[PKCard], float] | Iterable[PKCard]],
+    board_cards: Iterable[str | PKCard] = (),
+    sample_count: int = 1000,
+    exact: bool | str = "auto",
 ) -> List[float]:
     """Estimate player equities using Monte Carlo simulation.
 
+    The samples are dealt in batches of NumPy arrays. Spots with at most
+    10,000 deals of the unknown cards, such as heads-up river spots and turn
+    spots against narrow ranges, are enumerated exactly instead unless
+    ``exact`` is ``False``.
+
     Parameters
     ----------
-    ranges : iterable of str
-        Hand ranges for each active player written in pokerkit range syntax.
-    board_cards : iterable of str, optional
+    ranges : iterable of str, mapping or iterable of Card
+        Hand ranges for each active player written in pokerkit range syntax,
+        optionally with solver weights such as ``"AJs:0.042"``, weighted
+        ranges mapping combos to weights, or the exact hole cards of a player.
+    board_cards : iterable of str or Card, optional
         Board cards already dealt in two-character notation like ``'As'``.
     sample_count : int, optional
         Number of Monte Carlo samples to run, defaults to 1000.
+    exact : bool or {"auto"}, optional
+        ``True`` to always enumerate every runout, ``False`` to always
+        sample, or ``"auto"`` (default) to enumerate when there are at
+        most 10,000 runouts.
 
     Returns
     -------
     list of float
         The estimated equity for each player.
     """
-    board = [next(PKCard.parse(c)) for c in board_cards]
-
-    with ProcessPoolExecutor() as executor:
-        eqs = calculate_equities(
-            tuple(parse_range(r) for r in ranges),
-            board,
-            2,  # hole cards dealt to each player
-            5,  # total board cards
-            Deck.STANDARD,
-            (StandardHighHand,),
-            sample_count=sample_count,
-            executor=executor,
+    board = _to_cards(board_cards)
+    parsed = tuple(
+        (
+            parse_weighted_range(r)
+            if isinstance(r, str)
+            else r if isinstance(r, Mapping) else [tuple(r)]
         )
-    return eqs
+        for r in ranges
+    )
+
+    return _calculate_equities(parsed, board, sample_count, exact)
 
 
 def estimate_equity_vs_random(
-    hole_cards: Iterable[str],
-    board_cards: Iterable[str] = (),
+    hole_cards: Iterable[str | PKCard],
+    board_cards: Iterable[str | PKCard] = (),
     player_count: int = 2,
     sample_count: int = 1000,
+    exact: bool | str = "auto",
 ) -> float:
     """Estimate equity of ``hole_cards`` versus random opponents."""
 
     ranges = [[[]] for _ in range(player_count - 1)]
-    hole = [next(PKCard.parse(c)) for c in hole_cards]
+    hole = _to_cards(hole_cards)
     ranges.append([hole])
-    board = [next(PKCard.parse(c)) for c in board_cards]
-
-    with ProcessPoolExecutor() as executor:
-        eqs = calculate_equities(
-            ranges,
-            board,
-            2,
-            5,
-            Deck.STANDARD,
-            (StandardHighHand,),
-            sample_count=sample_count,
-            executor=executor,
-        )
+    board = _to_cards(board_cards)
 
-    return eqs[-1]
+    return _calculate_equities(ranges, board, sample_count, exact)[-1]
 
 
 def estimate_hand_strength(
-    hole_cards: Iterable[str],
-    board_cards: Iterable[str] = (),
+    hole_cards: Iterable[str | PKCard],
+    board_cards: Iterable[str | PKCard] = (),
     player_count: int = 2,
     sample_count: int = 1000,
+    exact: bool | str = "auto",
 ) -> float:
-    """Shortcut around :func:`calculate_hand_strength`."""
+    """Estimate the equity of ``hole_cards`` against random hands.
 
-    hole_range = parse_range("".join(hole_cards))
-    board = [next(PKCard.parse(c)) for c in board_cards]
+    This is pokerkit's ``calculate_hand_strength``, computed like
+    :func:`estimate_equity`.
+    """
 
-    with ProcessPoolExecutor() as executor:
-        strength = calculate_hand_strength(
-            player_count,
-            hole_range,
-            board,
-            2,
-            5,
-            Deck.STANDARD,
-            (StandardHighHand,),
-            sample_count=sample_count,
-            executor=executor,
-        )
+    ranges = [[[]] for _ in range(player_count - 1)]
+    ranges.append([tuple(_to_cards(hole_cards))])
+    board = _to_cards(board_cards)
 
-    return strength
+    return _calculate_equities(ranges, board, sample_count, exact)[-1]
 
 
 def basic_ai_decision(
@@ -127,14 +249,14 @@ def basic_ai_decision(
     if not hole:
         return "check", 0
 
-    hole_strs = [engine._tuple_to_str(c) for c in hole]
-    board_strs = [engine._tuple_to_str(c) for c in engine.community]
+    hole_pk = _engine_cards(hole)
+    board_pk = _engine_cards(engine.community)
     player_count = sum(engine.active)
 
     try:
         strength = estimate_hand_strength(
-            hole_strs,
-            board_strs,
+            hole_pk,
+            board_pk,
             player_count,
             sample_count=sample_count,
         )
@@ -161,17 +283,22 @@ def basic_ai_decision(
 def optimal_ai_move(
     engine: PokerEngine,
     seat: int,
-    ranges: dict[int, str] | None = None,
+    ranges: dict[int, str | Mapping[frozenset[PKCard], float]] | None = None,
     sample_count: int = 500,
 ) -> Tuple[str, int]:
-    """Return a suggested action using simple equity and pot odds heuristics."""
+    """Return a suggested action using simple equity and pot odds heuristics.
+
+    ``ranges`` maps opponent seats to their ranges, which may be weighted
+    solver ranges such as the contents of a TexasSolver range file. Seats
+    without a range are treated as holding random cards.
+    """
 
     hole = engine.hole_cards.get(seat)
     if not hole:
         return "check", 0
 
-    hole_strs = [engine._tuple_to_str(c) for c in hole]
-    board_strs = [engine._tuple_to_str(c) for c in engine.community]
+    hole_pk = _engine_cards(hole)
+    board_pk = _engine_cards(engine.community)
     to_call = max(0, engine.current_bet - engine.contributions[seat])
     pot = engine.pot
 
@@ -181,19 +308,19 @@ def optimal_ai_move(
         order = []
         for i in active_seats:
             if i == seat:
-                order.append("".join(hole_strs))
+                order.append(hole_pk)
             else:
-                order.append(ranges.get(i, ""))
+                order.append(ranges.get(i, ()))
         try:
-            equities = estimate_equity(order, board_strs, sample_count=sample_count)
+            equities = estimate_equity(order, board_pk, sample_count=sample_count)
             hero_equity = equities[active_seats.index(seat)]
         except Exception:
             hero_equity = 0.5
     else:
         try:
             hero_equity = estimate_hand_strength(
-                hole_strs,
-                board_strs,
+                hole_pk,
+                board_pk,
                 len(active_seats),
                 sample_count=sample_count,
             )
@@ -232,7 +359,7 @@ def solver_ai_move(
     *,
     hero_range: str,
     opp_range: str,
-    exe_dir: str | Path = texas_solver.DEFAULT_EXE_DIR,
+    exe_dir: str | Path | None = None,
 ) -> Tuple[str, int]:
     """Use TexasSolver to suggest an action for ``seat``.
 
@@ -247,7 +374,9 @@ def solver_ai_move(
     opp_range : str
         Range string for the opponent.
     exe_dir : str or Path, optional
-        Directory containing ``console_solver.exe``.
+        Directory containing another ``console_solver.exe``. By default, the
+        spot is queued on the shared :mod:`solver_service`. Spots already in
+        the :mod:`solver_cache`, up to suits and scale, are not solved again.
     """
 
     hole = engine.hole_cards.get(seat)
@@ -260,26 +389,19 @@ def solver_ai_move(
     opp = 1 - seat if engine.num_players == 2 else (seat + 1) % engine.num_players
     stack = min(engine.stacks[seat], engine.stacks[opp])
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".txt") as tmp:
-        params = texas_solver.simple_parameter_file(
-            pot=engine.pot,
-            stack=stack,
-            board=board,
-            range_oop=opp_range,
-            range_ip=hero_range,
-            output_path=tmp.name,
-        )
+    commands = texas_solver.build_commands(
+        pot=engine.pot,
+        stack=stack,
+        board=board,
+        range_oop=opp_range,
+        range_ip=hero_range,
+    )
 
     try:
-        out = texas_solver.run_console_solver(params, exe_dir=exe_dir, timeout=15)
-        action, amt = texas_solver.parse_solver_output(out, hero_hand)
+        strategy = solver_cache.solve_strategy(commands, exe_dir=exe_dir, timeout=15)
+        action, amt = texas_solver.choose_action(strategy, hero_hand)
     except Exception:
         action, amt = "check", 0
-    finally:
-        try:
-            Path(params).unlink()
-        except FileNotFoundError:
-            pass
 
     return action, amt
 
@@ -3,7 +3,7 @@ from __future__ import annotations
 import os
 from typing import Optional
 
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
 from PyQt5.QtWidgets import (
     QCheckBox,
     QLabel,
@@ -13,11 +13,19 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
-from ai import estimate_equity_vs_random, optimal_ai_move
+from analysis_worker import AnalysisRunner, make_request
 from texas_solver import engine_parameter_file, launch_solver_gui
 from engine import PokerEngine
 
 
+class _AnalysisSignals(QObject):
+    """Carry results from the analysis thread to the UI thread."""
+
+    equity = pyqtSignal(int, float, int)
+    recommendation = pyqtSignal(int, str, int)
+    error = pyqtSignal(int, str)
+
+
 class AnalysisWindow(QMainWindow):
     """Separate window displaying equity and solver information."""
 
@@ -50,6 +58,18 @@ class AnalysisWindow(QMainWindow):
         self.launch_btn.clicked.connect(self._launch_solver_gui)
         layout.addWidget(self.launch_btn, alignment=Qt.AlignCenter)
 
+        # signals emitted on the worker thread are queued to this thread
+        self._signals = _AnalysisSignals()
+        self._signals.equity.connect(self._show_equity)
+        self._signals.recommendation.connect(self._show_recommendation)
+        self._signals.error.connect(self._show_error)
+        self._generation = 0
+        self._runner = AnalysisRunner(
+            self._signals.equity.emit,
+            self._signals.recommendation.emit,
+            self._signals.error.emit,
+        )
+
     def set_context(self, engine: PokerEngine, seat: int) -> None:
         self.engine = engine
         self.seat = seat
@@ -58,39 +78,48 @@ class AnalysisWindow(QMainWindow):
         self._update_stats()
         self._update_solver_params()
 
+    def shutdown(self) -> None:
+        """Stop the background analysis."""
+        self._runner.shutdown(wait=False)
+
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
     def _update_stats(self) -> None:
-        hole = self.engine.hole_cards.get(self.seat)
-        if not hole:
+        request = make_request(self.engine, self.seat)
+        if request is None:
+            self._generation = self._runner.cancel()
             self.equity_label.setText("Equity: N/A")
             self.optimal_label.setText("Recommended: N/A")
             return
 
-        hole_strs = [self.engine._tuple_to_str(c) for c in hole]
-        board_strs = [
-            self.engine._tuple_to_str(c) for c in self.engine.community
-        ]
-        active_count = sum(self.engine.active)
-
-        try:
-            eq = estimate_equity_vs_random(
-                hole_strs, board_strs, active_count
-            )
-            self.equity_label.setText(f"Equity: {eq*100:.1f}%")
-        except Exception:
-            self.equity_label.setText("Equity: err")
+        self._generation = self._runner.submit(request)
+        self.equity_label.setText("Equity: ...")
+        self.optimal_label.setText("Recommended: ...")
 
-        try:
-            action, amt = optimal_ai_move(
-                self.engine, self.seat, sample_count=100
-            )
-            if action in {"bet", "raise"}:
-                self.optimal_label.setText(f"Recommended: {action} {amt}")
-            else:
-                self.optimal_label.setText(f"Recommended: {action}")
-        except Exception:
+    def _show_equity(self, generation: int, eq: float, samples: int) -> None:
+        if generation != self._generation:
+            return
+        if samples:
+            self.equity_label.setText(f"Equity: {eq*100:.1f}% ({samples} samples)")
+        else:
+            self.equity_label.setText(f"Equity: {eq*100:.1f}% (exact)")
+
+    def _show_recommendation(self, generation: int, action: str, amt: int) -> None:
+        if generation != self._generation:
+            return
+        if action in {"bet", "raise"}:
+            self.optimal_label.setText(f"Recommended: {action} {amt}")
+        else:
+            self.optimal_label.setText(f"Recommended: {action}")
+
+    def _show_error(self, generation: int, stage: str) -> None:
+        if generation != self._generation:
+            return
+        if stage == "equity":
+            self.equity_label.setText("Equity: err")
+            self.optimal_label.setText("Recommended: N/A")
+        else:
             self.optimal_label.setText("Recommended: err")
 
     def _update_solver_params(self) -> None:
@@ -0,0 +1,234 @@
+"""Background analysis of the table for :class:`AnalysisWindow`.
+
+The analysis runs on a dedicated thread, which hands the Monte Carlo work to
+the shared pool of :mod:`ai`, so the UI thread only takes a snapshot of the
+engine and submits it. Only the latest request is kept: submitting a new one
+drops a request still waiting and stops the running one at its next batch of
+samples. Results are reported through callbacks on the worker thread, each
+tagged with the generation returned by :meth:`AnalysisRunner.submit`.
+"""
+
+from __future__ import annotations
+
+import copy
+import math
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+import ai
+from engine import PokerEngine
+
+
+@dataclass(frozen=True)
+class AnalysisRequest:
+    """Snapshot of the state analysed for one seat."""
+
+    engine: PokerEngine
+    seat: int
+    hole: Tuple[str, ...]
+    board: Tuple[str, ...]
+    player_count: int
+
+
+def snapshot_engine(engine: PokerEngine) -> PokerEngine:
+    """Return a copy of ``engine`` that later actions do not change.
+
+    Hand histories are left out since the analysis does not need them.
+    """
+
+    snapshot = copy.copy(engine)
+    snapshot.hand_histories = []
+    snapshot._current_history = None
+    snapshot.history_writer = None
+    for name in (
+        "stacks",
+        "deck",
+        "community",
+        "active",
+        "contributions",
+        "total_contrib",
+        "all_in",
+    ):
+        setattr(snapshot, name, list(getattr(engine, name)))
+    snapshot.hole_cards = {i: list(c) for i, c in engine.hole_cards.items()}
+    return snapshot
+
+
+def make_request(engine: PokerEngine, seat: int) -> Optional[AnalysisRequest]:
+    """Return the request analysing ``seat``, or ``None`` without hole cards."""
+
+    hole = engine.hole_cards.get(seat)
+    if not hole:
+        return None
+    return AnalysisRequest(
+        engine=snapshot_engine(engine),
+        seat=seat,
+        hole=tuple(engine._tuple_to_str(c) for c in hole),
+        board=tuple(engine._tuple_to_str(c) for c in engine.community),
+        player_count=sum(engine.active),
+    )
+
+
+def _deal_count(player_count: int, board_count: int) -> int:
+    """Number of deals of the unknown cards against random opponents."""
+
+    deck_count = 52 - 2 - board_count
+    count = 1
+    for dealt in [2] * (player_count - 1) + [5 - board_count]:
+        count *= math.comb(deck_count, dealt)
+        deck_count -= dealt
+    return count
+
+
+class AnalysisRunner:
+    """Run analysis requests one at a time on a background thread.
+
+    Parameters
+    ----------
+    on_equity : callable
+        Called with ``(generation, equity, sample_count)`` after every batch
+        with the running estimate. ``sample_count`` is ``0`` for an exact
+        result.
+    on_recommendation : callable
+        Called with ``(generation, action, amount)`` once the equity is done.
+    on_error : callable
+        Called with ``(generation, stage)`` where ``stage`` is ``"equity"``
+        or ``"recommendation"`` if that part fails.
+    sample_count : int, optional
+        Total number of equity samples per request.
+    batch_size : int, optional
+        Number of samples between progress reports and cancellation checks.
+    recommendation_samples : int, optional
+        Number of samples given to :func:`ai.optimal_ai_move`.
+    enumeration_limit : int, optional
+        Spots with at most this many deals are enumerated in one step.
+    estimate, recommend : callable, optional
+        The estimators, :func:`ai.estimate_equity_vs_random` and
+        :func:`ai.optimal_ai_move` by default.
+    """
+
+    def __init__(
+        self,
+        on_equity: Callable[[int, float, int], None],
+        on_recommendation: Callable[[int, str, int], None],
+        on_error: Callable[[int, str], None],
+        *,
+        sample_count: int = 2000,
+        batch_size: int = 250,
+        recommendation_samples: int = 100,
+        enumeration_limit: int = 10000,
+        estimate: Callable[..., float] = ai.estimate_equity_vs_random,
+        recommend: Callable[..., Tuple[str, int]] = ai.optimal_ai_move,
+    ) -> None:
+        self._on_equity = on_equity
+        self._on_recommendation = on_recommendation
+        self._on_error = on_error
+        self.sample_count = sample_count
+        self.batch_size = batch_size
+        self.recommendation_samples = recommendation_samples
+        self.enumeration_limit = enumeration_limit
+        self._estimate = estimate
+        self._recommend = recommend
+
+        self._condition = threading.Condition()
+        self._generation = 0
+        self._pending: Optional[Tuple[int, AnalysisRequest]] = None
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="analysis", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def generation(self) -> int:
+        """Generation of the latest request or cancellation."""
+        return self._generation
+
+    def submit(self, request: AnalysisRequest) -> int:
+        """Replace any earlier request with ``request``.
+
+        Returns
+        -------
+        int
+            The generation tagging the results of ``request``.
+        """
+        with self._condition:
+            self._generation += 1
+            self._pending = self._generation, request
+            self._condition.notify()
+            return self._generation
+
+    def cancel(self) -> int:
+        """Drop the waiting request and stop the running one."""
+        with self._condition:
+            self._generation += 1
+            self._pending = None
+            return self._generation
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker thread after cancelling any request."""
+        with self._condition:
+            self._closed = True
+            self._generation += 1
+            self._pending = None
+            self._condition.notify()
+        if wait:
+            self._thread.join()
+
+    def _is_stale(self, generation: int) -> bool:
+        return generation != self._generation
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                generation, request = self._pending
+                self._pending = None
+
+            self._analyze(generation, request)
+
+    def _analyze(self, generation: int, request: AnalysisRequest) -> None:
+        args = request.hole, request.board, request.player_count
+
+        try:
+            if (
+                _deal_count(request.player_count, len(request.board))
+                <= self.enumeration_limit
+            ):
+                equity = self._estimate(*args, exact=True)
+                if self._is_stale(generation):
+                    return
+                self._on_equity(generation, equity, 0)
+            else:
+                total = 0.0
+                done = 0
+                while done < self.sample_count:
+                    count = min(self.batch_size, self.sample_count - done)
+                    equity = self._estimate(*args, sample_count=count, exact=False)
+                    total += equity * count
+                    done += count
+                    if self._is_stale(generation):
+                        return
+                    self._on_equity(generation, total / done, done)
+        except Exception:
+            if not self._is_stale(generation):
+                self._on_error(generation, "equity")
+            return
+
+        try:
+            action, amount = self._recommend(
+                request.engine,
+                request.seat,
+                sample_count=self.recommendation_samples,
+            )
+        except Exception:
+            if not self._is_stale(generation):
+                self._on_error(generation, "recommendation")
+            return
+
+        if not self._is_stale(generation):
+            self._on_recommendation(generation, action, amount)
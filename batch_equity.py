@@ -0,0 +1,538 @@
+"""Vectorized Monte Carlo equity calculation using NumPy.
+
+:func:`calculate_equities_batch` follows the semantics of
+``pokerkit.analysis.calculate_equities`` (hole card selections chosen
+uniformly or by weight, split pots and several hand types sharing each pot) but deals
+many samples at once into integer arrays and evaluates them with table
+lookups instead of building a hand per player and sample.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache, reduce
+from itertools import combinations, combinations_with_replacement, product
+from typing import Iterable, List, Mapping
+
+import numpy as np
+
+from pokerkit.pokerkit.utilities import Card as PKCard
+
+_RANKS = "23456789TJQKA"
+_SUITS = "cdhs"
+_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+_ID_PRIMES = np.array([_PRIMES[i // 4] for i in range(52)], dtype=np.int64)
+_ID_SUITS = np.eye(4, dtype=np.int8)[np.arange(52) % 4]
+_INVALID = -(2**63)
+
+
+def _multiply(values, axis):
+    # ufunc reductions over short axes are slow, so the axis is unrolled
+    values = np.moveaxis(values, axis, 0)
+
+    return reduce(np.multiply, values[1:], values[0].copy())
+
+
+def _add(values, axis):
+    values = np.moveaxis(values, axis, 0)
+
+    return reduce(np.add, values[1:], values[0].copy())
+
+
+class _StrengthTable:
+    """Strengths of every hand a player can hold with a fixed card count.
+
+    A strength is the index of the best lookup entry, negated for low hands,
+    so that a greater strength is always better. Hands without a valid entry
+    get the smallest possible strength.
+
+    Parameters
+    ----------
+    keys : numpy.ndarray
+        Sorted products of the rank primes of all cards.
+    values : numpy.ndarray
+        Strengths of ``keys`` when no five cards share a suit.
+    flush_keys : numpy.ndarray or None
+        Sorted products of the rank primes of the cards of one suit, or
+        ``None`` when suits do not matter to the hand type.
+    flush_values : numpy.ndarray or None
+        Strengths of ``flush_keys``.
+    card_count : int
+        Number of cards that form a hand.
+    """
+
+    def __init__(self, keys, values, flush_keys, flush_values, card_count):
+        self.keys = keys
+        self.values = values
+        self.flush_keys = flush_keys
+        self.flush_values = flush_values
+        self.card_count = card_count
+
+    def evaluate(self, holes: np.ndarray, board: np.ndarray) -> np.ndarray:
+        """Return the strengths of each player's hand.
+
+        Parameters
+        ----------
+        holes : numpy.ndarray
+            Hole card ids of the shape ``(samples, players, cards)``.
+        board : numpy.ndarray
+            Board card ids of the shape ``(samples, cards)``.
+
+        Returns
+        -------
+        numpy.ndarray
+            Strengths of the shape ``(samples, players)``.
+        """
+        # the board is shared, so its part of each key is computed once
+        hashes = _multiply(_ID_PRIMES[holes], -1) * _multiply(_ID_PRIMES[board], -1)[
+            :, None
+        ]
+        strengths = self.values[np.searchsorted(self.keys, hashes)]
+
+        if self.flush_keys is None:
+            return strengths
+
+        suit_counts = _add(_ID_SUITS[holes], -2) + _add(_ID_SUITS[board], -2)[:, None]
+
+        for suit in range(4):
+            flushes = suit_counts[..., suit] >= self.card_count
+
+            if not flushes.any():
+                continue
+
+            rows, players = np.nonzero(flushes)
+            cards = np.concatenate((holes[rows, players], board[rows]), axis=1)
+            suited = cards & 3 == suit
+            flush_hashes = _multiply(np.where(suited, _ID_PRIMES[cards], 1), -1)
+            flush_strengths = self.flush_values[
+                np.searchsorted(self.flush_keys, flush_hashes)
+            ]
+            strengths[rows, players] = np.maximum(
+                strengths[rows, players], flush_strengths
+            )
+
+        return strengths
+
+
+def _extend(table, card_count, total_count, multiplicity, keep_all):
+    # The best hand of n cards is the best hand among its n - 1 card subsets.
+    tables = [table]
+
+    for _ in range(total_count - card_count):
+        extended = {}
+
+        for key, value in tables[-1].items():
+            for prime in _PRIMES:
+                if key % prime**multiplicity == 0:
+                    continue
+
+                new_key = key * prime
+
+                if new_key not in extended or extended[new_key] < value:
+                    extended[new_key] = value
+
+        tables.append(extended)
+
+    if not keep_all:
+        return tables[-1]
+
+    merged = {}
+
+    for table in tables:
+        merged.update(table)
+
+    return merged
+
+
+def _to_arrays(table):
+    keys = np.array(sorted(table), dtype=np.int64)
+    values = np.array([table[key] for key in keys.tolist()], dtype=np.int64)
+
+    return keys, values
+
+
+@lru_cache(maxsize=None)
+def _get_table(hand_type, total_count: int) -> _StrengthTable:
+    card_count = getattr(hand_type, "card_count", None)
+
+    if (
+        card_count is None
+        or getattr(hand_type, "board_card_count", None) is not None
+        or not card_count <= total_count <= 4 * len(_RANKS)
+    ):
+        raise ValueError(
+            f"{hand_type.__name__} hands of {total_count} cards cannot be"
+            " evaluated in batches."
+        )
+
+    lookup = hand_type.lookup
+    sign = -1 if hand_type.low else 1
+
+    def get_strength(ranks, suits):
+        cards = "".join(_RANKS[r] + _SUITS[s] for r, s in zip(ranks, suits))
+        entry = lookup.get_entry_or_none(cards)
+
+        return _INVALID if entry is None else sign * entry.index
+
+    table = {}
+
+    for ranks in combinations_with_replacement(range(len(_RANKS)), card_count):
+        if any(ranks.count(rank) > 4 for rank in set(ranks)):
+            continue
+
+        key = int(np.prod([_PRIMES[rank] for rank in ranks]))
+        # cycling suits keeps paired ranks apart and avoids flushes
+        table[key] = get_strength(ranks, [i % 4 for i in range(card_count)])
+
+    flush_table = {}
+    suit_sensitive = False
+
+    for ranks in combinations(range(len(_RANKS)), card_count):
+        key = int(np.prod([_PRIMES[rank] for rank in ranks]))
+        flush_table[key] = get_strength(ranks, [0] * card_count)
+
+        if flush_table[key] < table[key]:
+            raise ValueError(
+                f"{hand_type.__name__} hands cannot be evaluated in batches"
+                " since suited cards may form weaker hands."
+            )
+
+        suit_sensitive |= flush_table[key] != table[key]
+
+    keys, values = _to_arrays(_extend(table, card_count, total_count, 4, False))
+
+    if suit_sensitive:
+        flush_keys, flush_values = _to_arrays(
+            _extend(flush_table, card_count, total_count, 1, True)
+        )
+    else:
+        flush_keys = flush_values = None
+
+    return _StrengthTable(keys, values, flush_keys, flush_values, card_count)
+
+
+def evaluate_hands(hand_type: type, holes: np.ndarray, board: np.ndarray) -> np.ndarray:
+    """Return the strengths of hands given by card ids, greater is better.
+
+    Parameters
+    ----------
+    hand_type : type
+        A hand type supported by :func:`calculate_equities_batch`.
+    holes : numpy.ndarray
+        Hole card ids of the shape ``(boards, hands, cards)``.
+    board : numpy.ndarray
+        Board card ids of the shape ``(boards, cards)``.
+
+    Returns
+    -------
+    numpy.ndarray
+        Strengths of the shape ``(boards, hands)``, only comparable within
+        a hand type and card count.
+    """
+    table = _get_table(hand_type, holes.shape[-1] + board.shape[-1])
+
+    return table.evaluate(holes, board)
+
+
+def _deal(
+    known, decks, hole_lengths, hole_dealing_count, board_ids, draw_count, rng
+):
+    """Deal the unknown cards of each sample.
+
+    ``known`` holds the known hole cards of every sample in player order and
+    ``decks`` the cards left to deal from. The cards are drawn with a partial
+    Fisher-Yates shuffle, all rows at once. The hole cards have the shape
+    ``(samples, players, cards)`` and the board cards the shape
+    ``(samples, cards)``.
+    """
+    sample_count, deck_size = decks.shape
+    cards = decks.ravel()
+    offsets = np.arange(sample_count) * deck_size
+    drawn = np.empty((sample_count, draw_count), dtype=np.int64)
+
+    for j in range(draw_count):
+        picks = offsets + rng.integers(j, deck_size, size=sample_count)
+        drawn[:, j] = cards[picks]
+        # the slot j is never read again, so only the pick is overwritten
+        cards[picks] = cards[offsets + j]
+
+    holes = []
+    known_begin = 0
+    drawn_begin = 0
+
+    for length in hole_lengths:
+        drawn_end = drawn_begin + hole_dealing_count - length
+        holes.append(
+            np.concatenate(
+                (
+                    known[:, known_begin : known_begin + length],
+                    drawn[:, drawn_begin:drawn_end],
+                ),
+                axis=1,
+            )
+        )
+        known_begin += length
+        drawn_begin = drawn_end
+
+    board = np.concatenate(
+        (
+            np.tile(np.array(board_ids, dtype=np.int64), (sample_count, 1)),
+            drawn[:, drawn_begin:],
+        ),
+        axis=1,
+    )
+
+    return np.stack(holes, axis=1), board
+
+
+def _pack_range(holes, weights):
+    """Pack the combos of a range into arrays for drawing them by index.
+
+    The hole card ids are padded with ``-1`` to the longest combo. The
+    cumulative weights are ``None`` when the combos are drawn uniformly.
+    """
+    width = max(map(len, holes), default=0)
+    ids = np.full((len(holes), width), -1, dtype=np.int64)
+
+    for row, hole in zip(ids, holes):
+        row[: len(hole)] = hole
+
+    weights = np.array(weights, dtype=np.float64)
+    cumulative = np.cumsum(weights) if len(weights) and np.ptp(weights) else None
+
+    return ids, cumulative
+
+
+def _selection_exists(hole_id_ranges, board_ids):
+    """Return whether some combination of the ranges shares no card."""
+    for holes in product(*hole_id_ranges):
+        ids = [id_ for hole in holes for id_ in hole]
+
+        if len(set(ids).union(board_ids)) == len(ids) + len(board_ids):
+            return True
+
+    return False
+
+
+def _draw_selections(packed_ranges, hole_id_ranges, board_ids, count, rng):
+    """Draw ``count`` valid selections of hole cards, one combo per range.
+
+    One combo index is drawn per range and sample, uniformly or by weight,
+    and the samples whose combos share a card with each other or with the
+    board are redrawn until none is left. The accepted selections therefore
+    follow the products of the combo weights over the valid selections.
+    The picked, padded hole card ids of each range are returned.
+    """
+    board = np.zeros(53, dtype=bool)
+    board[list(board_ids)] = True
+    picks = [
+        np.empty((count, ids.shape[1]), dtype=np.int64) for ids, _ in packed_ranges
+    ]
+    rows = np.arange(count)
+    checked = False
+
+    while len(rows):
+        drawn = []
+
+        for (ids, cumulative), picked in zip(packed_ranges, picks):
+            if cumulative is None:
+                indices = rng.integers(len(ids), size=len(rows))
+            else:
+                indices = np.searchsorted(
+                    cumulative, rng.random(len(rows)) * cumulative[-1], side="right"
+                )
+            picked[rows] = ids[indices]
+            drawn.append(picked[rows])
+
+        cards = np.concatenate(
+            [np.empty((len(rows), 0), dtype=np.int64), *drawn], axis=1
+        )
+        # padding maps to the unused slot 52 of the board mask
+        cards[cards < 0] = 52
+        collided = board[cards].any(axis=1)
+
+        # there are few known cards, so every pair is compared
+        for i, j in combinations(range(cards.shape[1]), 2):
+            collided |= (cards[:, i] == cards[:, j]) & (cards[:, i] < 52)
+
+        if collided.all() and not checked:
+            if not _selection_exists(hole_id_ranges, board_ids):
+                raise ValueError("No valid selection of hole cards exists.")
+
+            checked = True
+
+        rows = rows[collided]
+
+    return picks
+
+
+def _group_selections(picks, deck_ids, count):
+    """Group the drawn selections by their shape.
+
+    Each group holds the combo lengths of its selections, their known hole
+    card ids in player order and the decks left after removing them, which
+    have the same size within a group.
+    """
+    lengths = np.zeros((count, len(picks)), dtype=np.int64)
+
+    for i, picked in enumerate(picks):
+        lengths[:, i] = (picked >= 0).sum(axis=1)
+
+    known = np.concatenate([np.empty((count, 0), dtype=np.int64), *picks], axis=1)
+    used = np.zeros((count, 53), dtype=bool)
+    np.put_along_axis(used, np.where(known < 0, 52, known), True, axis=1)
+    left = ~used[:, deck_ids]
+    # known cards missing from the deck leave decks of other sizes
+    shapes = np.column_stack((lengths, left.sum(axis=1)))
+    deck = np.broadcast_to(np.array(deck_ids, dtype=np.int64), left.shape)
+
+    if (shapes == shapes[:1]).all():
+        # usually every selection has the same shape, which needs no sort
+        selections = [(shapes[0], slice(None))]
+    else:
+        unique, inverse = np.unique(shapes, axis=0, return_inverse=True)
+        selections = [
+            (shape, inverse.ravel() == i) for i, shape in enumerate(unique)
+        ]
+
+    groups = []
+
+    for shape, rows in selections:
+        *hole_lengths, size = shape.tolist()
+        holes = [picked[rows, :length] for picked, length in zip(picks, hole_lengths)]
+        decks = deck[rows][left[rows]].reshape(-1, size)
+        groups.append(
+            (
+                tuple(hole_lengths),
+                np.concatenate(
+                    [np.empty((len(decks), 0), dtype=np.int64), *holes], axis=1
+                ),
+                decks,
+            )
+        )
+
+    return groups
+
+
+def calculate_equities_batch(
+    hole_ranges: Iterable[
+        Iterable[Iterable[PKCard]] | Mapping[frozenset[PKCard], float]
+    ],
+    board_cards: Iterable[PKCard],
+    hole_dealing_count: int,
+    board_dealing_count: int,
+    deck: Iterable[PKCard],
+    hand_types: Iterable[type],
+    *,
+    sample_count: int,
+    batch_size: int = 65536,
+    rng: np.random.Generator | None = None,
+) -> List[float]:
+    """Estimate equities by dealing samples in batches of NumPy arrays.
+
+    The arguments mirror ``pokerkit.analysis.calculate_equities``. Each
+    sample picks a uniformly random valid selection of hole cards from the
+    ranges, or one in proportion to the products of the combo weights of
+    weighted ranges, deals the unknown cards uniformly from the rest of the deck and
+    splits every pot evenly among the players with the best hand of each
+    hand type.
+
+    Supported hand types are those formed by the best ``card_count`` cards
+    among all hole and board cards, such as ``StandardHighHand``,
+    ``ShortDeckHoldemHand`` or ``EightOrBetterLowHand``. Their strengths are
+    tabulated the first time each hand type and card count is used.
+
+    Parameters
+    ----------
+    hole_ranges : iterable of iterable of iterable of Card or mapping
+        The range of each player in the pot, optionally mapping the combos to
+        their weights.
+    board_cards : iterable of Card
+        The board cards, may be empty.
+    hole_dealing_count : int
+        The final number of hole cards, ``2`` for hold'em.
+    board_dealing_count : int
+        The final number of board cards, ``5`` for hold'em.
+    deck : iterable of Card
+        The deck, typically ``Deck.STANDARD``.
+    hand_types : iterable of type
+        The hand types, typically just ``StandardHighHand``.
+    sample_count : int
+        The number of samples to simulate.
+    batch_size : int, optional
+        The number of samples dealt at once, defaults to 65536.
+    rng : numpy.random.Generator, optional
+        The random generator, a fresh one is used by default.
+
+    Returns
+    -------
+    list of float
+        The equity of each player.
+
+    Raises
+    ------
+    ValueError
+        If a weight is negative, no valid selection of hole cards exists, the
+        deck runs out of cards, or a hand type cannot be evaluated in batches.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    hole_id_ranges = []
+    hole_weights = []
+
+    for hole_range in hole_ranges:
+        if isinstance(hole_range, Mapping):
+            if any(not weight >= 0 for weight in hole_range.values()):
+                raise ValueError("Range weights must be nonnegative.")
+
+            items = [(hole, w) for hole, w in hole_range.items() if w]
+        else:
+            items = [(hole, 1.0) for hole in hole_range]
+
+        hole_id_ranges.append([tuple(PKCard.get_ids(hole)) for hole, _ in items])
+        hole_weights.append([float(weight) for _, weight in items])
+
+    board_ids = tuple(PKCard.get_ids(board_cards))
+    deck_ids = sorted(set(PKCard.get_ids(deck)) - set(board_ids))
+    hand_types = tuple(hand_types)
+    total_count = hole_dealing_count + board_dealing_count
+    tables = [_get_table(hand_type, total_count) for hand_type in hand_types]
+    packed_ranges = list(map(_pack_range, hole_id_ranges, hole_weights))
+
+    if not all(hole_id_ranges):
+        raise ValueError("No valid selection of hole cards exists.")
+
+    equities = np.zeros(len(hole_id_ranges))
+    remaining = sample_count
+
+    while remaining > 0:
+        count = min(batch_size, remaining)
+        remaining -= count
+        picks = _draw_selections(packed_ranges, hole_id_ranges, board_ids, count, rng)
+
+        for lengths, known, decks in _group_selections(picks, deck_ids, count):
+            draw_count = (
+                hole_dealing_count * len(lengths)
+                - sum(lengths)
+                + board_dealing_count
+                - len(board_ids)
+            )
+
+            if draw_count > decks.shape[1]:
+                raise ValueError("There are not enough cards in the deck to deal.")
+
+            holes, board = _deal(
+                known,
+                decks,
+                lengths,
+                hole_dealing_count,
+                board_ids,
+                draw_count,
+                rng,
+            )
+
+            for table in tables:
+                strengths = table.evaluate(holes, board)
+                winners = strengths == strengths.max(axis=1, keepdims=True)
+                shares = winners / winners.sum(axis=1, keepdims=True)
+                equities += shares.sum(axis=0) / len(tables)
+
+    return (equities / sample_count).tolist()
@@ -0,0 +1,732 @@
+"""In-process heads-up CFR solver for turn and river spots.
+
+:class:`CFRSolver` solves the same spots as ``console_solver.exe`` from the
+settings of a solver command script (pot, effective stack, board, weighted
+ranges and ``set_bet_sizes`` lines) without leaving Python. It runs
+discounted CFR (DCFR) with the strategies and regrets of every decision
+point held as NumPy arrays over the combos of the acting player's range, so
+that each iteration is a few array operations per node of the betting tree.
+Showdowns are evaluated by sorting the hands by strength, with card removal
+handled by per-card cumulative sums, instead of comparing every pair.
+
+Turn spots deal each river card as a separate slice of the same arrays. The
+river cards can be split between threads, which NumPy runs in parallel.
+
+Solving stops once the exploitability of the average strategies falls under
+the accuracy target, in percent of the pot as with ``set_accuracy``, or when
+the iteration or time budget runs out. The result is a tree of nodes in the
+format of the JSON dumped by ``console_solver.exe``, which
+:func:`texas_solver.parse_solver_strategy` reads. Bets are named with their
+amounts in chips and raises with the chips added on top of the call, such as
+``"BET 25.000000"`` and ``"RAISE 60.000000"``.
+
+:class:`CFRSolverBackend` plugs the solver into
+:class:`solver_service.SolverService`.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+import solver_service
+from batch_equity import evaluate_hands
+from pokerkit.pokerkit.hands import StandardHighHand
+from range_library import COMBOS, parse_range_text
+
+_RANKS = "23456789TJQKA"
+_SUITS = "cdhs"
+_STREETS = {4: "turn", 5: "river"}
+
+# discounting of DCFR, as recommended by Brown and Sandholm
+ALPHA = 1.5
+BETA = 0.0
+GAMMA = 2.0
+
+
+def _card_id(card: str) -> int:
+    return _RANKS.index(card[0]) * 4 + _SUITS.index(card[1])
+
+
+def _card_name(card_id: int) -> str:
+    return _RANKS[card_id // 4] + _SUITS[card_id % 4]
+
+
+_COMBO_IDS = np.array([[_card_id(a), _card_id(b)] for a, b in COMBOS])
+
+
+@dataclass(frozen=True)
+class BetSizes:
+    """Bet sizes of one player on one street, as fractions of the pot.
+
+    Raises are sized by the pot after calling. ``donk`` sizes are used for
+    leads out of position into the aggressor of the previous street and
+    default to the bet sizes.
+    """
+
+    bet: Tuple[float, ...] = (0.5, 1.0)
+    raises: Tuple[float, ...] = (1.0,)
+    donk: Optional[Tuple[float, ...]] = None
+    allin: bool = True
+
+
+def parse_bet_sizes(lines: Iterable[str]) -> Dict[Tuple[str, str], BetSizes]:
+    """Parse ``set_bet_sizes`` values such as ``"oop,river,bet,50,100"``.
+
+    Returns
+    -------
+    dict
+        Sizes keyed by player (``"oop"`` or ``"ip"``) and street.
+    """
+
+    fields: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for line in lines:
+        player, street, kind, *sizes = (item.strip() for item in line.split(","))
+        entry = fields.setdefault((player, street), {"bet": (), "raises": ()})
+        if kind == "allin":
+            entry["allin"] = True
+        else:
+            key = {"bet": "bet", "raise": "raises", "donk": "donk"}.get(kind)
+            if key is None:
+                raise ValueError(f"Unknown bet size kind in {line!r}")
+            entry[key] = tuple(float(size) / 100 for size in sizes)
+    return {
+        key: BetSizes(
+            entry["bet"],
+            entry["raises"],
+            entry.get("donk"),
+            entry.get("allin", False),
+        )
+        for key, entry in fields.items()
+    }
+
+
+@dataclass(eq=False)
+class _Node:
+    kind: str  # "action", "chance", "fold" or "showdown"
+    level: int  # 0 before the chance node of turn spots, 1 after
+    commits: Tuple[float, float]
+    player: int = -1
+    actions: List[str] = field(default_factory=list)
+    children: List["_Node"] = field(default_factory=list)
+    regrets: Optional[np.ndarray] = None
+    strategy_sum: Optional[np.ndarray] = None
+
+
+class CFRSolver:
+    """Solve a heads-up turn or river spot with DCFR.
+
+    Player 0 is out of position and acts first, player 1 is in position.
+
+    Parameters
+    ----------
+    pot : float
+        The pot before the street.
+    stack : float
+        The effective stack behind.
+    board : sequence of str
+        Four or five board cards such as ``["Qs", "Jh", "2h", "7c"]``.
+    range_oop, range_ip : str or numpy.ndarray
+        Ranges in ``hand:weight`` notation or as weights of the 1326
+        :data:`range_library.COMBOS`.
+    bet_sizes : dict, optional
+        Sizes from :func:`parse_bet_sizes`. Players and streets without
+        sizes use :class:`BetSizes` defaults.
+    allin_threshold : float, optional
+        Bets and raises of at least this fraction of the stack left go all
+        in instead.
+    raise_limit : int, optional
+        Number of raises allowed on each street.
+    threads : int, optional
+        Number of threads sharing the river cards of turn spots.
+
+    Raises
+    ------
+    ValueError
+        If the board is not a turn or river board or a range is empty.
+    """
+
+    def __init__(
+        self,
+        *,
+        pot: float,
+        stack: float,
+        board: Sequence[str],
+        range_oop: str | np.ndarray,
+        range_ip: str | np.ndarray,
+        bet_sizes: Mapping[Tuple[str, str], BetSizes] | None = None,
+        allin_threshold: float = 0.67,
+        raise_limit: int = 3,
+        threads: int = 1,
+    ) -> None:
+        if len(board) not in _STREETS:
+            raise ValueError("Only turn and river spots can be solved in-process")
+
+        self.pot = float(pot)
+        self.stack = float(stack)
+        self.board = [_card_id(card) for card in board]
+        if len(set(self.board)) != len(self.board):
+            raise ValueError("The board cards are not distinct")
+        self.bet_sizes = dict(bet_sizes or {})
+        self.allin_threshold = allin_threshold
+        self.raise_limit = raise_limit
+        self.threads = max(1, threads)
+        self.iterations = 0
+
+        self._init_hands([range_oop, range_ip])
+        self._init_contexts()
+        self.root = self._build_street(0, len(self.board), (0.0, 0.0), 0, 0, None)
+        self._action_nodes: Tuple[List[_Node], List[_Node]] = ([], [])
+        self._init_state(self.root)
+
+    # setup
+
+    def _init_hands(self, ranges: List[str | np.ndarray]) -> None:
+        dead = np.isin(_COMBO_IDS, self.board).any(axis=1)
+        self.combos: List[np.ndarray] = []
+        self.weights: List[np.ndarray] = []
+
+        for player, raw_range in enumerate(ranges):
+            weights = (
+                parse_range_text(raw_range)
+                if isinstance(raw_range, str)
+                else np.asarray(raw_range, dtype=np.float32)
+            )
+            indices = np.flatnonzero((weights > 0) & ~dead)
+            if not indices.size:
+                raise ValueError(f"The range of player {player} is empty")
+            self.combos.append(indices)
+            self.weights.append(weights[indices].astype(np.float64))
+
+        self.cards = [_COMBO_IDS[indices] for indices in self.combos]
+        self.onehot = [
+            np.eye(52)[cards].sum(axis=1) for cards in self.cards
+        ]  # (hands, 52)
+        # index of the same combo in the range of the opponent, or -1
+        self.same = []
+        for player in range(2):
+            positions = {combo: i for i, combo in enumerate(self.combos[1 - player])}
+            self.same.append(
+                np.array([positions.get(combo, -1) for combo in self.combos[player]])
+            )
+
+    def _init_contexts(self) -> None:
+        if len(self.board) == 5:
+            self.rivers: List[int] = []
+            boards = np.array([self.board])
+        else:
+            self.rivers = [card for card in range(52) if card not in self.board]
+            boards = np.array([self.board + [river] for river in self.rivers])
+
+        # hands which do not hold the river card of each context
+        self.valid = [
+            (cards[None, :, :] != boards[:, -1, None, None]).all(axis=2)
+            if self.rivers
+            else np.ones((1, len(cards)), dtype=bool)
+            for cards in self.cards
+        ]
+
+        strengths = [
+            evaluate_hands(
+                StandardHighHand,
+                np.broadcast_to(cards, (len(boards),) + cards.shape),
+                boards,
+            )
+            for cards in self.cards
+        ]
+        # the opponent hands sorted by strength, and the hands of each player
+        # stronger and weaker than them
+        self.order = [np.argsort(s, axis=1, kind="stable") for s in strengths]
+        self.sorted_onehot = [
+            self.onehot[player][self.order[player]] for player in range(2)
+        ]
+        self.lower: List[np.ndarray] = []
+        self.upper: List[np.ndarray] = []
+        for player in range(2):
+            opponent = strengths[1 - player]
+            sorted_opponent = np.take_along_axis(
+                opponent, self.order[1 - player], axis=1
+            )
+            self.lower.append(
+                np.array(
+                    [
+                        np.searchsorted(row, own, "left")
+                        for row, own in zip(sorted_opponent, strengths[player])
+                    ]
+                )
+            )
+            self.upper.append(
+                np.array(
+                    [
+                        np.searchsorted(row, own, "right")
+                        for row, own in zip(sorted_opponent, strengths[player])
+                    ]
+                )
+            )
+
+    def _sizes(self, player: int, street: int) -> BetSizes:
+        key = ("oop", "ip")[player], _STREETS[street]
+        return self.bet_sizes.get(key, BetSizes())
+
+    def _bet_amounts(
+        self, fractions: Iterable[float], base: float, minimum: float, left: float
+    ) -> List[Tuple[float, bool]]:
+        amounts: List[Tuple[float, bool]] = []
+        for fraction in fractions:
+            amount = max(minimum, fraction * base)
+            if amount >= left * self.allin_threshold or amount >= left:
+                amount = left
+            entry = (round(amount, 6), amount >= left)
+            if entry not in amounts:
+                amounts.append(entry)
+        return amounts
+
+    def _build_street(
+        self,
+        level: int,
+        street: int,
+        commits: Tuple[float, float],
+        player: int,
+        raise_count: int,
+        aggressor: Optional[int],
+        *,
+        previous_aggressor: Optional[int] = None,
+    ) -> _Node:
+        opponent = 1 - player
+        to_call = commits[opponent] - commits[player]
+        pot = self.pot + sum(commits)
+        left = self.stack - commits[player]
+        sizes = self._sizes(player, street)
+        node = _Node("action", level, commits, player)
+
+        def add(name: str, child: _Node) -> None:
+            node.actions.append(name)
+            node.children.append(child)
+
+        if to_call > 0:
+            add("FOLD", _Node("fold", level, commits, player))
+            called = (commits[opponent], commits[opponent])
+            add("CALL", self._end_street(level, street, called, player))
+            if raise_count < self.raise_limit and left > to_call:
+                fractions = list(sizes.raises)
+                amounts = self._bet_amounts(
+                    fractions, pot + to_call, to_call, left - to_call
+                )
+                if sizes.allin and (left - to_call, True) not in amounts:
+                    amounts.append((left - to_call, True))
+                for amount, _ in amounts:
+                    raised = list(commits)
+                    raised[player] = commits[opponent] + amount
+                    add(
+                        f"RAISE {amount:.6f}",
+                        self._build_street(
+                            level,
+                            street,
+                            (raised[0], raised[1]),
+                            opponent,
+                            raise_count + 1,
+                            player,
+                        ),
+                    )
+        else:
+            if player == 1:
+                check = self._end_street(level, street, commits, None)
+            else:
+                check = self._build_street(
+                    level, street, commits, opponent, raise_count, aggressor
+                )
+            add("CHECK", check)
+
+            fractions = sizes.bet
+            if player == 0 and previous_aggressor == 1 and sizes.donk is not None:
+                fractions = sizes.donk
+            if left > 0:
+                amounts = self._bet_amounts(fractions, pot, 1.0, left)
+                if sizes.allin and (left, True) not in amounts:
+                    amounts.append((left, True))
+                for amount, _ in amounts:
+                    bet = list(commits)
+                    bet[player] = commits[player] + amount
+                    add(
+                        f"BET {amount:.6f}",
+                        self._build_street(
+                            level, street, (bet[0], bet[1]), opponent, 0, player
+                        ),
+                    )
+
+        return node
+
+    def _end_street(
+        self,
+        level: int,
+        street: int,
+        commits: Tuple[float, float],
+        caller: Optional[int],
+    ) -> _Node:
+        if street == 5:
+            return _Node("showdown", level, commits)
+
+        chance = _Node("chance", level, commits)
+        if commits[0] >= self.stack:
+            chance.children.append(_Node("showdown", 1, commits))
+        else:
+            # the caller closed the action, so the other player was aggressor
+            aggressor = None if caller is None else 1 - caller
+            chance.children.append(
+                self._build_street(
+                    1, 5, commits, 0, 0, None, previous_aggressor=aggressor
+                )
+            )
+        return chance
+
+    def _init_state(self, node: _Node) -> None:
+        if node.kind == "action":
+            contexts = max(1, len(self.rivers)) if node.level else 1
+            shape = (contexts, len(node.actions), len(self.combos[node.player]))
+            node.regrets = np.zeros(shape)
+            node.strategy_sum = np.zeros(shape)
+            self._action_nodes[node.player].append(node)
+        for child in node.children:
+            self._init_state(child)
+
+    # traversal
+
+    @staticmethod
+    def _normalize(values: np.ndarray) -> np.ndarray:
+        totals = values.sum(axis=1, keepdims=True)
+        uniform = np.full_like(values, 1 / values.shape[1])
+        return np.divide(values, totals, out=uniform, where=totals > 0)
+
+    def _current_strategy(self, node: _Node, contexts: slice) -> np.ndarray:
+        return self._normalize(np.maximum(node.regrets[contexts], 0))
+
+    def _average_strategy(self, node: _Node, contexts: slice) -> np.ndarray:
+        return self._normalize(node.strategy_sum[contexts])
+
+    def _fold_values(
+        self, player: int, reach: np.ndarray, payoff: float
+    ) -> np.ndarray:
+        cards = self.cards[player]
+        card_reach = reach @ self.onehot[1 - player]
+        same = self.same[player]
+        compatible = (
+            reach.sum(axis=1, keepdims=True)
+            - card_reach[:, cards[:, 0]]
+            - card_reach[:, cards[:, 1]]
+            + np.where(same >= 0, reach[:, same], 0)
+        )
+        return payoff * compatible
+
+    def _showdown_values(
+        self, player: int, reach: np.ndarray, payoff: float, contexts: slice
+    ) -> np.ndarray:
+        opponent = 1 - player
+        order = self.order[opponent][contexts]
+        sorted_reach = np.take_along_axis(reach, order, axis=1)
+        count = len(sorted_reach)
+
+        cumulative = np.zeros((count, sorted_reach.shape[1] + 1))
+        np.cumsum(sorted_reach, axis=1, out=cumulative[:, 1:])
+        card_cumulative = np.zeros((count, sorted_reach.shape[1] + 1, 52))
+        np.cumsum(
+            sorted_reach[:, :, None] * self.sorted_onehot[opponent][contexts],
+            axis=1,
+            out=card_cumulative[:, 1:],
+        )
+
+        rows = np.arange(count)[:, None]
+        first, second = self.cards[player][:, 0], self.cards[player][:, 1]
+        lower = self.lower[player][contexts]
+        upper = self.upper[player][contexts]
+
+        def weaker(index):
+            return (
+                cumulative[rows, index]
+                - card_cumulative[rows, index, first]
+                - card_cumulative[rows, index, second]
+            )
+
+        # ties, including the same combo, sit between lower and upper
+        total = weaker(np.full_like(upper, sorted_reach.shape[1]))
+        return payoff * (weaker(lower) - (total - weaker(upper)))
+
+    def _traverse(
+        self,
+        node: _Node,
+        player: int,
+        own_reach: np.ndarray,
+        reach: np.ndarray,
+        contexts: slice,
+        best_response: bool = False,
+    ) -> np.ndarray:
+        """Return the counterfactual values of the hands of ``player``."""
+
+        if node.kind == "fold":
+            loser = node.player
+            payoff = self.pot / 2 + node.commits[loser]
+            return self._fold_values(
+                player, reach, payoff if loser != player else -payoff
+            )
+
+        if node.kind == "showdown":
+            payoff = self.pot / 2 + node.commits[0]
+            return self._showdown_values(player, reach, payoff, contexts)
+
+        if node.kind == "chance":
+            return self._deal(node, player, own_reach, reach, best_response)
+
+        if node.player != player:
+            strategy = (
+                self._average_strategy(node, contexts)
+                if best_response
+                else self._current_strategy(node, contexts)
+            )
+            values = np.zeros_like(own_reach)
+            for action, child in enumerate(node.children):
+                child_reach = reach * strategy[:, action]
+                if child_reach.any():
+                    values += self._traverse(
+                        child, player, own_reach, child_reach, contexts, best_response
+                    )
+            return values
+
+        strategy = self._current_strategy(node, contexts)
+        action_values = np.stack(
+            [
+                self._traverse(
+                    child,
+                    player,
+                    own_reach * strategy[:, action],
+                    reach,
+                    contexts,
+                    best_response,
+                )
+                for action, child in enumerate(node.children)
+            ],
+            axis=1,
+        )
+        if best_response:
+            return action_values.max(axis=1)
+
+        values = (strategy * action_values).sum(axis=1)
+        node.regrets[contexts] += action_values - values[:, None]
+        node.strategy_sum[contexts] += strategy * own_reach[:, None]
+        return values
+
+    def _deal(
+        self,
+        node: _Node,
+        player: int,
+        own_reach: np.ndarray,
+        reach: np.ndarray,
+        best_response: bool,
+    ) -> np.ndarray:
+        child = node.children[0]
+        count = len(self.rivers)
+        chunk = math.ceil(count / self.threads)
+        chunks = [slice(i, min(i + chunk, count)) for i in range(0, count, chunk)]
+
+        def run(contexts: slice) -> np.ndarray:
+            own_valid = self.valid[player][contexts]
+            values = self._traverse(
+                child,
+                player,
+                own_reach * own_valid,
+                reach * self.valid[1 - player][contexts],
+                contexts,
+                best_response,
+            )
+            return (values * own_valid).sum(axis=0)
+
+        if len(chunks) > 1:
+            with ThreadPoolExecutor(len(chunks)) as executor:
+                total = sum(executor.map(run, chunks))
+        else:
+            total = run(chunks[0])
+        # each pair of hands leaves four cards fewer than there are rivers
+        return total[None, :] / (count - 4)
+
+    # solving
+
+    def iterate(self) -> None:
+        """Run one iteration, updating each player once."""
+        self.iterations += 1
+        t = self.iterations
+        for player in range(2):
+            for node in self._action_nodes[player]:
+                positive = node.regrets > 0
+                node.regrets *= np.where(
+                    positive, t**ALPHA / (t**ALPHA + 1), t**BETA / (t**BETA + 1)
+                )
+                node.strategy_sum *= (t / (t + 1)) ** GAMMA
+            self._traverse(
+                self.root,
+                player,
+                self.weights[player][None, :],
+                self.weights[1 - player][None, :],
+                slice(0, 1),
+            )
+
+    def exploitability(self) -> float:
+        """Return the exploitability of the average strategies in % of the pot.
+
+        It is the mean gain of the best responses of both players against the
+        average strategy of the other, per hand pair dealt.
+        """
+        total = 0.0
+        for player in range(2):
+            values = self._traverse(
+                self.root,
+                player,
+                self.weights[player][None, :],
+                self.weights[1 - player][None, :],
+                slice(0, 1),
+                best_response=True,
+            )
+            total += float(values[0] @ self.weights[player])
+
+        pairs = float(
+            self._fold_values(0, self.weights[1][None, :], 1.0)[0] @ self.weights[0]
+        )
+        return 100 * total / 2 / pairs / self.pot
+
+    def solve(
+        self,
+        *,
+        max_iterations: int = 200,
+        accuracy: float = 0.5,
+        time_limit: float | None = None,
+        check_interval: int = 10,
+    ) -> float:
+        """Iterate until the exploitability is at most ``accuracy``.
+
+        Parameters
+        ----------
+        max_iterations : int, optional
+            Iteration budget.
+        accuracy : float, optional
+            Target exploitability in percent of the pot.
+        time_limit : float, optional
+            Seconds after which no further iteration is started.
+        check_interval : int, optional
+            Number of iterations between exploitability checks.
+
+        Returns
+        -------
+        float
+            The final exploitability in percent of the pot, computed once
+            more only if the last iteration was not checked.
+        """
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        exploitability = None
+        while self.iterations < max_iterations:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self.iterate()
+            exploitability = None
+            if self.iterations % check_interval == 0:
+                exploitability = self.exploitability()
+                if exploitability <= accuracy:
+                    break
+        if exploitability is None:
+            exploitability = self.exploitability()
+        return exploitability
+
+    def result(self, dump_rounds: int = 1) -> dict:
+        """Return the average strategies as solver JSON data.
+
+        Parameters
+        ----------
+        dump_rounds : int, optional
+            Number of streets dumped, 2 includes the river of turn spots.
+        """
+        return self._dump(self.root, 0, dump_rounds)
+
+    def _dump(self, node: _Node, context: int, rounds: int) -> dict:
+        if node.kind == "chance":
+            data: Dict[str, Any] = {
+                "node_type": "chance_node",
+                "deal_number": len(self.rivers),
+            }
+            child = node.children[0]
+            if rounds > 1 and child.kind == "action":
+                data["dealcards"] = {
+                    _card_name(river): self._dump(child, i, rounds - 1)
+                    for i, river in enumerate(self.rivers)
+                }
+            return data
+
+        contexts = slice(context, context + 1)
+        strategy = self._average_strategy(node, contexts)[0]
+        valid = self.valid[node.player][context] if node.level else None
+        combos = {}
+        for i, combo in enumerate(self.combos[node.player]):
+            if valid is None or valid[i]:
+                combos["".join(COMBOS[combo])] = [
+                    round(float(p), 6) for p in strategy[:, i]
+                ]
+
+        return {
+            "node_type": "action_node",
+            "player": node.player,
+            "actions": list(node.actions),
+            "strategy": {"actions": list(node.actions), "strategy": combos},
+            "childrens": {
+                name: self._dump(child, context, rounds)
+                for name, child in zip(node.actions, node.children)
+                if child.kind in ("action", "chance")
+            },
+        }
+
+
+def solve_settings(
+    settings: Mapping[str, Any], *, time_limit: float | None = None
+) -> dict:
+    """Solve the spot of :func:`solver_service.parse_commands` settings.
+
+    The ``max_iteration``, ``accuracy``, ``print_interval``, ``thread_num``
+    and ``dump_rounds`` settings are honoured like ``console_solver.exe``.
+    """
+
+    solver = CFRSolver(
+        pot=float(settings["pot"]),
+        stack=float(settings["effective_stack"]),
+        board=[card for card in settings.get("board", "").split(",") if card],
+        range_oop=settings["range_oop"],
+        range_ip=settings["range_ip"],
+        bet_sizes=parse_bet_sizes(settings.get("bet_sizes", [])),
+        allin_threshold=float(settings.get("allin_threshold", 0.67)),
+        raise_limit=int(settings.get("raise_limit", 3)),
+        threads=int(settings.get("thread_num", 1)),
+    )
+    solver.solve(
+        max_iterations=int(settings.get("max_iteration", 200)),
+        accuracy=float(settings.get("accuracy", 0.5)),
+        time_limit=time_limit,
+        check_interval=max(1, int(settings.get("print_interval", 10))),
+    )
+    return solver.result(int(settings.get("dump_rounds", 1)))
+
+
+class CFRSolverBackend:
+    """Solver backend running :class:`CFRSolver` in the calling process.
+
+    The timeout of a job is used as its time budget, so the job returns the
+    strategies reached so far instead of failing.
+    """
+
+    def start(self) -> None:
+        pass
+
+    def solve(self, commands: str, timeout: float | None) -> str:
+        settings = solver_service.parse_commands(commands)
+        return json.dumps(solve_settings(settings, time_limit=timeout))
+
+    def close(self) -> None:
+        pass
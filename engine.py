@@ -6,17 +6,38 @@ Poker game engine for Texas Hold'em using pokerkit.
 
 import json
 import random
-import tempfile
+from collections import deque
 from pathlib import Path
 
+import phh_export
+import solver_cache
 import texas_solver
 from pokerkit.pokerkit.hands import StandardHighHand
-from pokerkit.pokerkit.utilities import Card as PKCard
-from pokerkit.pokerkit.utilities import Deck
+
+
+def card_to_id(card_tuple):
+    """Return the 0..51 card id of a ``(rank, suit)`` tuple.
+
+    The ids follow the order of pokerkit's ``Deck.STANDARD`` so that
+    ``Card.from_ids`` and the id-based hand evaluation accept them directly.
+    """
+    return (card_tuple[0] - 2) * 4 + card_tuple[1]
+
+
+def id_to_card(card_id):
+    """Return the ``(rank, suit)`` tuple of a 0..51 card id."""
+    return (card_id // 4 + 2, card_id % 4)
 
 
 class PokerEngine:
-    def __init__(self, num_players=6, starting_stack=1000, sb_amt=10, bb_amt=20):
+    def __init__(
+        self,
+        num_players=6,
+        starting_stack=1000,
+        sb_amt=10,
+        bb_amt=20,
+        history_limit=None,
+    ):
         self.num_players = num_players
         self.starting_stack = starting_stack
         self.sb_amt = sb_amt
@@ -38,9 +59,10 @@ class PokerEngine:
         self.turn = 0
         self.last_raiser = None
 
-        # hand histories
-        self.hand_histories = []
+        # hand histories, the most recent ``history_limit`` are kept
+        self.hand_histories = deque(maxlen=history_limit)
         self._current_history = None
+        self.history_writer = None
 
     def new_hand(self):
         """Start a new hand and reset all betting state."""
@@ -99,13 +121,13 @@ class PokerEngine:
         )
 
         # shuffle and deal
-        self.deck = list(Deck.STANDARD)
+        self.deck = list(range(52))
         random.shuffle(self.deck)
         self.hole_cards = {}
         for i in range(self.num_players):
             c1 = self.deck.pop()
             c2 = self.deck.pop()
-            cards = [self._card_to_tuple(c1), self._card_to_tuple(c2)]
+            cards = [id_to_card(c1), id_to_card(c2)]
             self.hole_cards[i] = cards
             self._current_history["hole_cards"][i] = cards
         self.community = []
@@ -226,11 +248,7 @@ class PokerEngine:
                         "hand": None,
                     }
                 ]
-                self._current_history["winners"] = winners_record
-                self._current_history["final_stacks"] = self.stacks.copy()
-                self._current_history["community"] = self.community.copy()
-                self.hand_histories.append(self._current_history)
-                self._current_history = None
+                self._finish_history(winners_record)
             self.pot = 0
             self.stage = "complete"
             return
@@ -321,7 +339,7 @@ class PokerEngine:
         # deal 3 board cards
         flop = []
         for _ in range(3):
-            flop.append(self._card_to_tuple(self.deck.pop()))
+            flop.append(id_to_card(self.deck.pop()))
         self.community = flop
         if self._current_history is not None:
             self._current_history["community"] = self.community.copy()
@@ -331,7 +349,7 @@ class PokerEngine:
         # burn
         self.deck.pop()
         # deal 1 board card
-        self.community.append(self._card_to_tuple(self.deck.pop()))
+        self.community.append(id_to_card(self.deck.pop()))
         if self._current_history is not None:
             self._current_history["community"] = self.community.copy()
         return self.community
@@ -340,22 +358,24 @@ class PokerEngine:
         # burn
         self.deck.pop()
         # deal 1 board card
-        self.community.append(self._card_to_tuple(self.deck.pop()))
+        self.community.append(id_to_card(self.deck.pop()))
         if self._current_history is not None:
             self._current_history["community"] = self.community.copy()
         return self.community
 
     def showdown(self):
-        board_str = "".join(self._tuple_to_str(c) for c in self.community)
+        board_ids = [card_to_id(c) for c in self.community]
         hands = {}
         for i in range(self.num_players):
             if not self.active[i] and not self.all_in[i]:
                 continue
-            hole = self.hole_cards[i]
-            hole_str = "".join(self._tuple_to_str(c) for c in hole)
-            hand = StandardHighHand.from_game_or_none(hole_str, board_str)
-            if hand is not None:
-                hands[i] = hand
+            hole_ids = [card_to_id(c) for c in self.hole_cards[i]]
+            try:
+                hands[i] = StandardHighHand.get_game_entry_from_ids(
+                    hole_ids, board_ids
+                )
+            except ValueError:
+                continue
 
         side_pots = self._compute_side_pots()
         winners_record = []
@@ -380,40 +400,24 @@ class PokerEngine:
                     "pot": pot["amount"],
                     "winners": winners,
                     "share": share,
-                    "hand": best_hand.entry.label.value if best_hand else None,
+                    "hand": best_hand.label.value if best_hand else None,
                 }
             )
 
         if self._current_history is not None:
-            self._current_history["winners"] = winners_record
-            self._current_history["final_stacks"] = self.stacks.copy()
-            self._current_history["community"] = self.community.copy()
-            self.hand_histories.append(self._current_history)
-            self._current_history = None
+            self._finish_history(winners_record)
         self.pot = 0
         return winners_record
 
-    def _card_to_tuple(self, card: PKCard):
-        # convert pokerkit Card to (rank_int, suit_int)
-        rank_map = {
-            "2": 2,
-            "3": 3,
-            "4": 4,
-            "5": 5,
-            "6": 6,
-            "7": 7,
-            "8": 8,
-            "9": 9,
-            "T": 10,
-            "J": 11,
-            "Q": 12,
-            "K": 13,
-            "A": 14,
-        }
-        suit_map = {"c": 0, "d": 1, "h": 2, "s": 3}
-        rank_char = card.rank.value
-        suit_char = card.suit.value
-        return (rank_map[rank_char], suit_map[suit_char])
+    def _finish_history(self, winners_record):
+        """Record the finished hand in memory and in the history writer."""
+        self._current_history["winners"] = winners_record
+        self._current_history["final_stacks"] = self.stacks.copy()
+        self._current_history["community"] = self.community.copy()
+        self.hand_histories.append(self._current_history)
+        if self.history_writer is not None:
+            self.history_writer.write(self._current_history)
+        self._current_history = None
 
     def _tuple_to_str(self, card_tuple):
         # convert (rank_int, suit_int) to card string like 'As'
@@ -436,9 +440,40 @@ class PokerEngine:
         return rank_map[card_tuple[0]] + suit_map[card_tuple[1]]
 
     def save_histories(self, path):
-        """Persist recorded hand histories to a JSON file."""
+        """Persist the hand histories held in memory to a JSON file."""
         with open(path, "w", encoding="utf-8") as fh:
-            json.dump(self.hand_histories, fh)
+            json.dump(list(self.hand_histories), fh)
+
+    def save_phh(self, path, skip_invalid=False):
+        """Write the hand histories held in memory to a PHHS file.
+
+        Parameters
+        ----------
+        path : str or Path
+            The file written, readable by ``HandHistory.load_all``.
+        skip_invalid : bool, optional
+            Leave out hands that pokerkit cannot replay instead of raising
+            ``ValueError``, see :mod:`phh_export`.
+
+        Returns
+        -------
+        int
+            The number of hands written.
+        """
+        phhs = phh_export.iter_phh(self.hand_histories, skip_invalid=skip_invalid)
+        with open(path, "wb") as fh:
+            return phh_export.write_phhs(phhs, fh)
+
+    def attach_history_writer(self, writer):
+        """Stream each finished hand to ``writer``.
+
+        Parameters
+        ----------
+        writer : history_writer.HistoryWriter or None
+            Receives the history of every hand as it finishes, ``None``
+            detaches the current writer. The writer is not closed here.
+        """
+        self.history_writer = writer
 
     def add_chips(self, player: int, amount: int) -> None:
         """Add chips to a player's stack."""
@@ -449,27 +484,23 @@ class PokerEngine:
         *,
         range_oop: str,
         range_ip: str,
-        exe_dir: Path | str = texas_solver.DEFAULT_EXE_DIR,
+        exe_dir: Path | str | None = None,
     ) -> str:
-        """Call TexasSolver for the current board state."""
+        """Call TexasSolver for the current board state.
+
+        The spot is queued on the shared :mod:`solver_service` unless the
+        directory of another ``console_solver.exe`` is given. Spots found in
+        the :mod:`solver_cache` return the cached strategy as solver JSON.
+        """
 
         board = [self._tuple_to_str(c) for c in self.community]
         stack = min(self.stacks[i] for i in range(self.num_players) if self.active[i])
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".txt") as tmp:
-            param = texas_solver.simple_parameter_file(
-                pot=self.pot,
-                stack=stack,
-                board=board,
-                range_oop=range_oop,
-                range_ip=range_ip,
-                output_path=tmp.name,
-            )
-
-        try:
-            return texas_solver.run_console_solver(param, exe_dir=exe_dir, timeout=15)
-        finally:
-            try:
-                Path(param).unlink()
-            except FileNotFoundError:
-                pass
+        commands = texas_solver.build_commands(
+            pot=self.pot,
+            stack=stack,
+            board=board,
+            range_oop=range_oop,
+            range_ip=range_ip,
+        )
+        return solver_cache.solve_output(commands, exe_dir=exe_dir, timeout=15)
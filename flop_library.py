@@ -0,0 +1,504 @@
+"""Precomputed flop strategies for preflop spots of the bundled ranges.
+
+A preflop node is a heads-up spot of the TexasSolver range tree, named by its
+action path such as ``"CO/2.5bb/BTN/Call"``, whose directory holds the range
+of each player. :func:`precompute` solves the node on every strategically
+distinct flop, one of the 1,755 boards left when suits are permuted away, on
+a :class:`solver_service.SolverService` and stores the strategies in a
+:class:`FlopLibrary`.
+
+Every finished flop is committed to the library, so an interrupted run picks
+up where it stopped, and failed solves are retried. The library answers
+lookups of any flop with one primary-key read.
+
+Run ``python flop_library.py --help`` for the command line options; the
+``--stub`` option solves with :func:`stub_solve` instead of the binary.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Sequence, Tuple
+
+import solver_cache
+import texas_solver
+from pokerkit import parse_weighted_range
+from solver_cache import CanonicalSpot
+from solver_service import LocalSolverBackend, SolverService
+
+DEFAULT_RANGE_DIR = texas_solver.DEFAULT_EXE_DIR / "ranges" / "6max_range"
+DEFAULT_LIBRARY_PATH = Path(__file__).parent / "solver_cache" / "flop_library.sqlite"
+
+# order of action after the flop, the first to act is out of position
+POSTFLOP_ORDER = ("SB", "BB", "UTG", "MP", "CO", "BTN")
+BLINDS = {"SB": 0.5, "BB": 1.0}
+
+_RANKS = "23456789TJQKA"
+_SUITS = "cdhs"
+
+Flop = Tuple[str, str, str]
+
+
+@lru_cache(maxsize=None)
+def canonical_flops() -> dict[Flop, int]:
+    """Return each canonical flop with the number of flops it stands for.
+
+    There are 1,755 canonical flops standing for all 22,100 flops.
+    """
+
+    # the card ids under each suit permutation, as in solver_cache
+    tables = [
+        [i - i % 4 + permutation[i % 4] for i in range(52)]
+        for permutation in itertools.permutations(range(4))
+    ]
+    counts: dict[Tuple[int, ...], int] = {}
+    for flop in itertools.combinations(range(52), 3):
+        board = min(
+            tuple(sorted((table[i] for i in flop), reverse=True)) for table in tables
+        )
+        counts[board] = counts.get(board, 0) + 1
+    return {
+        tuple(_RANKS[i // 4] + _SUITS[i % 4] for i in board): count
+        for board, count in counts.items()
+    }
+
+
+@dataclass(frozen=True)
+class PreflopNode:
+    """A heads-up spot reached preflop, with amounts in big blinds.
+
+    Attributes
+    ----------
+    name : str
+        Action path of the node below the range directory.
+    oop, ip : str
+        Positions of the players out of and in position.
+    range_oop, range_ip : str
+        Their ranges as ``hand:weight`` lists.
+    pot : float
+        Pot on the flop.
+    stack : float
+        Effective stack behind on the flop.
+    """
+
+    name: str
+    oop: str
+    ip: str
+    range_oop: str
+    range_ip: str
+    pot: float
+    stack: float
+
+    def commands(self, flop: Iterable[str]) -> str:
+        """Return the solver commands of the node on ``flop``."""
+        return texas_solver.build_commands(
+            pot=self.pot,
+            stack=self.stack,
+            board=flop,
+            range_oop=self.range_oop,
+            range_ip=self.range_ip,
+        )
+
+
+def load_node(
+    name: str,
+    *,
+    root: str | Path = DEFAULT_RANGE_DIR,
+    stack_depth: float = 100.0,
+) -> PreflopNode:
+    """Load a heads-up preflop node of the range tree.
+
+    Parameters
+    ----------
+    name : str
+        Action path such as ``"CO/2.5bb/BTN/Call"``, alternating positions and
+        actions, which are raise sizes, ``Call``, ``AllIn`` or ``Fold``.
+    root : str or Path, optional
+        Directory of the range tree.
+    stack_depth : float, optional
+        Starting stacks in big blinds.
+
+    Raises
+    ------
+    ValueError
+        If the node is not heads-up or its path cannot be read.
+    """
+
+    directory = Path(root) / name
+    ranges = {
+        path.name[: -len("_range.txt")]: path.read_text().strip()
+        for path in directory.glob("*_range.txt")
+    }
+    if len(ranges) != 2:
+        raise ValueError(f"Node {name!r} is not heads-up")
+
+    steps = name.strip("/").split("/")
+    if len(steps) % 2:
+        raise ValueError(f"Node {name!r} does not end with an action")
+
+    contributions = dict(BLINDS)
+    bet = 1.0
+    for position, action in zip(steps[::2], steps[1::2]):
+        if action == "Call":
+            contributions[position] = bet
+        elif action == "AllIn":
+            bet = contributions[position] = stack_depth
+        elif action.endswith("bb"):
+            bet = contributions[position] = float(action[:-2])
+        elif action != "Fold":
+            raise ValueError(f"Unknown action {action!r} in node {name!r}")
+
+    oop, ip = sorted(ranges, key=POSTFLOP_ORDER.index)
+    return PreflopNode(
+        name=name,
+        oop=oop,
+        ip=ip,
+        range_oop=ranges[oop],
+        range_ip=ranges[ip],
+        pot=sum(contributions.values()),
+        stack=stack_depth - max(contributions.get(oop, 0), contributions.get(ip, 0)),
+    )
+
+
+def list_nodes(root: str | Path = DEFAULT_RANGE_DIR) -> list[str]:
+    """Return the names of the heads-up nodes of the range tree with a flop.
+
+    Nodes where a player is all in are left out.
+    """
+
+    root = Path(root)
+    names = set()
+    for path in root.rglob("*_range.txt"):
+        directory = path.parent
+        name = directory.relative_to(root).as_posix()
+        if "AllIn" in name.split("/"):
+            continue
+        if len(list(directory.glob("*_range.txt"))) == 2:
+            names.add(name)
+    return sorted(names)
+
+
+def _flop_key(flop: Iterable[str]) -> str:
+    return "".join(flop)
+
+
+class FlopLibrary:
+    """Strategies of preflop nodes on the canonical flops, in an SQLite file.
+
+    Strategies are stored in the suits of the canonical flop with bet sizes
+    as fractions of the pot, see :func:`solver_cache.to_canonical`.
+
+    Parameters
+    ----------
+    path : str or Path, optional
+        The database file, created with its directory if missing.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_LIBRARY_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS nodes ("
+            "name TEXT PRIMARY KEY, pot REAL NOT NULL, stack REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS strategies ("
+            "node TEXT NOT NULL, flop TEXT NOT NULL, value BLOB NOT NULL, "
+            "PRIMARY KEY (node, flop)) WITHOUT ROWID"
+        )
+        self._connection.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM strategies"
+            ).fetchone()[0]
+
+    def add_node(self, node: PreflopNode) -> None:
+        """Record the pot and stack of ``node``."""
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO nodes VALUES (?, ?, ?)",
+                (node.name, node.pot, node.stack),
+            )
+            self._connection.commit()
+
+    def solved(self, node: str) -> set[str]:
+        """Return the canonical flops of ``node`` in the library."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT flop FROM strategies WHERE node = ?", (node,)
+            ).fetchall()
+        return {flop for flop, in rows}
+
+    def put(self, node: PreflopNode, flop: Flop, strategy: dict) -> None:
+        """Store the strategy of ``node`` on the canonical ``flop``."""
+        canonical = solver_cache.to_canonical(
+            strategy, CanonicalSpot(_flop_key(flop), (0, 1, 2, 3), node.pot)
+        )
+        value = zlib.compress(json.dumps(canonical, separators=(",", ":")).encode())
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO strategies VALUES (?, ?, ?)",
+                (node.name, _flop_key(flop), value),
+            )
+            self._connection.commit()
+
+    def get(
+        self, node: str, board: Iterable[str], pot: float | None = None
+    ) -> Optional[dict]:
+        """Return the strategy of ``node`` on any flop, or ``None``.
+
+        Parameters
+        ----------
+        node : str
+            Name of the preflop node.
+        board : iterable of str
+            The flop, in any suits and order.
+        pot : float, optional
+            Pot the bet sizes are scaled to, that of the node by default.
+        """
+
+        flop, permutation = solver_cache.canonical_board(board)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, pot FROM strategies JOIN nodes ON node = name "
+                "WHERE node = ? AND flop = ?",
+                (node, _flop_key(flop)),
+            ).fetchone()
+        if row is None:
+            return None
+
+        value, node_pot = row
+        return solver_cache.from_canonical(
+            json.loads(zlib.decompress(value)),
+            CanonicalSpot(
+                _flop_key(flop), permutation, node_pot if pot is None else pot
+            ),
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+def stub_solve(settings: dict[str, Any]) -> dict:
+    """Return a made-up strategy in the format of the solver output.
+
+    The strategy covers the in-position range and only depends on the spot,
+    so the library can be built without ``console_solver.exe``.
+    """
+
+    pot = float(settings["pot"])
+    board = settings.get("board", "")
+    dead = set(board.split(","))
+    rng = random.Random(board + settings["range_ip"])
+    strategy = {}
+    for combo in parse_weighted_range(settings["range_ip"]):
+        cards = sorted(
+            map(repr, combo), key=lambda card: _RANKS.index(card[0]), reverse=True
+        )
+        if dead.isdisjoint(cards):
+            check = rng.random()
+            strategy["".join(cards)] = [check, 1 - check]
+    return {
+        "strategy": {
+            "actions": ["CHECK", f"BET {pot / 2:g}"],
+            "strategy": strategy,
+        }
+    }
+
+
+@dataclass
+class Progress:
+    """Progress of :func:`precompute`.
+
+    Attributes
+    ----------
+    total : int
+        Number of flops to solve in this run.
+    done : int
+        Number of flops solved and stored.
+    failed : int
+        Number of flops given up after all retries.
+    elapsed : float
+        Seconds since the start of the run.
+    """
+
+    total: int
+    done: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Flops solved per second."""
+        return self.done / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def eta(self) -> float:
+        """Estimated seconds left."""
+        remaining = self.total - self.done - self.failed
+        return remaining / self.rate if self.rate else float("inf")
+
+    def __str__(self) -> str:
+        return (
+            f"{self.done}/{self.total} flops, {self.failed} failed, "
+            f"{self.rate:.2f} flops/s, ETA {self.eta:.0f}s"
+        )
+
+
+def precompute(
+    nodes: Iterable[PreflopNode],
+    *,
+    library: FlopLibrary,
+    service: SolverService,
+    flops: Iterable[Flop] | None = None,
+    retries: int = 2,
+    timeout: float | None = None,
+    on_progress: Callable[[Progress], None] | None = None,
+) -> Progress:
+    """Solve ``nodes`` on the flops missing from ``library``.
+
+    Parameters
+    ----------
+    nodes : iterable of PreflopNode
+        The preflop nodes to solve.
+    library : FlopLibrary
+        Receives each strategy as soon as it is solved.
+    service : SolverService
+        Runs the solves, as many at once as it has workers.
+    flops : iterable of tuple of str, optional
+        Canonical flops to solve, all of :func:`canonical_flops` by default.
+    retries : int, optional
+        Number of times a failed solve is run again.
+    timeout : float, optional
+        Timeout of each solve, the service default if omitted.
+    on_progress : callable, optional
+        Called with the :class:`Progress` after each flop.
+
+    Returns
+    -------
+    Progress
+        The final counts.
+    """
+
+    flops = list(canonical_flops() if flops is None else flops)
+    jobs = []
+    for node in nodes:
+        library.add_node(node)
+        solved = library.solved(node.name)
+        jobs.extend((node, flop) for flop in flops if _flop_key(flop) not in solved)
+
+    progress = Progress(total=len(jobs))
+    start = time.perf_counter()
+    pending = {}
+    queue = iter(jobs)
+    # keep the queue of the service short so that interrupted runs lose little
+    limit = 2 * service.max_workers
+
+    def submit(job, attempt):
+        node, flop = job
+        pending[service.submit(node.commands(flop), timeout)] = job, attempt
+
+    for job in itertools.islice(queue, limit):
+        submit(job, 0)
+
+    while pending:
+        finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in finished:
+            job, attempt = pending.pop(future)
+            try:
+                strategy = texas_solver.parse_solver_strategy(future.result())
+            except Exception:
+                if attempt < retries:
+                    submit(job, attempt + 1)
+                    continue
+                progress.failed += 1
+            else:
+                library.put(*job, strategy)
+                progress.done += 1
+
+            for next_job in itertools.islice(queue, 1):
+                submit(next_job, 0)
+            progress.elapsed = time.perf_counter() - start
+            if on_progress is not None:
+                on_progress(progress)
+
+    progress.elapsed = time.perf_counter() - start
+    return progress
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "nodes", nargs="*", help="preflop nodes such as CO/2.5bb/BTN/Call"
+    )
+    parser.add_argument("--list", action="store_true", help="list the nodes")
+    parser.add_argument("--ranges", default=str(DEFAULT_RANGE_DIR))
+    parser.add_argument("--library", default=str(DEFAULT_LIBRARY_PATH))
+    parser.add_argument("--stack", type=float, default=100.0, help="stacks in bb")
+    parser.add_argument("-w", "--workers", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=None, help="solver threads")
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--limit", type=int, default=None, help="flops per node")
+    parser.add_argument(
+        "--stub", action="store_true", help="use the stub solver instead of the binary"
+    )
+    args = parser.parse_args(argv)
+
+    if args.list or not args.nodes:
+        print("\n".join(list_nodes(args.ranges)))
+        return
+
+    nodes = [
+        load_node(name, root=args.ranges, stack_depth=args.stack) for name in args.nodes
+    ]
+    service = SolverService(
+        LocalSolverBackend(stub_solve) if args.stub else None,
+        max_workers=args.workers,
+        thread_budget=args.threads,
+        timeout=args.timeout,
+    )
+    library = FlopLibrary(args.library)
+    last_report = 0.0
+
+    def report(progress: Progress) -> None:
+        nonlocal last_report
+        if progress.elapsed - last_report >= 1:
+            last_report = progress.elapsed
+            print(progress, flush=True)
+
+    try:
+        progress = precompute(
+            nodes,
+            library=library,
+            service=service,
+            flops=list(canonical_flops())[: args.limit],
+            retries=args.retries,
+            on_progress=report,
+        )
+    finally:
+        service.shutdown(wait=False)
+        library.close()
+    print(progress)
+
+
+if __name__ == "__main__":
+    main()
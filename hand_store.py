@@ -0,0 +1,718 @@
+"""Columnar store of hand histories.
+
+Engine histories and pokerkit's :class:`~pokerkit.notation.HandHistory`
+objects hold one hand each, so answering a question about many hands means
+loading every one of them. :class:`HandStoreWriter` keeps the hands as
+columns instead, in chunks of NumPy ``.npy`` files, and :class:`HandStore`
+memory-maps those files to filter and aggregate them with vectorized
+operations, reading only the columns a query uses.
+
+A store is a directory of chunks, each a directory with a ``chunk.json``
+and one ``<table>.<column>.npy`` file per column of :data:`SCHEMA`:
+
+* ``hands``: one row per hand
+* ``players``: one row per player of each hand, in PHH order, so that
+  ``position`` 0 is the small blind and the button comes last
+* ``actions``: one row per action, with ``player`` -1 for the dealer
+* ``cards``: one row per dealt or shown card, with ``player`` -1 for the
+  board and ``card`` -1 when unknown
+
+The rows of the other tables point to their hand with ``hand``, the index of
+the hand in its chunk, which the queries turn into its index in the store.
+``street`` counts the dealings that follow a betting round, so it is 0 for
+preflop in hold'em. ``level`` is the number of bets and raises of the street
+up to the action, the blinds counting as the first bet, so a preflop
+``cbr`` at level 3 is a 3-bet. The queries of ``actions`` and ``cards`` can
+use the columns of ``players``, like ``seat`` or ``name``, for the player of
+each row.
+
+Text columns (:data:`DICTIONARY_COLUMNS`) are stored as codes into a
+dictionary of their chunk. The store maps them to codes of its own, which
+queries compare and group by, and decodes them in the results. Chunks are
+written under a ``.part`` name and renamed once complete, and directories
+named like that are ignored, so a store can be read while it grows.
+
+Run ``python hand_store.py --help`` for the command line options.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+from array import array
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Tuple
+
+import numpy as np
+
+from phh_export import iter_phh, load_engine_histories
+from pokerkit.pokerkit.notation import HandHistory
+
+VERSION = 1
+CHUNK_NAME = "chunk.json"
+
+SCHEMA: Dict[str, Dict[str, str]] = {
+    "hands": {
+        "number": "<i8",
+        "variant": "<u4",
+        "venue": "<u4",
+        "player_count": "<u1",
+        "big_blind": "<f8",
+    },
+    "players": {
+        "hand": "<u4",
+        "position": "<u1",
+        "seat": "<u2",
+        "name": "<u4",
+        "starting_stack": "<f8",
+        "finishing_stack": "<f8",
+        "payoff": "<f8",
+    },
+    "actions": {
+        "hand": "<u4",
+        "player": "<i1",
+        "street": "<i1",
+        "kind": "<u4",
+        "amount": "<f8",
+        "level": "<i2",
+    },
+    "cards": {
+        "hand": "<u4",
+        "player": "<i1",
+        "street": "<i1",
+        "card": "<i1",
+    },
+}
+#: Table of each text column.
+DICTIONARY_COLUMNS = {
+    "variant": "hands",
+    "venue": "hands",
+    "name": "players",
+    "kind": "actions",
+}
+AGGREGATES = ("count", "sum", "mean", "std", "min", "max")
+# columns of players available in the tables with a player column
+_PLAYER_COLUMNS = tuple(c for c in SCHEMA["players"] if c not in ("hand", "position"))
+
+# array typecodes of the dtypes of SCHEMA, to collect columns compactly
+_TYPECODES = {
+    "i1": "b",
+    "u1": "B",
+    "i2": "h",
+    "u2": "H",
+    "u4": "I",
+    "i8": "q",
+    "f8": "d",
+}
+_RANKS = "23456789TJQKA"
+_SUITS = "cdhs"
+
+
+@lru_cache(maxsize=1 << 16)
+def _card_ids(cards: str) -> Tuple[int, ...]:
+    """Return the ids, rank * 4 + suit, of cards like ``"AhKh"``."""
+    ids = []
+    for i in range(0, len(cards) - 1, 2):
+        rank, suit = _RANKS.find(cards[i]), _SUITS.find(cards[i + 1])
+        ids.append(rank * 4 + suit if rank >= 0 and suit >= 0 else -1)
+    return tuple(ids)
+
+
+class _ChunkBuilder:
+    """Collect the columns of a chunk in compact arrays."""
+
+    def __init__(self) -> None:
+        self.columns = {
+            table: {column: array(_TYPECODES[dtype[1:]]) for column, dtype in c.items()}
+            for table, c in SCHEMA.items()
+        }
+        self.dictionaries: Dict[str, Dict[str, int]] = {
+            column: {} for column in DICTIONARY_COLUMNS
+        }
+        self.hands = 0
+
+    def code(self, column: str, value: str) -> int:
+        dictionary = self.dictionaries[column]
+        return dictionary.setdefault(value, len(dictionary))
+
+    def add(self, hh: HandHistory) -> None:
+        index = self.hands
+        count = len(hh.starting_stacks)
+        blinds = list(hh.blinds_or_straddles or ())
+        try:
+            number = int(hh.hand)  # type: ignore[arg-type]
+        except (TypeError, ValueError):
+            number = -1
+
+        hands = self.columns["hands"]
+        hands["number"].append(number)
+        hands["variant"].append(self.code("variant", hh.variant))
+        hands["venue"].append(self.code("venue", hh.venue or ""))
+        hands["player_count"].append(count)
+        hands["big_blind"].append(float(max(blinds, default=0)))
+
+        finishing = hh.finishing_stacks
+        if finishing is None:
+            finishing = deque(hh, maxlen=1)[0].stacks
+        names = hh.players or [f"p{i + 1}" for i in range(count)]
+        seats = hh.seats or range(1, count + 1)
+        players = self.columns["players"]
+        for position in range(count):
+            starting = float(hh.starting_stacks[position])
+            players["hand"].append(index)
+            players["position"].append(position)
+            players["seat"].append(seats[position])
+            players["name"].append(self.code("name", names[position]))
+            players["starting_stack"].append(starting)
+            players["finishing_stack"].append(float(finishing[position]))
+            players["payoff"].append(float(finishing[position]) - starting)
+
+        actions = self.columns["actions"]
+        cards = self.columns["cards"]
+        street = 0
+        # the blinds and straddles open the betting of the first street
+        level = int(any(blinds[:2])) + sum(map(bool, blinds[2:]))
+        betting = False
+        for action in hh.actions:
+            tokens = action.split("#", 1)[0].split()
+            if len(tokens) < 2:
+                continue
+            if tokens[0] == "d":
+                player = -1
+                if betting:
+                    street += 1
+                    level = 0
+                    betting = False
+            else:
+                player = int(tokens[0][1:]) - 1
+                betting = True
+            kind = tokens[1]
+            amount = 0.0
+            shown = ""
+            if kind == "cbr" and len(tokens) > 2:
+                level += 1
+                amount = float(tokens[2])
+            elif kind == "dh" and len(tokens) > 3:
+                player = int(tokens[2][1:]) - 1
+                shown = tokens[3]
+            elif kind in ("db", "sm") and len(tokens) > 2:
+                shown = tokens[2]
+
+            actions["hand"].append(index)
+            actions["player"].append(player)
+            actions["street"].append(street)
+            actions["kind"].append(self.code("kind", kind))
+            actions["amount"].append(amount)
+            actions["level"].append(level)
+            for card in _card_ids(shown):
+                cards["hand"].append(index)
+                cards["player"].append(-1 if kind == "db" else player)
+                cards["street"].append(street)
+                cards["card"].append(card)
+
+        self.hands += 1
+
+    def save(self, path: Path) -> None:
+        part = path.with_name(path.name + ".part")
+        if part.exists():
+            shutil.rmtree(part)
+        part.mkdir(parents=True)
+        rows = {}
+        for table, columns in SCHEMA.items():
+            for column, dtype in columns.items():
+                values = np.asarray(self.columns[table][column]).astype(dtype)
+                np.save(part / f"{table}.{column}.npy", values)
+                rows[table] = len(values)
+        meta = {
+            "version": VERSION,
+            "hands": self.hands,
+            "rows": rows,
+            "dictionaries": {
+                column: list(dictionary)
+                for column, dictionary in self.dictionaries.items()
+            },
+        }
+        with open(part / CHUNK_NAME, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh)
+        os.replace(part, path)
+
+
+class HandStoreWriter:
+    """Append hand histories to the store at ``path``.
+
+    Parameters
+    ----------
+    path : str or Path
+        Directory of the store, created if missing. Chunks of an existing
+        store are kept and new ones numbered after them.
+    chunk_size : int, optional
+        Number of hands per chunk, held in memory until the chunk is saved.
+    """
+
+    def __init__(self, path: str | Path, chunk_size: int = 1 << 18) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+        self.count = 0
+        numbers = [int(p.name) for p in self.path.iterdir() if p.name.isdigit()]
+        self._next_chunk = max(numbers, default=-1) + 1
+        self._builder = _ChunkBuilder()
+
+    def __enter__(self) -> HandStoreWriter:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def write(self, hhs: Iterable[HandHistory]) -> int:
+        """Add ``hhs`` to the store and return their number."""
+        count = 0
+        for hh in hhs:
+            self._builder.add(hh)
+            count += 1
+            if self._builder.hands >= self.chunk_size:
+                self.flush()
+        self.count += count
+        return count
+
+    def flush(self) -> None:
+        """Save the hands written so far as a chunk."""
+        if self._builder.hands:
+            self._builder.save(self.path / f"{self._next_chunk:06d}")
+            self._next_chunk += 1
+            self._builder = _ChunkBuilder()
+
+    def close(self) -> None:
+        self.flush()
+
+
+class _Chunk:
+    def __init__(self, path: Path, base: int) -> None:
+        with open(path / CHUNK_NAME, encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta["version"] != VERSION:
+            raise ValueError(f"Unsupported chunk version {meta['version']} in {path}")
+        self.path = path
+        self.base = base
+        self.hands: int = meta["hands"]
+        self.rows: Dict[str, int] = meta["rows"]
+        self.dictionaries: Dict[str, List[str]] = meta["dictionaries"]
+        self.remaps: Dict[str, np.ndarray] = {}
+
+    def load(self, table: str, column: str) -> np.ndarray:
+        dtype = SCHEMA[table][column]
+        if not self.rows[table]:
+            return np.empty(0, dtype)
+        return np.load(self.path / f"{table}.{column}.npy", mmap_mode="r")
+
+
+class Columns(Mapping[str, np.ndarray]):
+    """Columns of one table in one chunk, loaded on first use.
+
+    Besides the columns of the table, ``hand`` is the index of the hand in
+    the store, the columns of ``hands`` are available in the other tables
+    for the hand of each row, and text columns hold store codes. The
+    columns of ``players`` but ``position`` are available in ``actions``
+    and ``cards`` for the player of each row, as looked up by its hand and
+    ``player``. Rows without a player, like those of the dealer, have -1
+    in text columns, 0 in ``seat`` and NaN in the others.
+    """
+
+    def __init__(self, chunk: _Chunk, table: str) -> None:
+        self.chunk = chunk
+        self.table = table
+        self._cache: Dict[str, np.ndarray] = {}
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        if column in self._cache:
+            return self._cache[column]
+        chunk = self.chunk
+        if column == "hand":
+            if self.table == "hands":
+                values = np.arange(chunk.base, chunk.base + chunk.hands)
+            else:
+                values = chunk.load(self.table, "hand").astype(np.int64) + chunk.base
+        elif column in SCHEMA[self.table]:
+            values = chunk.load(self.table, column)
+        elif column in SCHEMA["hands"]:
+            values = chunk.load("hands", column)[chunk.load(self.table, "hand")]
+        elif column in _PLAYER_COLUMNS and "player" in SCHEMA[self.table]:
+            values = self._player_values(column)
+            self._cache[column] = values
+            return values
+        else:
+            raise KeyError(column)
+        if column in DICTIONARY_COLUMNS:
+            values = chunk.remaps[column][values]
+        self._cache[column] = values
+        return values
+
+    def _player_values(self, column: str) -> np.ndarray:
+        """Return the ``players`` column for the player of each row."""
+        chunk = self.chunk
+        player = chunk.load(self.table, "player").astype(np.int64)
+        # the players of a hand are consecutive rows, in position order
+        starts = np.zeros(chunk.hands + 1, dtype=np.int64)
+        np.cumsum(chunk.load("hands", "player_count"), out=starts[1:])
+        seated = player >= 0
+        rows = np.where(seated, starts[chunk.load(self.table, "hand")] + player, 0)
+        values = chunk.load("players", column)
+        if column in DICTIONARY_COLUMNS:
+            values, missing = chunk.remaps[column][values], -1
+        elif values.dtype.kind == "f":
+            missing = np.nan
+        else:
+            missing = 0
+        if not len(values):
+            return np.full(len(player), missing, dtype=values.dtype)
+        return np.where(seated, values[rows], missing)
+
+    def __iter__(self) -> Iterator[str]:
+        yield "hand"
+        yield from (column for column in SCHEMA[self.table] if column != "hand")
+        if self.table != "hands":
+            yield from SCHEMA["hands"]
+        if "player" in SCHEMA[self.table]:
+            yield from _PLAYER_COLUMNS
+
+    def __len__(self) -> int:
+        return self.chunk.rows[self.table]
+
+
+Where = Mapping[str, Any] | Callable[[Columns], np.ndarray] | None
+
+
+def _group(
+    keys: List[np.ndarray], counts: np.ndarray, stats: Dict[str, Tuple]
+) -> Tuple[List[np.ndarray], np.ndarray, Dict[str, Tuple]]:
+    """Merge rows of partial aggregates that share their keys.
+
+    Each value column has the sum, the sum of squared deviations from the
+    mean, the minimum and the maximum of its rows, which are merged with
+    the pairwise formula of Chan et al.
+    """
+    if not len(counts):
+        return keys, counts, stats
+    order = np.lexsort(keys[::-1]) if keys else np.arange(len(counts))
+    change = np.zeros(len(counts), dtype=bool)
+    change[0] = True
+    keys = [key[order] for key in keys]
+    for key in keys:
+        change[1:] |= key[1:] != key[:-1]
+    starts = np.flatnonzero(change)
+    group_counts = np.add.reduceat(counts[order], starts)
+
+    merged = {}
+    for column, (sums, m2s, mins, maxs) in stats.items():
+        sums, m2s = sums[order], m2s[order]
+        group_sums = np.add.reduceat(sums, starts)
+        means = sums / counts[order]
+        sizes = np.diff(starts, append=len(sums))
+        group_means = np.repeat(group_sums / group_counts, sizes)
+        deviations = counts[order] * (means - group_means) ** 2
+        merged[column] = (
+            group_sums,
+            np.add.reduceat(m2s + deviations, starts),
+            np.minimum.reduceat(mins[order], starts),
+            np.maximum.reduceat(maxs[order], starts),
+        )
+    return [key[starts] for key in keys], group_counts, merged
+
+
+class HandStore:
+    """Read-only view of the store at ``path``.
+
+    Every chunk under ``path`` is part of the store, so the stores written
+    by ``hh_import.py --format columnar`` for each export are read together
+    by opening their destination.
+
+    Examples
+    --------
+    >>> store = HandStore("hands.store")  # doctest: +SKIP
+    >>> three_bets = store.hands_where(
+    ...     "actions",
+    ...     lambda c: (c["street"] == 0) & (c["kind"] == store.code("kind", "cbr"))
+    ...     & (c["level"] == 3) & (c["seat"] == 3),
+    ... )  # doctest: +SKIP
+    >>> store.aggregate(
+    ...     "players", by="position", hands=three_bets, payoff=("payoff", "sum")
+    ... )  # doctest: +SKIP
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.dictionaries: Dict[str, List[str]] = {c: [] for c in DICTIONARY_COLUMNS}
+        self._codes: Dict[str, Dict[str, int]] = {c: {} for c in DICTIONARY_COLUMNS}
+        self.chunks: List[_Chunk] = []
+
+        base = 0
+        for meta in sorted(self.path.rglob(CHUNK_NAME)):
+            parts = meta.parent.relative_to(self.path).parts
+            if any(p.startswith(".") or p.endswith(".part") for p in parts):
+                continue
+            chunk = _Chunk(meta.parent, base)
+            for column, values in chunk.dictionaries.items():
+                chunk.remaps[column] = np.array(
+                    [self._intern(column, value) for value in values], dtype=np.int64
+                )
+            self.chunks.append(chunk)
+            base += chunk.hands
+        self.hand_count = base
+
+    def __len__(self) -> int:
+        return self.hand_count
+
+    def _intern(self, column: str, value: str) -> int:
+        codes = self._codes[column]
+        if value not in codes:
+            codes[value] = len(codes)
+            self.dictionaries[column].append(value)
+        return codes[value]
+
+    def code(self, column: str, value: str) -> int:
+        """Return the store code of ``value`` in a text column, or -1."""
+        return self._codes[column].get(value, -1)
+
+    def rows(self, table: str) -> int:
+        """Return the number of rows of ``table``."""
+        return sum(chunk.rows[table] for chunk in self.chunks)
+
+    def _scan(
+        self, table: str, where: Where, hands: Any
+    ) -> Iterator[Tuple[Columns, np.ndarray | None]]:
+        """Yield the columns of each chunk with the mask of matching rows."""
+        if hands is not None:
+            hands = np.unique(np.asarray(hands, dtype=np.int64))
+
+        for chunk in self.chunks:
+            mask = None
+            if hands is not None:
+                lo, hi = np.searchsorted(hands, [chunk.base, chunk.base + chunk.hands])
+                if lo == hi:
+                    continue
+            columns = Columns(chunk, table)
+            if hands is not None:
+                mask = np.isin(columns["hand"], hands[lo:hi])
+            if callable(where):
+                mask = _and(mask, np.asarray(where(columns), dtype=bool))
+            elif where:
+                for column, value in where.items():
+                    mask = _and(mask, self._match(columns[column], column, value))
+            yield columns, mask
+
+    def _match(self, values: np.ndarray, column: str, value: Any) -> np.ndarray:
+        if isinstance(value, (list, tuple, set, frozenset, np.ndarray)):
+            if column in DICTIONARY_COLUMNS:
+                value = [self.code(column, v) for v in value]
+            return np.isin(values, list(value))
+        if column in DICTIONARY_COLUMNS:
+            value = self.code(column, value)
+        return values == value
+
+    def _decode(self, column: str, values: np.ndarray) -> np.ndarray:
+        if column in DICTIONARY_COLUMNS:
+            # code -1, of rows without a player, is decoded as None
+            dictionary = self.dictionaries[column] + [None]
+            return np.asarray(dictionary, dtype=object)[values]
+        return values
+
+    def select(
+        self,
+        table: str,
+        columns: Iterable[str] | None = None,
+        *,
+        where: Where = None,
+        hands: Any = None,
+        decode: bool = True,
+    ) -> Dict[str, np.ndarray]:
+        """Return the columns of the rows of ``table`` that match.
+
+        Parameters
+        ----------
+        table : str
+            A table of :data:`SCHEMA`.
+        columns : iterable of str, optional
+            Columns returned, all of the table's by default. The columns of
+            ``hands`` may also be given for the other tables, and those of
+            ``players`` for ``actions`` and ``cards``, as in :class:`Columns`.
+        where : mapping or callable, optional
+            Values that the rows must have by column, either a value or a
+            collection of values, or a function of the :class:`Columns` of a
+            chunk returning the mask of the matching rows.
+        hands : array_like, optional
+            Indices of the hands the rows must belong to.
+        decode : bool, optional
+            Return text columns as strings instead of store codes.
+
+        Returns
+        -------
+        dict
+            The selected columns by name.
+        """
+        _check_table(table)
+        if columns is None:
+            names = ["hand"] + [c for c in SCHEMA[table] if c != "hand"]
+        else:
+            names = list(columns)
+        parts: Dict[str, List[np.ndarray]] = {name: [] for name in names}
+        for chunk_columns, mask in self._scan(table, where, hands):
+            for name in names:
+                values = chunk_columns[name]
+                parts[name].append(values[mask] if mask is not None else values[:])
+        result = {}
+        for name in names:
+            values = np.concatenate(parts[name]) if parts[name] else np.empty(0)
+            result[name] = self._decode(name, values) if decode else values
+        return result
+
+    def hands_where(self, table: str, where: Where, hands: Any = None) -> np.ndarray:
+        """Return the indices of the hands with a row of ``table`` that matches.
+
+        The arguments are those of :meth:`select`.
+        """
+        return np.unique(self.select(table, ["hand"], where=where, hands=hands)["hand"])
+
+    def aggregate(
+        self,
+        table: str,
+        by: str | Iterable[str] = (),
+        *,
+        where: Where = None,
+        hands: Any = None,
+        **aggregates: Tuple[str, str],
+    ) -> Dict[str, np.ndarray]:
+        """Aggregate the matching rows of ``table`` by the values of ``by``.
+
+        Parameters
+        ----------
+        table : str
+            A table of :data:`SCHEMA`.
+        by : str or iterable of str, optional
+            Columns grouped by. All rows form one group if omitted.
+        where, hands
+            Filters of the rows, as for :meth:`select`.
+        **aggregates : tuple of str
+            ``name=(column, function)`` pairs, where the function is one of
+            :data:`AGGREGATES`. The standard deviation is that of a sample.
+
+        Returns
+        -------
+        dict
+            The ``by`` columns and the aggregates by name, one entry per
+            group, sorted by the ``by`` columns, text columns by code.
+        """
+        _check_table(table)
+        by = [by] if isinstance(by, str) else list(by)
+        for name, (column, function) in aggregates.items():
+            if function not in AGGREGATES:
+                raise ValueError(
+                    f"Unknown aggregate {function!r} for {name}, "
+                    f"expected one of {AGGREGATES}"
+                )
+        value_columns = sorted({column for column, _ in aggregates.values()})
+
+        parts = []
+        for columns, mask in self._scan(table, where, hands):
+            rows = mask if mask is not None else slice(None)
+            keys = [np.asarray(columns[c])[rows] for c in by]
+            stats = {}
+            count = len(columns) if mask is None else int(mask.sum())
+            for column in value_columns:
+                values = np.asarray(columns[column][rows], dtype=np.float64)
+                stats[column] = (values, np.zeros(count), values, values)
+            parts.append(_group(keys, np.ones(count, dtype=np.int64), stats))
+
+        if parts:
+            keys = list(map(np.concatenate, zip(*(p[0] for p in parts))))
+            counts = np.concatenate([p[1] for p in parts])
+            stats = {
+                column: tuple(map(np.concatenate, zip(*(p[2][column] for p in parts))))
+                for column in value_columns
+            }
+            keys, counts, stats = _group(keys, counts, stats)
+        else:
+            keys = [np.empty(0, dtype=np.int64) for _ in by]
+            counts = np.empty(0, dtype=np.int64)
+            stats = {column: (np.empty(0),) * 4 for column in value_columns}
+
+        result = {column: self._decode(column, key) for column, key in zip(by, keys)}
+        for name, (column, function) in aggregates.items():
+            sums, m2s, mins, maxs = stats[column]
+            if function == "count":
+                result[name] = counts
+            elif function == "sum":
+                result[name] = sums
+            elif function == "min":
+                result[name] = mins
+            elif function == "max":
+                result[name] = maxs
+            else:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    if function == "mean":
+                        result[name] = sums / counts
+                    else:
+                        result[name] = np.sqrt(m2s / (counts - 1))
+        return result
+
+
+def _check_table(table: str) -> None:
+    if table not in SCHEMA:
+        raise ValueError(f"Unknown table {table!r}, expected one of {list(SCHEMA)}")
+
+
+def _and(mask: np.ndarray | None, other: np.ndarray) -> np.ndarray:
+    return other if mask is None else mask & other
+
+
+def load_hand_histories(
+    path: str | Path, skip_invalid: bool = False
+) -> Iterator[HandHistory]:
+    """Yield the hands of a PHH or PHHS file, or of engine histories.
+
+    Engine histories are read by :func:`phh_export.load_engine_histories`
+    and converted to PHH, leaving out those that cannot be with
+    ``skip_invalid``.
+    """
+    path = Path(path)
+    if path.suffix == ".phh":
+        with open(path, "rb") as fp:
+            yield HandHistory.load(fp)
+    elif path.suffix == ".phhs":
+        with open(path, "rb") as fp:
+            yield from HandHistory.stream_all(fp)
+    else:
+        yield from iter_phh(load_engine_histories(path), skip_invalid=skip_invalid)
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Add hand histories to a columnar hand store."
+    )
+    parser.add_argument(
+        "sources", nargs="+", help="PHH or PHHS files, or engine history files"
+    )
+    parser.add_argument("-o", "--output", required=True, help="store directory")
+    parser.add_argument("--chunk-size", type=int, default=1 << 18)
+    parser.add_argument(
+        "--skip-invalid",
+        action="store_true",
+        help="leave out engine hands pokerkit cannot replay",
+    )
+    args = parser.parse_args(argv)
+
+    with HandStoreWriter(args.output, args.chunk_size) as writer:
+        for source in args.sources:
+            writer.write(load_hand_histories(source, args.skip_invalid))
+    store = HandStore(args.output)
+    print(
+        f"Added {writer.count} hands to {args.output}, "
+        f"{len(store)} hands in {len(store.chunks)} chunks"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,6 @@ from typing import Iterable, List
 
 from pokerkit.pokerkit.hands import StandardHighHand
 from pokerkit.pokerkit.utilities import Card as PKCard
-from pokerkit.pokerkit.utilities import Deck
 
 
 def _parse_cards(cards: Iterable[str]) -> List[PKCard]:
@@ -45,10 +44,11 @@ def monte_carlo_strength(
     """
     rng = random.Random(seed)
 
-    hero = _parse_cards(hole_cards)
-    board_known = _parse_cards(board_cards or [])
+    hero = list(PKCard.get_ids(_parse_cards(hole_cards)))
+    board_known = list(PKCard.get_ids(_parse_cards(board_cards or [])))
 
-    base_deck = [card for card in Deck.STANDARD if card not in hero + board_known]
+    known = set(hero + board_known)
+    base_deck = [card_id for card_id in range(52) if card_id not in known]
 
     wins = 0
     ties = 0
@@ -63,8 +63,10 @@ def monte_carlo_strength(
 
         opp_holes = [ [deck.pop(), deck.pop()] for _ in range(num_opponents) ]
 
-        hero_hand = StandardHighHand.from_game(hero, board)
-        opp_hands = [StandardHighHand.from_game(o, board) for o in opp_holes]
+        hero_hand = StandardHighHand.get_game_entry_from_ids(hero, board)
+        opp_hands = [
+            StandardHighHand.get_game_entry_from_ids(o, board) for o in opp_holes
+        ]
         best_opp = max(opp_hands)
 
         if hero_hand > best_opp:
@@ -0,0 +1,523 @@
+"""Bulk import of hand histories exported by online poker rooms.
+
+:func:`import_histories` walks files and directories of raw hand history
+exports of one site, splits each file into hands with a regular expression
+run over a memory map of the file, and parses the hands in batches with the
+parsers of :mod:`pokerkit.notation`, on an executor if one is given. The
+parsed hands are written as they come in, one output per source file, so
+the memory usage stays flat however large the exports are.
+
+Each output is written under a temporary name and renamed once the whole
+source file is imported, and the finished files are listed with their hand
+and error counts in ``manifest.jsonl`` in the destination. An interrupted
+import skips the files in the manifest when run again, unless they changed.
+Hands that fail to parse are counted per file instead of warned about.
+
+Run ``python hh_import.py --help`` for the command line options.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import os
+import re
+import shutil
+import time
+import warnings
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from hand_store import HandStoreWriter
+from phh_export import write_phhs
+from pokerkit.pokerkit.notation import (
+    AbsolutePokerParser,
+    FullTiltPokerParser,
+    HandHistory,
+    IPokerNetworkParser,
+    OngameNetworkParser,
+    PartyPokerParser,
+    PokerStarsParser,
+    REParser,
+)
+
+SITES: dict[str, type[REParser]] = {
+    "absolute": AbsolutePokerParser,
+    "full_tilt": FullTiltPokerParser,
+    "ipoker": IPokerNetworkParser,
+    "ongame": OngameNetworkParser,
+    "partypoker": PartyPokerParser,
+    "pokerstars": PokerStarsParser,
+}
+
+MANIFEST_NAME = "manifest.jsonl"
+
+# text before the first hand, such as the session details of iPoker files,
+# is passed to the parser with every hand
+_HEADER_LIMIT = 1 << 16
+
+
+def _hand_pattern(site: str) -> re.Pattern[bytes]:
+    """Return the hand pattern of ``site`` for bytes, allowing CRLF lines."""
+    pattern = SITES[site].HAND
+    source = pattern.pattern.replace(r"\n", r"(?:\r?\n)")
+    return re.compile(source.encode(), pattern.flags & ~re.UNICODE)
+
+
+def split_hands(path: str | Path, site: str) -> Tuple[bytes, Iterator[bytes]]:
+    """Return the header of the file at ``path`` and an iterator of its hands.
+
+    The hands are found by the hand pattern of the site's parser, searched
+    in a memory map of the file, so only the hands themselves are copied.
+    Unlike the parsers, the last hand of the file needs no blank lines after
+    it.
+    """
+    pattern = _hand_pattern(site)
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return b"", iter(())
+        data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    first = pattern.search(data)
+    header = data[: min(first.start(), _HEADER_LIMIT)] if first else b""
+
+    def hands() -> Iterator[bytes]:
+        end = 0
+        try:
+            for match in pattern.finditer(data):
+                end = match.end()
+                yield match.group()
+            tail = data[end:]
+            if tail.strip():
+                for match in pattern.finditer(tail + b"\n\n\n"):
+                    yield match.group()
+        finally:
+            data.close()
+
+    return header, hands()
+
+
+def parse_hands(
+    site: str,
+    header: bytes,
+    hands: Sequence[bytes],
+    *,
+    encoding: str = "utf-8",
+    validate: bool = True,
+) -> Tuple[List[HandHistory], int]:
+    """Parse raw ``hands`` of ``site`` and return them with the error count.
+
+    Hands that the parser rejects are counted and left out, and the
+    parser's warnings are silenced.
+    """
+    parser = SITES[site]()
+    prefix = header.decode(encoding, errors="replace")
+    parsed = []
+    errors = 0
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for hand in hands:
+            # the parsers expect blank lines after each hand
+            text = prefix + hand.decode(encoding, errors="replace") + "\n\n\n"
+            try:
+                parsed.extend(
+                    parser(
+                        text.replace("\r\n", "\n"),
+                        error_status=True,
+                        validation_status=validate,
+                    )
+                )
+            except ValueError:
+                errors += 1
+
+    return parsed, errors
+
+
+class PHHSOutput:
+    """Write the hands of one source file to a PHHS file.
+
+    The hands go to ``path`` with a ``.part`` suffix until :meth:`commit`
+    renames it.
+    """
+
+    suffix = ".phhs"
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._part = self.path.with_name(self.path.name + ".part")
+        self._file: IO[bytes] = open(self._part, "wb")
+        self.count = 0
+
+    def write(self, hhs: Iterable[HandHistory]) -> None:
+        self.count += write_phhs(hhs, self._file, start=self.count + 1)
+
+    def commit(self) -> None:
+        self._file.close()
+        os.replace(self._part, self.path)
+
+    def abort(self) -> None:
+        self._file.close()
+        self._part.unlink(missing_ok=True)
+
+
+class ColumnarOutput:
+    """Write the hands of one source file to a :mod:`hand_store` store.
+
+    The store is written to ``path`` with a ``.part`` suffix until
+    :meth:`commit` renames it. The stores of all the files are read together
+    by ``hand_store.HandStore`` opened on the destination.
+    """
+
+    suffix = ".hands"
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._part = self.path.with_name(self.path.name + ".part")
+        if self._part.exists():
+            shutil.rmtree(self._part)
+        self._writer = HandStoreWriter(self._part)
+        self.count = 0
+
+    def write(self, hhs: Iterable[HandHistory]) -> None:
+        self.count += self._writer.write(hhs)
+
+    def commit(self) -> None:
+        self._writer.close()
+        if self.path.exists():
+            shutil.rmtree(self.path)
+        os.replace(self._part, self.path)
+
+    def abort(self) -> None:
+        shutil.rmtree(self._part, ignore_errors=True)
+
+
+FORMATS: dict[str, Callable[[Path], Any]] = {
+    "columnar": ColumnarOutput,
+    "phhs": PHHSOutput,
+}
+
+
+@dataclass
+class ImportProgress:
+    """Progress of :func:`import_histories`.
+
+    Attributes
+    ----------
+    total_files : int
+        Number of source files to import in this run.
+    files : int
+        Number of source files imported.
+    skipped_files : int
+        Number of source files already in the manifest.
+    hands : int
+        Number of hands written.
+    errors : dict
+        Number of hands that failed to parse, by source file.
+    elapsed : float
+        Seconds since the start of the run.
+    """
+
+    total_files: int
+    files: int = 0
+    skipped_files: int = 0
+    hands: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def error_count(self) -> int:
+        """Number of hands that failed to parse in all files."""
+        return sum(self.errors.values())
+
+    @property
+    def rate(self) -> float:
+        """Hands written per second."""
+        return self.hands / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.files}/{self.total_files} files, {self.hands} hands, "
+            f"{self.error_count} errors, {self.rate:.0f} hands/s"
+        )
+
+
+def find_sources(
+    sources: Iterable[str | Path], glob: str = "*"
+) -> List[Tuple[Path, str]]:
+    """Return the files of ``sources`` with their names in the destination.
+
+    Directories are searched recursively for files matching ``glob``,
+    skipping hidden files, and named relative to the directory.
+    """
+    found = []
+    for source in map(Path, sources):
+        if source.is_dir():
+            for path in sorted(source.rglob(glob)):
+                name = path.relative_to(source).as_posix()
+                hidden = any(part.startswith(".") for part in name.split("/"))
+                if path.is_file() and not hidden:
+                    found.append((path, name))
+        else:
+            found.append((source, source.name))
+    return found
+
+
+def read_manifest(destination: str | Path) -> Dict[str, dict]:
+    """Return the manifest entries of ``destination`` by source name."""
+    path = Path(destination) / MANIFEST_NAME
+    entries = {}
+    if path.exists():
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries[entry["source"]] = entry
+    return entries
+
+
+def _fingerprint(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+@dataclass
+class _FileImport:
+    name: str
+    path: Path
+    output: Any
+    submitted: int = 0
+    finished: int = 0
+    hands: int = 0
+    errors: int = 0
+    split: bool = False
+
+
+def import_histories(
+    site: str,
+    sources: str | Path | Iterable[str | Path],
+    destination: str | Path,
+    *,
+    glob: str = "*",
+    output_format: str = "phhs",
+    executor: Executor | None = None,
+    ordered: bool = True,
+    validate: bool = True,
+    encoding: str = "utf-8",
+    batch_size: int = 256,
+    prefetch_count: int = 16,
+    on_progress: Callable[[ImportProgress], None] | None = None,
+) -> ImportProgress:
+    """Import the hand history exports of ``site`` into ``destination``.
+
+    Parameters
+    ----------
+    site : str
+        A key of :data:`SITES`.
+    sources : str, Path or iterable of them
+        Export files, or directories searched recursively.
+    destination : str or Path
+        Directory receiving one output per source file, named after it,
+        and the manifest.
+    glob : str, optional
+        Pattern of the files imported from directories.
+    output_format : str, optional
+        A key of :data:`FORMATS`.
+    executor : Executor, optional
+        Parses the batches of hands, such as a ``ProcessPoolExecutor``.
+        They are parsed in this process if omitted.
+    ordered : bool, optional
+        Write the hands in the order of the files. Otherwise, batches are
+        written as they finish, and the hands of a file may be reordered.
+    validate : bool, optional
+        Replay each hand, see ``HandHistory.validate``.
+    encoding : str, optional
+        Encoding of the exports.
+    batch_size : int, optional
+        Number of hands parsed by each task.
+    prefetch_count : int, optional
+        Maximum number of batches queued on the executor.
+    on_progress : callable, optional
+        Called with the :class:`ImportProgress` after each batch.
+
+    Returns
+    -------
+    ImportProgress
+        The final counts.
+    """
+
+    if site not in SITES:
+        raise ValueError(f"Unknown site {site!r}, expected one of {sorted(SITES)}")
+    if output_format not in FORMATS:
+        raise ValueError(
+            f"Unknown format {output_format!r}, expected one of {sorted(FORMATS)}"
+        )
+    if isinstance(sources, (str, Path)):
+        sources = [sources]
+
+    destination = Path(destination)
+    destination.mkdir(parents=True, exist_ok=True)
+    output_type = FORMATS[output_format]
+    manifest = read_manifest(destination)
+
+    files = []
+    skipped = 0
+    for path, name in find_sources(sources, glob):
+        entry = manifest.get(name)
+        if entry is not None and tuple(entry["fingerprint"]) == _fingerprint(path):
+            skipped += 1
+        else:
+            files.append((path, name))
+
+    progress = ImportProgress(total_files=len(files), skipped_files=skipped)
+    start = time.perf_counter()
+    pending: deque[Tuple[Future | None, _FileImport, Any]] = deque()
+    manifest_file = open(destination / MANIFEST_NAME, "a", encoding="utf-8")
+
+    def submit(job: _FileImport, header: bytes, batch: List[bytes]) -> None:
+        job.submitted += 1
+        args = (site, header, batch)
+        kwargs = {"encoding": encoding, "validate": validate}
+        if executor is None:
+            pending.append((None, job, parse_hands(*args, **kwargs)))
+        else:
+            pending.append((executor.submit(parse_hands, *args, **kwargs), job, None))
+
+    def finish(job: _FileImport, result: Tuple[List[HandHistory], int]) -> None:
+        hhs, errors = result
+        job.output.write(hhs)
+        job.finished += 1
+        job.hands += len(hhs)
+        job.errors += errors
+        progress.hands += len(hhs)
+        if errors:
+            progress.errors[job.name] = job.errors
+        if job.split and job.finished == job.submitted:
+            complete(job)
+        progress.elapsed = time.perf_counter() - start
+        if on_progress is not None:
+            on_progress(progress)
+
+    def complete(job: _FileImport) -> None:
+        job.output.commit()
+        entry = {
+            "source": job.name,
+            "output": Path(job.output.path).relative_to(destination).as_posix(),
+            "fingerprint": list(_fingerprint(job.path)),
+            "hands": job.hands,
+            "errors": job.errors,
+        }
+        manifest_file.write(json.dumps(entry) + "\n")
+        manifest_file.flush()
+        progress.files += 1
+
+    def drain(limit: int) -> None:
+        while len(pending) > limit:
+            if ordered or executor is None:
+                future, job, result = pending.popleft()
+            else:
+                futures = [item[0] for item in pending]
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                index = next(i for i, item in enumerate(pending) if item[0] in done)
+                future, job, result = pending[index]
+                del pending[index]
+            finish(job, future.result() if future is not None else result)
+
+    jobs = []
+    try:
+        for path, name in files:
+            job = _FileImport(
+                name, path, output_type(destination / (name + output_type.suffix))
+            )
+            jobs.append(job)
+            header, hands = split_hands(path, site)
+            batch: List[bytes] = []
+            for hand in hands:
+                batch.append(hand)
+                if len(batch) == batch_size:
+                    submit(job, header, batch)
+                    batch = []
+                    drain(prefetch_count)
+            if batch:
+                submit(job, header, batch)
+            job.split = True
+            if job.finished == job.submitted:
+                complete(job)
+            drain(prefetch_count)
+        drain(0)
+    except BaseException:
+        for future, _, _ in pending:
+            if future is not None:
+                future.cancel()
+        for job in jobs:
+            if not job.split or job.finished < job.submitted:
+                job.output.abort()
+        raise
+    finally:
+        manifest_file.close()
+
+    progress.elapsed = time.perf_counter() - start
+    return progress
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("site", choices=sorted(SITES))
+    parser.add_argument("sources", nargs="+", help="export files or directories")
+    parser.add_argument("-o", "--output", required=True, help="destination directory")
+    parser.add_argument("--glob", default="*", help="files imported from directories")
+    parser.add_argument("--format", default="phhs", choices=sorted(FORMATS))
+    parser.add_argument("-w", "--workers", type=int, default=1)
+    parser.add_argument(
+        "--unordered", action="store_true", help="write batches as they finish"
+    )
+    parser.add_argument(
+        "--no-validate", action="store_true", help="do not replay the hands"
+    )
+    parser.add_argument("--encoding", default="utf-8")
+    args = parser.parse_args(argv)
+
+    last_report = 0.0
+
+    def report(progress: ImportProgress) -> None:
+        nonlocal last_report
+        if progress.elapsed - last_report >= 1:
+            last_report = progress.elapsed
+            print(progress, flush=True)
+
+    kwargs: dict[str, Any] = {
+        "glob": args.glob,
+        "output_format": args.format,
+        "ordered": not args.unordered,
+        "validate": not args.no_validate,
+        "encoding": args.encoding,
+        "on_progress": report,
+    }
+    if args.workers > 1:
+        with ProcessPoolExecutor(args.workers) as executor:
+            progress = import_histories(
+                args.site, args.sources, args.output, executor=executor, **kwargs
+            )
+    else:
+        progress = import_histories(args.site, args.sources, args.output, **kwargs)
+
+    print(progress)
+    if progress.skipped_files:
+        print(f"{progress.skipped_files} files were already imported")
+    for name, count in sorted(progress.errors.items()):
+        print(f"{name}: {count} hands failed to parse")
+
+
+if __name__ == "__main__":
+    main()
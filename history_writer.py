@@ -0,0 +1,316 @@
+"""Append-only streaming storage of hand histories.
+
+A :class:`HistoryWriter` appends each finished hand to disk as one record,
+either a line of JSON (JSON Lines) or a JSON document preceded by its length
+as a 4-byte little-endian integer. Records are encoded by the caller and
+buffered, and a background thread writes the buffer out every
+``flush_interval`` seconds or once it grows past ``buffer_bytes``, so the
+caller never waits on the disk unless the writer falls behind.
+
+Files ending in ``.gz``, ``.bz2`` or ``.xz`` are compressed. With
+``max_bytes`` or ``max_seconds``, the records are split over numbered files,
+``hands.jsonl.gz`` becoming ``hands-00000.jsonl.gz``, ``hands-00001.jsonl.gz``
+and so on. :func:`read_histories` reads the records back from either layout.
+
+Attach a writer to a :class:`engine.PokerEngine` with
+:meth:`engine.PokerEngine.attach_history_writer` to stream its hands.
+"""
+
+from __future__ import annotations
+
+import bz2
+import gzip
+import json
+import lzma
+import re
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any, Callable, Iterator, List
+
+FRAMINGS = ("jsonl", "length")
+
+_COMPRESSIONS: dict[str, Callable[..., IO[bytes]]] = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+}
+_LENGTH = struct.Struct("<I")
+
+
+def _opener(path: Path) -> Callable[..., IO[bytes]]:
+    return _COMPRESSIONS.get(path.suffix, open)
+
+
+def _split_name(path: Path) -> tuple[str, str]:
+    stem, dot, suffixes = path.name.partition(".")
+    return stem, dot + suffixes
+
+
+def segment_path(path: str | Path, index: int) -> Path:
+    """Return the ``index``-th file of a rotated history at ``path``."""
+    path = Path(path)
+    stem, suffixes = _split_name(path)
+    return path.with_name(f"{stem}-{index:05d}{suffixes}")
+
+
+def _segment_indices(path: Path) -> List[int]:
+    stem, suffixes = _split_name(path)
+    pattern = re.compile(rf"{re.escape(stem)}-(\d+){re.escape(suffixes)}")
+    indices = []
+    for candidate in path.parent.glob(f"{stem}-*{suffixes}"):
+        match = pattern.fullmatch(candidate.name)
+        if match:
+            indices.append(int(match.group(1)))
+    return sorted(indices)
+
+
+def history_files(path: str | Path) -> List[Path]:
+    """Return the files of the history at ``path``, oldest first.
+
+    This is ``path`` itself if it exists, otherwise its rotated files.
+    """
+    path = Path(path)
+    if path.exists():
+        return [path]
+    return [segment_path(path, index) for index in _segment_indices(path)]
+
+
+def encode_record(record: Any, framing: str = "jsonl") -> bytes:
+    """Return ``record`` encoded as JSON in the given framing."""
+    data = json.dumps(record, separators=(",", ":")).encode()
+    if framing == "jsonl":
+        return data + b"\n"
+    if framing == "length":
+        return _LENGTH.pack(len(data)) + data
+    raise ValueError(f"Unknown framing {framing!r}, expected one of {FRAMINGS}")
+
+
+def read_histories(path: str | Path, framing: str = "jsonl") -> Iterator[Any]:
+    """Yield the records of the history at ``path`` one at a time.
+
+    Parameters
+    ----------
+    path : str or Path
+        The path given to the :class:`HistoryWriter`.
+    framing : str, optional
+        ``"jsonl"`` or ``"length"``, as written.
+
+    Raises
+    ------
+    ValueError
+        If a length-prefixed file ends in the middle of a record.
+    """
+    if framing not in FRAMINGS:
+        raise ValueError(f"Unknown framing {framing!r}, expected one of {FRAMINGS}")
+
+    for file_path in history_files(path):
+        with _opener(file_path)(file_path, "rb") as fh:
+            if framing == "jsonl":
+                for line in fh:
+                    if line.strip():
+                        yield json.loads(line)
+                continue
+
+            while header := fh.read(_LENGTH.size):
+                size = _LENGTH.unpack(header)[0] if len(header) == _LENGTH.size else -1
+                data = fh.read(size) if size >= 0 else b""
+                if len(data) != size:
+                    raise ValueError(f"{file_path} ends with a truncated record")
+                yield json.loads(data)
+
+
+class HistoryWriter:
+    """Append records to a history file from a background thread.
+
+    Parameters
+    ----------
+    path : str or Path
+        File receiving the records, compressed if it ends in ``.gz``,
+        ``.bz2`` or ``.xz``.
+    framing : str, optional
+        ``"jsonl"`` for one JSON document per line (the default) or
+        ``"length"`` for length-prefixed documents.
+    max_bytes : int, optional
+        Start a new file once the current one holds this many bytes of
+        records, counted before compression. A file appended to counts with
+        its size on disk.
+    max_seconds : float, optional
+        Start a new file once the current one is this old.
+    flush_interval : float, optional
+        Seconds between writes of the buffered records.
+    buffer_bytes : int, optional
+        Size of the buffer that triggers a write before the interval ends.
+        :meth:`write` blocks while the buffer holds four times as much.
+    append : bool, optional
+        Append to existing files (the default) or replace them.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        framing: str = "jsonl",
+        max_bytes: int | None = None,
+        max_seconds: float | None = None,
+        flush_interval: float = 1.0,
+        buffer_bytes: int = 1 << 20,
+        append: bool = True,
+    ) -> None:
+        if framing not in FRAMINGS:
+            raise ValueError(
+                f"Unknown framing {framing!r}, expected one of {FRAMINGS}"
+            )
+
+        self.path = Path(path)
+        self.framing = framing
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.flush_interval = flush_interval
+        self.buffer_bytes = buffer_bytes
+        self.rotating = max_bytes is not None or max_seconds is not None
+
+        self._condition = threading.Condition()
+        self._pending: List[bytes] = []
+        self._pending_bytes = 0
+        self._queued = 0
+        self._written = 0
+        self._closing = False
+        self._error: BaseException | None = None
+
+        self._file: IO[bytes] | None = None
+        self._file_bytes = 0
+        self._file_started = 0.0
+        indices = _segment_indices(self.path) if self.rotating else []
+        if not append:
+            for index in indices:
+                segment_path(self.path, index).unlink()
+            indices = []
+        self._index = indices[-1] if indices else 0
+        self._mode = "ab" if append else "wb"
+
+        self._thread = threading.Thread(
+            target=self._run, name="history-writer", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> HistoryWriter:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def write(self, record: Any) -> None:
+        """Queue ``record``, which must be JSON serializable."""
+        data = encode_record(record, self.framing)
+
+        with self._condition:
+            if self._closing:
+                raise ValueError("The history writer is closed")
+            self._check()
+            while (
+                self._pending_bytes > 4 * self.buffer_bytes
+                and self._error is None
+                and not self._closing
+            ):
+                self._condition.wait()
+            self._check()
+            self._pending.append(data)
+            self._pending_bytes += len(data)
+            self._queued += 1
+            if self._pending_bytes >= self.buffer_bytes:
+                self._condition.notify_all()
+
+    def flush(self) -> None:
+        """Block until the records queued so far are written."""
+        with self._condition:
+            target = self._queued
+            self._condition.notify_all()
+            while self._written < target and self._error is None:
+                self._condition.wait()
+            self._check()
+
+    def close(self) -> None:
+        """Write the queued records and close the file."""
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        self._thread.join()
+        self._check()
+
+    def _check(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("Writing hand histories failed") from self._error
+
+    def _run(self) -> None:
+        try:
+            while True:
+                with self._condition:
+                    if not self._pending and not self._closing:
+                        self._condition.wait(self.flush_interval)
+                    batch, self._pending = self._pending, []
+                    self._pending_bytes = 0
+                    closing = self._closing
+                    self._condition.notify_all()
+
+                if batch:
+                    self._write_batch(batch)
+                with self._condition:
+                    self._written += len(batch)
+                    self._condition.notify_all()
+                    if closing and not self._pending:
+                        break
+        except BaseException as error:
+            with self._condition:
+                self._error = error
+                self._condition.notify_all()
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _write_batch(self, batch: List[bytes]) -> None:
+        if self.rotating and self._file is not None:
+            if (
+                self.max_seconds is not None
+                and time.monotonic() - self._file_started >= self.max_seconds
+            ):
+                self._rotate()
+
+        chunk: List[bytes] = []
+        for data in batch:
+            if self._file is None:
+                self._open()
+            elif (
+                self.max_bytes is not None
+                and self._file_bytes
+                and self._file_bytes + len(data) > self.max_bytes
+            ):
+                self._file.write(b"".join(chunk))
+                chunk = []
+                self._rotate()
+                self._open()
+            chunk.append(data)
+            self._file_bytes += len(data)
+
+        if self._file is not None:
+            self._file.write(b"".join(chunk))
+            self._file.flush()
+
+    def _open(self) -> None:
+        path = segment_path(self.path, self._index) if self.rotating else self.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if self._mode == "ab" and path.exists():
+            self._file_bytes = path.stat().st_size
+        else:
+            self._file_bytes = 0
+        self._file = _opener(path)(path, self._mode)
+        self._file_started = time.monotonic()
+
+    def _rotate(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._index += 1
+        self._mode = "wb"
@@ -21,7 +21,7 @@ from PyQt5.QtWidgets import (
 )
 
 from engine import PokerEngine
-from ai import basic_ai_decision
+from ai import basic_ai_decision, shutdown_pool
 from analysis_window import AnalysisWindow
 
 
@@ -563,6 +563,9 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         if hasattr(self, "log_file") and self.log_file:
             self.log_file.close()
+        if hasattr(self, "analysis_window"):
+            self.analysis_window.shutdown()
+        shutdown_pool(wait=False)
         super().closeEvent(event)
 
 
@@ -0,0 +1,371 @@
+"""Export :class:`engine.PokerEngine` hand histories as PHH.
+
+The engine records each hand as a dictionary of seats, blinds, actions and
+cards. :func:`history_to_phh` turns one of them into a
+:class:`pokerkit.notation.HandHistory`, the Poker Hand History (PHH) format
+read by pokerkit's tools such as ``Statistics.from_hand_history``, and
+:func:`convert_histories` converts whole history files, one hand at a time.
+
+PHH players are ordered from the small blind, so player ``p1`` is the small
+blind seat, ``p2`` the big blind and the button comes last. Heads-up, the
+engine's small blind acts first on every street, which pokerkit plays when
+the blinds are listed as ``[big, small]``.
+
+The actions are replayed through a pokerkit state as they are converted.
+Checks that the engine leaves implicit, such as the big blind's option in a
+limped pot, are written out, and hands that pokerkit cannot replay, for
+instance with raises under the minimum raise, or whose replay does not end
+with the engine's final stacks raise :class:`ValueError`.
+
+Run ``python phh_export.py --help`` for the command line options.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, List, Sequence
+
+from history_writer import read_histories
+from pokerkit.pokerkit.analysis import StatisticsAggregator
+from pokerkit.pokerkit.notation import HandHistory, parse_action
+
+STAGES = ("preflop", "flop", "turn", "river")
+
+_RANKS = "23456789TJQKA"
+_SUITS = "cdhs"
+
+
+def card_to_str(card: Sequence[int]) -> str:
+    """Return the PHH string, like ``"As"``, of a ``(rank, suit)`` card."""
+    return _RANKS[card[0] - 2] + _SUITS[card[1]]
+
+
+def _cards_to_str(cards: Iterable[Sequence[int]]) -> str:
+    return "".join(map(card_to_str, cards))
+
+
+def _seat_order(history: dict) -> List[int]:
+    stacks = history["starting_stacks"]
+    count = len(stacks)
+    order = [(history["sb"] + i) % count for i in range(count)]
+    seats = [seat for seat in order if stacks[seat] > 0]
+    if history["sb"] not in seats or history["bb"] not in seats:
+        raise ValueError("The blinds were posted from empty stacks")
+    return seats
+
+
+class _Replay:
+    """Apply PHH actions to a pokerkit state while collecting them."""
+
+    def __init__(self, hh: HandHistory, history: dict, seats: List[int]) -> None:
+        self.hh = hh
+        self.state = hh.create_state()
+        self.seats = seats
+        self.board = history.get("community") or []
+        self.board_dealt = 0
+        hole_cards = history.get("hole_cards") or {}
+        self.hole_cards = [
+            hole_cards.get(seat, hole_cards.get(str(seat))) for seat in seats
+        ]
+
+    def apply(self, action: str) -> None:
+        parse_action(self.state, action, self.hh.parse_value)
+        self.hh.actions.append(action)
+
+    def settle(self, street_index: int, showdown: bool = False) -> None:
+        """Deal cards and write implicit checks up to ``street_index``."""
+        state = self.state
+        while state.status:
+            if state.can_deal_hole():
+                player = state.hole_dealee_index
+                cards = self.hole_cards[player]
+                if not cards:
+                    raise ValueError(f"Seat {self.seats[player]} has no hole cards")
+                self.apply(f"d dh p{player + 1} {_cards_to_str(cards)}")
+            elif state.can_burn_card():
+                # burns are not written, HandHistory replays them as "??"
+                state.burn_card("??")
+            elif state.can_deal_board():
+                count = state.board_dealing_count
+                cards = self.board[self.board_dealt : self.board_dealt + count]
+                if len(cards) != count:
+                    raise ValueError("The history is missing community cards")
+                self.board_dealt += count
+                self.apply(f"d db {_cards_to_str(cards)}")
+            elif (
+                state.actor_index is not None
+                and state.street_index is not None
+                and state.street_index < street_index
+            ):
+                if state.checking_or_calling_amount:
+                    raise ValueError(
+                        f"Seat {self.seats[state.actor_index]} never answered a bet"
+                    )
+                self.apply(f"p{state.actor_index + 1} cc")
+            elif showdown and state.can_show_or_muck_hole_cards():
+                player = state.showdown_index
+                self.apply(f"p{player + 1} sm {_cards_to_str(self.hole_cards[player])}")
+            else:
+                break
+
+    def act(self, event: dict) -> None:
+        """Write the PHH action of an engine action."""
+        state = self.state
+        self.settle(STAGES.index(event["stage"]))
+
+        player = self.seats.index(event["player"])
+        action = event["action"]
+        if state.actor_index is None and action == "check":
+            # the engine may ask a player who has called an all-in to act again
+            return
+        if state.actor_index != player:
+            raise ValueError(f"Seat {event['player']} acted out of turn")
+
+        if action == "fold":
+            self.apply(f"p{player + 1} f")
+        elif action == "check" or action == "call":
+            self.apply(f"p{player + 1} cc")
+        elif action == "bet" or action == "raise":
+            total = state.bets[player] + event["amount"]
+            if total > max(state.bets):
+                self.apply(f"p{player + 1} cbr {total}")
+            elif event["amount"] == state.checking_or_calling_amount:
+                # the engine turns raises it cannot afford into all-in calls
+                self.apply(f"p{player + 1} cc")
+            else:
+                raise ValueError(
+                    f"Seat {event['player']} raised {event['amount']}, less than"
+                    " a call, without going all-in"
+                )
+        else:
+            raise ValueError(f"Unknown action {action!r}")
+
+
+def history_to_phh(
+    history: dict,
+    *,
+    players: Sequence[str] | None = None,
+    **fields: Any,
+) -> HandHistory:
+    """Return the PHH of one engine hand history.
+
+    Parameters
+    ----------
+    history : dict
+        A hand of ``PokerEngine.hand_histories``, or the same dictionary
+        read back from JSON.
+    players : sequence of str, optional
+        Name of each engine seat, ``"Seat 1"``, ``"Seat 2"`` and so on by
+        default. Statistics are grouped by these names.
+    **fields
+        Other PHH fields, such as ``hand``, ``table`` or ``event``.
+
+    Returns
+    -------
+    HandHistory
+        The hand, with the seats reordered from the small blind and the
+        engine's final stacks as its finishing stacks.
+
+    Raises
+    ------
+    ValueError
+        If pokerkit cannot replay the hand or ends it with other stacks than
+        the engine.
+    """
+    seats = _seat_order(history)
+    blinds = {event["player"]: event["amount"] for event in history["actions"][:2]}
+    seat_count = len(history["starting_stacks"])
+    if players is None:
+        players = [f"Seat {seat + 1}" for seat in range(seat_count)]
+    blinds_or_straddles = [blinds[history["sb"]], blinds[history["bb"]]]
+    if len(seats) == 2:
+        blinds_or_straddles.reverse()
+    else:
+        blinds_or_straddles += [0] * (len(seats) - 2)
+
+    hh = HandHistory(
+        variant="NT",
+        antes=[0] * len(seats),
+        blinds_or_straddles=blinds_or_straddles,
+        min_bet=blinds[history["bb"]],
+        starting_stacks=[history["starting_stacks"][seat] for seat in seats],
+        actions=[],
+        seats=[seat + 1 for seat in seats],
+        seat_count=seat_count,
+        players=[players[seat] for seat in seats],
+        **fields,
+    )
+    replay = _Replay(hh, history, seats)
+    try:
+        for event in history["actions"][2:]:
+            replay.act(event)
+        replay.settle(len(STAGES), showdown=True)
+        if "final_stacks" in history:
+            finishing_stacks = [history["final_stacks"][seat] for seat in seats]
+            if list(replay.state.stacks) != finishing_stacks:
+                raise ValueError(
+                    f"The replay ends with the stacks {list(replay.state.stacks)}"
+                    f" instead of {finishing_stacks}"
+                )
+    except ValueError as error:
+        raise ValueError(f"Cannot replay the hand as PHH: {error}") from error
+
+    if "final_stacks" in history:
+        hh.finishing_stacks = finishing_stacks
+    return hh
+
+
+def iter_phh(
+    histories: Iterable[dict],
+    *,
+    players: Sequence[str] | None = None,
+    skip_invalid: bool = False,
+    **fields: Any,
+) -> Iterator[HandHistory]:
+    """Yield the PHH of each engine hand history in ``histories``.
+
+    Hands that cannot be converted raise :class:`ValueError`, or are left
+    out with ``skip_invalid``. The other arguments are passed to
+    :func:`history_to_phh`.
+    """
+    for history in histories:
+        try:
+            yield history_to_phh(history, players=players, **fields)
+        except ValueError:
+            if not skip_invalid:
+                raise
+
+
+def history_statistics(
+    histories: Iterable[dict],
+    *,
+    players: Sequence[str] | None = None,
+    skip_invalid: bool = True,
+    executor: Executor | None = None,
+) -> tuple[StatisticsAggregator, int]:
+    """Aggregate player statistics over engine hand histories.
+
+    The hands are converted by :func:`iter_phh` as they are read and
+    passed to ``StatisticsAggregator.from_hand_histories``, so ``histories``
+    can be a stream of any length. The statistics are keyed by the
+    ``players`` names, ``"Seat 1"`` and so on by default, and by the PHH
+    position of each seat, 0 for the small blind.
+
+    The skipped hands are returned alongside the statistics. They are
+    mostly raised pots with raises under the minimum raise, so the
+    statistics are biased against raising when many hands are skipped.
+    """
+    read = 0
+
+    def counted() -> Iterator[dict]:
+        nonlocal read
+        for history in histories:
+            read += 1
+            yield history
+
+    aggregator = StatisticsAggregator.from_hand_histories(
+        iter_phh(counted(), players=players, skip_invalid=skip_invalid),
+        executor=executor,
+    )
+    return aggregator, read - aggregator.hand_count
+
+
+def write_phhs(phhs: Iterable[HandHistory], fp: IO[bytes], start: int = 1) -> int:
+    """Write ``phhs`` to ``fp`` one at a time and return their number.
+
+    The output is that of ``HandHistory.dump_all``, a PHHS file with the
+    hands in numbered sections from ``start``, without holding all the
+    hands in memory. Calls with a later ``start`` continue the same file.
+    """
+    count = 0
+    for count, phh in enumerate(phhs, 1):
+        number = start + count - 1
+        separator = "\n\n" if number > 1 else ""
+        fp.write(f"{separator}[{number}]\n{phh.dumps()}".encode())
+    return count
+
+
+def load_engine_histories(path: str | Path) -> Iterator[dict]:
+    """Yield the hand histories of a file written by the engine.
+
+    ``.json`` files are read as the list saved by
+    ``PokerEngine.save_histories``, anything else as a history of
+    :class:`history_writer.HistoryWriter` in JSON Lines.
+    """
+    path = Path(path)
+    if path.suffix == ".json":
+        with open(path, encoding="utf-8") as fh:
+            yield from json.load(fh)
+    else:
+        yield from read_histories(path)
+
+
+def convert_histories(
+    sources: str | Path | Iterable[str | Path],
+    destination: str | Path,
+    *,
+    players: Sequence[str] | None = None,
+    skip_invalid: bool = False,
+) -> tuple[int, int]:
+    """Convert engine history files into one PHHS file.
+
+    Parameters
+    ----------
+    sources : str, Path or iterable of them
+        Files read by :func:`load_engine_histories`, in order.
+    destination : str or Path
+        The PHHS file written.
+    players : sequence of str, optional
+        Name of each engine seat.
+    skip_invalid : bool, optional
+        Leave out hands that cannot be converted instead of raising
+        :class:`ValueError`.
+
+    Returns
+    -------
+    tuple of int
+        The number of hands written and the number of hands skipped.
+    """
+    if isinstance(sources, (str, Path)):
+        sources = [sources]
+
+    read = 0
+
+    def histories() -> Iterator[dict]:
+        nonlocal read
+        for source in sources:
+            for history in load_engine_histories(source):
+                read += 1
+                yield history
+
+    with open(destination, "wb") as fp:
+        count = write_phhs(
+            iter_phh(histories(), players=players, skip_invalid=skip_invalid), fp
+        )
+    return count, read - count
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Convert engine hand histories to a PHHS file."
+    )
+    parser.add_argument("sources", nargs="+", help="history files, .json or .jsonl")
+    parser.add_argument("-o", "--output", required=True, help="PHHS file to write")
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="fail on hands pokerkit cannot replay instead of skipping them",
+    )
+    args = parser.parse_args(argv)
+
+    count, skipped = convert_histories(
+        args.sources, args.output, skip_invalid=not args.strict
+    )
+    print(f"Wrote {count} hands to {args.output}, skipped {skipped} invalid hands")
+
+
+if __name__ == "__main__":
+    main()
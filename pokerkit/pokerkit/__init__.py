@@ -19,6 +19,7 @@ __all__ = (
     'calculate_equities',
     'calculate_hand_strength',
     'calculate_icm',
+    'calculate_icms',
     'Card',
     'CardBurning',
     'CardsLike',
@@ -28,6 +29,7 @@ __all__ = (
     'clean_values',
     'CombinationHand',
     'CompletionBettingOrRaisingTo',
+    'count_deals',
     'Deck',
     'DeuceToSevenLowballMixin',
     'divmod',
@@ -35,6 +37,7 @@ __all__ = (
     'EightOrBetterLookup',
     'EightOrBetterLowHand',
     'Entry',
+    'estimate_icm',
     'filter_none',
     'FixedLimitBadugi',
     'FixedLimitDeuceToSevenLowballTripleDraw',
@@ -80,7 +83,9 @@ __all__ = (
     'parse_range',
     'parse_time',
     'parse_value',
+    'parse_weighted_range',
     'PartyPokerParser',
+    'PlayerStatistics',
     'Poker',
     'PokerStarsParser',
     'Pot',
@@ -93,6 +98,7 @@ __all__ = (
     'RegularLowHand',
     'REParser',
     'rotated',
+    'RunningMoments',
     'RunoutCountSelection',
     'SevenCardStud',
     'ShortDeckHoldemHand',
@@ -109,6 +115,7 @@ __all__ = (
     'StandingPatOrDiscarding',
     'State',
     'Statistics',
+    'StatisticsAggregator',
     'Street',
     'Suit',
     'TexasHoldemMixin',
@@ -122,8 +129,15 @@ from pokerkit.analysis import (
     calculate_equities,
     calculate_hand_strength,
     calculate_icm,
+    calculate_icms,
+    count_deals,
+    estimate_icm,
     parse_range,
+    parse_weighted_range,
+    PlayerStatistics,
+    RunningMoments,
     Statistics,
+    StatisticsAggregator,
 )
 from pokerkit.games import (
     DeuceToSevenLowballMixin,
@@ -4,30 +4,50 @@ analysis.
 
 from __future__ import annotations
 
-from collections.abc import Iterable, Iterator
-from collections import Counter, defaultdict
-from concurrent.futures import Executor
-from dataclasses import dataclass
-from functools import partial
+from bisect import bisect
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from collections import defaultdict, deque
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from heapq import nlargest, nsmallest
 from itertools import (
+    accumulate,
     chain,
     combinations,
+    compress,
+    islice,
     permutations,
     product,
     repeat,
     starmap,
 )
-from math import sqrt
+from math import comb, nan, prod, sqrt
 from operator import eq
-from random import choices, sample
+from os import cpu_count
+from random import getrandbits, Random
 from statistics import mean, stdev
-from typing import Any
+from typing import Any, Literal
 
 from pokerkit.hands import Hand
 from pokerkit.notation import HandHistory
-from pokerkit.utilities import Card, Deck, max_or_none, RankOrder, Suit
+from pokerkit.utilities import (
+    Card,
+    Deck,
+    max_or_none,
+    min_or_none,
+    RankOrder,
+    Suit,
+)
 
 __SUITS = Suit.CLUB, Suit.DIAMOND, Suit.HEART, Suit.SPADE
+__COMBO_IDS = tuple(combinations(range(52), 2))
+__COMBOS = tuple(frozenset(Card.from_ids(ids)) for ids in __COMBO_IDS)
+__COMBO_INDICES = {combo: i for i, combo in enumerate(__COMBOS)}
+__CARD_COMBO_INDICES = tuple(
+    tuple(i for i, ids in enumerate(__COMBO_IDS) if id_ in ids)
+    for id_ in range(52)
+)
 
 
 def __parse_range(
@@ -119,6 +139,9 @@ def parse_range(
 
     The notations can be separated by a whitespace, comma, or a
     semicolon. The returned range is a set of frozensets of cards.
+    Weighted notations are accepted as in
+    :func:`parse_weighted_range`, but only the combinations with
+    nonzero weights are kept.
 
     >>> rng = parse_range('AKs')
     >>> len(rng)
@@ -133,60 +156,319 @@ def parse_range(
                        :attr:`pokerkit.utilities.RankOrder`.
     :return: The range.
     """
+    return set(__parse_range_set(raw_ranges, rank_order))
+
+
+def parse_weighted_range(
+        *raw_ranges: str,
+        rank_order: RankOrder = RankOrder.STANDARD,
+) -> dict[frozenset[Card], float]:
+    """Parse the weighted range.
+
+    The notations are those of :func:`parse_range`, each optionally
+    followed by a colon and the weight of its combinations, like in the
+    ranges of TexasSolver. Notations without weights have a weight of
+    ``1``. If a combination is covered more than once, the last weight
+    is used. The combinations with zero weights are left out.
+
+    The parsed ranges are cached, so parsing the same notations again
+    only copies the cached dictionary. The two-card combinations are
+    shared between the parsed ranges.
+
+    >>> rng = parse_weighted_range('AKs:0.5,AsKs QQ:0.0')
+    >>> len(rng)
+    4
+    >>> rng[frozenset(Card.parse('AsKs'))]
+    1.0
+    >>> rng[frozenset(Card.parse('AcKc'))]
+    0.5
+    >>> parse_weighted_range('AA:-1')
+    Traceback (most recent call last):
+        ...
+    ValueError: The weight in 'AA:-1' is not a nonnegative number.
+
+    :param raw_ranges: The raw ranges to be parsed.
+    :param rank_order: The rank ordering to be used, defaults to
+                       :attr:`pokerkit.utilities.RankOrder`.
+    :return: The weights of the combinations in the range.
+    :raises ValueError: If a weight is invalid or negative.
+    """
+    # The cached dictionary is shared, so only copies are handed out.
+    return __parse_range_dict(raw_ranges, rank_order).copy()
+
+
+@lru_cache(maxsize=256)
+def __parse_range_set(
+        raw_ranges: tuple[str, ...],
+        rank_order: RankOrder,
+) -> frozenset[frozenset[Card]]:
+    weights, other_weights = __parse_weighted_range(raw_ranges, rank_order)
+
+    return frozenset(
+        chain(
+            compress(__COMBOS, weights),
+            (cards for cards, _ in other_weights),
+        ),
+    )
+
+
+@lru_cache(maxsize=256)
+def __parse_range_dict(
+        raw_ranges: tuple[str, ...],
+        rank_order: RankOrder,
+) -> dict[frozenset[Card], float]:
+    weights, other_weights = __parse_weighted_range(raw_ranges, rank_order)
+    range_ = dict(zip(compress(__COMBOS, weights), filter(None, weights)))
+
+    range_.update(other_weights)
+
+    return range_
+
+
+@lru_cache(maxsize=256)
+def __parse_weighted_range(
+        raw_ranges: tuple[str, ...],
+        rank_order: RankOrder,
+) -> tuple[tuple[float, ...], tuple[tuple[frozenset[Card], float], ...]]:
+    # The two-card combinations are weighted in 1326 slots, one for
+    # each pair of card ids, and the others in a dictionary.
     raw_ranges = tuple(
         ' '.join(raw_ranges).replace(',', ' ').replace(';', ' ').split(),
     )
-    range_ = set[frozenset[Card]]()
+    weights = [0.0] * len(__COMBOS)
+    other_weights = dict[frozenset[Card], float]()
 
     for raw_range in raw_ranges:
-        range_.update(__parse_range(raw_range, rank_order))
+        notation, colon, raw_weight = raw_range.partition(':')
+        weight = float(raw_weight) if colon else 1.0
 
-    return range_
+        if not weight >= 0:
+            raise ValueError(
+                (
+                    f'The weight in {repr(raw_range)} is not a nonnegative'
+                    ' number.'
+                ),
+            )
+
+        for cards in __parse_range(notation, rank_order):
+            index = __COMBO_INDICES.get(cards)
+
+            if index is not None:
+                weights[index] = weight
+            elif weight:
+                other_weights[cards] = weight
+            else:
+                other_weights.pop(cards, None)
+
+    return tuple(weights), tuple(other_weights.items())
+
+
+def __get_mask(ids: Iterable[int], mask: int = 0) -> int | None:
+    for id_ in ids:
+        if mask >> id_ & 1:
+            return None
+
+        mask |= 1 << id_
+
+    return mask
+
+
+def __get_chunk_count(
+        executor: Executor | None,
+        chunk_count: int | None,
+) -> int:
+    # Without a chunk count, an executor is assumed to run one worker
+    # per CPU.
+    if chunk_count is None:
+        return 1 if executor is None else cpu_count() or 1
+
+    if chunk_count <= 0:
+        raise ValueError(
+            f'The chunk count {repr(chunk_count)} is not positive.',
+        )
+
+    return chunk_count
+
+
+def __get_deck_ids(deck_ids: list[int], mask: int) -> list[int]:
+    return [id_ for id_ in deck_ids if not mask >> id_ & 1]
+
+
+def __get_id_range(
+        hole_range: Iterable[Iterable[Card]],
+        board_mask: int,
+) -> tuple[list[tuple[int, ...]], list[float] | None]:
+    items: Iterable[tuple[Iterable[Card], float]]
+
+    if isinstance(hole_range, Mapping):
+        items = hole_range.items()
+    else:
+        items = zip(hole_range, repeat(1.0))
+
+    # The two-card combinations are weighted in 1326 slots, one for
+    # each pair of card ids, and the others in a list.
+    weights = [0.0] * len(__COMBO_IDS)
+    other_id_range = []
+    other_weights = []
+
+    for cards, weight in items:
+        if not weight >= 0:
+            raise ValueError(
+                f'The weight {repr(weight)} is not a nonnegative number.',
+            )
+
+        if isinstance(cards, frozenset):
+            index = __COMBO_INDICES.get(cards)
+        else:
+            index = None
+
+        if index is not None:
+            weights[index] = float(weight)
+        elif weight:
+            ids = tuple(Card.get_ids(cards))
+
+            if __get_mask(ids, board_mask) is not None:
+                other_id_range.append(ids)
+                other_weights.append(float(weight))
+
+    # The combinations sharing a card with the board are removed here
+    # rather than rejected in every sample.
+    for id_ in range(52):
+        if board_mask >> id_ & 1:
+            for index in __CARD_COMBO_INDICES[id_]:
+                weights[index] = 0.0
+
+    indices = list(compress(range(len(weights)), weights))
+    id_range = [__COMBO_IDS[i] for i in indices] + other_id_range
+    weights = [weights[i] for i in indices] + other_weights
+
+    # Equally weighted ranges are sampled without the weights.
+    return id_range, weights if len(set(weights)) > 1 else None
+
+
+def __iterate_selections(
+        hole_id_ranges: tuple[list[tuple[int, ...]], ...],
+        hole_weights: tuple[list[float] | None, ...],
+        board_mask: int,
+) -> Iterator[tuple[tuple[tuple[int, ...], ...], int, float]]:
+    for pairs in product(
+            *(
+                zip(ids, repeat(1.0) if weights is None else weights)
+                for ids, weights in zip(hole_id_ranges, hole_weights)
+            ),
+    ):
+        selection = tuple(ids for ids, _ in pairs)
+        mask = __get_mask(chain.from_iterable(selection), board_mask)
+
+        if mask is not None:
+            yield selection, mask, prod(weight for _, weight in pairs)
+
+
+def __sample_selection(
+        hole_id_ranges: tuple[list[tuple[int, ...]], ...],
+        hole_cum_weights: tuple[list[float] | None, ...],
+        board_mask: int,
+        random: Random,
+) -> tuple[tuple[tuple[int, ...], ...], int]:
+    # Drawing from each range independently and rejecting conflicting
+    # draws samples from the valid selections in proportion to their
+    # weights without materializing their product. The weighted draws
+    # search the cumulative weights for a uniform point below their
+    # total.
+    while True:
+        selection = tuple(
+            (
+                random.choice(ids)
+                if cum_weights is None
+                else ids[
+                    bisect(
+                        cum_weights,
+                        random.random() * cum_weights[-1],
+                        0,
+                        len(cum_weights) - 1,
+                    )
+                ]
+            )
+            for ids, cum_weights in zip(hole_id_ranges, hole_cum_weights)
+        )
+        mask = __get_mask(chain.from_iterable(selection), board_mask)
+
+        if mask is not None:
+            return selection, mask
 
 
 def __calculate_equities_0(
-        hole_cards: tuple[list[Card], ...],
-        board_cards: list[Card],
+        hole_cards: tuple[tuple[int, ...], ...],
+        board_cards: tuple[int, ...],
         hole_dealing_count: int,
         board_dealing_count: int,
-        deck_cards: list[Card],
+        deck_cards: list[int],
+        mask: int,
         hand_types: tuple[type[Hand], ...],
+        random: Random,
 ) -> list[float]:
-    hole_cards = tuple(map(list.copy, hole_cards))
-    board_cards = board_cards.copy()
+    hole_ids = list(map(list, hole_cards))
+    board_ids = list(board_cards)
     sample_count = (
-        (hole_dealing_count * len(hole_cards))
-        - sum(map(len, hole_cards))
+        (hole_dealing_count * len(hole_ids))
+        - sum(map(len, hole_ids))
         + board_dealing_count
-        - len(board_cards)
+        - len(board_ids)
     )
-    sampled_cards = sample(deck_cards, k=sample_count)
+    # The known cards are drawn along with the rest and then discarded
+    # so that the deck need not be rebuilt for every selection.
+    sampled_ids = [
+        id_ for id_ in random.sample(
+            deck_cards,
+            k=min(len(deck_cards), sample_count + mask.bit_count()),
+        ) if not mask >> id_ & 1
+    ][:sample_count]
+
+    if len(sampled_ids) < sample_count:
+        raise ValueError('There are not enough cards in the deck to deal.')
+
     begin = 0
 
-    for i in range(len(hole_cards)):
-        end = begin + hole_dealing_count - len(hole_cards[i])
+    for i in range(len(hole_ids)):
+        end = begin + hole_dealing_count - len(hole_ids[i])
 
-        hole_cards[i].extend(sampled_cards[begin:end])
+        hole_ids[i].extend(sampled_ids[begin:end])
 
-        assert len(hole_cards[i]) == hole_dealing_count
+        assert len(hole_ids[i]) == hole_dealing_count
 
         begin = end
 
-    board_cards.extend(sampled_cards[begin:])
+    board_ids.extend(sampled_ids[begin:])
+
+    assert len(board_ids) == board_dealing_count
+
+    return __calculate_deal_equities(hole_ids, board_ids, hand_types)
 
-    assert len(board_cards) == board_dealing_count
 
-    equities = [0.0] * len(hole_cards)
+def __calculate_deal_equities(
+        hole_ids: Sequence[Sequence[int]],
+        board_ids: Sequence[int],
+        hand_types: tuple[type[Hand], ...],
+) -> list[float]:
+    equities = [0.0] * len(hole_ids)
 
     for hand_type in hand_types:
-        hands = list(
-            map(
-                partial(hand_type.from_game_or_none, board_cards=board_cards),
-                hole_cards,
-            ),
-        )
-        max_hand = max_or_none(hands)
-        statuses = list(map(partial(eq, max_hand), hands))
+        entries = []
+
+        for ids in hole_ids:
+            try:
+                entry = hand_type.get_game_entry_from_ids(ids, board_ids)
+            except ValueError:
+                entry = None
+
+            entries.append(entry)
+
+        if hand_type.low:
+            max_entry = min_or_none(entries)
+        else:
+            max_entry = max_or_none(entries)
+
+        statuses = list(map(partial(eq, max_entry), entries))
         increment = 1 / (len(hand_types) * sum(statuses))
 
         for i, status in enumerate(statuses):
@@ -197,26 +479,264 @@ def __calculate_equities_0(
 
 
 def __calculate_equities_1(
-        hole_cards: list[tuple[list[Card], ...]],
-        board_cards: list[Card],
+        hole_id_ranges: tuple[list[tuple[int, ...]], ...],
+        hole_weights: tuple[list[float] | None, ...],
+        board_cards: tuple[int, ...],
         hole_dealing_count: int,
         board_dealing_count: int,
-        deck_cards: list[list[Card]],
+        deck_cards: list[int],
+        board_mask: int,
         hand_types: tuple[type[Hand], ...],
-        index: int,
+        seed: int,
+        sample_count: int,
 ) -> list[float]:
-    return __calculate_equities_0(
-        hole_cards[index],
-        board_cards,
+    random = Random(seed)
+    equities = [0.0] * len(hole_id_ranges)
+    hole_cum_weights = tuple(
+        None if weights is None else list(accumulate(weights))
+        for weights in hole_weights
+    )
+
+    for _ in range(sample_count):
+        selection, mask = __sample_selection(
+            hole_id_ranges,
+            hole_cum_weights,
+            board_mask,
+            random,
+        )
+        sample_equities = __calculate_equities_0(
+            selection,
+            board_cards,
+            hole_dealing_count,
+            board_dealing_count,
+            deck_cards,
+            mask,
+            hand_types,
+            random,
+        )
+
+        for i, equity in enumerate(sample_equities):
+            equities[i] += equity
+
+    return equities
+
+
+def __count_deals(
+        hole_ids: tuple[tuple[int, ...], ...],
+        mask: int,
+        board_ids: tuple[int, ...],
+        hole_dealing_count: int,
+        board_dealing_count: int,
+        deck_mask: int,
+) -> int:
+    deck_count = (deck_mask & ~mask).bit_count()
+    count = 1
+
+    for dealing_count in chain(
+            (hole_dealing_count - len(ids) for ids in hole_ids),
+            (board_dealing_count - len(board_ids),),
+    ):
+        count *= comb(deck_count, dealing_count)
+        deck_count -= dealing_count
+
+    return count
+
+
+def __enumerate_deals(
+        hole_ids: tuple[tuple[int, ...], ...],
+        board_ids: tuple[int, ...],
+        hole_dealing_count: int,
+        board_dealing_count: int,
+        deck_ids: list[int],
+) -> Iterator[tuple[tuple[tuple[int, ...], ...], tuple[int, ...]]]:
+    if not hole_ids:
+        dealing_count = board_dealing_count - len(board_ids)
+
+        for ids in combinations(deck_ids, dealing_count):
+            yield (), board_ids + ids
+
+        return
+
+    for ids in combinations(deck_ids, hole_dealing_count - len(hole_ids[0])):
+        remaining_deck_ids = [id_ for id_ in deck_ids if id_ not in ids]
+
+        for dealt_hole_ids, dealt_board_ids in __enumerate_deals(
+                hole_ids[1:],
+                board_ids,
+                hole_dealing_count,
+                board_dealing_count,
+                remaining_deck_ids,
+        ):
+            yield (hole_ids[0] + ids,) + dealt_hole_ids, dealt_board_ids
+
+
+def __calculate_equities_2(
+        hole_id_ranges: tuple[list[tuple[int, ...]], ...],
+        hole_weights: tuple[list[float] | None, ...],
+        board_cards: tuple[int, ...],
+        hole_dealing_count: int,
+        board_dealing_count: int,
+        deck_cards: list[int],
+        board_mask: int,
+        hand_types: tuple[type[Hand], ...],
+        chunk_index: int,
+        chunk_count: int,
+) -> list[float]:
+    equities = [0.0] * len(hole_id_ranges)
+
+    for selection, mask, weight in islice(
+            __iterate_selections(hole_id_ranges, hole_weights, board_mask),
+            chunk_index,
+            None,
+            chunk_count,
+    ):
+        selection_equities = [0.0] * len(equities)
+        count = 0
+
+        for hole_ids, board_ids in __enumerate_deals(
+                selection,
+                board_cards,
+                hole_dealing_count,
+                board_dealing_count,
+                __get_deck_ids(deck_cards, mask),
+        ):
+            deal_equities = __calculate_deal_equities(
+                hole_ids,
+                board_ids,
+                hand_types,
+            )
+
+            for i, equity in enumerate(deal_equities):
+                selection_equities[i] += equity
+
+            count += 1
+
+        if not count:
+            raise ValueError(
+                'There are not enough cards in the deck to deal.',
+            )
+
+        for i, equity in enumerate(selection_equities):
+            equities[i] += weight * equity / count
+
+    return equities
+
+
+def __count_id_deals(
+        hole_id_ranges: tuple[list[tuple[int, ...]], ...],
+        hole_weights: tuple[list[float] | None, ...],
+        board_ids: tuple[int, ...],
+        hole_dealing_count: int,
+        board_dealing_count: int,
+        deck_ids: list[int],
+        board_mask: int,
+        limit: int | None,
+) -> int:
+    deck_mask = __get_mask(deck_ids) or 0
+    deal_count = 0
+
+    for selection, mask, _ in __iterate_selections(
+            hole_id_ranges,
+            hole_weights,
+            board_mask,
+    ):
+        deal_count += __count_deals(
+            selection,
+            mask,
+            board_ids,
+            hole_dealing_count,
+            board_dealing_count,
+            deck_mask,
+        )
+
+        if limit is not None and deal_count > limit:
+            break
+
+    return deal_count
+
+
+def count_deals(
+        hole_ranges: Iterable[
+            Iterable[Iterable[Card]] | Mapping[frozenset[Card], float]
+        ],
+        board_cards: Iterable[Card],
+        hole_dealing_count: int,
+        board_dealing_count: int,
+        deck: Deck,
+        *,
+        limit: int | None = None,
+) -> int:
+    """Count the deals that :func:`calculate_equities` enumerates with
+    ``exact=True``.
+
+    This is the number of deals of the unknown cards summed over every
+    valid selection of hole cards from the ranges. It helps to decide
+    whether to enumerate the deals or to sample them elsewhere.
+
+    >>> count_deals(
+    ...     (parse_range('AhAd'), parse_range('KhKd')),
+    ...     Card.parse('Ks7c2d3s'),
+    ...     2,
+    ...     5,
+    ...     Deck.STANDARD,
+    ... )
+    44
+    >>> count_deals(
+    ...     ([[]], parse_range('AhKd')),
+    ...     Card.parse('Ks7c2d3s'),
+    ...     2,
+    ...     5,
+    ...     Deck.STANDARD,
+    ... )
+    45540
+    >>> count_deals(
+    ...     ([[]], parse_range('AhKd')),
+    ...     Card.parse('Ks7c2d3s'),
+    ...     2,
+    ...     5,
+    ...     Deck.STANDARD,
+    ...     limit=10000,
+    ... ) > 10000
+    True
+
+    :param hole_ranges: The ranges of each player in the pot, as in
+                        :func:`calculate_equities`.
+    :param board_cards: The board cards, may be empty.
+    :param hole_dealing_count: The final number of hole cards.
+    :param board_dealing_count: The final number of board cards.
+    :param deck: The deck.
+    :param limit: The optional count after which the counting stops,
+                  in which case some greater count is returned.
+    :return: The number of deals.
+    :raises ValueError: If the board cards are not distinct or a weight
+                        is negative.
+    """
+    board_ids = tuple(Card.get_ids(board_cards))
+    board_mask = __get_mask(board_ids)
+
+    if board_mask is None:
+        raise ValueError('The board cards are not distinct.')
+
+    id_ranges = tuple(
+        __get_id_range(hole_range, board_mask) for hole_range in hole_ranges
+    )
+
+    return __count_id_deals(
+        tuple(id_range for id_range, _ in id_ranges),
+        tuple(weights for _, weights in id_ranges),
+        board_ids,
         hole_dealing_count,
         board_dealing_count,
-        deck_cards[index],
-        hand_types,
+        sorted(set(Card.get_ids(deck))),
+        board_mask,
+        limit,
     )
 
 
 def calculate_equities(
-        hole_ranges: Iterable[Iterable[Iterable[Card]]],
+        hole_ranges: Iterable[
+            Iterable[Iterable[Card]] | Mapping[frozenset[Card], float]
+        ],
         board_cards: Iterable[Card],
         hole_dealing_count: int,
         board_dealing_count: int,
@@ -225,11 +745,39 @@ def calculate_equities(
         *,
         sample_count: int,
         executor: Executor | None = None,
+        chunk_count: int | None = None,
+        exact: bool | Literal['auto'] = False,
+        enumeration_limit: int = 10000,
 ) -> list[float]:
     """Calculate the equities.
 
     The user may supply an executor to use parallelization. If not
-    given, a single-threaded evaluation is performed.
+    given, a single-threaded evaluation is performed. With an executor,
+    the work is split into ``chunk_count`` chunks, one per CPU by
+    default, so that the inputs are sent once per chunk. Passing the
+    number of workers of the executor as ``chunk_count`` gives each
+    worker one chunk. Each chunk of samples is simulated with its own
+    generator seeded from :mod:`random`.
+
+    The selections of hole cards from the ranges are never stored.
+    While sampling, a combination is drawn from each range and the
+    draws are redone whenever they share a card, so every valid
+    selection is equally likely and the memory usage does not grow with
+    the widths of the ranges.
+
+    A range may also be a mapping from the combinations to their
+    weights, like the ones from :func:`parse_weighted_range`. Then, the
+    selections are chosen in proportion to the products of the weights
+    of their combinations.
+
+    By default, the equities are estimated through sampling. If
+    ``exact`` is ``True``, every selection of hole cards from the
+    ranges and every way of dealing the remaining cards are enumerated
+    instead, which gives exact and repeatable equities. If ``exact`` is
+    ``'auto'``, the enumeration is only carried out when the number of
+    deals does not exceed ``enumeration_limit``; otherwise, sampling is
+    used. This makes most turn and river calculations both exact and
+    cheaper.
 
     >>> from concurrent.futures import ProcessPoolExecutor
     >>> from pokerkit import *
@@ -277,8 +825,24 @@ def calculate_equities(
     ...     )
     ...
     [0.0, 0.0, 1.0]
+    >>> calculate_equities(
+    ...     (
+    ...         parse_range('AhAd'),
+    ...         parse_range('KhKd'),
+    ...     ),
+    ...     Card.parse('Ks7c2d3s'),
+    ...     2,
+    ...     5,
+    ...     Deck.STANDARD,
+    ...     (StandardHighHand,),
+    ...     sample_count=1000,
+    ...     exact=True,
+    ... )
+    [0.045454545454545456, 0.9545454545454546]
 
-    :param hole_ranges: The ranges of each player in the pot.
+    :param hole_ranges: The ranges of each player in the pot, each
+                        optionally mapping the combinations to their
+                        weights.
     :param board_cards: The board cards, may be empty.
     :param hole_dealing_count: The final number of hole cards; for
                                hold'em, it is ``2``.
@@ -293,46 +857,119 @@ def calculate_equities(
     :param executor: The optional executor, defaults to ``None`` which
                      is just using 1 thread/process. The user can supply
                      a ``ProcessPoolExecutor`` to use processes.
+    :param chunk_count: The optional number of chunks the work is split
+                        into, defaults to ``None`` which is ``1``
+                        without an executor and the number of CPUs
+                        with one.
+    :param exact: ``True`` to enumerate every deal, ``False`` to
+                  sample, or ``'auto'`` to enumerate only when the
+                  number of deals is at most ``enumeration_limit``,
+                  defaults to ``False``.
+    :param enumeration_limit: The greatest number of deals enumerated
+                              in the ``'auto'`` mode, defaults to
+                              ``10000``.
     :return: The equity values.
+    :raises ValueError: If the board cards are not distinct, a weight
+                        is negative, the chunk count is not positive,
+                        or no selection of hole cards from the ranges
+                        avoids sharing a card with the others or the
+                        board.
     """
-    hole_ranges = tuple(map(list, map(partial(map, list), hole_ranges)))
-    board_cards = list(board_cards)
+    board_ids = tuple(Card.get_ids(board_cards))
+    deck_ids = sorted(set(Card.get_ids(deck)))
     hand_types = tuple(hand_types)
-    hole_cards = []
-    deck_cards = []
-
-    for selection in product(*hole_ranges):
-        counter = Counter(chain(chain.from_iterable(selection), board_cards))
+    board_mask = __get_mask(board_ids)
 
-        if all(map(partial(eq, 1), counter.values())):
-            hole_cards.append(selection)
-            deck_cards.append(list(set(deck) - counter.keys()))
+    if board_mask is None:
+        raise ValueError('The board cards are not distinct.')
 
-    fn = partial(
-        __calculate_equities_1,
-        hole_cards,  # type: ignore[arg-type]
-        board_cards,
-        hole_dealing_count,
-        board_dealing_count,
-        deck_cards,
-        hand_types,
+    id_ranges = tuple(
+        __get_id_range(hole_range, board_mask) for hole_range in hole_ranges
     )
+    hole_id_ranges = tuple(id_range for id_range, _ in id_ranges)
+    hole_weights = tuple(weights for _, weights in id_ranges)
+
+    selections = __iterate_selections(hole_id_ranges, hole_weights, board_mask)
+
+    if next(selections, None) is None:
+        raise ValueError(
+            'There is no valid selection of hole cards from the ranges.',
+        )
+
+    if exact == 'auto':
+        deal_count = __count_id_deals(
+            hole_id_ranges,
+            hole_weights,
+            board_ids,
+            hole_dealing_count,
+            board_dealing_count,
+            deck_ids,
+            board_mask,
+            enumeration_limit,
+        )
+        exact = deal_count <= enumeration_limit
+
+    # Each task covers a chunk of the work so that the inputs are sent
+    # to the workers once per chunk rather than once per sample.
+    chunk_count = __get_chunk_count(executor, chunk_count)
+    args: tuple[Iterable[Any], ...]
+
+    if exact:
+        fn: Any = partial(
+            __calculate_equities_2,
+            hole_id_ranges,
+            hole_weights,
+            board_ids,
+            hole_dealing_count,
+            board_dealing_count,
+            deck_ids,
+            board_mask,
+            hand_types,
+        )
+        args = range(chunk_count), repeat(chunk_count, chunk_count)
+        divisor = sum(
+            weight for _, _, weight in __iterate_selections(
+                hole_id_ranges,
+                hole_weights,
+                board_mask,
+            )
+        )
+    else:
+        fn = partial(
+            __calculate_equities_1,
+            hole_id_ranges,
+            hole_weights,
+            board_ids,
+            hole_dealing_count,
+            board_dealing_count,
+            deck_ids,
+            board_mask,
+            hand_types,
+        )
+        args = (
+            (getrandbits(64) for _ in range(chunk_count)),
+            (
+                len(range(i, sample_count, chunk_count))
+                for i in range(chunk_count)
+            ),
+        )
+        divisor = sample_count
+
     mapper: Any = map if executor is None else executor.map
-    indices = choices(range(len(hole_cards)), k=sample_count)
-    equities = [0.0] * len(hole_ranges)
+    equities = [0.0] * len(hole_id_ranges)
 
-    for i, equity in chain.from_iterable(map(enumerate, mapper(fn, indices))):
+    for i, equity in chain.from_iterable(map(enumerate, mapper(fn, *args))):
         equities[i] += equity
 
     for i, equity in enumerate(equities):
-        equities[i] = equity / sample_count
+        equities[i] = equity / divisor
 
     return equities
 
 
 def calculate_hand_strength(
         player_count: int,
-        hole_range: Iterable[Iterable[Card]],
+        hole_range: Iterable[Iterable[Card]] | Mapping[frozenset[Card], float],
         board_cards: Iterable[Card],
         hole_dealing_count: int,
         board_dealing_count: int,
@@ -341,12 +978,16 @@ def calculate_hand_strength(
         *,
         sample_count: int,
         executor: Executor | None = None,
+        chunk_count: int | None = None,
+        exact: bool | Literal['auto'] = False,
+        enumeration_limit: int = 10000,
 ) -> float:
     """Calculate the hand strength: odds of beating a single other hand
     chosen uniformly at random.
 
     The user may supply an executor to use parallelization. If not
-    given, a single-threaded evaluation is performed.
+    given, a single-threaded evaluation is performed. For exact
+    calculations, please refer to :func:`calculate_equities`.
 
     >>> from concurrent.futures import ProcessPoolExecutor
     >>> from pokerkit import *
@@ -377,7 +1018,8 @@ def calculate_hand_strength(
     1.0
 
     :param player_count: Number of players in the pot.
-    :param hole_range: The range of the player.
+    :param hole_range: The range of the player, optionally mapping the
+                       combinations to their weights.
     :param board_cards: The board cards, may be empty.
     :param hole_dealing_count: The final number of hole cards; for
                                hold'em, it is ``2``.
@@ -392,9 +1034,22 @@ def calculate_hand_strength(
     :param executor: The optional executor, defaults to ``None`` which
                      is just using 1 thread/process. The user can supply
                      a ``ProcessPoolExecutor`` to use processes.
+    :param chunk_count: The optional number of chunks the work is split
+                        into, defaults to ``None`` which is ``1``
+                        without an executor and the number of CPUs
+                        with one.
+    :param exact: ``True`` to enumerate every deal, ``False`` to
+                  sample, or ``'auto'`` to enumerate only when the
+                  number of deals is at most ``enumeration_limit``,
+                  defaults to ``False``.
+    :param enumeration_limit: The greatest number of deals enumerated
+                              in the ``'auto'`` mode, defaults to
+                              ``10000``.
     :return: The equity values.
     """
-    hole_ranges: list[Iterable[Iterable[Card]]] = [
+    hole_ranges: list[
+        Iterable[Iterable[Card]] | Mapping[frozenset[Card], float]
+    ] = [
         [[]] for _ in range(player_count - 1)
     ]
 
@@ -409,6 +1064,9 @@ def calculate_hand_strength(
         hand_types,
         sample_count=sample_count,
         executor=executor,
+        chunk_count=chunk_count,
+        exact=exact,
+        enumeration_limit=enumeration_limit,
     )
 
     return equities[-1]
@@ -450,7 +1108,7 @@ class Statistics:
 
         for hh in hhs:
             if hh.finishing_stacks is None:
-                end_state = tuple(hh)[-1]
+                end_state = deque(hh, maxlen=1)[0]
                 finishing_stacks = end_state.stacks
             else:
                 finishing_stacks = hh.finishing_stacks
@@ -515,12 +1173,514 @@ class Statistics:
         return self.payoff_stdev / sqrt(self.sample_count)
 
 
+@dataclass
+class RunningMoments:
+    """The class for running moments of a sample.
+
+    The values are added one at a time with Welford's algorithm, so only
+    the count, the mean, and the sum of squared deviations from the mean
+    are stored. Moments of separate samples can be merged.
+
+    >>> moments = RunningMoments()
+    >>> for value in (2, 4, 4, 4, 5, 5, 7, 9):
+    ...     moments.add(value)
+    ...
+    >>> moments.mean
+    5.0
+    >>> moments.variance  # doctest: +ELLIPSIS
+    4.571...
+    >>> RunningMoments.merge(moments, moments).count
+    16
+
+    :param count: The sample size.
+    :param mean: The sample mean.
+    :param m2: The sum of squared deviations from the mean.
+    """
+
+    count: int = 0
+    """The sample size."""
+    mean: float = 0.0
+    """The sample mean."""
+    m2: float = 0.0
+    """The sum of squared deviations from the mean."""
+
+    @classmethod
+    def merge(cls, *moments: RunningMoments) -> RunningMoments:
+        """Merge the moments of separate samples.
+
+        :param moments: The moments to merge.
+        :return: The merged moments.
+        """
+        merged = cls()
+
+        for sub_moments in moments:
+            merged.update(sub_moments)
+
+        return merged
+
+    def add(self, value: float) -> None:
+        """Add a value.
+
+        :param value: The value.
+        :return: ``None``.
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def update(self, moments: RunningMoments) -> None:
+        """Add the values of another sample.
+
+        :param moments: The moments of the other sample.
+        :return: ``None``.
+        """
+        if not moments.count:
+            return
+
+        count = self.count + moments.count
+        delta = moments.mean - self.mean
+        self.mean += delta * moments.count / count
+        self.m2 += moments.m2 + delta ** 2 * self.count * moments.count / count
+        self.count = count
+
+    @property
+    def sum(self) -> float:
+        """Return the sum.
+
+        :return: The sum.
+        """
+        return self.mean * self.count
+
+    @property
+    def variance(self) -> float:
+        """Return the sample variance, or ``nan`` with less than two
+        values.
+
+        :return: The sample variance.
+        """
+        return self.m2 / (self.count - 1) if self.count > 1 else nan
+
+    @property
+    def stdev(self) -> float:
+        """Return the sample standard deviation.
+
+        :return: The sample standard deviation.
+        """
+        return sqrt(self.variance)
+
+    @property
+    def stderr(self) -> float:
+        """Return the standard error of the mean.
+
+        :return: The standard error of the mean.
+        """
+        return self.stdev / sqrt(self.count) if self.count else nan
+
+
+def _ratio(numerator: int, denominator: int) -> float:
+    return numerator / denominator if denominator else nan
+
+
+@dataclass
+class PlayerStatistics:
+    """The class for the statistics of a player, or of a position, in
+    constant memory.
+
+    The frequencies are those shown by heads-up displays (HUDs). Those
+    without any opportunity are ``nan``.
+
+    :param hand_count: The number of hands.
+    :param voluntary_count: The number of hands with chips put in the
+                            pot voluntarily before the flop.
+    :param preflop_raise_count: The number of hands raised before the
+                                flop.
+    :param three_bet_opportunity_count: The number of hands with an
+                                        action facing a single raise
+                                        before the flop.
+    :param three_bet_count: The number of hands that raise a single
+                            raise before the flop.
+    :param flop_count: The number of hands that see the flop.
+    :param showdown_count: The number of hands that go to showdown after
+                           seeing the flop.
+    :param showdown_win_count: The number of hands that go to showdown
+                               and win chips.
+    :param payoffs: The moments of the payoffs.
+    :param big_blind_payoffs: The moments of the payoffs in big blinds,
+                              over the hands with blinds.
+    """
+
+    hand_count: int = 0
+    """The number of hands."""
+    voluntary_count: int = 0
+    """The number of hands with chips put in the pot voluntarily before
+    the flop.
+    """
+    preflop_raise_count: int = 0
+    """The number of hands raised before the flop."""
+    three_bet_opportunity_count: int = 0
+    """The number of hands with an action facing a single raise before
+    the flop.
+    """
+    three_bet_count: int = 0
+    """The number of hands that raise a single raise before the flop."""
+    flop_count: int = 0
+    """The number of hands that see the flop."""
+    showdown_count: int = 0
+    """The number of hands that go to showdown after seeing the flop."""
+    showdown_win_count: int = 0
+    """The number of hands that go to showdown and win chips."""
+    payoffs: RunningMoments = field(default_factory=RunningMoments)
+    """The moments of the payoffs."""
+    big_blind_payoffs: RunningMoments = field(default_factory=RunningMoments)
+    """The moments of the payoffs in big blinds."""
+
+    @classmethod
+    def merge(cls, *statistics: PlayerStatistics) -> PlayerStatistics:
+        """Merge the statistics.
+
+        :param statistics: The statistics to merge.
+        :return: The merged statistics.
+        """
+        merged = cls()
+
+        for sub_statistics in statistics:
+            merged.update(sub_statistics)
+
+        return merged
+
+    def update(self, statistics: PlayerStatistics) -> None:
+        """Add the hands of other statistics.
+
+        :param statistics: The other statistics.
+        :return: ``None``.
+        """
+        self.hand_count += statistics.hand_count
+        self.voluntary_count += statistics.voluntary_count
+        self.preflop_raise_count += statistics.preflop_raise_count
+        self.three_bet_opportunity_count += (
+            statistics.three_bet_opportunity_count
+        )
+        self.three_bet_count += statistics.three_bet_count
+        self.flop_count += statistics.flop_count
+        self.showdown_count += statistics.showdown_count
+        self.showdown_win_count += statistics.showdown_win_count
+        self.payoffs.update(statistics.payoffs)
+        self.big_blind_payoffs.update(statistics.big_blind_payoffs)
+
+    @property
+    def vpip(self) -> float:
+        """Return the frequency of putting chips in the pot voluntarily
+        before the flop (VPIP).
+
+        :return: The VPIP.
+        """
+        return _ratio(self.voluntary_count, self.hand_count)
+
+    @property
+    def pfr(self) -> float:
+        """Return the frequency of raising before the flop (PFR).
+
+        :return: The PFR.
+        """
+        return _ratio(self.preflop_raise_count, self.hand_count)
+
+    @property
+    def three_bet(self) -> float:
+        """Return the frequency of 3-betting when facing a single raise
+        before the flop.
+
+        :return: The 3-bet frequency.
+        """
+        return _ratio(self.three_bet_count, self.three_bet_opportunity_count)
+
+    @property
+    def wtsd(self) -> float:
+        """Return the frequency of going to showdown after seeing the
+        flop (WTSD).
+
+        :return: The WTSD.
+        """
+        return _ratio(self.showdown_count, self.flop_count)
+
+    @property
+    def wsd(self) -> float:
+        """Return the frequency of winning chips at showdown (W$SD).
+
+        :return: The W$SD.
+        """
+        return _ratio(self.showdown_win_count, self.showdown_count)
+
+    @property
+    def payoff_sum(self) -> float:
+        """Return the total payoff.
+
+        :return: The total payoff.
+        """
+        return self.payoffs.sum
+
+    @property
+    def payoff_mean(self) -> float:
+        """Return the payoff rate (per hand).
+
+        :return: The payoff rate.
+        """
+        return self.payoffs.mean
+
+    @property
+    def payoff_stdev(self) -> float:
+        """Return the payoff standard deviation.
+
+        :return: The payoff standard deviation.
+        """
+        return self.payoffs.stdev
+
+    @property
+    def bb_per_100(self) -> float:
+        """Return the win rate in big blinds per 100 hands.
+
+        :return: The win rate.
+        """
+        if not self.big_blind_payoffs.count:
+            return nan
+
+        return 100 * self.big_blind_payoffs.mean
+
+    @property
+    def bb_per_100_stderr(self) -> float:
+        """Return the standard error of the win rate in big blinds per
+        100 hands.
+
+        :return: The standard error of the win rate.
+        """
+        return 100 * self.big_blind_payoffs.stderr
+
+
+@dataclass
+class StatisticsAggregator:
+    """The class for aggregating player statistics over hand histories
+    in a single pass.
+
+    Each hand is read from its actions, without replaying it unless its
+    finishing stacks are missing, and only counts and running moments
+    are kept, so the memory usage does not grow with the number of
+    hands. The aggregators of separate hands, for example from parallel
+    workers, can be merged.
+
+    The streets are counted by the dealings that follow betting, so the
+    flop is the second street in hold'em. Positions are the indices of
+    the players in the hand history, starting from ``0``.
+
+    :param players: The statistics of each named player.
+    :param positions: The statistics of each position.
+    :param hand_count: The number of hands.
+    """
+
+    players: dict[str, PlayerStatistics] = field(default_factory=dict)
+    """The statistics of each named player."""
+    positions: dict[int, PlayerStatistics] = field(default_factory=dict)
+    """The statistics of each position."""
+    hand_count: int = 0
+    """The number of hands."""
+
+    @classmethod
+    def merge(
+            cls,
+            *aggregators: StatisticsAggregator,
+    ) -> StatisticsAggregator:
+        """Merge the aggregators.
+
+        :param aggregators: The aggregators to merge.
+        :return: The merged aggregator.
+        """
+        merged = cls()
+
+        for aggregator in aggregators:
+            merged.update(aggregator)
+
+        return merged
+
+    @classmethod
+    def from_hand_histories(
+            cls,
+            hhs: Iterable[HandHistory],
+            *,
+            executor: Executor | None = None,
+            batch_size: int = 1024,
+            prefetch_count: int = 16,
+    ) -> StatisticsAggregator:
+        """Aggregate the statistics of hand histories.
+
+        :param hhs: The hand histories, which may be a stream.
+        :param executor: The optional executor aggregating batches of
+                         hands in parallel.
+        :param batch_size: The number of hands in each batch.
+        :param prefetch_count: The maximum number of batches submitted
+                               to the executor at once.
+        :return: The aggregator.
+        """
+        aggregator = cls()
+
+        if executor is None:
+            for hh in hhs:
+                aggregator.add(hh)
+
+            return aggregator
+
+        futures = deque[Future[StatisticsAggregator]]()
+        iterator = iter(hhs)
+
+        while batch := list(islice(iterator, batch_size)):
+            futures.append(executor.submit(cls.from_hand_histories, batch))
+
+            if len(futures) >= prefetch_count:
+                aggregator.update(futures.popleft().result())
+
+        while futures:
+            aggregator.update(futures.popleft().result())
+
+        return aggregator
+
+    def update(self, aggregator: StatisticsAggregator) -> None:
+        """Add the hands of another aggregator.
+
+        :param aggregator: The other aggregator.
+        :return: ``None``.
+        """
+        for key, statistics in aggregator.players.items():
+            self.players.setdefault(key, PlayerStatistics()).update(
+                statistics,
+            )
+
+        for position, statistics in aggregator.positions.items():
+            self.positions.setdefault(position, PlayerStatistics()).update(
+                statistics,
+            )
+
+        self.hand_count += aggregator.hand_count
+
+    def add(self, hh: HandHistory) -> None:
+        """Add a hand.
+
+        :param hh: The hand history.
+        :return: ``None``.
+        """
+        count = len(hh.starting_stacks)
+        finishing_stacks: Sequence[int]
+
+        if hh.finishing_stacks is None:
+            finishing_stacks = deque(hh, maxlen=1)[0].stacks
+        else:
+            finishing_stacks = hh.finishing_stacks
+
+        blinds = list(hh.blinds_or_straddles or ())
+        # The values parsed from hand histories may be decimals.
+        big_blind = float(max(blinds, default=0))
+        bets = [float(blind) for blind in blinds] + [0.0] * count
+        level = int(any(blinds[:2])) + sum(map(bool, blinds[2:]))
+        street = 0
+        betting = False
+        folded = [False] * count
+        voluntary = [False] * count
+        raised = [False] * count
+        three_bet_opportunity = [False] * count
+        three_bet = [False] * count
+        flop = [False] * count
+
+        for action in hh.actions:
+            tokens = action.split('#', 1)[0].split()
+
+            if len(tokens) < 2:
+                continue
+
+            if tokens[0] == 'd':
+                if betting:
+                    street += 1
+                    betting = False
+
+                    if street == 1:
+                        flop = [not folded_ for folded_ in folded]
+
+                continue
+
+            player = int(tokens[0][1:]) - 1
+            kind = tokens[1]
+            betting = True
+
+            if kind == 'f':
+                folded[player] = True
+
+            if street or kind not in ('f', 'cc', 'cbr'):
+                continue
+
+            if level == 2:
+                three_bet_opportunity[player] = True
+
+            if kind == 'cc':
+                if bets[player] < max(bets):
+                    voluntary[player] = True
+
+                bets[player] = max(bets)
+            elif kind == 'cbr':
+                voluntary[player] = raised[player] = True
+                three_bet[player] = three_bet[player] or level == 2
+                level += 1
+                bets[player] = float(tokens[2])
+
+        showdown = folded.count(False) > 1
+        players: Iterable[str | None]
+
+        if hh.players is None:
+            players = repeat(None)
+        else:
+            players = hh.players
+
+        for i, name in zip(range(count), players):
+            payoff = float(finishing_stacks[i] - hh.starting_stacks[i])
+            went_to_showdown = showdown and flop[i] and not folded[i]
+            targets = [self.positions.setdefault(i, PlayerStatistics())]
+
+            if name is not None:
+                targets.append(
+                    self.players.setdefault(name, PlayerStatistics()),
+                )
+
+            for statistics in targets:
+                statistics.hand_count += 1
+                statistics.voluntary_count += voluntary[i]
+                statistics.preflop_raise_count += raised[i]
+                statistics.three_bet_opportunity_count += (
+                    three_bet_opportunity[i]
+                )
+                statistics.three_bet_count += three_bet[i]
+                statistics.flop_count += flop[i]
+                statistics.showdown_count += went_to_showdown
+                statistics.showdown_win_count += (
+                    went_to_showdown and payoff > 0
+                )
+                statistics.payoffs.add(payoff)
+
+                if big_blind:
+                    statistics.big_blind_payoffs.add(payoff / big_blind)
+
+        self.hand_count += 1
+
+
 def calculate_icm(
         payouts: Iterable[float],
         chips: Iterable[float],
 ) -> tuple[float, ...]:
     """Calculate the independent chip model (ICM) values.
 
+    The values are exact under the Malmuth-Harville model, in which
+    each place is won by one of the remaining players with a probability
+    proportional to their chips. The probabilities of each set of
+    players finishing in the first places are built place by place, so
+    the work grows with the number of such sets rather than with the
+    number of finishing orders. This is practical for up to about 20
+    players, or more when only a few places are paid. For larger
+    fields, see :func:`pokerkit.analysis.estimate_icm`.
+
     >>> calculate_icm([70, 30], [50, 30, 20])  # doctest: +ELLIPSIS
     (45.17..., 32.25, 22.57...)
     >>> calculate_icm([50, 30, 20], [25, 87, 88])  # doctest: +ELLIPSIS
@@ -534,22 +1694,238 @@ def calculate_icm(
     :param chips: The players' chips.
     :return: The ICM values.
     """
-    payouts = tuple(payouts)
+    payouts = list(payouts)
     chips = tuple(chips)
-    chip_sum = sum(chips)
-    chip_percentages = [chip / chip_sum for chip in chips]
     icms = [0.0] * len(chips)
+    players = [(1 << i, i, chip) for i, chip in enumerate(chips) if chip > 0]
+
+    while payouts and not payouts[-1]:
+        payouts.pop()
+
+    place_count = min(len(payouts), len(players))
+    # The probability of each set of players, as a bit mask, taking the
+    # places so far, along with the chips of the other players.
+    layer = {0: (1.0, float(sum(chips)))}
+
+    for place in range(place_count):
+        payout = payouts[place]
+        last = place == place_count - 1
+        next_layer: dict[int, tuple[float, float]] = {}
+
+        for mask, (probability, remainder) in layer.items():
+            for bit, i, chip in players:
+                if mask & bit:
+                    continue
+
+                sub_probability = probability * chip / remainder
+                icms[i] += payout * sub_probability
 
-    for player_indices in permutations(range(len(chips)), len(payouts)):
-        probability = 1.0
-        denominator = 1.0
+                if not last:
+                    key = mask | bit
+                    entry = next_layer.get(key)
 
-        for player_index in player_indices:
-            chip_percentage = chip_percentages[player_index]
-            probability *= chip_percentage / denominator
-            denominator -= chip_percentage
+                    if entry is None:
+                        next_layer[key] = sub_probability, remainder - chip
+                    else:
+                        next_layer[key] = (
+                            entry[0] + sub_probability,
+                            entry[1],
+                        )
 
-        for payout, player_index in zip(payouts, player_indices):
-            icms[player_index] += payout * probability
+        layer = next_layer
 
     return tuple(icms)
+
+
+def __sample_icm(
+        payouts: tuple[float, ...],
+        chips: tuple[float, ...],
+        model: Literal['malmuth-harville', 'malmuth-weitzman'],
+        seed: int,
+        sample_count: int,
+) -> tuple[list[float], list[float]]:
+    random = Random(seed)
+    players = [i for i, chip in enumerate(chips) if chip > 0]
+    place_count = min(len(payouts), len(players))
+    sums = [0.0] * len(chips)
+    squares = [0.0] * len(chips)
+
+    for _ in range(sample_count):
+        # Exponential clocks with the right rates ring in the order of
+        # the model: by chips for the winners in the Malmuth-Harville
+        # model, by inverse chips for the eliminations in the
+        # Malmuth-Weitzman model.
+        if model == 'malmuth-harville':
+            times = {i: random.expovariate(chips[i]) for i in players}
+            order = nsmallest(place_count, players, key=times.__getitem__)
+        else:
+            times = {i: random.expovariate(1 / chips[i]) for i in players}
+            order = nlargest(place_count, players, key=times.__getitem__)
+
+        for payout, i in zip(payouts, order):
+            sums[i] += payout
+            squares[i] += payout * payout
+
+    return sums, squares
+
+
+def estimate_icm(
+        payouts: Iterable[float],
+        chips: Iterable[float],
+        sample_count: int,
+        *,
+        model: Literal[
+            'malmuth-harville',
+            'malmuth-weitzman',
+        ] = 'malmuth-harville',
+        executor: Executor | None = None,
+        chunk_count: int | None = None,
+) -> tuple[tuple[float, ...], tuple[float, ...]]:
+    """Estimate the independent chip model (ICM) values by sampling
+    finishing orders, with their standard errors.
+
+    Each sample costs time linear in the number of players, so large
+    fields, such as tournament bubbles, can be evaluated. The standard
+    error of each value shrinks with the square root of the sample
+    count, and the exact value lies within about two standard errors of
+    the estimate 95% of the time.
+
+    In the ``'malmuth-harville'`` model, the finishing orders are those
+    of :func:`pokerkit.analysis.calculate_icm`. In the
+    ``'malmuth-weitzman'`` model, the players are eliminated one by one,
+    each with a probability inversely proportional to their chips.
+
+    >>> values, errors = estimate_icm([50, 30, 20], [50, 30, 20], 10000)
+    >>> exact_values = calculate_icm([50, 30, 20], [50, 30, 20])
+    >>> all(
+    ...     abs(value - exact_value) < 5 * error
+    ...     for value, exact_value, error in zip(
+    ...         values,
+    ...         exact_values,
+    ...         errors,
+    ...     )
+    ... )
+    True
+    >>> round(sum(values), 6)
+    100.0
+
+    :param payouts: The payouts.
+    :param chips: The players' chips.
+    :param sample_count: The number of finishing orders to sample.
+    :param model: The model of the finishing orders, defaults to
+                  ``'malmuth-harville'``.
+    :param executor: The optional executor, defaults to ``None`` which
+                     samples in this process.
+    :param chunk_count: The optional number of chunks the samples are
+                        split into, defaults to ``None`` which is ``1``
+                        without an executor and the number of CPUs
+                        with one.
+    :return: The estimated ICM values and their standard errors.
+    """
+    if model not in ('malmuth-harville', 'malmuth-weitzman'):
+        raise ValueError(f'unknown model {repr(model)}')
+
+    if sample_count <= 0:
+        raise ValueError('sample count not positive')
+
+    payouts = tuple(payouts)
+    chips = tuple(chips)
+    chunk_count = __get_chunk_count(executor, chunk_count)
+    fn = partial(__sample_icm, payouts, chips, model)
+    mapper: Any = map if executor is None else executor.map
+    sums = [0.0] * len(chips)
+    squares = [0.0] * len(chips)
+
+    for sub_sums, sub_squares in mapper(
+            fn,
+            (getrandbits(64) for _ in range(chunk_count)),
+            (
+                len(range(i, sample_count, chunk_count))
+                for i in range(chunk_count)
+            ),
+    ):
+        for i in range(len(chips)):
+            sums[i] += sub_sums[i]
+            squares[i] += sub_squares[i]
+
+    values = []
+    errors = []
+
+    for sum_, square in zip(sums, squares):
+        value = sum_ / sample_count
+
+        if sample_count > 1:
+            variance = (square - sum_ * value) / (sample_count - 1)
+            error = sqrt(max(variance, 0.0) / sample_count)
+        else:
+            error = nan
+
+        values.append(value)
+        errors.append(error)
+
+    return tuple(values), tuple(errors)
+
+
+def __calculate_icms(
+        payouts: tuple[float, ...],
+        sample_count: int | None,
+        model: Literal['malmuth-harville', 'malmuth-weitzman'],
+        chip_distributions: list[tuple[float, ...]],
+) -> list[tuple[float, ...]]:
+    if sample_count is None:
+        return [calculate_icm(payouts, chips) for chips in chip_distributions]
+
+    return [
+        estimate_icm(payouts, chips, sample_count, model=model)[0]
+        for chips in chip_distributions
+    ]
+
+
+def calculate_icms(
+        payouts: Iterable[float],
+        chip_distributions: Iterable[Iterable[float]],
+        *,
+        sample_count: int | None = None,
+        model: Literal[
+            'malmuth-harville',
+            'malmuth-weitzman',
+        ] = 'malmuth-harville',
+        executor: Executor | None = None,
+        chunk_size: int = 64,
+) -> list[tuple[float, ...]]:
+    """Calculate the independent chip model (ICM) values of many chip
+    distributions under the same payouts.
+
+    This suits tables of spots, like push or fold charts, in which the
+    chip distributions after each outcome of each spot are evaluated.
+    The distributions are split into chunks, which are evaluated by the
+    executor if given.
+
+    >>> calculate_icms([70, 30], [[50, 30, 20], [30, 50, 20]])
+    ... # doctest: +ELLIPSIS
+    [(45.17..., 32.25, 22.57...), (32.25, 45.17..., 22.57...)]
+
+    :param payouts: The payouts.
+    :param chip_distributions: The chips of the players in each
+                               distribution.
+    :param sample_count: The optional number of samples of
+                         :func:`pokerkit.analysis.estimate_icm`, defaults
+                         to ``None`` which calculates the exact values
+                         with :func:`pokerkit.analysis.calculate_icm`.
+    :param model: The model used when sampling, see
+                  :func:`pokerkit.analysis.estimate_icm`.
+    :param executor: The optional executor, defaults to ``None`` which
+                     evaluates the distributions in this process.
+    :param chunk_size: The number of distributions per chunk.
+    :return: The ICM values of each distribution.
+    """
+    if model not in ('malmuth-harville', 'malmuth-weitzman'):
+        raise ValueError(f'unknown model {repr(model)}')
+
+    payouts = tuple(payouts)
+    iterator = map(tuple, chip_distributions)
+    chunks = iter(lambda: list(islice(iterator, chunk_size)), [])
+    fn = partial(__calculate_icms, payouts, sample_count, model)
+    mapper: Any = map if executor is None else executor.map
+
+    return list(chain.from_iterable(mapper(fn, chunks)))
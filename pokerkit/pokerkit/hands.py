@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from collections.abc import Hashable
+from collections.abc import Hashable, Iterable
 from functools import total_ordering
 from itertools import chain, combinations
 from typing import Any, ClassVar
@@ -113,16 +113,84 @@ class Hand(Hashable, ABC):
 
         return hand
 
+    @classmethod
+    def from_game_ids(
+            cls,
+            hole_ids: Iterable[int],
+            board_ids: Iterable[int] = (),
+    ) -> Hand:
+        """Create a poker hand from a game setting with integer card
+        ids.
+
+        The cards are read from a table (for more details, please see
+        :meth:`pokerkit.utilities.Card.from_ids`). Therefore, no cards
+        are parsed or created.
+
+        >>> h0 = StandardHighHand.from_game_ids([51, 50], [45, 47, 4])
+        >>> h1 = StandardHighHand('AsAhKdKs3c')
+        >>> h0 == h1
+        True
+
+        :param hole_ids: The ids of the hole cards.
+        :param board_ids: The optional ids of the board cards.
+        :return: The strongest hand from possible card combinations.
+        :raises ValueError: If no valid hand can be formed.
+        """
+        return cls.from_game(Card.from_ids(hole_ids), Card.from_ids(board_ids))
+
+    @classmethod
+    def get_game_entry_from_ids(
+            cls,
+            hole_ids: Iterable[int],
+            board_ids: Iterable[int] = (),
+    ) -> Entry:
+        """Return the entry of the strongest hand in a game setting
+        with integer card ids.
+
+        Entries of high hands are greater for stronger hands while those
+        of low hands are less for stronger hands.
+
+        >>> e0 = StandardHighHand.get_game_entry_from_ids(
+        ...     [51, 50],
+        ...     [45],
+        ... )  # doctest: +ELLIPSIS
+        Traceback (most recent call last):
+            ...
+        ValueError: No valid StandardHighHand hand can be formed from the ho...
+        >>> e0 = StandardHighHand.get_game_entry_from_ids(
+        ...     [51, 50],
+        ...     [45, 47, 4],
+        ... )
+        >>> e0 == StandardHighHand('AsAhKdKs3c').entry
+        True
+
+        :param hole_ids: The ids of the hole cards.
+        :param board_ids: The optional ids of the board cards.
+        :return: The entry of the strongest hand.
+        :raises ValueError: If no valid hand can be formed.
+        """
+        return cls.from_game_ids(hole_ids, board_ids).entry
+
+    @classmethod
+    def _from_entry(cls, cards: tuple[Card, ...], entry: Entry) -> Hand:
+        hand = cls.__new__(cls)
+        hand.__cards = cards
+        hand.__entry = entry
+
+        return hand
+
     def __init__(self, cards: CardsLike) -> None:
         self.__cards = Card.clean(cards)
 
-        if not self.lookup.has_entry(self.cards):
+        try:
+            self.__entry = self.lookup.get_entry(self.__cards)
+        except ValueError:
             raise ValueError(
                 (
                     f'The cards {repr(cards)} form an invalid'
                     f' {type(self).__qualname__} hand.'
                 ),
-            )
+            ) from None
 
     def __eq__(self, other: Any) -> bool:
         if type(self) != type(other):  # noqa: E721
@@ -180,7 +248,7 @@ class Hand(Hashable, ABC):
 
         :return: The hand entry.
         """
-        return self.lookup.get_entry(self.cards)
+        return self.__entry
 
 
 class CombinationHand(Hand, ABC):
@@ -308,6 +376,83 @@ class StandardHighHand(StandardHand):
 
     low = False
 
+    @classmethod
+    def from_game(
+            cls,
+            hole_cards: CardsLike,
+            board_cards: CardsLike = (),
+    ) -> Hand:
+        """Create a poker hand from a game setting.
+
+        In a game setting, a player uses private cards from their hole
+        and the public cards from the board to make their hand.
+
+        When there are at most seven cards, the strongest hand is found
+        through :meth:`pokerkit.lookups.Lookup.get_max_combination`
+        instead of evaluating every combination of five cards. The
+        resulting hand is identical either way.
+
+        >>> h0 = StandardHighHand.from_game('AsAc', 'Kh3sAdAh')
+        >>> h0.cards
+        (As, Ac, Kh, Ad, Ah)
+        >>> h0 = StandardHighHand.from_game('Ac9c', 'AhKhQhJhTh')
+        >>> h1 = StandardHighHand('AhKhQhJhTh')
+        >>> h0 == h1
+        True
+        >>> StandardHighHand.from_game('AcKc', 'Qh')  # doctest: +ELLIPSIS
+        Traceback (most recent call last):
+            ...
+        ValueError: No valid StandardHighHand hand can be formed from the ho...
+
+        :param hole_cards: The hole cards.
+        :param board_cards: The optional board cards.
+        :return: The strongest hand from possible card combinations.
+        """
+        cards = tuple(chain(Card.clean(hole_cards), Card.clean(board_cards)))
+
+        try:
+            combination, entry = cls.lookup.get_max_combination(cards)
+        except ValueError:
+            return super().from_game(hole_cards, board_cards)
+
+        return cls._from_entry(combination, entry)
+
+    @classmethod
+    def get_game_entry_from_ids(
+            cls,
+            hole_ids: Iterable[int],
+            board_ids: Iterable[int] = (),
+    ) -> Entry:
+        """Return the entry of the strongest hand in a game setting
+        with integer card ids.
+
+        When there are at most seven cards, the entry is looked up
+        directly from the ids through
+        :meth:`pokerkit.lookups.Lookup.get_max_entry_from_ids` without
+        creating any cards or hands.
+
+        >>> e0 = StandardHighHand.get_game_entry_from_ids(
+        ...     [51, 50],
+        ...     [49, 0, 8, 12, 48],
+        ... )
+        >>> e0.label
+        <Label.FOUR_OF_A_KIND: 'Four of a kind'>
+
+        :param hole_ids: The ids of the hole cards.
+        :param board_ids: The optional ids of the board cards.
+        :return: The entry of the strongest hand.
+        :raises ValueError: If no valid hand can be formed.
+        """
+        hole_ids = tuple(hole_ids)
+        board_ids = tuple(board_ids)
+
+        try:
+            entry = cls.lookup.get_max_entry_from_ids(hole_ids + board_ids)
+        except ValueError:
+            entry = super().get_game_entry_from_ids(hole_ids, board_ids)
+
+        return entry
+
 
 class StandardLowHand(StandardHand):
     """The class for standard low hands.
@@ -13,9 +13,12 @@ from functools import partial
 from itertools import combinations, filterfalse
 from math import prod
 from operator import contains
-from typing import ClassVar
+from threading import Lock
+from typing import Any, ClassVar, TypeVar
 
-from pokerkit.utilities import Card, CardsLike, Rank, RankOrder
+from pokerkit.utilities import Card, CardsLike, Deck, Rank, RankOrder, Suit
+
+_S = TypeVar('_S')
 
 
 @unique
@@ -115,6 +118,9 @@ class Lookup(ABC):
     assert len(__primes) >= len(tuple(Rank)) - 1  # except unknown
 
     __multipliers = dict(zip(Rank, __primes))
+    __id_multipliers = tuple(
+        map(__multipliers.__getitem__, Card.get_ranks(Deck.STANDARD)),
+    )
     rank_order: ClassVar[RankOrder]
     """The rank order."""
     __entries: dict[tuple[int, bool], Entry] = field(
@@ -123,6 +129,13 @@ class Lookup(ABC):
         repr=False,
     )
     __entry_count: int = field(default=0, init=False, repr=False)
+    __max_keys: dict[tuple[int, bool], tuple[int, bool]] | None = field(
+        default=None,
+        init=False,
+        repr=False,
+    )
+    __max_keys_lock: ClassVar[Lock] = Lock()
+    __max_card_count: ClassVar[int] = 7
 
     @classmethod
     def __hash(cls, ranks: Iterable[Rank]) -> int:
@@ -243,6 +256,223 @@ class Lookup(ABC):
         """
         return self.__entries.get(self._get_key(cards))
 
+    def get_max_entry(self, cards: CardsLike) -> Entry:
+        """Return the greatest lookup entry among the hands that any
+        five of the cards form.
+
+        Unlike looking up every combination of five cards, the entry is
+        obtained directly from precomputed tables keyed by the ranks of
+        all of the cards and the ranks of each suit. The tables are
+        built the first time they are needed.
+
+        Up to seven cards are supported. This is only meaningful for
+        lookups of five-card hands where suited hands are never weaker
+        than their unsuited counterparts, such as
+        :class:`StandardLookup`.
+
+        >>> lookup = StandardLookup()
+        >>> entry = lookup.get_max_entry('AsAcKh3sAdAh')
+        >>> entry == lookup.get_entry('AsAcAdAhKh')
+        True
+        >>> entry.label
+        <Label.FOUR_OF_A_KIND: 'Four of a kind'>
+        >>> lookup.get_max_entry('2h7h9hJhKh3c3d').label
+        <Label.FLUSH: 'Flush'>
+        >>> lookup.get_max_entry('AsKsQs')
+        Traceback (most recent call last):
+            ...
+        ValueError: The cards 'AsKsQs' cannot be looked up together.
+
+        :param cards: The cards to look up.
+        :return: The greatest lookup entry.
+        :raises ValueError: If the cards cannot be looked up.
+        """
+        key, _ = self.__get_max_key(cards)
+
+        return self.__entries[key]
+
+    def get_max_entry_from_ids(self, ids: Iterable[int]) -> Entry:
+        """Return the greatest lookup entry among the hands that any
+        five of the cards with the given integer ids form.
+
+        This is equivalent to :meth:`get_max_entry` but no card is
+        parsed or created. For the ids, please refer to
+        :meth:`pokerkit.utilities.Card.get_ids`.
+
+        >>> lookup = StandardLookup()
+        >>> ids = list(Card.get_ids('AsAcKh3sAdAh'))
+        >>> lookup.get_max_entry_from_ids(ids).label
+        <Label.FOUR_OF_A_KIND: 'Four of a kind'>
+        >>> lookup.get_max_entry_from_ids(ids) == lookup.get_max_entry(
+        ...     'AsAcKh3sAdAh',
+        ... )
+        True
+
+        :param ids: The ids of the cards to look up.
+        :return: The greatest lookup entry.
+        :raises ValueError: If the cards cannot be looked up.
+        """
+        hash_ = 1
+        suit_hashes = [1] * 4
+
+        for id_ in ids:
+            multiplier = self.__id_multipliers[id_]
+            hash_ *= multiplier
+            suit_hashes[id_ & 3] *= multiplier
+
+        key, _ = self.__get_max_key_from_hashes(
+            hash_,
+            enumerate(suit_hashes),
+            ids,
+        )
+
+        return self.__entries[key]
+
+    def get_max_combination(
+            self,
+            cards: CardsLike,
+    ) -> tuple[tuple[Card, ...], Entry]:
+        """Return the combination of five cards that forms the
+        greatest lookup entry alongside the entry itself.
+
+        When several combinations form the greatest entry, the first one
+        in the order of ``itertools.combinations`` is returned.
+
+        >>> lookup = StandardLookup()
+        >>> combination, entry = lookup.get_max_combination('AsAcKh3sAdAh')
+        >>> combination
+        (As, Ac, Kh, Ad, Ah)
+        >>> entry.label
+        <Label.FOUR_OF_A_KIND: 'Four of a kind'>
+        >>> combination, entry = lookup.get_max_combination('Jh9d2h7h9hKh3h')
+        >>> combination
+        (Jh, 7h, 9h, Kh, 3h)
+        >>> entry.label
+        <Label.FLUSH: 'Flush'>
+
+        :param cards: The cards to look up.
+        :return: The greatest combination and its lookup entry.
+        :raises ValueError: If the cards cannot be looked up.
+        """
+        cards = Card.clean(cards)
+        key, suit = self.__get_max_key(cards)
+        hash_, _ = key
+        combination = []
+
+        for card in cards:
+            multiplier = self.__multipliers[card.rank]
+
+            if (
+                    hash_ % multiplier == 0
+                    and (suit is None or card.suit == suit)
+            ):
+                combination.append(card)
+
+                hash_ //= multiplier
+
+        return tuple(combination), self.__entries[key]
+
+    def __get_max_key(
+            self,
+            cards: CardsLike,
+    ) -> tuple[tuple[int, bool], Suit | None]:
+        hash_ = 1
+        suit_hashes = dict[Suit, int]()
+
+        for card in Card.clean(cards):
+            if card.rank not in self.__multipliers:
+                raise ValueError(
+                    f'The cards {repr(cards)} cannot be looked up together.',
+                )
+
+            multiplier = self.__multipliers[card.rank]
+            hash_ *= multiplier
+            suit_hashes[card.suit] = suit_hashes.get(card.suit, 1) * multiplier
+
+        return self.__get_max_key_from_hashes(
+            hash_,
+            suit_hashes.items(),
+            cards,
+        )
+
+    def __get_max_key_from_hashes(
+            self,
+            hash_: int,
+            suit_hashes: Iterable[tuple[_S, int]],
+            cards: Any,
+    ) -> tuple[tuple[int, bool], _S | None]:
+        max_keys = self.__max_keys
+
+        if max_keys is None:
+            max_keys = self.__create_max_keys()
+
+        if (hash_, False) not in max_keys:
+            raise ValueError(
+                f'The cards {repr(cards)} cannot be looked up together.',
+            )
+
+        max_key = max_keys[hash_, False]
+        max_suit = None
+
+        for suit, suit_hash in suit_hashes:
+            key = max_keys.get((suit_hash, True))
+
+            if (
+                    key is not None
+                    and self.__entries[key] > self.__entries[max_key]
+            ):
+                max_key = key
+                max_suit = suit
+
+        return max_key, max_suit
+
+    def __create_max_keys(
+            self,
+    ) -> dict[tuple[int, bool], tuple[int, bool]]:
+        with self.__max_keys_lock:
+            if self.__max_keys is None:
+                self.__max_keys = self.__build_max_keys()
+
+            return self.__max_keys
+
+    def __build_max_keys(self) -> dict[tuple[int, bool], tuple[int, bool]]:
+        multipliers = tuple(map(self.__multipliers.get, self.rank_order))
+        keys = list(self.__entries)
+        max_keys = {key: key for key in keys}
+
+        for _ in range(self.__max_card_count - 5):
+            extended_keys = dict[tuple[int, bool], tuple[int, bool]]()
+
+            for hash_, suitedness in keys:
+                max_key = max_keys[hash_, suitedness]
+                max_index = self.__entries[max_key].index
+                multiplicity = 1 if suitedness else 4
+
+                for multiplier in multipliers:
+                    assert multiplier is not None
+
+                    if hash_ % multiplier ** multiplicity == 0:
+                        continue
+
+                    extended_key = hash_ * multiplier, suitedness
+
+                    if (
+                            extended_key not in extended_keys
+                            or (
+                                self.__entries[
+                                    extended_keys[extended_key]
+                                ].index
+                                < max_index
+                            )
+                    ):
+                        extended_keys[extended_key] = max_key
+
+            max_keys.update(extended_keys)
+
+            keys = list(extended_keys)
+
+        return max_keys
+
     def _get_key(self, cards: CardsLike) -> tuple[int, bool]:
         cards = Card.clean(cards)
         hash_ = self.__hash(Card.get_ranks(cards))
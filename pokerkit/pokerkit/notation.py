@@ -7,11 +7,13 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from collections.abc import Callable, Generator, Iterable, Iterator, Sequence
 from collections import defaultdict, deque
+from concurrent.futures import Executor, Future
 from copy import deepcopy
 from dataclasses import asdict, dataclass, field, fields, KW_ONLY
 from decimal import Decimal
 from functools import partial
 from math import inf
+from mmap import mmap
 from operator import add, itemgetter
 from re import (
     compile,
@@ -496,11 +498,110 @@ class HandHistory(Iterable[State]):
     def load_all(cls, fp: BinaryIO, **kwargs: Any) -> Iterator[HandHistory]:
         """Load PHHs from a file pointer.
 
+        The file is read section by section. For more information,
+        please refer to :meth:`pokerkit.notation.HandHistory.stream_all`.
+
         :param fp: The file pointer.
         :param kwargs: The metadata.
         :return: The hand history object.
         """
-        yield from cls.loads_all(fp.read().decode(), **kwargs)
+        yield from cls.stream_all(fp, **kwargs)
+
+    @classmethod
+    def stream_all(
+            cls,
+            fp: BinaryIO | mmap,
+            *,
+            parse_value: Callable[[str], int] = parse_value,
+            executor: Executor | None = None,
+            chunk_size: int = 1 << 20,
+            batch_size: int = 256,
+            prefetch_count: int = 16,
+            **kwargs: Any,
+    ) -> Iterator[HandHistory]:
+        """Lazily load PHHs from a file pointer or a memory map.
+
+        The file is read in chunks of ``chunk_size`` bytes and split at
+        the top-level table headers like ``[1]``, and each section is
+        parsed on its own, so the memory usage does not grow with the
+        file size. Only headers with a single key, at the start of lines
+        of their own and outside multi-line strings, start a new hand.
+
+        The user may supply an executor to parse the sections in
+        parallel. The sections are then sent in batches of
+        ``batch_size``, at most ``prefetch_count`` batches are pending
+        at any time, and the hands are yielded in the order of the file.
+        The parsing function must be picklable to be sent to processes.
+
+        >>> from io import BytesIO
+        >>> s = b"[1]\\nvariant = 'NT'\\n[2]\\nvariant = 'FT'\\n"
+        >>> hhs = HandHistory.stream_all(
+        ...     BytesIO(s),
+        ...     antes=[0, 0],
+        ...     starting_stacks=[200, 200],
+        ...     actions=[],
+        ... )
+        >>> [hh.variant for hh in hhs]
+        ['NT', 'FT']
+
+        :param fp: The file pointer or the memory map.
+        :param parse_value: The value parsing function.
+        :param executor: The optional executor, defaults to ``None``
+                         which parses the sections in this process.
+        :param chunk_size: The number of bytes read at a time.
+        :param batch_size: The number of sections parsed by each task
+                           of the executor.
+        :param prefetch_count: The maximum number of pending tasks.
+        :param kwargs: The metadata.
+        :return: The hand history objects.
+        :raises ValueError: If there are values before the first header.
+        """
+        sections = _split_phhs(fp, chunk_size)
+
+        if executor is None:
+            for section in sections:
+                yield from _load_phhs(cls, [section], parse_value, kwargs)
+
+            return
+
+        futures = deque[Future[list[HandHistory]]]()
+        batch = []
+
+        try:
+            for section in sections:
+                batch.append(section)
+
+                if len(batch) == batch_size:
+                    futures.append(
+                        executor.submit(
+                            _load_phhs,
+                            cls,
+                            batch,
+                            parse_value,
+                            kwargs,
+                        ),
+                    )
+                    batch = []
+
+                    if len(futures) >= prefetch_count:
+                        yield from futures.popleft().result()
+
+            if batch:
+                futures.append(
+                    executor.submit(
+                        _load_phhs,
+                        cls,
+                        batch,
+                        parse_value,
+                        kwargs,
+                    ),
+                )
+
+            while futures:
+                yield from futures.popleft().result()
+        finally:
+            for future in futures:
+                future.cancel()
 
     @classmethod
     def dumps_all(cls, phhs: Iterable[HandHistory]) -> str:
@@ -646,6 +747,7 @@ class HandHistory(Iterable[State]):
             *,
             parse_value: Callable[[str], int] = parse_value,
             error_status: bool = False,
+            validation_status: bool = True,
     ) -> Generator[HandHistory, None, int]:
         """Parse hand history logs from Absolute Poker.
 
@@ -653,10 +755,16 @@ class HandHistory(Iterable[State]):
         ``error_status`` is passed as ``True`` (by default, it is
         ``False``). If ``False``, only warnings are shown.
 
+        Each hand is replayed and rebuilt from its final state unless
+        ``validation_status`` is ``False``. For more information, please
+        refer to :meth:`pokerkit.notation.HandHistory.validate`.
+
         :param s: The hand history logs.
         :param parse_value: The value parser.
         :param error_status: Set ``True`` to raise errors, otherwise
                                   ``False``.
+        :param validation_status: Set ``False`` to skip the replay,
+                                  otherwise ``True``.
         :return: The generator that iterates yields hand histories and
                  returns the total number of hands parsed.
         """
@@ -664,6 +772,7 @@ class HandHistory(Iterable[State]):
             s,
             parse_value=parse_value,
             error_status=error_status,
+            validation_status=validation_status,
         )
 
     @classmethod
@@ -673,6 +782,7 @@ class HandHistory(Iterable[State]):
             *,
             parse_value: Callable[[str], int] = parse_value,
             error_status: bool = False,
+            validation_status: bool = True,
     ) -> Generator[HandHistory, None, int]:
         """Parse hand history logs from Full Tilt Poker.
 
@@ -680,10 +790,16 @@ class HandHistory(Iterable[State]):
         ``error_status`` is passed as ``True`` (by default, it is
         ``False``). If ``False``, only warnings are shown.
 
+        Each hand is replayed and rebuilt from its final state unless
+        ``validation_status`` is ``False``. For more information, please
+        refer to :meth:`pokerkit.notation.HandHistory.validate`.
+
         :param s: The hand history logs.
         :param parse_value: The value parser.
         :param error_status: Set ``True`` to raise errors, otherwise
                                   ``False``.
+        :param validation_status: Set ``False`` to skip the replay,
+                                  otherwise ``True``.
         :return: The generator that iterates yields hand histories and
                  returns the total number of hands parsed.
         """
@@ -691,6 +807,7 @@ class HandHistory(Iterable[State]):
             s,
             parse_value=parse_value,
             error_status=error_status,
+            validation_status=validation_status,
         )
 
     @classmethod
@@ -700,6 +817,7 @@ class HandHistory(Iterable[State]):
             *,
             parse_value: Callable[[str], int] = parse_value,
             error_status: bool = False,
+            validation_status: bool = True,
     ) -> Generator[HandHistory, None, int]:
         """Parse hand history logs from iPoker Network.
 
@@ -707,10 +825,16 @@ class HandHistory(Iterable[State]):
         ``error_status`` is passed as ``True`` (by default, it is
         ``False``). If ``False``, only warnings are shown.
 
+        Each hand is replayed and rebuilt from its final state unless
+        ``validation_status`` is ``False``. For more information, please
+        refer to :meth:`pokerkit.notation.HandHistory.validate`.
+
         :param s: The hand history logs.
         :param parse_value: The value parser.
         :param error_status: Set ``True`` to raise errors, otherwise
                                   ``False``.
+        :param validation_status: Set ``False`` to skip the replay,
+                                  otherwise ``True``.
         :return: The generator that iterates yields hand histories and
                  returns the total number of hands parsed.
         """
@@ -718,6 +842,7 @@ class HandHistory(Iterable[State]):
             s,
             parse_value=parse_value,
             error_status=error_status,
+            validation_status=validation_status,
         )
 
     @classmethod
@@ -727,6 +852,7 @@ class HandHistory(Iterable[State]):
             *,
             parse_value: Callable[[str], int] = parse_value,
             error_status: bool = False,
+            validation_status: bool = True,
     ) -> Generator[HandHistory, None, int]:
         """Parse hand history logs from Ongame Network.
 
@@ -734,10 +860,16 @@ class HandHistory(Iterable[State]):
         ``error_status`` is passed as ``True`` (by default, it is
         ``False``). If ``False``, only warnings are shown.
 
+        Each hand is replayed and rebuilt from its final state unless
+        ``validation_status`` is ``False``. For more information, please
+        refer to :meth:`pokerkit.notation.HandHistory.validate`.
+
         :param s: The hand history logs.
         :param parse_value: The value parser.
         :param error_status: Set ``True`` to raise errors, otherwise
                                   ``False``.
+        :param validation_status: Set ``False`` to skip the replay,
+                                  otherwise ``True``.
         :return: The generator that iterates yields hand histories and
                  returns the total number of hands parsed.
         """
@@ -745,6 +877,7 @@ class HandHistory(Iterable[State]):
             s,
             parse_value=parse_value,
             error_status=error_status,
+            validation_status=validation_status,
         )
 
     @classmethod
@@ -754,6 +887,7 @@ class HandHistory(Iterable[State]):
             *,
             parse_value: Callable[[str], int] = parse_value,
             error_status: bool = False,
+            validation_status: bool = True,
     ) -> Generator[HandHistory, None, int]:
         """Parse hand history logs from PartyPoker.
 
@@ -761,10 +895,16 @@ class HandHistory(Iterable[State]):
         disabled by setting ``error_status`` to be ``True``. Then,
         errors will be warned.
 
+        Each hand is replayed and rebuilt from its final state unless
+        ``validation_status`` is ``False``. For more information, please
+        refer to :meth:`pokerkit.notation.HandHistory.validate`.
+
         :param s: The hand history logs.
         :param parse_value: The value parser.
         :param error_status: Set ``True`` to skip errors, otherwise
                                   ``False``.
+        :param validation_status: Set ``False`` to skip the replay,
+                                  otherwise ``True``.
         :return: The generator that iterates yields hand histories and
                  returns the total number of hands parsed.
         """
@@ -772,6 +912,7 @@ class HandHistory(Iterable[State]):
             s,
             parse_value=parse_value,
             error_status=error_status,
+            validation_status=validation_status,
         )
 
     @classmethod
@@ -781,6 +922,7 @@ class HandHistory(Iterable[State]):
             *,
             parse_value: Callable[[str], int] = parse_value,
             error_status: bool = False,
+            validation_status: bool = True,
     ) -> Generator[HandHistory, None, int]:
         """Parse hand history logs from PokerStars.
 
@@ -788,10 +930,16 @@ class HandHistory(Iterable[State]):
         ``error_status`` is passed as ``True`` (by default, it is
         ``False``). If ``False``, only warnings are shown.
 
+        Each hand is replayed and rebuilt from its final state unless
+        ``validation_status`` is ``False``. For more information, please
+        refer to :meth:`pokerkit.notation.HandHistory.validate`.
+
         :param s: The hand history logs.
         :param parse_value: The value parser.
         :param error_status: Set ``True`` to raise errors, otherwise
                                   ``False``.
+        :param validation_status: Set ``False`` to skip the replay,
+                                  otherwise ``True``.
         :return: The generator that iterates yields hand histories and
                  returns the total number of hands parsed.
         """
@@ -799,6 +947,7 @@ class HandHistory(Iterable[State]):
             s,
             parse_value=parse_value,
             error_status=error_status,
+            validation_status=validation_status,
         )
 
     @classmethod
@@ -904,6 +1053,39 @@ class HandHistory(Iterable[State]):
         if actions:
             raise ValueError('Unable to repair the hand history')
 
+    def validate(self) -> HandHistory:
+        """Replay the hand and rebuild the hand history from its final
+        state.
+
+        The actions are replayed as in
+        :attr:`pokerkit.notation.HandHistory.state_actions`, so missing
+        hole dealings, checks, and folds are filled in, and the returned
+        hand history holds the actions of the final state. The other
+        fields are kept. Hand histories parsed with ``validation_status``
+        set to ``False`` can be validated later this way, for example in
+        parallel through an executor.
+
+        :return: The rebuilt hand history.
+        :raises ValueError: If the actions cannot be replayed.
+        """
+        state, _ = deque(self.state_actions, maxlen=1).pop()
+        kwargs = {
+            name: getattr(self, name)
+            for name in self.optional_field_names
+            if getattr(self, name) is not None
+        }
+
+        return self.from_game_state(
+            self.create_game(),
+            state,
+            automations=self.automations,
+            divmod=self.divmod,
+            rake=self.rake,
+            parse_value=self.parse_value,
+            user_defined_fields=dict(self.user_defined_fields),
+            **kwargs,
+        )
+
     @property
     def game_type(self) -> type[Poker]:
         """Return the game type.
@@ -1254,6 +1436,115 @@ class HandHistory(Iterable[State]):
         return match_state
 
 
+_PHHS_HEADER = compile(
+    rb'^\[[ \t]*([A-Za-z0-9_-]+|"[^"\r\n]*"|\'[^\'\r\n]*\')[ \t]*\]'
+    rb'[ \t]*(#[^\r\n]*)?\r?$',
+    MULTILINE,
+)
+_PHHS_PREAMBLE = compile(rb'(?:[ \t]*(?:#[^\n]*)?\r?\n?)*')
+
+
+def _skip_strings(
+        data: bytes,
+        start: int,
+        end: int,
+        delimiter: bytes | None,
+) -> bytes | None:
+    while True:
+        if delimiter is None:
+            indices = [
+                index
+                for index in (
+                    data.find(b"'''", start, end),
+                    data.find(b'"""', start, end),
+                )
+                if index >= 0
+            ]
+
+            if not indices:
+                return None
+
+            index = min(indices)
+            delimiter = data[index:index + 3]
+        else:
+            index = data.find(delimiter, start, end)
+
+            if index < 0:
+                return delimiter
+
+            delimiter = None
+
+        start = index + 3
+
+
+def _split_phhs(fp: BinaryIO | mmap, chunk_size: int) -> Iterator[bytes]:
+    pieces: list[bytes] = []
+    tail = b''
+    delimiter = None
+    started = False
+
+    while True:
+        chunk = fp.read(chunk_size)
+        data = tail + chunk
+
+        if chunk:
+            end = data.rfind(b'\n') + 1
+            data, tail = data[:end], data[end:]
+
+        start = 0
+        scanned = 0
+
+        for m in finditer(_PHHS_HEADER, data):
+            delimiter = _skip_strings(data, scanned, m.start(), delimiter)
+            scanned = m.start()
+
+            if delimiter is not None:
+                continue
+
+            pieces.append(data[start:m.start()])
+
+            if started:
+                yield b''.join(pieces)
+            elif not _PHHS_PREAMBLE.fullmatch(b''.join(pieces)):
+                raise ValueError('The PHHS file has values outside sections.')
+
+            pieces = []
+            start = m.start()
+            started = True
+
+        delimiter = _skip_strings(data, scanned, len(data), delimiter)
+
+        pieces.append(data[start:])
+
+        if not chunk:
+            break
+
+    if started:
+        yield b''.join(pieces)
+    elif not _PHHS_PREAMBLE.fullmatch(b''.join(pieces)):
+        raise ValueError('The PHHS file has values outside sections.')
+
+
+def _load_phhs(
+        cls: type[HandHistory],
+        sections: list[bytes],
+        parse_value: Callable[[str], int],
+        kwargs: dict[str, Any],
+) -> list[HandHistory]:
+    hhs: list[HandHistory] = []
+
+    for section in sections:
+        hhs.extend(
+            cls.loads_all(
+                section.decode(),
+                parse_value=parse_value,
+                **kwargs,
+            ),
+        )
+
+    return hhs
+
+
 def parse_action(
         state: State,
         action: str,
@@ -1424,12 +1715,16 @@ class REParser(Parser, ABC):
             *,
             parse_value: Callable[[str], int] = parse_value,
             error_status: bool = False,
+            validation_status: bool = True,
     ) -> Generator[HandHistory, None, int]:
         ss = findall(self.HAND, s)
 
         for s in ss:
             try:
                 hh = self._parse(s, parse_value)
+
+                if validation_status:
+                    hh = hh.validate()
             except (KeyError, ValueError):
                 message = f'Unable to parse {repr(s)}.'
 
@@ -1484,27 +1779,23 @@ class REParser(Parser, ABC):
         )
         actions = self._parse_actions(s, parse_value, players)
         hh = HandHistory(
-            variant=variant,
-            antes=antes,
-            blinds_or_straddles=blinds_or_straddles,
-            min_bet=max(blinds_or_straddles[:2]),
-            starting_stacks=starting_stacks,
-            actions=actions,
-        )
-        game = hh.create_game()
-        state = tuple(hh)[-1]
-        hh = HandHistory.from_game_state(
-            game,
-            state,
-            seats=seats,
-            players=players,
-            **self.CONSTANTS,
-            **self._parse_variables(s, parse_value),
-            **{
-                key: cast(Any, list(map(value.__getitem__, players)))
-                for key, value
-                in self._parse_player_variables(s, parse_value).items()
-            },
+            **HandHistory._filter_non_fields(
+                variant=variant,
+                antes=antes,
+                blinds_or_straddles=blinds_or_straddles,
+                min_bet=max(blinds_or_straddles[:2]),
+                starting_stacks=starting_stacks,
+                actions=actions,
+                seats=seats,
+                players=players,
+                **self.CONSTANTS,
+                **self._parse_variables(s, parse_value),
+                **{
+                    key: cast(Any, list(map(value.__getitem__, players)))
+                    for key, value
+                    in self._parse_player_variables(s, parse_value).items()
+                },
+            ),
         )
 
         return hh
@@ -2097,12 +2388,14 @@ class IPokerNetworkParser(REParser):
             *,
             parse_value: Callable[[str], int] = parse_value,
             error_status: bool = False,
+            validation_status: bool = True,
     ) -> Generator[HandHistory, None, int]:
         variables = self._parse_variables(s, parse_value)
         it = super().__call__(
             s,
             parse_value=parse_value,
             error_status=error_status,
+            validation_status=validation_status,
         )
         return_value = None
 
@@ -2,11 +2,27 @@
 analysis related tools on PokerKit.
 """
 
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import permutations
+from math import isnan
+from random import randint, seed
+from statistics import mean, variance
+from typing import Any
 from unittest import TestCase, main
 
-from pokerkit.analysis import calculate_equities, parse_range
+from pokerkit.analysis import (
+    calculate_equities,
+    calculate_icm,
+    calculate_icms,
+    estimate_icm,
+    parse_range,
+    parse_weighted_range,
+    RunningMoments,
+    Statistics,
+    StatisticsAggregator,
+)
 from pokerkit.hands import StandardHighHand
+from pokerkit.notation import HandHistory
 from pokerkit.utilities import Card, Deck
 
 
@@ -491,6 +507,595 @@ class HandHistoryTestCase(TestCase):
             self.assertAlmostEqual(equities[0], 0.5)
             self.assertAlmostEqual(equities[1], 0.5)
 
+    def test_calculate_equities_seeding(self) -> None:
+        args: tuple[Any, ...] = (
+            (parse_range('AKs'), parse_range('QQ')),
+            (),
+            2,
+            5,
+            Deck.STANDARD,
+            (StandardHighHand,),
+        )
+
+        seed(0)
+
+        equities = calculate_equities(*args, sample_count=1000)
+
+        seed(0)
+
+        self.assertEqual(
+            calculate_equities(*args, sample_count=1000),
+            equities,
+        )
+
+        with ProcessPoolExecutor() as executor:
+            seed(0)
+
+            equities = calculate_equities(
+                *args,
+                sample_count=1000,
+                executor=executor,
+            )
+
+            seed(0)
+
+            self.assertEqual(
+                calculate_equities(
+                    *args,
+                    sample_count=1000,
+                    executor=executor,
+                ),
+                equities,
+            )
+
+    def test_calculate_equities_chunking(self) -> None:
+        submissions = []
+
+        class Executor(ThreadPoolExecutor):
+            def submit(self, fn: Any, /, *args: Any, **kwargs: Any) -> Any:
+                submissions.append(args)
+
+                return super().submit(fn, *args, **kwargs)
+
+        for chunk_count in (1, 3):
+            submissions.clear()
+
+            with Executor(2) as executor:
+                equities = calculate_equities(
+                    (parse_range('AKs'), parse_range('QQ')),
+                    (),
+                    2,
+                    5,
+                    Deck.STANDARD,
+                    (StandardHighHand,),
+                    sample_count=100,
+                    executor=executor,
+                    chunk_count=chunk_count,
+                )
+
+            self.assertEqual(len(submissions), chunk_count)
+            self.assertAlmostEqual(sum(equities), 1)
+
+        self.assertRaises(
+            ValueError,
+            calculate_equities,
+            (parse_range('AKs'), parse_range('QQ')),
+            (),
+            2,
+            5,
+            Deck.STANDARD,
+            (StandardHighHand,),
+            sample_count=100,
+            chunk_count=0,
+        )
+
+    def test_calculate_equities_exactly(self) -> None:
+        equities = calculate_equities(
+            (parse_range('AhAd'), parse_range('KhKd')),
+            Card.parse('Ks7c2d3s'),
+            2,
+            5,
+            Deck.STANDARD,
+            (StandardHighHand,),
+            sample_count=0,
+            exact=True,
+        )
+
+        self.assertEqual(equities, [2 / 44, 42 / 44])
+
+        with ProcessPoolExecutor() as executor:
+            equities = calculate_equities(
+                (parse_range('AA'), parse_range('KK')),
+                Card.parse('Ks7c2d3s'),
+                2,
+                5,
+                Deck.STANDARD,
+                (StandardHighHand,),
+                sample_count=0,
+                executor=executor,
+                exact=True,
+            )
+
+        self.assertAlmostEqual(equities[0], 2 / 44)
+        self.assertAlmostEqual(equities[1], 42 / 44)
+
+        args: tuple[Any, ...] = (
+            (parse_range('AhKh'), [[]]),
+            tuple(Card.parse('Kc7h2d3h9s')),
+            2,
+            5,
+            Deck.STANDARD,
+            (StandardHighHand,),
+        )
+        equities = calculate_equities(*args, sample_count=0, exact='auto')
+
+        self.assertEqual(
+            equities,
+            calculate_equities(*args, sample_count=0, exact=True),
+        )
+        self.assertAlmostEqual(sum(equities), 1)
+
+        equities = calculate_equities(
+            *args,
+            sample_count=1,
+            exact='auto',
+            enumeration_limit=989,
+        )
+
+        self.assertIn(equities, ([0.0, 1.0], [0.5, 0.5], [1.0, 0.0]))
+
+    def test_calculate_equities_rejection(self) -> None:
+        args: tuple[Any, ...] = (
+            (
+                parse_range('AA,KK'),
+                parse_range('AKs,QQ'),
+                parse_range('KK,QQ,JJ'),
+            ),
+            tuple(Card.parse('Ks7c2d3s9h')),
+            2,
+            5,
+            Deck.STANDARD,
+            (StandardHighHand,),
+        )
+        expected = calculate_equities(*args, sample_count=0, exact=True)
+
+        seed(0)
+
+        equities = calculate_equities(*args, sample_count=20000)
+
+        for equity, expected_equity in zip(equities, expected):
+            self.assertAlmostEqual(equity, expected_equity, delta=0.02)
+
+        self.assertRaises(
+            ValueError,
+            calculate_equities,
+            (parse_range('AsAh'), parse_range('AsKs')),
+            (),
+            2,
+            5,
+            Deck.STANDARD,
+            (StandardHighHand,),
+            sample_count=10,
+        )
+        self.assertRaises(
+            ValueError,
+            calculate_equities,
+            (parse_range('AhKh'), parse_range('QQ')),
+            Card.parse('Ah'),
+            2,
+            5,
+            Deck.STANDARD,
+            (StandardHighHand,),
+            sample_count=10,
+            exact=True,
+        )
+
+    def test_parse_weighted_range(self) -> None:
+        self.assertEqual(
+            parse_weighted_range('AKs:0.042;QQ'),
+            dict.fromkeys(parse_range('AKs'), 0.042)
+            | dict.fromkeys(parse_range('QQ'), 1.0),
+        )
+        self.assertEqual(
+            parse_weighted_range('AA:1.0,AhAd:0.5,KK:0.0'),
+            dict.fromkeys(parse_range('AA'), 1.0)
+            | {frozenset(Card.parse('AhAd')): 0.5},
+        )
+        self.assertEqual(parse_range('AA:0.5,KK:0'), parse_range('AA'))
+        self.assertRaises(ValueError, parse_weighted_range, 'AA:x')
+        self.assertRaises(ValueError, parse_weighted_range, 'AA:-0.5')
+        self.assertRaises(ValueError, parse_weighted_range, 'AA:nan')
+
+    def test_parse_range_caching(self) -> None:
+        range_ = parse_range('AKs,QQ+')
+
+        range_.clear()
+
+        self.assertEqual(len(parse_range('AKs,QQ+')), 22)
+
+        weighted_range = parse_weighted_range('AKs:0.5')
+        weighted_range[frozenset(Card.parse('AsKs'))] = 1.0
+
+        self.assertEqual(
+            parse_weighted_range('AKs:0.5'),
+            dict.fromkeys(parse_range('AKs'), 0.5),
+        )
+
+        combos = {combo: combo for combo in parse_range('AA', 'AKs')}
+
+        for combo in parse_range('AKs', 'AA'):
+            self.assertIs(combos[combo], combo)
+
+        self.assertEqual(
+            parse_weighted_range('AsKsQs:0.5', 'AsKsQs'),
+            {frozenset(Card.parse('AsKsQs')): 1.0},
+        )
+        self.assertEqual(parse_weighted_range('AsKsQs', 'AsKsQs:0'), {})
+
+    def test_calculate_equities_weighted(self) -> None:
+        hole_range = parse_weighted_range('AhAd:3,2c2d')
+        args: tuple[Any, ...] = (
+            (hole_range, parse_range('KhKd')),
+            tuple(Card.parse('8c7d4h3s9c')),
+            2,
+            5,
+            Deck.STANDARD,
+            (StandardHighHand,),
+        )
+
+        self.assertEqual(
+            calculate_equities(*args, sample_count=0, exact=True),
+            [0.75, 0.25],
+        )
+
+        seed(0)
+
+        equities = calculate_equities(*args, sample_count=10000)
+
+        self.assertAlmostEqual(equities[0], 0.75, delta=0.02)
+        self.assertAlmostEqual(equities[1], 0.25, delta=0.02)
+
+        args = (
+            (dict.fromkeys(parse_range('AA'), 0.5), parse_range('KK')),
+            tuple(Card.parse('Ks7c2d3s')),
+            2,
+            5,
+            Deck.STANDARD,
+            (StandardHighHand,),
+        )
+
+        self.assertEqual(
+            calculate_equities(*args, sample_count=0, exact=True),
+            calculate_equities(
+                (parse_range('AA'), parse_range('KK')),
+                *args[1:],
+                sample_count=0,
+                exact=True,
+            ),
+        )
+        self.assertRaises(
+            ValueError,
+            calculate_equities,
+            ({frozenset(Card.parse('AhAd')): -1.0}, parse_range('KK')),
+            *args[1:],
+            sample_count=10,
+        )
+
+    def test_running_moments(self) -> None:
+        values = [3.0, -1.5, 8.25, 0.0, 2.0, 7.5, -4.0]
+        moments = RunningMoments()
+
+        for value in values:
+            moments.add(value)
+
+        self.assertEqual(moments.count, 7)
+        self.assertAlmostEqual(moments.mean, mean(values))
+        self.assertAlmostEqual(moments.variance, variance(values))
+        self.assertAlmostEqual(moments.sum, sum(values))
+
+        left = RunningMoments()
+        right = RunningMoments()
+
+        for i, value in enumerate(values):
+            (left if i < 3 else right).add(value)
+
+        merged = RunningMoments.merge(left, RunningMoments(), right)
+
+        self.assertEqual(merged.count, 7)
+        self.assertAlmostEqual(merged.mean, moments.mean)
+        self.assertAlmostEqual(merged.variance, moments.variance)
+        self.assertTrue(isnan(RunningMoments().variance))
+
+    def test_statistics_aggregator(self) -> None:
+        hhs = [
+            HandHistory(
+                variant='NT',
+                antes=[0] * 3,
+                blinds_or_straddles=[1, 2, 0],
+                min_bet=2,
+                starting_stacks=[200] * 3,
+                actions=[
+                    'd dh p1 AhKh',
+                    'd dh p2 QsQd',
+                    'd dh p3 7c2d',
+                    'p3 cbr 6',
+                    'p1 cbr 20',
+                    'p2 f',
+                    'p3 cc',
+                    'd db 2c7dTs',
+                    'p1 cbr 30',
+                    'p3 cc',
+                    'd db 3h',
+                    'p1 cc',
+                    'p3 cc',
+                    'd db 4h',
+                    'p1 cc',
+                    'p3 cc',
+                    'p1 sm AhKh',
+                    'p3 sm 7c2d',
+                ],
+                players=['Alice', 'Bob', 'Carol'],
+            ),
+            HandHistory(
+                variant='NT',
+                antes=[0] * 3,
+                blinds_or_straddles=[1, 2, 0],
+                min_bet=2,
+                starting_stacks=[200] * 3,
+                actions=[
+                    'd dh p1 ????',
+                    'd dh p2 ????',
+                    'd dh p3 ????',
+                    'p3 f',
+                    'p1 cc',
+                    'p2 cc',
+                    'd db 2c7dTs',
+                    'p1 cbr 2',
+                    'p2 f',
+                ],
+                players=['Bob', 'Carol', 'Alice'],
+                finishing_stacks=[202, 198, 200],
+            ),
+        ]
+        aggregator = StatisticsAggregator.from_hand_histories(hhs)
+
+        self.assertEqual(aggregator.hand_count, 2)
+
+        alice = aggregator.players['Alice']
+
+        self.assertEqual(alice.hand_count, 2)
+        self.assertEqual(alice.vpip, 0.5)
+        self.assertEqual(alice.pfr, 0.5)
+        self.assertEqual(alice.three_bet, 1)
+        self.assertEqual(alice.wtsd, 1)
+        self.assertEqual(alice.wsd, 0)
+        self.assertEqual(alice.payoff_sum, -50)
+        self.assertEqual(alice.bb_per_100, -1250)
+
+        bob = aggregator.players['Bob']
+
+        self.assertEqual(bob.vpip, 0.5)
+        self.assertEqual(bob.pfr, 0)
+        self.assertTrue(isnan(bob.three_bet))
+        self.assertEqual(bob.wtsd, 0)
+
+        carol = aggregator.players['Carol']
+
+        self.assertEqual(carol.vpip, 0.5)
+        self.assertEqual(carol.three_bet_opportunity_count, 0)
+        self.assertEqual(carol.flop_count, 2)
+        self.assertEqual(carol.showdown_count, 1)
+        self.assertEqual(carol.showdown_win_count, 1)
+        self.assertEqual(aggregator.positions[0].three_bet_count, 1)
+        self.assertEqual(aggregator.positions[1].vpip, 0)
+
+        statistics = Statistics.from_hand_history(*hhs)
+
+        for player, player_statistics in aggregator.players.items():
+            self.assertEqual(
+                player_statistics.payoff_sum,
+                statistics[player].payoff_sum,
+            )
+            self.assertAlmostEqual(
+                player_statistics.payoff_stdev,
+                statistics[player].payoff_stdev,
+            )
+
+        merged = StatisticsAggregator.merge(
+            StatisticsAggregator.from_hand_histories(hhs[:1]),
+            StatisticsAggregator.from_hand_histories(hhs[1:]),
+        )
+
+        self.assertEqual(merged, aggregator)
+
+        with ProcessPoolExecutor(2) as executor:
+            parallel = StatisticsAggregator.from_hand_histories(
+                hhs * 3,
+                executor=executor,
+                batch_size=2,
+                prefetch_count=1,
+            )
+
+        self.assertEqual(parallel.hand_count, 6)
+        self.assertEqual(parallel.players['Alice'].payoff_sum, -150)
+        self.assertAlmostEqual(parallel.players['Carol'].vpip, 0.5)
+
+    def test_statistics_aggregator_decimals(self) -> None:
+        hh = HandHistory.loads(
+            '''variant = "NT"
+antes = [0, 0, 0]
+blinds_or_straddles = [0.50, 1, 0]
+min_bet = 1
+starting_stacks = [80.50, 100, 99.25]
+actions = [
+  "d dh p1 AhKh",
+  "d dh p2 QsQd",
+  "d dh p3 7c2d",
+  "p3 cbr 3.50",
+  "p1 f",
+  "p2 f",
+]
+players = ["Alice", "Bob", "Carol"]
+''',
+        )
+        aggregator = StatisticsAggregator.from_hand_histories([hh])
+        statistics = Statistics.from_hand_history(hh)
+
+        for name in hh.players or ():
+            self.assertEqual(
+                aggregator.players[name].payoff_sum,
+                statistics[name].payoff_sum,
+            )
+
+        self.assertEqual(aggregator.players['Carol'].payoff_sum, 1.5)
+        self.assertEqual(aggregator.players['Carol'].bb_per_100, 150)
+        self.assertEqual(aggregator.players['Carol'].pfr, 1)
+
+    def test_calculate_icm(self) -> None:
+        def calculate_icm_by_permutations(
+                payouts: list[float],
+                chips: list[float],
+        ) -> list[float]:
+            icms = [0.0] * len(chips)
+
+            for order in permutations(range(len(chips)), len(payouts)):
+                probability = 1.0
+                remainder = sum(chips)
+
+                for i in order:
+                    probability *= chips[i] / remainder
+                    remainder -= chips[i]
+
+                for payout, i in zip(payouts, order):
+                    icms[i] += payout * probability
+
+            return icms
+
+        seed(0)
+
+        for player_count in range(1, 7):
+            for place_count in range(1, player_count + 1):
+                chips = [float(randint(1, 100)) for _ in range(player_count)]
+                payouts = sorted(
+                    (float(randint(0, 50)) for _ in range(place_count)),
+                    reverse=True,
+                )
+
+                for icm, expected_icm in zip(
+                        calculate_icm(payouts, chips),
+                        calculate_icm_by_permutations(payouts, chips),
+                ):
+                    self.assertAlmostEqual(icm, expected_icm)
+
+        self.assertEqual(
+            calculate_icm([60, 40, 20], [0, 50, 0, 50]),
+            (0.0, 50.0, 0.0, 50.0),
+        )
+        self.assertEqual(calculate_icm([], [10, 20]), (0.0, 0.0))
+        self.assertAlmostEqual(
+            sum(calculate_icm(range(18, 0, -3), [1] * 18)),
+            63,
+        )
+
+    def test_estimate_icm(self) -> None:
+        seed(0)
+
+        payouts = [50, 30, 20]
+        chips = [500, 300, 150, 50]
+        icms = calculate_icm(payouts, chips)
+        values, errors = estimate_icm(payouts, chips, 20000)
+
+        for value, icm, error in zip(values, icms, errors):
+            self.assertLess(abs(value - icm), 5 * error)
+            self.assertLess(error, 0.5)
+
+        self.assertAlmostEqual(sum(values), 100)
+
+        values, errors = estimate_icm(
+            [1],
+            [3, 1],
+            20000,
+            model='malmuth-weitzman',
+        )
+
+        self.assertAlmostEqual(values[0], 0.75, delta=5 * errors[0])
+
+        values, errors = estimate_icm(
+            payouts,
+            chips,
+            20000,
+            model='malmuth-weitzman',
+        )
+
+        self.assertEqual(list(values), sorted(values, reverse=True))
+        self.assertAlmostEqual(sum(values), 100)
+
+        with ProcessPoolExecutor(2) as executor:
+            values, errors = estimate_icm(
+                payouts,
+                chips,
+                4000,
+                executor=executor,
+                chunk_count=2,
+            )
+
+        for value, icm, error in zip(values, icms, errors):
+            self.assertLess(abs(value - icm), 5 * error)
+
+        self.assertRaises(ValueError, estimate_icm, payouts, chips, 0)
+        self.assertRaises(
+            ValueError,
+            estimate_icm,
+            payouts,
+            chips,
+            10,
+            model='chen',
+        )
+        self.assertRaises(
+            ValueError,
+            estimate_icm,
+            payouts,
+            chips,
+            10,
+            chunk_count=0,
+        )
+
+    def test_calculate_icms(self) -> None:
+        payouts = [50, 30, 20]
+        chip_distributions = [
+            [randint(0, 100) for _ in range(5)] for _ in range(10)
+        ]
+        expected_icms = [
+            calculate_icm(payouts, chips) for chips in chip_distributions
+        ]
+
+        self.assertEqual(
+            calculate_icms(payouts, chip_distributions, chunk_size=3),
+            expected_icms,
+        )
+
+        with ProcessPoolExecutor(2) as executor:
+            self.assertEqual(
+                calculate_icms(
+                    payouts,
+                    iter(chip_distributions),
+                    executor=executor,
+                    chunk_size=4,
+                ),
+                expected_icms,
+            )
+
+        self.assertEqual(calculate_icms(payouts, []), [])
+
+        icms = calculate_icms(payouts, chip_distributions, sample_count=100)
+
+        self.assertEqual(len(icms), 10)
+
+        for values, chips in zip(icms, chip_distributions):
+            for value, chip in zip(values, chips):
+                if not chip:
+                    self.assertEqual(value, 0)
+
 
 if __name__ == '__main__':
     main()  # pragma: no cover
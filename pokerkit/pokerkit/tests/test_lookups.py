@@ -3,12 +3,16 @@
 """
 
 from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import md5
 from itertools import combinations
+from random import Random
+from threading import Barrier
 from unittest import main, TestCase
 
 from pokerkit.lookups import (
     BadugiLookup,
+    Entry,
     EightOrBetterLookup,
     KuhnPokerLookup,
     RegularLookup,
@@ -48,6 +52,48 @@ class StandardLookupTestCase(LookupTestCaseMixin, TestCase):
             '488cdd27873395ba75205cd02fb9d6b2',
         )
 
+    def test_get_max_combination(self) -> None:
+        lookup = StandardLookup()
+        random = Random(0)
+
+        for count in range(5, 8):
+            for _ in range(2000):
+                cards = random.sample(Deck.STANDARD, count)
+                max_combination = None
+                max_entry = None
+
+                for combination in combinations(cards, 5):
+                    entry = lookup.get_entry(combination)
+
+                    if max_entry is None or entry > max_entry:
+                        max_combination = combination
+                        max_entry = entry
+
+                self.assertEqual(
+                    lookup.get_max_combination(cards),
+                    (max_combination, max_entry),
+                )
+                self.assertEqual(lookup.get_max_entry(cards), max_entry)
+
+        self.assertRaises(ValueError, lookup.get_max_entry, 'AsKsQsJs')
+        self.assertRaises(ValueError, lookup.get_max_entry, 'AsKsQsJsTs9s8s7s')
+
+    def test_get_max_entry_concurrently(self) -> None:
+        lookup = StandardLookup()
+        cards = Deck.STANDARD[:7]
+        barrier = Barrier(8)
+
+        def get_max_entry() -> Entry:
+            barrier.wait()
+
+            return lookup.get_max_entry(cards)
+
+        with ThreadPoolExecutor(8) as executor:
+            futures = [executor.submit(get_max_entry) for _ in range(8)]
+            entries = {future.result() for future in futures}
+
+        self.assertEqual(len(entries), 1)
+
 
 class ShortDeckHoldemLookupTestCase(LookupTestCaseMixin, TestCase):
     def test_get_entry(self) -> None:
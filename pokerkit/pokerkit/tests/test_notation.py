@@ -2,6 +2,10 @@
 notation related tools on PokerKit.
 """
 
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from mmap import ACCESS_READ, mmap
+from tempfile import TemporaryFile
 from tomllib import loads
 from unittest import TestCase, main
 from warnings import resetwarnings, simplefilter
@@ -67,6 +71,151 @@ class HandHistoryTestCase(TestCase):
         self.assertEqual(loads(hh.dumps()).get('key'), 'value')
         self.assertEqual(loads(hh.dumps()).get('_key'), '_value')
 
+    def test_stream_all(self) -> None:
+        hhs = []
+
+        for i in range(1, 11):
+            game = NoLimitTexasHoldem(
+                (
+                    Automation.ANTE_POSTING,
+                    Automation.BET_COLLECTION,
+                    Automation.BLIND_OR_STRADDLE_POSTING,
+                    Automation.HAND_KILLING,
+                    Automation.CHIPS_PUSHING,
+                    Automation.CHIPS_PULLING,
+                ),
+                True,
+                0,
+                (1, 2),
+                2,
+            )
+            state = game(200, i % 3 + 2)
+
+            while state.can_deal_hole():
+                state.deal_hole('????')
+
+            state.complete_bet_or_raise_to(i * 2 + 2)
+
+            while state.status:
+                state.fold()
+
+            hh = HandHistory.from_game_state(game, state)
+            hh.hand = i
+            hh.user_defined_fields['_note'] = f'it\'s\n[{i}]\n[{i + 1}]'
+
+            hhs.append(hh)
+
+        s = '# hands\n\n' + HandHistory.dumps_all(hhs).replace(
+            'actions = [',
+            'actions = [\n  ',
+        ).replace('[3]\n', '[ "3" ] # third\n')
+        expected = list(HandHistory.loads_all(s))
+
+        self.assertEqual(len(expected), 10)
+        self.assertEqual(
+            expected[0].user_defined_fields['_note'],
+            'it\'s\n[1]\n[2]',
+        )
+
+        for chunk_size in (1, 7, 1 << 20):
+            self.assertEqual(
+                list(
+                    HandHistory.stream_all(
+                        BytesIO(s.encode()),
+                        chunk_size=chunk_size,
+                    ),
+                ),
+                expected,
+            )
+
+        with TemporaryFile() as file:
+            file.write(s.encode())
+            file.flush()
+
+            with (
+                    mmap(file.fileno(), 0, access=ACCESS_READ) as m,
+                    ProcessPoolExecutor(2) as executor,
+            ):
+                hhs = list(
+                    HandHistory.stream_all(
+                        m,
+                        executor=executor,
+                        chunk_size=64,
+                        batch_size=3,
+                        prefetch_count=2,
+                    ),
+                )
+
+        self.assertEqual(
+            list(map(HandHistory.dumps, hhs)),
+            list(map(HandHistory.dumps, expected)),
+        )
+
+        self.assertEqual(list(HandHistory.stream_all(BytesIO(b''))), [])
+        self.assertRaises(
+            ValueError,
+            list,
+            HandHistory.stream_all(BytesIO(b'variant = \'NT\'\n[1]\n')),
+        )
+
+    def test_validate(self) -> None:
+        s = (
+            'PokerStars Hand #210000000001:  Hold\'em No Limit (10/20)'
+            ' - 2020/01/02 12:34:56 ET\n'
+            'Table \'Alpha\' 6-max Seat #1 is the button\n'
+            'Seat 1: alice (2000 in chips)\n'
+            'Seat 2: bob (1500 in chips)\n'
+            'Seat 3: carol (2500 in chips)\n'
+            'bob: posts small blind 10\n'
+            'carol: posts big blind 20\n'
+            '*** HOLE CARDS ***\n'
+            'Dealt to alice [Ah Kh]\n'
+            'alice: raises 40 to 60\n'
+            'bob: folds\n'
+            'carol: calls 40\n'
+            '*** FLOP *** [2c 7d Ts]\n'
+            'carol: checks\n'
+            'alice: bets 100\n'
+            'carol: folds\n'
+            'Uncalled bet (100) returned to alice\n'
+            'alice collected 130 from pot\n'
+            '*** SUMMARY ***\n'
+            'Seat 1: alice (button) collected (130)\n'
+            '\n\n\n'
+        )
+        hh = next(HandHistory.from_pokerstars(s, error_status=True))
+        fast_hh = next(
+            HandHistory.from_pokerstars(
+                s,
+                error_status=True,
+                validation_status=False,
+            ),
+        )
+
+        self.assertEqual(
+            hh.actions,
+            [
+                'd dh p1 ????',
+                'd dh p2 ????',
+                'd dh p3 AhKh',
+                'p3 cbr 60',
+                'p1 f',
+                'p2 cc',
+                'd db 2c7dTs',
+                'p2 cc',
+                'p3 cbr 100',
+                'p2 f',
+            ],
+        )
+        self.assertEqual(fast_hh.actions, hh.actions[2:])
+        self.assertEqual(fast_hh.players, ['bob', 'carol', 'alice'])
+        self.assertEqual(fast_hh.validate().dumps(), hh.dumps())
+        self.assertEqual(hh.validate().dumps(), hh.dumps())
+
+        fast_hh.actions.append('p1 cbr 100')
+
+        self.assertRaises(ValueError, fast_hh.validate)
+
     def test_to_acpc_protocol_full(self) -> None:
         game: FixedLimitTexasHoldem | NoLimitTexasHoldem = (
             FixedLimitTexasHoldem(
@@ -26,6 +26,21 @@ class SuitTestCase(TestCase):
         self.assertEqual(''.join(Suit), 'cdhs?')
 
 
+class CardTestCase(TestCase):
+    def test_ids(self) -> None:
+        self.assertEqual(list(Card.get_ids(Deck.STANDARD)), list(range(52)))
+        self.assertEqual(Card.from_ids(range(52)), Deck.STANDARD)
+        self.assertRaises(ValueError, list, Card.get_ids('Ah??'))
+
+    def test_masks(self) -> None:
+        for i, card in enumerate(Deck.STANDARD):
+            self.assertEqual(Card.get_mask((card,)), 1 << i)
+            self.assertEqual(Card.from_mask(1 << i), (card,))
+
+        self.assertEqual(Card.get_mask(Deck.STANDARD), (1 << 52) - 1)
+        self.assertEqual(Card.from_mask((1 << 52) - 1), Deck.STANDARD)
+
+
 class DeckTestCase(TestCase):
     def test_members(self) -> None:
         self.assertEqual(len(Deck.STANDARD), 52)
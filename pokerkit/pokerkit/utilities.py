@@ -282,6 +282,7 @@ class Card:
 
     UNKNOWN: ClassVar[Card]
     """An unknown card. This is a class variable."""
+    __parsed_cards: ClassVar[dict[str, Card]] = {}
     rank: Rank
     """The rank of the card."""
     suit: Suit
@@ -317,6 +318,89 @@ class Card:
         for card in cls.clean(cards):
             yield card.suit
 
+    @classmethod
+    def get_ids(cls, cards: CardsLike) -> Iterator[int]:
+        """Return an iterator of the integer ids of each card.
+
+        The id of a card is its index in :attr:`Deck.STANDARD`, ranging
+        from ``0`` (``2c``) to ``51`` (``As``). The ids are read from a
+        precomputed table.
+
+        >>> Card.get_ids('2sKh')  # doctest: +ELLIPSIS
+        <generator object Card.get_ids at 0x...>
+        >>> list(Card.get_ids('2c2dAs'))
+        [0, 1, 51]
+        >>> list(Card.get_ids('??'))
+        Traceback (most recent call last):
+            ...
+        ValueError: The card ?? does not have an id.
+
+        :param cards: The cards to get ids from.
+        :return: The iterator of the ids of each card.
+        :raises ValueError: If a card is not in the standard deck.
+        """
+        for card in cls.clean(cards):
+            try:
+                yield _CARD_IDS[card.rank, card.suit]
+            except KeyError:
+                raise ValueError(
+                    f'The card {repr(card)} does not have an id.',
+                ) from None
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[int]) -> tuple[Card, ...]:
+        """Return the cards with the given integer ids.
+
+        No card is created. The cards are the members of
+        :attr:`Deck.STANDARD`.
+
+        >>> Card.from_ids([0, 1, 51])
+        (2c, 2d, As)
+        >>> Card.from_ids(Card.get_ids('KhQs'))
+        (Kh, Qs)
+
+        :param ids: The ids of the cards.
+        :return: The cards.
+        """
+        return tuple(map(Deck.STANDARD.__getitem__, ids))
+
+    @classmethod
+    def get_mask(cls, cards: CardsLike) -> int:
+        """Return the bitmask of the cards.
+
+        The bit ``1 << i`` is set if the card with the id ``i`` is
+        present. The mask fits in an unsigned 64-bit integer.
+
+        >>> Card.get_mask('2c2dAs') == 0b11 | (1 << 51)
+        True
+        >>> Card.get_mask('2c2d') & Card.get_mask('2d3c')
+        2
+
+        :param cards: The cards.
+        :return: The bitmask.
+        :raises ValueError: If a card is not in the standard deck.
+        """
+        mask = 0
+
+        for id_ in cls.get_ids(cards):
+            mask |= 1 << id_
+
+        return mask
+
+    @classmethod
+    def from_mask(cls, mask: int) -> tuple[Card, ...]:
+        """Return the cards in the bitmask, ordered by their ids.
+
+        >>> Card.from_mask(Card.get_mask('AsKh2c'))
+        (2c, Kh, As)
+
+        :param mask: The bitmask.
+        :return: The cards.
+        """
+        return cls.from_ids(
+            id_ for id_ in range(len(Deck.STANDARD)) if mask >> id_ & 1
+        )
+
     @classmethod
     def are_paired(cls, cards: CardsLike) -> bool:
         """Return the pairedness of the given cards.
@@ -474,10 +558,15 @@ class Card:
                     )
 
                 for i in range(0, len(content), 2):
-                    rank = Rank(content[i])
-                    suit = Suit(content[i + 1])
+                    card = cls.__parsed_cards.get(content[i:i + 2])
 
-                    yield cls(rank, suit)
+                    if card is None:
+                        rank = Rank(content[i])
+                        suit = Suit(content[i + 1])
+                        card = cls(rank, suit)
+                        cls.__parsed_cards[content[i:i + 2]] = card
+
+                    yield card
 
     def __repr__(self) -> str:
         return f'{self.rank}{self.suit}'
@@ -616,6 +705,11 @@ class Deck(tuple[Card, ...], Enum):
     """
 
 
+_CARD_IDS = {
+    (card.rank, card.suit): id_ for id_, card in enumerate(Deck.STANDARD)
+}
+
+
 def filter_none(values: Iterable[Any]) -> Any:
     """Filter out ``None`` from an iterable of values.
 
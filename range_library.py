@@ -0,0 +1,466 @@
+"""Packed library of the preflop ranges bundled with TexasSolver.
+
+The range tree under ``TexasSolver-v0.2.0-Windows/ranges`` holds thousands of
+small ``hand:weight`` text files in directories named after the actions
+leading to them. :func:`build_range_library` compiles the whole tree into one
+binary file and :class:`RangeLibrary` memory-maps it, so that looking up a
+range walks a prefix tree of action paths and returns an array of weights
+without touching the text files.
+
+Each range is stored as 169 weights, one per starting hand class, or as 1326
+weights, one per combo, when the combos of a class are weighted differently.
+Ranges are named by their file names without the ``_range`` suffix, such as
+``"CO"`` for ``CO_range.txt`` or ``"BB_call"`` for ``BB_call.txt``.
+
+Layout of the file, little-endian with every section aligned to 8 bytes:
+
+* header: :data:`MAGIC`, version, section counts and offsets
+* string offsets (``uint32``) and UTF-8 string data of the path segments and
+  range names, sorted so that string ids compare like the strings
+* prefix tree nodes in breadth-first order, so that the children of a node
+  are contiguous and sorted by name
+* range entries, contiguous per node and sorted by name
+* hand class weights (``float32`` rows of 169)
+* combo weights (``float32`` rows of 1326)
+
+Run ``python range_library.py --help`` for the command line options.
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import struct
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+import texas_solver
+from pokerkit import Card, parse_weighted_range
+
+DEFAULT_RANGE_ROOT = texas_solver.DEFAULT_EXE_DIR / "ranges"
+DEFAULT_PATH = Path(__file__).parent / "solver_cache" / "ranges.bin"
+
+MAGIC = b"PKRANGES"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sI6I6Q")
+_HEADER_SIZE = 96
+_NODE_DTYPE = np.dtype(
+    [
+        ("name", "<u4"),
+        ("first_child", "<u4"),
+        ("child_count", "<u4"),
+        ("first_entry", "<u4"),
+        ("entry_count", "<u4"),
+    ]
+)
+_ENTRY_DTYPE = np.dtype([("name", "<u4"), ("kind", "<u4"), ("row", "<u4")])
+_HANDS, _COMBOS = 0, 1
+
+_RANKS = "23456789TJQKA"
+_SUITS = "cdhs"
+
+# combos are the card id pairs i < j in the order of j, then i
+_COMBO_IDS = np.array([(i, j) for j in range(52) for i in range(j)], dtype=np.int64)
+_COMBO_INDICES = np.full((52, 52), -1, dtype=np.int64)
+_COMBO_INDICES[_COMBO_IDS[:, 0], _COMBO_IDS[:, 1]] = np.arange(1326)
+_COMBO_INDICES[_COMBO_IDS[:, 1], _COMBO_IDS[:, 0]] = np.arange(1326)
+
+
+def _hand_class(i: int, j: int) -> int:
+    # cell of the 13 by 13 grid: suited above, offsuit below the diagonal
+    high, low = max(i // 4, j // 4), min(i // 4, j // 4)
+    if i % 4 == j % 4 or high == low:
+        return high * 13 + low
+    return low * 13 + high
+
+
+def _hand_class_name(index: int) -> str:
+    row, column = divmod(index, 13)
+    if row == column:
+        return _RANKS[row] * 2
+    if row > column:
+        return _RANKS[row] + _RANKS[column] + "s"
+    return _RANKS[column] + _RANKS[row] + "o"
+
+
+#: Name of each of the 169 hand classes, such as ``"AKs"``.
+HAND_CLASSES: Tuple[str, ...] = tuple(_hand_class_name(i) for i in range(169))
+#: Cards of each of the 1326 combos, such as ``("Ac", "Kc")``.
+COMBOS: Tuple[Tuple[str, str], ...] = tuple(
+    (_RANKS[j // 4] + _SUITS[j % 4], _RANKS[i // 4] + _SUITS[i % 4])
+    for i, j in _COMBO_IDS
+)
+_COMBO_CLASSES = np.array([_hand_class(i, j) for i, j in _COMBO_IDS])
+
+
+@lru_cache(maxsize=None)
+def _card_combos() -> Tuple[frozenset, ...]:
+    return tuple(frozenset(Card.parse("".join(combo))) for combo in COMBOS)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // 8) * 8
+
+
+@lru_cache(maxsize=None)
+def _class_combos() -> dict[str, np.ndarray]:
+    """Return the combo indices of each hand class, also as ``"AK"``."""
+
+    combos = {
+        name: np.flatnonzero(_COMBO_CLASSES == i) for i, name in enumerate(HAND_CLASSES)
+    }
+    for name in HAND_CLASSES:
+        if name.endswith("s"):
+            combos[name[:2]] = np.concatenate(
+                [combos[name], combos[name[:2] + "o"]]
+            )
+    return combos
+
+
+def parse_range_text(text: str) -> np.ndarray:
+    """Return the weight of each combo of a ``hand:weight`` range.
+
+    Hand classes such as ``"AKs:0.5"`` are read directly and other notation
+    is left to :func:`pokerkit.parse_weighted_range`. Later weights override
+    earlier ones.
+    """
+
+    class_combos = _class_combos()
+    weights = np.zeros(1326, dtype=np.float32)
+    for item in text.replace(" ", ",").split(","):
+        if not item:
+            continue
+
+        hand, _, raw_weight = item.partition(":")
+        try:
+            weight = float(raw_weight) if raw_weight else 1.0
+        except ValueError:
+            weight = -1.0
+        if not weight >= 0:
+            raise ValueError(f"The weight in {item!r} is not a nonnegative number.")
+
+        if hand in class_combos:
+            weights[class_combos[hand]] = weight
+        else:
+            for combo in parse_weighted_range(hand):
+                i, j = Card.get_ids(combo)
+                weights[_COMBO_INDICES[i, j]] = weight
+    return weights
+
+
+def _hand_weights(weights: np.ndarray) -> np.ndarray | None:
+    """Return the class weights of combo weights, ``None`` if they differ."""
+
+    hands = np.zeros(169, dtype=np.float32)
+    hands[_COMBO_CLASSES] = weights
+    return hands if np.array_equal(hands[_COMBO_CLASSES], weights) else None
+
+
+class _Node:
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.ranges: dict[str, np.ndarray] = {}
+
+
+def build_range_library(
+    root: str | Path = DEFAULT_RANGE_ROOT, path: str | Path = DEFAULT_PATH
+) -> Path:
+    """Compile the range files under ``root`` into a library at ``path``.
+
+    Every ``*.txt`` file is a range named by the file name without ``.txt``
+    and ``_range``, found at the action path of its directory relative to
+    ``root``.
+    """
+
+    root = Path(root)
+    tree = _Node()
+    for text_path in sorted(root.rglob("*.txt")):
+        node = tree
+        for segment in text_path.parent.relative_to(root).parts:
+            node = node.children.setdefault(segment, _Node())
+        name = text_path.stem.removesuffix("_range")
+        node.ranges[name] = parse_range_text(text_path.read_text())
+
+    strings: set[str] = set()
+    level = [tree]
+    while level:
+        for node in level:
+            strings.update(node.children)
+            strings.update(node.ranges)
+        level = [child for node in level for child in node.children.values()]
+    string_list = sorted(strings)
+    string_ids = {string: i for i, string in enumerate(string_list)}
+
+    nodes: List[Tuple[int, int, int, int, int]] = []
+    entries: List[Tuple[int, int, int]] = []
+    hand_rows: List[np.ndarray] = []
+    combo_rows: List[np.ndarray] = []
+    order = [("", tree)]
+    next_child = 1
+    for name, node in order:
+        children = sorted(node.children.items())
+        nodes.append(
+            (
+                string_ids.get(name, 0),
+                next_child,
+                len(children),
+                len(entries),
+                len(node.ranges),
+            )
+        )
+        order.extend(children)
+        next_child += len(children)
+        for range_name, weights in sorted(node.ranges.items()):
+            hands = _hand_weights(weights)
+            if hands is None:
+                entries.append((string_ids[range_name], _COMBOS, len(combo_rows)))
+                combo_rows.append(weights)
+            else:
+                entries.append((string_ids[range_name], _HANDS, len(hand_rows)))
+                hand_rows.append(hands)
+
+    encoded = [string.encode() for string in string_list]
+    sections = [
+        np.cumsum([0] + [len(data) for data in encoded], dtype="<u4").tobytes(),
+        b"".join(encoded),
+        np.array(nodes, dtype="<u4").tobytes(),
+        np.array(entries, dtype="<u4").tobytes(),
+        np.array(hand_rows, dtype="<f4").reshape(-1, 169).tobytes(),
+        np.array(combo_rows, dtype="<f4").reshape(-1, 1326).tobytes(),
+    ]
+    offsets = []
+    offset = _HEADER_SIZE
+    for section in sections:
+        offsets.append(offset)
+        offset = _align(offset + len(section))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(path.suffix + ".tmp")
+    with open(temporary, "wb") as file:
+        header = _HEADER.pack(
+            MAGIC,
+            VERSION,
+            len(string_list),
+            len(sections[1]),
+            len(nodes),
+            len(entries),
+            len(hand_rows),
+            len(combo_rows),
+            *offsets,
+        )
+        file.write(header.ljust(_HEADER_SIZE, b"\0"))
+        for section_offset, section in zip(offsets, sections):
+            file.seek(section_offset)
+            file.write(section)
+        file.truncate(offset)
+    temporary.replace(path)
+    return path
+
+
+class RangeLibrary:
+    """Read-only view of a library built by :func:`build_range_library`.
+
+    Action paths are given as ``"6max_range/CO/2.5bb/BTN/Call"`` or as a
+    sequence of segments.
+
+    Parameters
+    ----------
+    path : str or Path, optional
+        The library file, which is memory-mapped.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_PATH) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic,
+            version,
+            string_count,
+            data_size,
+            node_count,
+            entry_count,
+            hand_count,
+            combo_count,
+            *offsets,
+        ) = _HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a range library")
+
+        string_offsets = np.frombuffer(
+            self._map, "<u4", string_count + 1, offsets[0]
+        ).tolist()
+        data = self._map[offsets[1] : offsets[1] + data_size]
+        self._strings = [
+            data[start:end].decode()
+            for start, end in zip(string_offsets, string_offsets[1:])
+        ]
+        self._string_ids = {string: i for i, string in enumerate(self._strings)}
+        self._nodes = np.frombuffer(self._map, _NODE_DTYPE, node_count, offsets[2])
+        self._node_names = self._nodes["name"]
+        self._first_children = self._nodes["first_child"]
+        self._child_counts = self._nodes["child_count"]
+        self._first_entries = self._nodes["first_entry"]
+        self._entry_counts = self._nodes["entry_count"]
+        self._entries = np.frombuffer(
+            self._map, _ENTRY_DTYPE, entry_count, offsets[3]
+        )
+        self._hands = np.frombuffer(
+            self._map, "<f4", hand_count * 169, offsets[4]
+        ).reshape(hand_count, 169)
+        self._combos = np.frombuffer(
+            self._map, "<f4", combo_count * 1326, offsets[5]
+        ).reshape(combo_count, 1326)
+
+    def _find(self, first: int, count: int, names: np.ndarray, name: str) -> int:
+        string_id = self._string_ids.get(name)
+        if string_id is not None:
+            index = int(np.searchsorted(names[first : first + count], string_id))
+            if index < count and names[first + index] == string_id:
+                return first + index
+        return -1
+
+    def _node(self, action_path: str | Sequence[str]) -> int:
+        if isinstance(action_path, str):
+            action_path = [segment for segment in action_path.split("/") if segment]
+
+        node = 0
+        for segment in action_path:
+            node = self._find(
+                int(self._first_children[node]),
+                int(self._child_counts[node]),
+                self._node_names,
+                segment,
+            )
+            if node < 0:
+                raise KeyError(f"No node {'/'.join(action_path)!r}")
+        return node
+
+    def _entry(self, action_path: str | Sequence[str], name: str) -> np.void:
+        node = self._node(action_path)
+        index = self._find(
+            int(self._first_entries[node]),
+            int(self._entry_counts[node]),
+            self._entries["name"],
+            name,
+        )
+        if index < 0:
+            raise KeyError(f"No range {name!r} at {action_path!r}")
+        return self._entries[index]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, action_path: object) -> bool:
+        try:
+            self._node(action_path)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def children(self, action_path: str | Sequence[str] = ()) -> List[str]:
+        """Return the actions following ``action_path``."""
+        node = self._node(action_path)
+        first, count = self._first_children[node], self._child_counts[node]
+        return [self._strings[i] for i in self._node_names[first : first + count]]
+
+    def names(self, action_path: str | Sequence[str]) -> List[str]:
+        """Return the names of the ranges at ``action_path``."""
+        node = self._node(action_path)
+        first, count = self._first_entries[node], self._entry_counts[node]
+        return [self._strings[i] for i in self._entries["name"][first : first + count]]
+
+    def weights(self, action_path: str | Sequence[str], name: str) -> np.ndarray:
+        """Return the weight of each of the 1326 :data:`COMBOS`.
+
+        Raises
+        ------
+        KeyError
+            If there is no such range.
+        """
+        _, kind, row = self._entry(action_path, name).item()
+        if kind == _COMBOS:
+            return self._combos[row]
+        return self._hands[row][_COMBO_CLASSES]
+
+    def hand_weights(self, action_path: str | Sequence[str], name: str) -> np.ndarray:
+        """Return the weight of each of the 169 :data:`HAND_CLASSES`.
+
+        The weights are a read-only view of the library.
+
+        Raises
+        ------
+        KeyError
+            If there is no such range.
+        ValueError
+            If the combos of a hand class are weighted differently.
+        """
+        _, kind, row = self._entry(action_path, name).item()
+        if kind == _COMBOS:
+            raise ValueError("The range is weighted by combo")
+        return self._hands[row]
+
+    def range(
+        self, action_path: str | Sequence[str], name: str
+    ) -> dict[frozenset[Card], float]:
+        """Return the combos of a range with nonzero weights.
+
+        The result can be passed as a weighted range to
+        :func:`pokerkit.calculate_equities` and :func:`ai.estimate_equity`.
+        """
+        weights = self.weights(action_path, name)
+        combos = _card_combos()
+        # the weights are single precision, the files have a few decimals
+        return {combos[i]: round(float(weights[i]), 6) for i in np.flatnonzero(weights)}
+
+    def range_string(self, action_path: str | Sequence[str], name: str) -> str:
+        """Return a range in the ``hand:weight`` notation of the solver."""
+        _, kind, row = self._entry(action_path, name).item()
+        if kind == _COMBOS:
+            weights, labels = self._combos[row], ["".join(combo) for combo in COMBOS]
+        else:
+            weights, labels = self._hands[row], list(HAND_CLASSES)
+        # the strongest hands first
+        return ",".join(
+            f"{labels[i]}:{float(weights[i]):.6g}"
+            for i in np.flatnonzero(weights)[::-1]
+        )
+
+    def close(self) -> None:
+        # the arrays are views of the map, so they must go first
+        del self._nodes, self._node_names, self._first_children
+        del self._child_counts, self._first_entries, self._entry_counts
+        del self._entries, self._hands, self._combos
+        self._map.close()
+
+
+def load_range_library(
+    path: str | Path = DEFAULT_PATH, root: str | Path = DEFAULT_RANGE_ROOT
+) -> RangeLibrary:
+    """Open the library at ``path``, building it from ``root`` if missing."""
+
+    if not Path(path).exists():
+        build_range_library(root, path)
+    return RangeLibrary(path)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ranges", default=str(DEFAULT_RANGE_ROOT))
+    parser.add_argument("--output", default=str(DEFAULT_PATH))
+    args = parser.parse_args(argv)
+
+    path = build_range_library(args.ranges, args.output)
+    library = RangeLibrary(path)
+    print(f"{len(library)} ranges, {path.stat().st_size} bytes written to {path}")
+    library.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+"""Headless self-play simulation of :class:`engine.PokerEngine` bots.
+
+Hands are played back to back without any UI or timers. Every hand starts
+with fresh stacks, so the results of a seat are its winnings per hand, which
+are reported in big blinds per 100 hands. Independent tables can be played
+in separate processes and their results are merged.
+
+Run ``python simulator.py --help`` for the command line options.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Sequence, Tuple
+
+import ai
+from config import EngineConfig, load_config
+from engine import PokerEngine
+from history_writer import HistoryWriter
+
+Policy = Callable[[PokerEngine, int], Tuple[str, int]]
+
+MAX_ACTIONS_PER_HAND = 1000
+
+
+def random_policy(
+    engine: PokerEngine, seat: int, rng: random.Random | None = None
+) -> Tuple[str, int]:
+    """Choose a uniformly random legal action for ``seat``."""
+
+    rng = rng or random
+    to_call = engine.current_bet - engine.contributions[seat]
+    size = rng.choice([engine.bb_amt, max(engine.bb_amt, engine.pot)])
+
+    if to_call > 0:
+        return rng.choice([("fold", 0), ("call", 0), ("raise", size)])
+    return rng.choice([("check", 0), ("bet", size)])
+
+
+POLICIES: dict[str, Policy] = {
+    "basic": ai.basic_ai_decision,
+    "optimal": ai.optimal_ai_move,
+    "random": random_policy,
+}
+
+
+@dataclass
+class SimulationResult:
+    """Results of self-play, with winnings measured in big blinds.
+
+    Attributes
+    ----------
+    hand_count : int
+        Number of hands played.
+    elapsed : float
+        Wall-clock seconds spent playing.
+    totals : list of float
+        Sum of the per-hand winnings of each seat.
+    squares : list of float
+        Sum of the squared per-hand winnings of each seat.
+    """
+
+    hand_count: int = 0
+    elapsed: float = 0.0
+    totals: List[float] = field(default_factory=list)
+    squares: List[float] = field(default_factory=list)
+
+    @property
+    def hands_per_second(self) -> float:
+        """Number of hands played per second."""
+        return self.hand_count / self.elapsed if self.elapsed else math.inf
+
+    def add_hand(self, winnings: Sequence[float]) -> None:
+        """Record the winnings of each seat in one hand."""
+        if not self.totals:
+            self.totals = [0.0] * len(winnings)
+            self.squares = [0.0] * len(winnings)
+
+        self.hand_count += 1
+        for i, amount in enumerate(winnings):
+            self.totals[i] += amount
+            self.squares[i] += amount * amount
+
+    def merge(self, other: SimulationResult) -> SimulationResult:
+        """Return the combined results of two independent runs.
+
+        The runs are assumed to have been played side by side, so the longer
+        of the two elapsed times is kept.
+        """
+        size = max(len(self.totals), len(other.totals))
+
+        def padded(values: List[float]) -> List[float]:
+            return values + [0.0] * (size - len(values))
+
+        return SimulationResult(
+            self.hand_count + other.hand_count,
+            max(self.elapsed, other.elapsed),
+            [a + b for a, b in zip(padded(self.totals), padded(other.totals))],
+            [a + b for a, b in zip(padded(self.squares), padded(other.squares))],
+        )
+
+    def bb_per_100(self) -> List[float]:
+        """Return the win rate of each seat in big blinds per 100 hands."""
+        if not self.hand_count:
+            return [0.0] * len(self.totals)
+        return [100 * total / self.hand_count for total in self.totals]
+
+    def confidence_intervals(self, z: float = 1.96) -> List[Tuple[float, float]]:
+        """Return normal confidence intervals of the win rates in bb/100.
+
+        Parameters
+        ----------
+        z : float, optional
+            Number of standard errors on each side, defaults to 1.96 for a
+            95% interval.
+        """
+        intervals = []
+        n = self.hand_count
+
+        for rate, total, square in zip(self.bb_per_100(), self.totals, self.squares):
+            if n > 1:
+                variance = max(0.0, (square - total * total / n) / (n - 1))
+                margin = 100 * z * math.sqrt(variance / n)
+            else:
+                margin = math.inf
+            intervals.append((rate - margin, rate + margin))
+
+        return intervals
+
+
+def _fallback_action(engine: PokerEngine, seat: int) -> Tuple[str, int]:
+    """Return the passive action for ``seat``, used when a policy errs."""
+    if engine.current_bet > engine.contributions[seat]:
+        return "call", 0
+    return "check", 0
+
+
+def play_hand(engine: PokerEngine, policies: Sequence[Policy]) -> dict:
+    """Play one hand of ``engine`` to completion and return its history.
+
+    Illegal actions returned by a policy are replaced with a check or call.
+    The history is removed from ``engine.hand_histories`` so that long runs
+    do not accumulate them in memory.
+    """
+
+    engine.new_hand()
+
+    for _ in range(MAX_ACTIONS_PER_HAND):
+        if engine.stage == "complete":
+            break
+
+        seat = engine.turn
+        action, amount = policies[seat](engine, seat)
+        try:
+            engine.player_action(action, amount)
+        except ValueError:
+            engine.player_action(*_fallback_action(engine, seat))
+    else:
+        raise RuntimeError("Hand did not finish")
+
+    return engine.hand_histories.pop()
+
+
+def simulate_table(
+    policy_names: Sequence[str],
+    hand_count: int,
+    *,
+    config: EngineConfig | None = None,
+    seed: int | None = None,
+    history_path: str | Path | None = None,
+) -> SimulationResult:
+    """Play ``hand_count`` hands at one table in the current process.
+
+    Parameters
+    ----------
+    policy_names : sequence of str
+        Key of :data:`POLICIES` for each seat.
+    hand_count : int
+        Number of hands to play.
+    config : EngineConfig, optional
+        Table settings, the number of players is taken from ``policy_names``.
+    seed : int, optional
+        Seed of the :mod:`random` module, which deals the cards.
+    history_path : str or Path, optional
+        File receiving one JSON hand history per line as hands finish,
+        written by a :class:`history_writer.HistoryWriter`. Paths ending in
+        ``.gz`` are compressed.
+
+    Returns
+    -------
+    SimulationResult
+        The winnings of each seat in big blinds.
+    """
+
+    config = config or EngineConfig()
+    policies = [POLICIES[name] for name in policy_names]
+    engine = PokerEngine(
+        num_players=len(policies),
+        starting_stack=config.starting_stack,
+        sb_amt=config.sb_amt,
+        bb_amt=config.bb_amt,
+    )
+    result = SimulationResult()
+
+    if seed is not None:
+        random.seed(seed)
+
+    writer = (
+        HistoryWriter(history_path, append=False) if history_path is not None else None
+    )
+    engine.attach_history_writer(writer)
+    start = time.perf_counter()
+
+    try:
+        for _ in range(hand_count):
+            engine.stacks = [config.starting_stack] * engine.num_players
+            history = play_hand(engine, policies)
+            result.add_hand(
+                [
+                    (final - initial) / config.bb_amt
+                    for final, initial in zip(
+                        history["final_stacks"], history["starting_stacks"]
+                    )
+                ]
+            )
+    finally:
+        if writer is not None:
+            writer.close()
+
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def _simulate_table_in_worker(kwargs: dict) -> SimulationResult:
+    # the tables already occupy the processes, so estimate in-process
+    ai.set_pool_size(0)
+    return simulate_table(**kwargs)
+
+
+def simulate(
+    policy_names: Sequence[str],
+    hand_count: int,
+    *,
+    config: EngineConfig | None = None,
+    table_count: int = 1,
+    processes: int | None = None,
+    seed: int | None = None,
+    history_dir: str | Path | None = None,
+    compress_histories: bool = False,
+) -> SimulationResult:
+    """Play ``hand_count`` hands split over independent tables.
+
+    With several tables, each is played in its own worker process and given
+    its own seed, so runs with the same ``seed`` deal the same cards.
+
+    Parameters
+    ----------
+    policy_names : sequence of str
+        Key of :data:`POLICIES` for each seat.
+    hand_count : int
+        Total number of hands to play.
+    config : EngineConfig, optional
+        Table settings shared by all tables.
+    table_count : int, optional
+        Number of independent tables, defaults to 1.
+    processes : int, optional
+        Number of worker processes, ``None`` for one per CPU. Tables are
+        played in the calling process when there is only one.
+    seed : int, optional
+        Seed from which the seeds of the tables are drawn.
+    history_dir : str or Path, optional
+        Directory receiving ``table-<i>.jsonl`` for each table.
+    compress_histories : bool, optional
+        Write gzip compressed ``table-<i>.jsonl.gz`` files instead.
+
+    Returns
+    -------
+    SimulationResult
+        The merged results, timed by the wall clock.
+    """
+
+    seeds = random.Random(seed).sample(range(2**32), table_count)
+    suffix = ".gz" if compress_histories else ""
+    tasks = []
+
+    if history_dir is not None:
+        Path(history_dir).mkdir(parents=True, exist_ok=True)
+
+    for i, table_seed in enumerate(seeds):
+        tasks.append(
+            {
+                "policy_names": list(policy_names),
+                "hand_count": len(range(i, hand_count, table_count)),
+                "config": config,
+                "seed": table_seed,
+                "history_path": (
+                    None
+                    if history_dir is None
+                    else Path(history_dir) / f"table-{i}.jsonl{suffix}"
+                ),
+            }
+        )
+
+    start = time.perf_counter()
+
+    if table_count == 1:
+        results = [simulate_table(**tasks[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(_simulate_table_in_worker, tasks))
+
+    result = SimulationResult()
+    for table_result in results:
+        result = result.merge(table_result)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def format_result(result: SimulationResult, policy_names: Sequence[str]) -> str:
+    """Return a printable summary of ``result``."""
+
+    lines = [
+        f"{result.hand_count} hands in {result.elapsed:.1f}s "
+        f"({result.hands_per_second:.1f} hands/s)"
+    ]
+    for seat, (name, rate, (low, high)) in enumerate(
+        zip(policy_names, result.bb_per_100(), result.confidence_intervals())
+    ):
+        lines.append(
+            f"seat {seat} {name:>8}: {rate:+9.2f} bb/100 "
+            f"[{low:+.2f}, {high:+.2f}]"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "policies",
+        nargs="+",
+        choices=sorted(POLICIES),
+        help="policy of each seat, one per player",
+    )
+    parser.add_argument("-n", "--hands", type=int, default=1000)
+    parser.add_argument("-t", "--tables", type=int, default=1)
+    parser.add_argument("-p", "--processes", type=int, default=None)
+    parser.add_argument("-s", "--seed", type=int, default=None)
+    parser.add_argument("--config", help="JSON engine configuration")
+    parser.add_argument("--history-dir", help="directory for JSONL histories")
+    parser.add_argument(
+        "--compress", action="store_true", help="gzip the JSONL histories"
+    )
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config) if args.config else None
+    result = simulate(
+        args.policies,
+        args.hands,
+        config=config,
+        table_count=args.tables,
+        processes=args.processes,
+        seed=args.seed,
+        history_dir=args.history_dir,
+        compress_histories=args.compress,
+    )
+    print(format_result(result, args.policies))
+
+
+if __name__ == "__main__":
+    main()
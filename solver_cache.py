@@ -0,0 +1,385 @@
+"""On-disk cache of solver strategies keyed by canonical spots.
+
+Spots that differ only by a permutation of suits, or by scaling the pot and
+stack together, share one cache entry. :func:`canonicalize` finds the suit
+permutation giving the smallest board and ranges and hashes the result
+together with the stack-to-pot ratio and the remaining solver settings. The
+strategies are stored with their combos in canonical suits and their bet
+sizes as fractions of the pot, and are mapped back to the spot on lookup.
+
+Entries live in an SQLite database, so lookups are single primary-key reads.
+The least recently used entries are evicted once the stored strategies
+exceed the size limit.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+import solver_service
+import texas_solver
+from pokerkit import Card, parse_weighted_range
+
+_RANKS = "23456789TJQKA"
+_SUITS = "cdhs"
+_PERMUTATIONS = tuple(itertools.permutations(range(4)))
+
+# settings which do not change the solution
+_IGNORED_SETTINGS = {
+    "pot",
+    "effective_stack",
+    "board",
+    "range_oop",
+    "range_ip",
+    "thread_num",
+    "print_interval",
+    "dump_rounds",
+}
+
+DEFAULT_PATH = Path(__file__).parent / "solver_cache" / "strategies.sqlite"
+
+
+@dataclass(frozen=True)
+class CanonicalSpot:
+    """A spot in canonical form.
+
+    Attributes
+    ----------
+    key : str
+        Hex digest identifying the canonical spot.
+    permutation : tuple of int
+        Canonical suit index of each suit index of the spot, in ``"cdhs"``
+        order.
+    pot : float
+        Pot of the spot, which scales the bet sizes.
+    """
+
+    key: str
+    permutation: Tuple[int, ...]
+    pot: float
+
+
+def _card_id(card: str) -> int:
+    return _RANKS.index(card[0]) * 4 + _SUITS.index(card[1])
+
+
+def _permute_id(card_id: int, permutation: Tuple[int, ...]) -> int:
+    return card_id - card_id % 4 + permutation[card_id % 4]
+
+
+def _permute_card(card: str, permutation: Tuple[int, ...]) -> str:
+    return card[0] + _SUITS[permutation[_SUITS.index(card[1])]]
+
+
+def _permute_combo(combo: str, permutation: Tuple[int, ...]) -> str:
+    return "".join(
+        _permute_card(combo[i : i + 2], permutation) for i in range(0, len(combo), 2)
+    )
+
+
+@lru_cache(maxsize=64)
+def _parse_range(raw_range: str) -> Optional[list]:
+    """Return the combos of a range as card ids with their weights.
+
+    ``None`` is returned for ranges that are not in pokerkit notation, such as
+    ``"random"``, which are assumed to be the same under any suit permutation.
+    """
+
+    try:
+        weights = parse_weighted_range(raw_range)
+    except ValueError:
+        return None
+    return [(tuple(Card.get_ids(combo)), weight) for combo, weight in weights.items()]
+
+
+@lru_cache(maxsize=1024)
+def _range_key(raw_range: str, permutation: Tuple[int, ...]) -> str:
+    """Return a digest of a range with its suits permuted."""
+
+    combos = _parse_range(raw_range)
+    if combos is None:
+        return raw_range
+    permuted = sorted(
+        (sorted((_permute_id(i, permutation) for i in ids), reverse=True), weight)
+        for ids, weight in combos
+    )
+    return hashlib.sha256(json.dumps(permuted).encode()).hexdigest()
+
+
+def _board_candidates(board_ids: list) -> Tuple[list, list]:
+    """Return the smallest permuted board and the permutations giving it."""
+
+    def board_key(permutation):
+        return sorted((_permute_id(i, permutation) for i in board_ids), reverse=True)
+
+    smallest = min(map(board_key, _PERMUTATIONS))
+    return smallest, [p for p in _PERMUTATIONS if board_key(p) == smallest]
+
+
+def canonical_board(board: Iterable[str]) -> Tuple[Tuple[str, ...], Tuple[int, ...]]:
+    """Return the canonical form of a board and the suit permutation to it.
+
+    The canonical board lists the cards from highest to lowest, such as
+    ``("Ac", "Kc", "2d")`` for ``["Kh", "2s", "Ah"]``.
+    """
+
+    board_ids = [_card_id(card) for card in board]
+    smallest, candidates = _board_candidates(board_ids)
+    return (
+        tuple(_RANKS[i // 4] + _SUITS[i % 4] for i in smallest),
+        candidates[0],
+    )
+
+
+def canonicalize(commands: str) -> CanonicalSpot:
+    """Return the canonical form of the spot of a solver command script."""
+
+    settings = solver_service.parse_commands(commands)
+    pot = float(settings.get("pot", 0))
+    stack = float(settings.get("effective_stack", 0))
+    board = settings.get("board", "")
+    board_ids = [_card_id(card) for card in board.split(",") if card]
+    raw_ranges = settings.get("range_oop", ""), settings.get("range_ip", "")
+
+    def ranges_key(permutation):
+        return [_range_key(raw_range, permutation) for raw_range in raw_ranges]
+
+    smallest, candidates = _board_candidates(board_ids)
+    # ties are broken by the ranges, whose keys are cached for repeated ranges
+    permutation = min(candidates, key=ranges_key)
+
+    document = {
+        "board": smallest,
+        "ranges": ranges_key(permutation),
+        "spr": round(stack / pot, 4) if pot else stack,
+        "settings": sorted(
+            (name, value)
+            for name, value in settings.items()
+            if name not in _IGNORED_SETTINGS
+        ),
+    }
+    digest = hashlib.sha256(json.dumps(document).encode()).hexdigest()
+    return CanonicalSpot(digest, permutation, pot)
+
+
+def to_canonical(strategy: dict, spot: CanonicalSpot) -> dict:
+    """Return ``strategy`` in canonical suits with pot-relative bet sizes."""
+
+    actions = []
+    for action in strategy["actions"]:
+        name, _, amount = action.partition(" ")
+        if amount and spot.pot:
+            actions.append([name, float(amount) / spot.pot])
+        else:
+            actions.append([action, None])
+    return {
+        "actions": actions,
+        "strategy": {
+            _permute_combo(combo, spot.permutation): frequencies
+            for combo, frequencies in strategy["strategy"].items()
+        },
+    }
+
+
+def from_canonical(strategy: dict, spot: CanonicalSpot) -> dict:
+    """Return a canonical ``strategy`` in the suits and pot of ``spot``."""
+
+    inverse = tuple(spot.permutation.index(i) for i in range(4))
+    actions = []
+    for name, fraction in strategy["actions"]:
+        if fraction is None:
+            actions.append(name)
+        else:
+            actions.append(f"{name} {round(fraction * spot.pot, 2):g}")
+    return {
+        "actions": actions,
+        "strategy": {
+            _permute_combo(combo, inverse): frequencies
+            for combo, frequencies in strategy["strategy"].items()
+        },
+    }
+
+
+class StrategyCache:
+    """Size-bounded LRU store of canonical strategies in an SQLite file.
+
+    Parameters
+    ----------
+    path : str or Path
+        The database file, created with its directory if missing.
+    max_bytes : int, optional
+        Total size of the compressed strategies kept, defaults to 256 MiB.
+    """
+
+    def __init__(self, path: str | Path, max_bytes: int = 256 * 2**20) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS strategies ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+            "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS strategies_last_used "
+            "ON strategies (last_used)"
+        )
+        self._connection.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM strategies"
+            ).fetchone()[0]
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the strategy stored under ``key`` and mark it used."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM strategies WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                "UPDATE strategies SET last_used = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self._connection.commit()
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, strategy: dict) -> None:
+        """Store ``strategy`` under ``key``, evicting old entries if needed."""
+        value = zlib.compress(json.dumps(strategy, separators=(",", ":")).encode())
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO strategies VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time()),
+            )
+            total = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM strategies"
+            ).fetchone()[0]
+            if total > self.max_bytes:
+                evicted = 0
+                rows = self._connection.execute(
+                    "SELECT key, size FROM strategies ORDER BY last_used"
+                ).fetchall()
+                for old_key, size in rows:
+                    if total - evicted <= self.max_bytes:
+                        break
+                    self._connection.execute(
+                        "DELETE FROM strategies WHERE key = ?", (old_key,)
+                    )
+                    evicted += size
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+def default_strategy_cache() -> StrategyCache:
+    """Return a cache stored at :data:`DEFAULT_PATH`."""
+    return StrategyCache(DEFAULT_PATH)
+
+
+_cache_lock = threading.Lock()
+_cache: Optional[StrategyCache] = None
+_cache_started = False
+_cache_factory: Callable[[], Optional[StrategyCache]] = default_strategy_cache
+
+
+def get_strategy_cache() -> Optional[StrategyCache]:
+    """Return the shared cache, opening it on first use."""
+    global _cache, _cache_started
+
+    with _cache_lock:
+        if not _cache_started:
+            _cache = _cache_factory()
+            _cache_started = True
+        return _cache
+
+
+def configure_strategy_cache(factory: Callable[[], Optional[StrategyCache]]) -> None:
+    """Set how the shared cache is opened, ``lambda: None`` disables it."""
+    global _cache, _cache_started, _cache_factory
+
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = None
+        _cache_started = False
+        _cache_factory = factory
+
+
+def _lookup(commands: str) -> Tuple[CanonicalSpot, Optional[StrategyCache], Any]:
+    spot = canonicalize(commands)
+    cache = get_strategy_cache()
+    cached = cache.get(spot.key) if cache is not None else None
+    return spot, cache, None if cached is None else from_canonical(cached, spot)
+
+
+def solve_strategy(
+    commands: str,
+    *,
+    exe_dir: str | Path | None = None,
+    timeout: float | None = None,
+) -> dict:
+    """Return the strategy of a spot, solving it only if it is not cached.
+
+    The arguments are those of :func:`solver_service.solve`.
+
+    Raises
+    ------
+    ValueError
+        If the solver output holds no strategy.
+    """
+
+    spot, cache, strategy = _lookup(commands)
+    if strategy is not None:
+        return strategy
+
+    output = solver_service.solve(commands, exe_dir=exe_dir, timeout=timeout)
+    strategy = texas_solver.parse_solver_strategy(output)
+    if cache is not None:
+        cache.put(spot.key, to_canonical(strategy, spot))
+    return strategy
+
+
+def solve_output(
+    commands: str,
+    *,
+    exe_dir: str | Path | None = None,
+    timeout: float | None = None,
+) -> str:
+    """Return solver output for a spot, built from the cache if possible.
+
+    Cached spots give the strategy as solver JSON. Otherwise, the raw output
+    is returned and cached if it holds a strategy.
+    """
+
+    spot, cache, strategy = _lookup(commands)
+    if strategy is not None:
+        return json.dumps({"strategy": strategy})
+
+    output = solver_service.solve(commands, exe_dir=exe_dir, timeout=timeout)
+    if cache is not None:
+        try:
+            strategy = texas_solver.parse_solver_strategy(output)
+        except ValueError:
+            return output
+        cache.put(spot.key, to_canonical(strategy, spot))
+    return output
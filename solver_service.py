@@ -0,0 +1,317 @@
+"""Long-lived solver service running TexasSolver jobs from a queue.
+
+A :class:`SolverService` owns a backend and a pool of worker threads. Jobs
+are solver command scripts (the contents of a parameter file) that are
+queued with :meth:`SolverService.submit` and run by up to ``max_workers``
+threads, each with its own timeout. The thread budget is split between the
+workers through the ``set_thread_num`` command.
+
+Backends are pluggable. :class:`ConsoleSolverBackend` runs
+``console_solver.exe``, reusing one parameter file per worker and keeping the
+wine server alive between runs, while :class:`LocalSolverBackend` answers
+jobs with a Python function and can stand in for the binary in tests and
+benchmarks. Without Windows or wine, the service defaults to the in-process
+:class:`cfr_solver.CFRSolverBackend`.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Protocol, Tuple
+
+import texas_solver
+
+
+class SolverBackend(Protocol):
+    """Interface of the solvers run by :class:`SolverService`."""
+
+    def start(self) -> None:
+        """Pay the startup cost once, before the first job."""
+
+    def solve(self, commands: str, timeout: float | None) -> str:
+        """Run the solver command script and return the solver output."""
+
+    def close(self) -> None:
+        """Release the resources acquired by :meth:`start`."""
+
+
+def set_thread_count(commands: str, thread_count: int) -> str:
+    """Return ``commands`` running the solver on ``thread_count`` threads.
+
+    An existing ``set_thread_num`` command is replaced, otherwise one is added
+    right after ``build_tree`` or at the end.
+    """
+
+    line = f"set_thread_num {thread_count}"
+    lines = [
+        item for item in commands.splitlines() if not item.startswith("set_thread_num")
+    ]
+    if "build_tree" in lines:
+        lines.insert(lines.index("build_tree") + 1, line)
+    else:
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def parse_commands(commands: str) -> dict[str, Any]:
+    """Return the ``set_*`` settings of a command script by name.
+
+    Repeated commands such as ``set_bet_sizes`` are collected in lists.
+    """
+
+    settings: dict[str, Any] = {}
+    for line in commands.splitlines():
+        name, _, value = line.strip().partition(" ")
+        if not name.startswith("set_"):
+            continue
+        key = name[4:]
+        if key == "bet_sizes":
+            settings.setdefault(key, []).append(value)
+        else:
+            settings[key] = value
+    return settings
+
+
+class ConsoleSolverBackend:
+    """Run ``console_solver.exe``, through wine on non-Windows systems.
+
+    Each worker thread writes its jobs to its own parameter file in a
+    directory created once by :meth:`start`. With wine, a persistent wine
+    server is started once so that each run skips the wine startup.
+    """
+
+    def __init__(
+        self,
+        exe_dir: str | Path = texas_solver.DEFAULT_EXE_DIR,
+        use_wine: bool | None = None,
+    ) -> None:
+        self.exe_dir = Path(exe_dir)
+        self.use_wine = sys.platform != "win32" if use_wine is None else use_wine
+        self._directory: tempfile.TemporaryDirectory | None = None
+        self._wineserver: subprocess.Popen | None = None
+        self._local = threading.local()
+
+    def start(self) -> None:
+        if self._directory is None:
+            self._directory = tempfile.TemporaryDirectory(prefix="solver-")
+        if self.use_wine and self._wineserver is None and shutil.which("wineserver"):
+            self._wineserver = subprocess.Popen(["wineserver", "--persistent"])
+
+    def solve(self, commands: str, timeout: float | None) -> str:
+        if self._directory is None:
+            self.start()
+        path = getattr(self._local, "path", None)
+        if path is None:
+            path = Path(self._directory.name) / f"job-{threading.get_ident()}.txt"
+            self._local.path = path
+        path.write_text(commands)
+        return texas_solver.run_console_solver(
+            path, exe_dir=self.exe_dir, use_wine=self.use_wine, timeout=timeout
+        )
+
+    def close(self) -> None:
+        if self._wineserver is not None:
+            if shutil.which("wineserver"):
+                subprocess.run(["wineserver", "--kill"], check=False)
+            self._wineserver.wait()
+            self._wineserver = None
+        if self._directory is not None:
+            self._directory.cleanup()
+            self._directory = None
+
+
+class LocalSolverBackend:
+    """Answer jobs with a Python function instead of the solver binary.
+
+    Parameters
+    ----------
+    solve : callable
+        Called with the settings of a job from :func:`parse_commands` and
+        returning the solver result, which is encoded as JSON like the
+        output of ``console_solver.exe``.
+    """
+
+    def __init__(self, solve: Callable[[dict[str, Any]], Any]) -> None:
+        self._solve = solve
+
+    def start(self) -> None:
+        pass
+
+    def solve(self, commands: str, timeout: float | None) -> str:
+        start = time.perf_counter()
+        result = self._solve(parse_commands(commands))
+        if timeout is not None and time.perf_counter() - start > timeout:
+            raise TimeoutError("Local solver exceeded its timeout")
+        return json.dumps(result)
+
+    def close(self) -> None:
+        pass
+
+
+def default_backend() -> SolverBackend:
+    """Return the console solver if it can run, the in-process one otherwise."""
+    if sys.platform == "win32" or shutil.which("wine"):
+        return ConsoleSolverBackend()
+
+    from cfr_solver import CFRSolverBackend
+
+    return CFRSolverBackend()
+
+
+class SolverService:
+    """Queue solver jobs and run them on a pool of worker threads.
+
+    Parameters
+    ----------
+    backend : SolverBackend, optional
+        The solver, :func:`default_backend` by default. It is started once,
+        with the service.
+    max_workers : int, optional
+        Number of jobs run at once, defaults to 1.
+    thread_budget : int, optional
+        Solver threads shared by the running jobs, one per CPU by default.
+        Each job gets ``thread_budget // max_workers`` threads.
+    timeout : float, optional
+        Default timeout of a job in seconds.
+    """
+
+    def __init__(
+        self,
+        backend: SolverBackend | None = None,
+        *,
+        max_workers: int = 1,
+        thread_budget: int | None = None,
+        timeout: float | None = 15,
+    ) -> None:
+        self.backend = backend if backend is not None else default_backend()
+        self.max_workers = max_workers
+        budget = thread_budget or os.cpu_count() or 1
+        self.threads_per_job = max(1, budget // max_workers)
+        self.timeout = timeout
+        self.backend.start()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="solver"
+        )
+
+    def submit(self, commands: str, timeout: float | None = None) -> Future:
+        """Queue a command script and return the future of its output.
+
+        Parameters
+        ----------
+        commands : str
+            The solver command script, see :func:`texas_solver.build_commands`.
+        timeout : float, optional
+            Timeout of the job in seconds, the service default if omitted.
+        """
+        commands = set_thread_count(commands, self.threads_per_job)
+        return self._executor.submit(
+            self.backend.solve, commands, self.timeout if timeout is None else timeout
+        )
+
+    def solve(self, commands: str, timeout: float | None = None) -> str:
+        """Run a command script and wait for its output."""
+        return self.submit(commands, timeout).result()
+
+    def solve_all(
+        self, jobs: Iterable[str], timeout: float | None = None
+    ) -> Iterator[Tuple[int, str | BaseException]]:
+        """Run several command scripts and stream their outputs.
+
+        Yields
+        ------
+        tuple of int and str or exception
+            The index of a job and its output, or the exception it raised,
+            in the order the jobs finish.
+        """
+        futures = {
+            self.submit(commands, timeout): index for index, commands in enumerate(jobs)
+        }
+        for future in as_completed(futures):
+            error = future.exception()
+            yield futures[future], future.result() if error is None else error
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers and close the backend."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self.backend.close()
+
+
+_service_lock = threading.Lock()
+_service: SolverService | None = None
+_service_factory: Callable[[], SolverService] = SolverService
+_shutdown_registered = False
+
+
+def get_solver_service() -> SolverService:
+    """Return the shared solver service, starting it on first use."""
+    global _service, _shutdown_registered
+
+    with _service_lock:
+        if _service is None:
+            _service = _service_factory()
+            if not _shutdown_registered:
+                atexit.register(shutdown_solver_service)
+                _shutdown_registered = True
+        return _service
+
+
+def configure_solver_service(factory: Callable[[], SolverService]) -> None:
+    """Set how the shared service is created, replacing a running one.
+
+    For example, ``configure_solver_service(lambda: SolverService(backend,
+    max_workers=2))`` plugs in another backend.
+    """
+    global _service_factory
+
+    shutdown_solver_service()
+    _service_factory = factory
+
+
+def solve(
+    commands: str,
+    *,
+    exe_dir: str | Path | None = None,
+    timeout: float | None = None,
+) -> str:
+    """Run a command script on the shared service and return its output.
+
+    Parameters
+    ----------
+    commands : str
+        The solver command script.
+    exe_dir : str or Path, optional
+        Directory of another ``console_solver.exe`` to run just this job on,
+        bypassing the shared service.
+    timeout : float, optional
+        Timeout in seconds, the service default if omitted.
+    """
+    if exe_dir is None:
+        return get_solver_service().solve(commands, timeout)
+
+    backend = ConsoleSolverBackend(exe_dir)
+    backend.start()
+    try:
+        return backend.solve(commands, timeout)
+    finally:
+        backend.close()
+
+
+def shutdown_solver_service(wait: bool = True) -> None:
+    """Shut down the shared solver service if it is running."""
+    global _service
+
+    with _service_lock:
+        service, _service = _service, None
+
+    if service is not None:
+        service.shutdown(wait=wait)
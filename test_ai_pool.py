@@ -0,0 +1,70 @@
+import unittest
+from unittest import mock
+
+import ai
+
+
+class TestAIPool(unittest.TestCase):
+    def tearDown(self):
+        ai.set_pool_size(None)
+
+    def test_pool_is_reused(self):
+        ai.set_pool_size(2)
+        first = ai.get_executor()
+        second = ai.get_executor()
+        self.assertIs(first, second)
+
+        strength = ai.estimate_hand_strength(["As", "Ac"], sample_count=50)
+        self.assertGreaterEqual(strength, 0)
+        self.assertLessEqual(strength, 1)
+        self.assertIs(ai.get_executor(), first)
+
+    def test_shutdown_and_restart(self):
+        ai.set_pool_size(1)
+        pool = ai.get_executor()
+        ai.shutdown_pool()
+        self.assertIsNot(ai.get_executor(), pool)
+
+        equities = ai.estimate_equity(["AA", "KK"], sample_count=50)
+        self.assertAlmostEqual(sum(equities), 1)
+
+    def test_in_process(self):
+        ai.set_pool_size(0)
+        self.assertIsNone(ai.get_executor())
+        self.assertIsNone(ai._pool)
+
+        strength = ai.estimate_hand_strength(["As", "Ac"], sample_count=50)
+        self.assertGreaterEqual(strength, 0)
+        self.assertLessEqual(strength, 1)
+        self.assertIsNone(ai._pool)
+
+    def test_pool_size(self):
+        # calculate_equities splits its work into one chunk per worker
+        ai.set_pool_size(2)
+        self.assertEqual(ai.get_pool_size(), 2)
+        with mock.patch.object(
+            ai, "calculate_equities", wraps=ai.calculate_equities
+        ) as calculate:
+            ai.estimate_equity(["AhAd", "KhKd"], ["2c", "7d", "Ts", "Jh"])
+        self.assertEqual(calculate.call_args.kwargs["chunk_count"], 2)
+
+        ai.set_pool_size(0)
+        self.assertEqual(ai.get_pool_size(), 0)
+        ai.set_pool_size(None)
+        self.assertGreaterEqual(ai.get_pool_size(), 1)
+
+    def test_sampling_in_batches(self):
+        with mock.patch.object(
+            ai, "calculate_equities_batch", wraps=ai.calculate_equities_batch
+        ) as batch:
+            equities = ai.estimate_equity(["AA", "KK"], sample_count=2000)
+            self.assertAlmostEqual(equities[0], 0.82, delta=0.05)
+            self.assertEqual(batch.call_count, 1)
+
+            # heads-up river spots are enumerated
+            ai.estimate_hand_strength(["As", "Ac"], "2c 7d Th Js 3s".split())
+            self.assertEqual(batch.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
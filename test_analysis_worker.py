@@ -0,0 +1,115 @@
+import threading
+import unittest
+
+import ai
+from analysis_worker import AnalysisRunner, make_request
+from engine import PokerEngine
+
+
+class _Recorder:
+    def __init__(self):
+        self.equities = []
+        self.recommendations = []
+        self.errors = []
+        self.done = threading.Event()
+
+    def on_equity(self, generation, equity, samples):
+        self.equities.append((generation, equity, samples))
+
+    def on_recommendation(self, generation, action, amount):
+        self.recommendations.append((generation, action, amount))
+        self.done.set()
+
+    def on_error(self, generation, stage):
+        self.errors.append((generation, stage))
+        self.done.set()
+
+
+class TestAnalysisRunner(unittest.TestCase):
+    def setUp(self):
+        ai.set_pool_size(0)
+        self.recorder = _Recorder()
+        self.engine = PokerEngine(num_players=3, starting_stack=100, sb_amt=1, bb_amt=2)
+        self.engine.new_hand()
+
+    def tearDown(self):
+        ai.set_pool_size(None)
+
+    def _runner(self, **kwargs):
+        runner = AnalysisRunner(
+            self.recorder.on_equity,
+            self.recorder.on_recommendation,
+            self.recorder.on_error,
+            **kwargs,
+        )
+        self.addCleanup(runner.shutdown)
+        return runner
+
+    def test_progressive_results(self):
+        runner = self._runner(sample_count=300, batch_size=100)
+        generation = runner.submit(make_request(self.engine, 0))
+        self.assertTrue(self.recorder.done.wait(60))
+
+        self.assertEqual(
+            [(g, s) for g, _, s in self.recorder.equities],
+            [(generation, 100), (generation, 200), (generation, 300)],
+        )
+        for _, equity, _ in self.recorder.equities:
+            self.assertGreaterEqual(equity, 0)
+            self.assertLessEqual(equity, 1)
+        self.assertEqual(self.recorder.recommendations[0][0], generation)
+        self.assertFalse(self.recorder.errors)
+
+    def test_exact_river(self):
+        eng = PokerEngine(num_players=2, starting_stack=100, sb_amt=1, bb_amt=2)
+        eng.new_hand()
+        eng.player_action("call")
+        eng.player_action("check")
+        for _ in range(3):
+            eng.player_action("check")
+            eng.player_action("check")
+        self.assertEqual(len(eng.community), 5)
+
+        runner = self._runner()
+        generation = runner.submit(make_request(eng, eng.turn))
+        self.assertTrue(self.recorder.done.wait(60))
+        self.assertEqual(len(self.recorder.equities), 1)
+        self.assertEqual(self.recorder.equities[0][::2], (generation, 0))
+
+    def test_stale_requests_are_dropped(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def estimate(*args, **kwargs):
+            started.set()
+            release.wait(10)
+            return 0.5
+
+        runner = self._runner(
+            sample_count=1000,
+            batch_size=100,
+            estimate=estimate,
+            recommend=lambda *args, **kwargs: ("check", 0),
+        )
+        first = runner.submit(make_request(self.engine, 0))
+        self.assertTrue(started.wait(10))
+        runner.submit(make_request(self.engine, 1))
+        latest = runner.submit(make_request(self.engine, 2))
+        release.set()
+        self.assertTrue(self.recorder.done.wait(10))
+
+        generations = {g for g, _, _ in self.recorder.equities}
+        self.assertEqual(generations, {latest})
+        self.assertNotIn(first, generations)
+        self.assertEqual(len(self.recorder.equities), 10)
+        self.assertEqual(self.recorder.recommendations, [(latest, "check", 0)])
+
+    def test_snapshot_is_independent(self):
+        request = make_request(self.engine, self.engine.turn)
+        self.engine.player_action("fold")
+        self.assertTrue(all(request.engine.active))
+        self.assertIsNone(make_request(PokerEngine(num_players=2), 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
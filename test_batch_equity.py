@@ -0,0 +1,137 @@
+import unittest
+from itertools import combinations
+
+import numpy as np
+
+from batch_equity import _get_table, calculate_equities_batch
+from pokerkit.pokerkit.analysis import (
+    calculate_equities,
+    parse_range,
+    parse_weighted_range,
+)
+from pokerkit.pokerkit.hands import (
+    EightOrBetterLowHand,
+    StandardHighHand,
+    StandardLowHand,
+)
+from pokerkit.pokerkit.utilities import Card, Deck
+
+
+class TestBatchEquity(unittest.TestCase):
+    def test_table_matches_pokerkit(self):
+        rng = np.random.default_rng(0)
+        ids = np.array([rng.choice(52, 7, replace=False) for _ in range(2000)])
+        table = _get_table(StandardHighHand, 7)
+        strengths = table.evaluate(ids[:, None, :2], ids[:, 2:])[:, 0]
+        expected = [
+            StandardHighHand.get_game_entry_from_ids(row[:2], row[2:]).index
+            for row in ids.tolist()
+        ]
+        self.assertEqual(strengths.tolist(), expected)
+
+    def test_known_outcomes(self):
+        equities = calculate_equities_batch(
+            (parse_range("33"), parse_range("33")),
+            Card.parse("Tc8d6h4s"),
+            2,
+            5,
+            Deck.STANDARD,
+            (StandardHighHand,),
+            sample_count=1000,
+        )
+        self.assertEqual(equities, [0.5, 0.5])
+
+        equities = calculate_equities_batch(
+            (parse_range("2h2c"), parse_range("3h3c"), parse_range("AsKs")),
+            Card.parse("QsJsTs"),
+            2,
+            5,
+            Deck.STANDARD,
+            (StandardHighHand,),
+            sample_count=1000,
+        )
+        self.assertEqual(equities, [0.0, 0.0, 1.0])
+
+    def test_matches_calculate_equities(self):
+        args = (
+            (parse_range("AhKh"), parse_range("2c3d"), [[]]),
+            tuple(Card.parse("4h5h8d")),
+            2,
+            5,
+            Deck.STANDARD,
+            (StandardHighHand, EightOrBetterLowHand),
+        )
+        expected = calculate_equities(*args, sample_count=5000)
+        equities = calculate_equities_batch(
+            *args, sample_count=200000, rng=np.random.default_rng(0)
+        )
+
+        self.assertAlmostEqual(sum(equities), 1)
+        for equity, expected_equity in zip(equities, expected):
+            self.assertAlmostEqual(equity, expected_equity, delta=0.03)
+
+    def test_weighted_ranges(self):
+        equities = calculate_equities_batch(
+            (parse_weighted_range("AhAd:3,2c2d"), parse_range("KhKd")),
+            Card.parse("8c7d4h3s9c"),
+            2,
+            5,
+            Deck.STANDARD,
+            (StandardHighHand,),
+            sample_count=20000,
+            rng=np.random.default_rng(0),
+        )
+
+        self.assertAlmostEqual(equities[0], 0.75, delta=0.02)
+        self.assertAlmostEqual(equities[1], 0.25, delta=0.02)
+
+    def test_colliding_ranges(self):
+        equities = calculate_equities_batch(
+            (parse_range("AsAd,KsKh"), parse_range("AdQd")),
+            Card.parse("2c3c7h8s9d"),
+            2,
+            5,
+            Deck.STANDARD,
+            (StandardHighHand,),
+            sample_count=1000,
+        )
+        self.assertEqual(equities, [1.0, 0.0])
+
+        holes = [frozenset(cards) for cards in combinations(Deck.STANDARD, 2)]
+        equities = calculate_equities_batch(
+            (holes, holes),
+            (),
+            2,
+            5,
+            Deck.STANDARD,
+            (StandardHighHand,),
+            sample_count=20000,
+            rng=np.random.default_rng(0),
+        )
+        self.assertAlmostEqual(equities[0], 0.5, delta=0.02)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            calculate_equities_batch(
+                (parse_range("AsAh"), parse_range("AsKs")),
+                (),
+                2,
+                5,
+                Deck.STANDARD,
+                (StandardHighHand,),
+                sample_count=10,
+            )
+        with self.assertRaises(ValueError):
+            calculate_equities_batch(
+                (parse_range("AA"), parse_range("KK")),
+                (),
+                2,
+                5,
+                Deck.STANDARD,
+                (StandardLowHand,),
+                sample_count=10,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+import json
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import solver_service
+import texas_solver
+from cfr_solver import BetSizes, CFRSolver, CFRSolverBackend, parse_bet_sizes
+from solver_service import SolverService
+
+NO_BETS = BetSizes((), (), None, False)
+RANGE_OOP = "AA,KK,QQ,AK,AQ,KQ,JT,T9s,87s"
+RANGE_IP = "AA,KK,QQ,JJ,AK,AQ,KQ,QJ,JT,98s"
+
+
+class TestBetSizes(unittest.TestCase):
+    def test_parse(self):
+        sizes = parse_bet_sizes(
+            ["oop,river,bet,50,100", "oop,river,allin", "ip,turn,raise,75"]
+        )
+        self.assertEqual(sizes["oop", "river"], BetSizes((0.5, 1.0), (), None, True))
+        self.assertEqual(sizes["ip", "turn"], BetSizes((), (0.75,), None, False))
+        with self.assertRaises(ValueError):
+            parse_bet_sizes(["oop,river,overbet,200"])
+
+
+class TestCFRSolver(unittest.TestCase):
+    def test_bluff_catching(self):
+        # AA is the nuts, T9s is air and KQo catches bluffs. With a pot
+        # sized bet, OOP bluffs half as often as it bets for value and IP
+        # calls half of the time.
+        solver = CFRSolver(
+            pot=10,
+            stack=10,
+            board=["As", "Ks", "7d", "4c", "2h"],
+            range_oop="AA,T9s",
+            range_ip="KQo",
+            bet_sizes={
+                ("oop", "river"): BetSizes((1.0,), (), None, False),
+                ("ip", "river"): NO_BETS,
+            },
+        )
+        exploitability = solver.solve(max_iterations=1000, accuracy=0.1)
+        self.assertLessEqual(exploitability, 0.1)
+        self.assertLess(solver.iterations, 1000)
+
+        result = solver.result()
+        self.assertEqual(result["actions"], ["CHECK", "BET 10.000000"])
+        strategy = result["strategy"]["strategy"]
+        self.assertAlmostEqual(strategy["AhAd"][1], 1, delta=0.02)
+        bluffs = np.mean([strategy[f"T{s}9{s}"][1] for s in "cdhs"])
+        self.assertAlmostEqual(bluffs, 0.375, delta=0.03)
+
+        response = result["childrens"]["BET 10.000000"]
+        self.assertEqual(response["actions"], ["FOLD", "CALL"])
+        calls = np.mean(
+            [probs[1] for probs in response["strategy"]["strategy"].values()]
+        )
+        self.assertAlmostEqual(calls, 0.5, delta=0.05)
+
+    def test_river(self):
+        solver = CFRSolver(
+            pot=10,
+            stack=50,
+            board=["Qs", "Jh", "2h", "7c", "3d"],
+            range_oop=RANGE_OOP,
+            range_ip=RANGE_IP,
+        )
+        self.assertLessEqual(solver.solve(max_iterations=200, accuracy=0.5), 0.5)
+
+        output = json.dumps(solver.result())
+        strategy = texas_solver.parse_solver_strategy(output)
+        self.assertEqual(
+            strategy["actions"],
+            ["CHECK", "BET 5.000000", "BET 10.000000", "BET 50.000000"],
+        )
+        self.assertNotIn("QsQh", strategy["strategy"])
+        for probs in strategy["strategy"].values():
+            self.assertAlmostEqual(sum(probs), 1, places=4)
+
+    def test_turn(self):
+        solver = CFRSolver(
+            pot=10,
+            stack=20,
+            board=["Qs", "Jh", "2h", "7c"],
+            range_oop="QQ,AhKh,T9s",
+            range_ip="KK,AQ",
+            bet_sizes={
+                (player, street): BetSizes((1.0,), (), None, True)
+                for player in ("oop", "ip")
+                for street in ("turn", "river")
+            },
+        )
+        exploitability = solver.solve(max_iterations=300, accuracy=1)
+        self.assertLessEqual(exploitability, 1)
+
+        result = solver.result(dump_rounds=2)
+        river = result["childrens"]["CHECK"]["childrens"]["CHECK"]
+        self.assertEqual(river["node_type"], "chance_node")
+        self.assertEqual(len(river["dealcards"]), 48)
+        self.assertNotIn("AhKh", river["dealcards"]["Kh"]["strategy"]["strategy"])
+        self.assertIn("AhKh", river["dealcards"]["Kd"]["strategy"]["strategy"])
+        self.assertNotIn("dealcards", solver.result()["childrens"]["CHECK"])
+
+    def test_checks(self):
+        solver = CFRSolver(
+            pot=10,
+            stack=20,
+            board=["Qs", "Jh", "2h", "7c", "3d"],
+            range_oop="QQ,AhKh,T9s",
+            range_ip="KK,AQ",
+        )
+        with mock.patch.object(
+            solver, "exploitability", wraps=solver.exploitability
+        ) as exploitability:
+            solver.solve(max_iterations=20, accuracy=0, check_interval=10)
+            self.assertEqual(exploitability.call_count, 2)
+
+            solver.solve(max_iterations=25, accuracy=0, check_interval=10)
+            self.assertEqual(exploitability.call_count, 3)
+
+            solver.solve(max_iterations=100, time_limit=0)
+            self.assertEqual(solver.iterations, 25)
+
+    def test_threads(self):
+        def solve(threads):
+            solver = CFRSolver(
+                pot=10,
+                stack=20,
+                board=["Qs", "Jh", "2h", "7c"],
+                range_oop="QQ,AhKh,T9s",
+                range_ip="KK,AQ",
+                threads=threads,
+            )
+            solver.iterate()
+            return solver.exploitability()
+
+        self.assertAlmostEqual(solve(1), solve(3))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            CFRSolver(
+                pot=10,
+                stack=50,
+                board=["Qs", "Jh", "2h"],
+                range_oop=RANGE_OOP,
+                range_ip=RANGE_IP,
+            )
+        with self.assertRaises(ValueError):
+            CFRSolver(
+                pot=10,
+                stack=50,
+                board=["Qs", "Jh", "2h", "7c"],
+                range_oop="QsQh",
+                range_ip=RANGE_IP,
+            )
+
+
+class TestCFRSolverBackend(unittest.TestCase):
+    def test_service(self):
+        service = SolverService(CFRSolverBackend())
+        self.addCleanup(service.shutdown)
+        commands = texas_solver.build_commands(
+            pot=10,
+            stack=50,
+            board=["Qs", "Jh", "2h", "7c", "3d"],
+            range_oop=RANGE_OOP,
+            range_ip=RANGE_IP,
+        )
+        lines = ["set_bet_sizes oop,river,bet,100", "set_max_iteration 20"]
+        output = service.solve("\n".join([commands] + lines))
+
+        strategy = texas_solver.parse_solver_strategy(output)
+        self.assertEqual(strategy["actions"], ["CHECK", "BET 10.000000"])
+
+    @mock.patch("solver_service.sys.platform", "linux")
+    @mock.patch("solver_service.shutil.which", return_value=None)
+    def test_default_without_wine(self, which):
+        backend = solver_service.default_backend()
+        self.assertIsInstance(backend, CFRSolverBackend)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import flop_library
+import solver_cache
+from flop_library import FlopLibrary, load_node, precompute, stub_solve
+from solver_service import LocalSolverBackend, SolverService, parse_commands
+
+NODE = "CO/2.5bb/BTN/Call"
+FLOPS = [("Ac", "Kc", "2d"), ("7c", "7d", "2h"), ("Tc", "9c", "8c")]
+
+
+class TestFlops(unittest.TestCase):
+    def test_canonical_flops(self):
+        flops = flop_library.canonical_flops()
+        self.assertEqual(len(flops), 1755)
+        self.assertEqual(sum(flops.values()), 22100)
+        self.assertEqual(flops[("Ac", "Kc", "Qc")], 4)
+        self.assertEqual(flops[("Ac", "Kd", "Qh")], 24)
+        for flop in flops:
+            self.assertEqual(solver_cache.canonical_board(flop)[0], flop)
+
+
+class TestNodes(unittest.TestCase):
+    def test_load_node(self):
+        node = load_node(NODE)
+        self.assertEqual((node.oop, node.ip), ("CO", "BTN"))
+        self.assertEqual(node.pot, 6.5)
+        self.assertEqual(node.stack, 97.5)
+        self.assertTrue(node.range_oop.startswith("AA:1.0"))
+
+        node = load_node("BTN/2.5bb/BB/11.0bb/BTN/Call")
+        self.assertEqual((node.oop, node.ip), ("BB", "BTN"))
+        self.assertEqual(node.pot, 22.5)
+        self.assertEqual(node.stack, 89.0)
+
+    def test_list_nodes(self):
+        nodes = flop_library.list_nodes()
+        self.assertIn(NODE, nodes)
+        self.assertFalse(any("AllIn" in node for node in nodes))
+        with self.assertRaises(ValueError):
+            load_node("CO/2.5bb")
+
+
+class TestPrecompute(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "library.sqlite"
+        self.node = load_node(NODE)
+
+    def _precompute(self, solve, **kwargs):
+        service = SolverService(LocalSolverBackend(solve), max_workers=2)
+        library = FlopLibrary(self.path)
+        try:
+            return precompute([self.node], library=library, service=service, **kwargs)
+        finally:
+            service.shutdown()
+            library.close()
+
+    def test_resume_and_lookup(self):
+        progress = self._precompute(stub_solve, flops=FLOPS[:2])
+        self.assertEqual((progress.done, progress.failed), (2, 0))
+
+        jobs = []
+
+        def solve(settings):
+            jobs.append(settings["board"])
+            return stub_solve(settings)
+
+        updates = []
+        progress = self._precompute(solve, flops=FLOPS, on_progress=updates.append)
+        self.assertEqual(jobs, ["Tc,9c,8c"])
+        self.assertEqual(progress.total, 1)
+        self.assertEqual(len(updates), 1)
+
+        library = FlopLibrary(self.path)
+        self.addCleanup(library.close)
+        self.assertEqual(len(library), 3)
+
+        expected = stub_solve(parse_commands(self.node.commands(FLOPS[0])))
+        strategy = library.get(NODE, ["2s", "Ah", "Kh"])
+        self.assertEqual(strategy["actions"], ["CHECK", "BET 3.25"])
+        self.assertEqual(
+            strategy["strategy"]["QhJh"], expected["strategy"]["strategy"]["QcJc"]
+        )
+        strategy = library.get(NODE, ["Ah", "Kh", "2s"], pot=13)
+        self.assertEqual(strategy["actions"], ["CHECK", "BET 6.5"])
+        self.assertIsNone(library.get(NODE, ["2c", "3d", "4h"]))
+
+    def test_retry(self):
+        attempts = []
+        lock = threading.Lock()
+
+        def flaky(settings):
+            with lock:
+                attempts.append(settings["board"])
+                if attempts.count(settings["board"]) == 1:
+                    raise RuntimeError("solver crashed")
+            if settings["board"].startswith("7c"):
+                return "not a strategy"
+            return stub_solve(settings)
+
+        progress = self._precompute(flaky, flops=FLOPS, retries=1)
+        self.assertEqual((progress.done, progress.failed), (2, 1))
+        self.assertEqual(len(attempts), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
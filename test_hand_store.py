@@ -0,0 +1,191 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from engine import PokerEngine
+from hand_store import HandStore, HandStoreWriter, load_hand_histories
+from phh_export import iter_phh
+from pokerkit.pokerkit.notation import HandHistory
+
+THREE_BET = HandHistory(
+    variant="NT",
+    antes=[0] * 3,
+    blinds_or_straddles=[10, 20, 0],
+    min_bet=20,
+    starting_stacks=[1000, 1000, 1000],
+    actions=[
+        "d dh p1 AhKh",
+        "d dh p2 ????",
+        "d dh p3 QsQd",
+        "p3 cbr 60",
+        "p1 cbr 200",
+        "p2 f",
+        "p3 cc",
+        "d db 2c7dTs",
+        "p1 cbr 300",
+        "p3 f",
+    ],
+    players=["alice", "bob", "carol"],
+    hand=7,
+)
+
+
+def _engine_hands(count):
+    random.seed(2)
+    engine = PokerEngine(num_players=3)
+    for _ in range(count):
+        engine.new_hand()
+        for action in [("call", 0)] * 2 + [("check", 0)] * 9:
+            engine.player_action(*action)
+    return list(iter_phh(engine.hand_histories))
+
+
+class TestHandStore(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "store"
+        self.hhs = _engine_hands(5)
+        with HandStoreWriter(self.path, chunk_size=2) as writer:
+            writer.write(self.hhs)
+            writer.write([THREE_BET])
+        self.store = HandStore(self.path)
+
+    def test_layout(self):
+        store = self.store
+        self.assertEqual(len(store), 6)
+        self.assertEqual(len(store.chunks), 3)
+        self.assertEqual(store.rows("players"), 18)
+        actions = sum(len(hh.actions) for hh in self.hhs + [THREE_BET])
+        self.assertEqual(store.rows("actions"), actions)
+        self.assertIsInstance(
+            np.load(store.chunks[0].path / "actions.amount.npy", mmap_mode="r"),
+            np.memmap,
+        )
+
+        # a store can grow and ignores chunks being written
+        with HandStoreWriter(self.path) as writer:
+            writer.write([THREE_BET])
+        (self.path / "000009.part").mkdir()
+        self.assertEqual(len(HandStore(self.path)), 7)
+
+    def test_select(self):
+        store = self.store
+        hand = store.select("hands", where={"number": 7})["hand"]
+        self.assertEqual(list(hand), [5])
+
+        players = store.select("players", hands=hand)
+        self.assertEqual(list(players["name"]), ["alice", "bob", "carol"])
+        self.assertEqual(list(players["payoff"]), [220, -20, -200])
+
+        cards = store.select("cards", ["player", "street", "card"], hands=hand)
+        self.assertEqual(list(cards["card"][:4]), [50, 46, -1, -1])
+        self.assertEqual(list(cards["player"][-3:]), [-1] * 3)
+        self.assertEqual(list(cards["street"][-3:]), [1] * 3)
+
+        raises = store.select("actions", where={"kind": "cbr"}, hands=hand)
+        self.assertEqual(list(raises["level"]), [2, 3, 1])
+        self.assertEqual(list(raises["amount"]), [60, 200, 300])
+        self.assertEqual(list(raises["street"]), [0, 0, 1])
+
+    def test_hands_where(self):
+        store = self.store
+        three_bets = store.hands_where(
+            "actions",
+            lambda c: (c["street"] == 0)
+            & (c["kind"] == store.code("kind", "cbr"))
+            & (c["level"] == 3),
+        )
+        self.assertEqual(list(three_bets), [5])
+        self.assertEqual(store.code("kind", "missing"), -1)
+        self.assertEqual(len(store.hands_where("actions", {"kind": ["f", "cbr"]})), 1)
+        self.assertEqual(len(store.hands_where("players", {"player_count": 3})), 6)
+
+    def test_player_columns(self):
+        with HandStoreWriter(self.path) as writer:
+            writer.write([HandHistory(**{**vars(THREE_BET), "seats": [3, 5, 1]})])
+        store = HandStore(self.path)
+
+        # the example of HandStore: the payoffs of the hands where seat 3
+        # 3-bets preflop, by position
+        three_bets = store.hands_where(
+            "actions",
+            lambda c: (c["street"] == 0)
+            & (c["kind"] == store.code("kind", "cbr"))
+            & (c["level"] == 3)
+            & (c["seat"] == 3),
+        )
+        self.assertEqual(list(three_bets), [6])
+        result = store.aggregate(
+            "players", by="position", hands=three_bets, payoff=("payoff", "sum")
+        )
+        self.assertEqual(list(result["position"]), [0, 1, 2])
+        self.assertEqual(list(result["payoff"]), [220, -20, -200])
+
+        actions = store.select(
+            "actions", ["player", "seat", "name", "payoff"], hands=three_bets
+        )
+        self.assertEqual(list(actions["seat"][:4]), [3, 5, 1, 1])
+        self.assertEqual(list(actions["name"][:4]), ["alice", "bob", "carol", "carol"])
+        self.assertEqual(actions["seat"][7], 0)
+        self.assertIsNone(actions["name"][7])
+        self.assertTrue(np.isnan(actions["payoff"][7]))
+        self.assertEqual(actions["payoff"][8], 220)
+        cards = store.select("cards", ["player", "name"], where={"name": "carol"})
+        self.assertEqual(len(cards["name"]), 2 * 2)
+
+    def test_aggregate(self):
+        store = self.store
+        result = store.aggregate(
+            "players",
+            by="position",
+            count=("payoff", "count"),
+            total=("payoff", "sum"),
+            mean=("payoff", "mean"),
+            std=("payoff", "std"),
+            low=("payoff", "min"),
+            high=("payoff", "max"),
+        )
+        players = store.select("players")
+        for position in range(3):
+            payoffs = players["payoff"][players["position"] == position]
+            self.assertEqual(result["position"][position], position)
+            self.assertEqual(result["count"][position], 6)
+            self.assertEqual(result["total"][position], payoffs.sum())
+            self.assertAlmostEqual(result["mean"][position], payoffs.mean())
+            self.assertAlmostEqual(result["std"][position], payoffs.std(ddof=1))
+            self.assertEqual(result["low"][position], payoffs.min())
+            self.assertEqual(result["high"][position], payoffs.max())
+
+        result = store.aggregate("players", total=("payoff", "sum"))
+        self.assertEqual(list(result["total"]), [0])
+
+        result = store.aggregate(
+            "players", by=["name"], where={"name": "alice"}, total=("payoff", "sum")
+        )
+        self.assertEqual(list(result["name"]), ["alice"])
+        self.assertEqual(list(result["total"]), [220])
+
+        result = store.aggregate("players", by="name", hands=[], n=("payoff", "count"))
+        self.assertEqual(len(result["name"]), 0)
+
+        with self.assertRaises(ValueError):
+            store.aggregate("players", total=("payoff", "median"))
+        with self.assertRaises(ValueError):
+            store.select("bets")
+
+    def test_load_hand_histories(self):
+        path = self.path.parent / "hands.phhs"
+        with open(path, "wb") as fp:
+            HandHistory.dump_all(self.hhs, fp)
+        self.assertEqual(
+            [hh.actions for hh in load_hand_histories(path)],
+            [hh.actions for hh in self.hhs],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
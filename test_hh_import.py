@@ -0,0 +1,155 @@
+import json
+import tempfile
+import unittest
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from hand_store import HandStore
+from hh_import import ImportProgress, import_histories, read_manifest, split_hands
+from pokerkit.pokerkit.notation import HandHistory
+
+HAND = """\
+PokerStars Hand #{number}:  Hold'em No Limit (10/20) - 2020/01/02 12:34:56 ET
+Table 'Alpha' 6-max Seat #1 is the button
+Seat 1: alice (2000 in chips)
+Seat 2: bob (1500 in chips)
+Seat 3: carol (2500 in chips)
+bob: posts small blind 10
+carol: posts big blind 20
+*** HOLE CARDS ***
+Dealt to alice [Ah Kh]
+alice: raises 40 to 60
+bob: folds
+carol: calls 40
+*** FLOP *** [2c 7d Ts]
+carol: checks
+alice: bets 100
+carol: folds
+alice collected 130 from pot
+*** SUMMARY ***
+Seat 1: alice (button) collected (130)
+"""
+
+
+def _export(numbers, bad=(), newline="\n"):
+    hands = []
+    for number in numbers:
+        hand = HAND.format(number=number)
+        if number in bad:
+            hand = hand.replace("Seat 3: carol (2500 in chips)\n", "")
+        hands.append(hand)
+    return ("\n\n\n".join(hands)).replace("\n", newline).encode()
+
+
+def _load(path):
+    with open(path, "rb") as fh, warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return list(HandHistory.load_all(fh))
+
+
+class TestImport(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        self.sources = self.root / "exports"
+        (self.sources / "2020").mkdir(parents=True)
+        (self.sources / "a.txt").write_bytes(_export(range(1, 8), bad={3}))
+        (self.sources / "2020" / "b.txt").write_bytes(
+            _export(range(8, 12), newline="\r\n")
+        )
+        (self.sources / ".hidden.txt").write_bytes(_export([99]))
+
+    def test_split(self):
+        header, hands = split_hands(self.sources / "2020" / "b.txt", "pokerstars")
+        hands = list(hands)
+        self.assertEqual(header, b"")
+        self.assertEqual(len(hands), 4)
+        self.assertTrue(hands[-1].startswith(b"PokerStars Hand #11:"))
+
+        empty = self.root / "empty.txt"
+        empty.touch()
+        self.assertEqual(list(split_hands(empty, "pokerstars")[1]), [])
+
+    def test_import_and_resume(self):
+        reports = []
+        destination = self.root / "phh"
+        progress = import_histories(
+            "pokerstars",
+            self.sources,
+            destination,
+            batch_size=2,
+            on_progress=reports.append,
+        )
+
+        self.assertIsInstance(progress, ImportProgress)
+        self.assertEqual((progress.files, progress.hands), (2, 10))
+        self.assertEqual(progress.errors, {"a.txt": 1})
+        self.assertGreater(len(reports), 2)
+
+        hhs = _load(destination / "a.txt.phhs")
+        self.assertEqual([hh.hand for hh in hhs], [1, 2, 4, 5, 6, 7])
+        self.assertEqual(hhs[0].players, ["bob", "carol", "alice"])
+        self.assertEqual(
+            [hh.hand for hh in _load(destination / "2020" / "b.txt.phhs")],
+            [8, 9, 10, 11],
+        )
+        self.assertEqual(read_manifest(destination)["a.txt"]["errors"], 1)
+        self.assertEqual(list(destination.rglob("*.part")), [])
+
+        progress = import_histories("pokerstars", self.sources, destination)
+        self.assertEqual((progress.files, progress.skipped_files), (0, 2))
+
+        (self.sources / "a.txt").write_bytes(_export([1, 2]))
+        progress = import_histories("pokerstars", self.sources, destination)
+        self.assertEqual((progress.files, progress.hands), (1, 2))
+        self.assertEqual(len(_load(destination / "a.txt.phhs")), 2)
+
+        with open(destination / "manifest.jsonl") as fh:
+            self.assertEqual(len([json.loads(line) for line in fh]), 3)
+
+    def test_executor(self):
+        with ProcessPoolExecutor(2) as executor:
+            for ordered in (True, False):
+                destination = self.root / f"phh-{ordered}"
+                progress = import_histories(
+                    "pokerstars",
+                    [self.sources / "a.txt", self.sources / "2020"],
+                    destination,
+                    executor=executor,
+                    ordered=ordered,
+                    validate=False,
+                    batch_size=2,
+                    prefetch_count=2,
+                )
+                self.assertEqual(progress.hands, 10)
+                hhs = _load(destination / "a.txt.phhs")
+                self.assertEqual(sorted(hh.hand for hh in hhs), [1, 2, 4, 5, 6, 7])
+                self.assertEqual(hhs[0].actions[0], "d dh p3 AhKh")
+
+    def test_columnar(self):
+        destination = self.root / "store"
+        progress = import_histories(
+            "pokerstars", self.sources, destination, output_format="columnar"
+        )
+        self.assertEqual(progress.hands, 10)
+        self.assertEqual(read_manifest(destination)["a.txt"]["output"], "a.txt.hands")
+
+        store = HandStore(destination)
+        self.assertEqual(len(store), 10)
+        self.assertEqual(sorted(store.select("hands")["number"]), [1, 2, *range(4, 12)])
+        result = store.aggregate("players", by="name", total=("payoff", "sum"))
+        self.assertEqual(dict(zip(result["name"], result["total"]))["alice"], 700)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            import_histories("stars", self.sources, self.root / "phh")
+        with self.assertRaises(ValueError):
+            import_histories(
+                "pokerstars", self.sources, self.root / "phh", output_format="csv"
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
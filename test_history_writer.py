@@ -0,0 +1,116 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from engine import PokerEngine
+from history_writer import HistoryWriter, history_files, read_histories
+
+
+def _play_folds(engine, count):
+    for _ in range(count):
+        engine.new_hand()
+        while engine.stage != "complete":
+            engine.player_action("fold")
+
+
+class TestHistoryWriter(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def test_round_trip(self):
+        records = [{"hand": i, "actions": ["fold"] * i} for i in range(100)]
+        for name, framing in [
+            ("hands.jsonl", "jsonl"),
+            ("hands.jsonl.gz", "jsonl"),
+            ("hands.bin.xz", "length"),
+        ]:
+            path = self.directory / name
+            with HistoryWriter(path, framing=framing, buffer_bytes=256) as writer:
+                for record in records:
+                    writer.write(record)
+            self.assertEqual(list(read_histories(path, framing)), records)
+
+        self.assertEqual(
+            (self.directory / "hands.jsonl").read_text().splitlines()[1],
+            '{"hand":1,"actions":["fold"]}',
+        )
+
+    def test_append(self):
+        path = self.directory / "hands.jsonl.gz"
+        for i in range(3):
+            with HistoryWriter(path) as writer:
+                writer.write({"hand": i})
+        self.assertEqual([r["hand"] for r in read_histories(path)], [0, 1, 2])
+
+        with HistoryWriter(path, append=False) as writer:
+            writer.write({"hand": 3})
+        self.assertEqual(list(read_histories(path)), [{"hand": 3}])
+
+    def test_rotation(self):
+        path = self.directory / "hands.jsonl"
+        with HistoryWriter(path, max_bytes=100) as writer:
+            for i in range(30):
+                writer.write({"hand": i})
+        files = history_files(path)
+        self.assertGreater(len(files), 3)
+        self.assertEqual(files[0].name, "hands-00000.jsonl")
+        self.assertTrue(all(file.stat().st_size <= 100 for file in files))
+        self.assertEqual([r["hand"] for r in read_histories(path)], list(range(30)))
+
+        with HistoryWriter(path, max_bytes=100) as writer:
+            writer.write({"hand": 30})
+        self.assertEqual(len(history_files(path)), len(files))
+        self.assertEqual(list(read_histories(path))[-1], {"hand": 30})
+
+        with HistoryWriter(path, max_seconds=0) as writer:
+            for i in range(3):
+                writer.write({"hand": 31 + i})
+                writer.flush()
+        self.assertEqual(len(history_files(path)), len(files) + 2)
+        self.assertEqual(len(list(read_histories(path))), 34)
+
+    def test_errors(self):
+        writer = HistoryWriter(self.directory / "hands.jsonl")
+        writer.close()
+        with self.assertRaises(ValueError):
+            writer.write({})
+        with self.assertRaises(ValueError):
+            HistoryWriter(self.directory / "hands.jsonl", framing="csv")
+
+        path = self.directory / "hands.bin"
+        path.write_bytes(b"\x10\x00\x00\x00{}")
+        with self.assertRaises(ValueError):
+            list(read_histories(path, "length"))
+
+        writer = HistoryWriter(self.directory / "hands.jsonl")
+        with self.assertRaises(TypeError):
+            writer.write({"card": object()})
+        writer.close()
+
+
+class TestEngineHistories(unittest.TestCase):
+    def test_ring_buffer_and_writer(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "hands.jsonl"
+            engine = PokerEngine(num_players=2, history_limit=5)
+            with HistoryWriter(path) as writer:
+                engine.attach_history_writer(writer)
+                _play_folds(engine, 20)
+
+            self.assertEqual(len(engine.hand_histories), 5)
+            histories = list(read_histories(path))
+            self.assertEqual(len(histories), 20)
+            self.assertEqual(
+                histories[-5:], json.loads(json.dumps(list(engine.hand_histories)))
+            )
+
+            saved = Path(directory) / "saved.json"
+            engine.save_histories(saved)
+            self.assertEqual(json.loads(saved.read_text()), histories[-5:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,10 @@
 import unittest
+from pathlib import Path
 
 from engine import PokerEngine
-from ai import optimal_ai_move
+from ai import estimate_equity, optimal_ai_move
+from pokerkit.pokerkit.utilities import Card as PKCard
+import texas_solver
 
 
 class TestOptimalAIMove(unittest.TestCase):
@@ -16,6 +19,33 @@ class TestOptimalAIMove(unittest.TestCase):
         else:
             self.assertEqual(amount, 0)
 
+    def test_weighted_solver_ranges(self):
+        path = (
+            Path(texas_solver.DEFAULT_EXE_DIR)
+            / "ranges/qb_ranges/PioRanges_nlhe_100bb_3x_NL200"
+            / "LJ2bets/HJfolds/CO_raise.txt"
+        )
+        solver_range = path.read_text().strip()
+        eng = PokerEngine(num_players=2, starting_stack=100, sb_amt=1, bb_amt=2)
+        eng.new_hand()
+        seat = eng.turn
+        action, _ = optimal_ai_move(
+            eng, seat, ranges={1 - seat: solver_range}, sample_count=20
+        )
+        self.assertIn(action, {"fold", "check", "call", "bet", "raise"})
+
+        equities = estimate_equity(
+            (solver_range, "AhAd"), (), sample_count=200, exact=False
+        )
+        self.assertAlmostEqual(sum(equities), 1)
+
+        weighted = {
+            frozenset(PKCard.parse("AhAd")): 3.0,
+            frozenset(PKCard.parse("2c2d")): 1.0,
+        }
+        equities = estimate_equity((weighted, "KhKd"), "8c 7d 4h 3s 9c".split())
+        self.assertEqual(equities, [0.75, 0.25])
+
 
 if __name__ == "__main__":
     unittest.main()
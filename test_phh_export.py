@@ -0,0 +1,180 @@
+import contextlib
+import io
+import json
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from engine import PokerEngine
+from history_writer import HistoryWriter
+from phh_export import (
+    convert_histories,
+    history_statistics,
+    history_to_phh,
+    iter_phh,
+    main,
+    write_phhs,
+)
+from pokerkit.pokerkit.analysis import Statistics
+from pokerkit.pokerkit.notation import HandHistory
+
+
+def _play(engine, actions):
+    engine.new_hand()
+    for action in actions:
+        engine.player_action(*action)
+    assert engine.stage == "complete"
+    return engine.hand_histories[-1]
+
+
+def _check_down(engine):
+    players = engine.num_players
+    return _play(engine, [("call", 0)] * (players - 1) + [("check", 0)] * 3 * players)
+
+
+class TestHistoryToPHH(unittest.TestCase):
+    def setUp(self):
+        random.seed(3)
+
+    def test_limped_pot(self):
+        engine = PokerEngine(num_players=3)
+        history = _check_down(engine)
+        hh = history_to_phh(history, hand=1)
+
+        self.assertEqual(hh.blinds_or_straddles, [10, 20, 0])
+        self.assertEqual(hh.seats, [2, 3, 1])
+        self.assertEqual(hh.players, ["Seat 2", "Seat 3", "Seat 1"])
+        self.assertEqual(
+            hh.finishing_stacks, [history["final_stacks"][s] for s in (1, 2, 0)]
+        )
+
+        betting = [action for action in hh.actions if not action.startswith("d ")]
+        # the big blind checks its option, which the engine skips
+        self.assertEqual(betting[:3], ["p3 cc", "p1 cc", "p2 cc"])
+        self.assertEqual(betting[3:6], ["p1 cc", "p2 cc", "p3 cc"])
+        self.assertEqual(sum(a.startswith("d db") for a in hh.actions), 3)
+        self.assertEqual(sum(" sm " in a for a in hh.actions), 3)
+
+        state = tuple(hh)[-1]
+        self.assertFalse(state.status)
+        self.assertEqual(list(state.stacks), hh.finishing_stacks)
+
+        statistics = Statistics.from_hand_history(hh)
+        for seat in range(3):
+            self.assertEqual(
+                statistics[f"Seat {seat + 1}"].payoff_sum,
+                history["final_stacks"][seat] - history["starting_stacks"][seat],
+            )
+
+    def test_heads_up(self):
+        engine = PokerEngine(num_players=2)
+        history = _play(engine, [("raise", 40), ("call", 0), ("bet", 60), ("fold", 0)])
+        hh = history_to_phh(history)
+
+        self.assertEqual(hh.blinds_or_straddles, [20, 10])
+        self.assertEqual(hh.seats, [2, 1])
+        betting = [action for action in hh.actions if not action.startswith("d ")]
+        self.assertEqual(betting, ["p1 cbr 60", "p2 cc", "p1 cbr 60", "p2 f"])
+        self.assertEqual(list(tuple(hh)[-1].stacks), [1060, 940])
+
+    def test_json_round_trip(self):
+        engine = PokerEngine(num_players=4)
+        history = json.loads(json.dumps(_check_down(engine)))
+        self.assertEqual(
+            history_to_phh(history).actions,
+            history_to_phh(engine.hand_histories[-1]).actions,
+        )
+
+    def test_invalid(self):
+        engine = PokerEngine(num_players=2)
+        history = _play(engine, [("raise", 100), ("raise", 20), ("fold", 0)])
+        with self.assertRaises(ValueError):
+            history_to_phh(history)
+        self.assertEqual(list(iter_phh([history], skip_invalid=True)), [])
+
+    def test_inconsistent(self):
+        engine = PokerEngine(num_players=2)
+        history = _play(engine, [("raise", 40), ("call", 0), ("bet", 60), ("fold", 0)])
+
+        # a raise under the call amount is only a call when it is all-in
+        short = json.loads(json.dumps(history))
+        short["actions"][3].update(action="raise", amount=20)
+        with self.assertRaisesRegex(ValueError, "less than a call"):
+            history_to_phh(short)
+
+        moved = json.loads(json.dumps(history))
+        moved["final_stacks"] = [1000, 1000]
+        with self.assertRaisesRegex(ValueError, "instead of"):
+            history_to_phh(moved)
+
+
+class TestConversion(unittest.TestCase):
+    def setUp(self):
+        random.seed(5)
+        self.engine = PokerEngine(num_players=3)
+        for _ in range(4):
+            _check_down(self.engine)
+        _play(self.engine, [("raise", 100), ("raise", 20), ("fold", 0), ("fold", 0)])
+
+    def test_write_phhs(self):
+        phhs = list(iter_phh(self.engine.hand_histories, skip_invalid=True))
+        fp = io.BytesIO()
+        self.assertEqual(write_phhs(phhs, fp), 4)
+        self.assertEqual(fp.getvalue().decode(), HandHistory.dumps_all(phhs))
+
+        fp.seek(0)
+        loaded = list(HandHistory.load_all(fp))
+        self.assertEqual([hh.actions for hh in loaded], [hh.actions for hh in phhs])
+
+    def test_statistics(self):
+        aggregator, skipped = history_statistics(self.engine.hand_histories)
+        self.assertEqual(aggregator.hand_count, 4)
+        self.assertEqual(skipped, 1)
+        # in the limped pots, every seat but the big blind calls
+        self.assertEqual(aggregator.positions[1].vpip, 0)
+        self.assertEqual(
+            sum(s.voluntary_count for s in aggregator.players.values()), 8
+        )
+        self.assertEqual(aggregator.players["Seat 1"].wtsd, 1)
+        self.assertEqual(
+            sum(s.payoff_sum for s in aggregator.players.values()),
+            sum(s.payoff_sum for s in aggregator.positions.values()),
+        )
+        with self.assertRaises(ValueError):
+            history_statistics(self.engine.hand_histories, skip_invalid=False)
+
+    def test_convert_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+            saved = directory / "hands.json"
+            self.engine.save_histories(saved)
+            streamed = directory / "hands.jsonl.gz"
+            with HistoryWriter(streamed) as writer:
+                for history in self.engine.hand_histories:
+                    writer.write(history)
+
+            output = directory / "hands.phhs"
+            with self.assertRaises(ValueError):
+                convert_histories(saved, output)
+            counts = convert_histories([saved, streamed], output, skip_invalid=True)
+            self.assertEqual(counts, (8, 2))
+            with open(output, "rb") as fp:
+                self.assertEqual(len(list(HandHistory.load_all(fp))), 8)
+
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                main([str(saved), str(streamed), "-o", str(output)])
+            self.assertIn("Wrote 8 hands", stdout.getvalue())
+            self.assertIn("skipped 2 invalid hands", stdout.getvalue())
+            with self.assertRaises(ValueError):
+                main([str(saved), "-o", str(output), "--strict"])
+
+            self.assertEqual(self.engine.save_phh(output, skip_invalid=True), 4)
+            with open(output, "rb") as fp:
+                statistics = Statistics.from_hand_history(*HandHistory.load_all(fp))
+            self.assertEqual(sum(s.payoff_sum for s in statistics.values()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+import range_library
+from pokerkit import Card, parse_weighted_range
+from range_library import RangeLibrary, build_range_library, parse_range_text
+
+
+class TestParseRangeText(unittest.TestCase):
+    def test_matches_pokerkit(self):
+        text = "AA:1.0,AKs:0.5,AKo:0.25,KQ:0.75,AhKd:0,T9s"
+        weights = parse_range_text(text)
+        expected = parse_weighted_range(text)
+        combos = [frozenset(Card.parse("".join(c))) for c in range_library.COMBOS]
+        self.assertEqual(
+            {c: float(w) for c, w in zip(combos, weights) if w},
+            {c: float(np.float32(w)) for c, w in expected.items()},
+        )
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            parse_range_text("AA:-1")
+        with self.assertRaises(ValueError):
+            parse_range_text("AA:x")
+
+
+class TestRangeLibrary(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name) / "ranges"
+        node = self.root / "6max" / "CO" / "2.5bb" / "BTN" / "Call"
+        node.mkdir(parents=True)
+        (node / "CO_range.txt").write_text("AA:1.0,AKs:0.5,72o:0.1")
+        (node / "BTN_range.txt").write_text("AhKh:0.5,QQ:1.0")
+        other = self.root / "qb" / "LJ2bets"
+        other.mkdir(parents=True)
+        (other / "CO_raise.txt").write_text("")
+
+        path = build_range_library(self.root, Path(directory.name) / "ranges.bin")
+        self.library = RangeLibrary(path)
+        self.addCleanup(self.library.close)
+
+    def test_navigation(self):
+        self.assertEqual(len(self.library), 3)
+        self.assertEqual(self.library.children(), ["6max", "qb"])
+        self.assertEqual(self.library.children("6max/CO/2.5bb"), ["BTN"])
+        self.assertEqual(self.library.names("6max/CO/2.5bb/BTN/Call"), ["BTN", "CO"])
+        self.assertEqual(self.library.names(["qb", "LJ2bets"]), ["CO_raise"])
+        self.assertIn("6max/CO/2.5bb", self.library)
+        self.assertNotIn("6max/CO/3bb", self.library)
+        with self.assertRaises(KeyError):
+            self.library.weights("6max/CO/2.5bb/BTN/Call", "SB")
+        with self.assertRaises(KeyError):
+            self.library.weights("6max/MP", "MP")
+
+    def test_weights(self):
+        path = "6max/CO/2.5bb/BTN/Call"
+        hands = self.library.hand_weights(path, "CO")
+        self.assertEqual(hands[range_library.HAND_CLASSES.index("AKs")], 0.5)
+        self.assertAlmostEqual(hands[range_library.HAND_CLASSES.index("72o")], 0.1)
+        self.assertEqual(np.count_nonzero(hands), 3)
+        np.testing.assert_array_equal(
+            self.library.weights(path, "CO"), parse_range_text("AA,AKs:0.5,72o:0.1")
+        )
+
+        with self.assertRaises(ValueError):
+            self.library.hand_weights(path, "BTN")
+        self.assertEqual(
+            self.library.range(path, "BTN"),
+            {
+                frozenset(Card.parse("AhKh")): 0.5,
+                **parse_weighted_range("QQ"),
+            },
+        )
+        self.assertEqual(
+            parse_weighted_range(self.library.range_string(path, "BTN")),
+            self.library.range(path, "BTN"),
+        )
+        self.assertEqual(self.library.range(["qb", "LJ2bets"], "CO_raise"), {})
+
+    def test_range_string(self):
+        text = self.library.range_string("6max/CO/2.5bb/BTN/Call", "CO")
+        self.assertEqual(text, "AA:1,AKs:0.5,72o:0.1")
+
+    def test_bundled_ranges(self):
+        node = "6max_range/CO/2.5bb/BTN/Call"
+        path = range_library.DEFAULT_RANGE_ROOT / node / "CO_range.txt"
+        with tempfile.TemporaryDirectory() as directory:
+            library = RangeLibrary(
+                build_range_library(
+                    range_library.DEFAULT_RANGE_ROOT, Path(directory) / "ranges.bin"
+                )
+            )
+            self.assertEqual(
+                library.range(node, "CO"), parse_weighted_range(path.read_text())
+            )
+            self.assertIn(
+                "PioRanges_nlhe_100bb_3x_NL200", library.children("qb_ranges")
+            )
+            library.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
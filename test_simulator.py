@@ -0,0 +1,78 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from config import EngineConfig
+from engine import PokerEngine
+from simulator import (
+    SimulationResult,
+    play_hand,
+    random_policy,
+    simulate,
+    simulate_table,
+)
+
+
+class TestSimulator(unittest.TestCase):
+    def test_play_hand(self):
+        eng = PokerEngine(num_players=3, starting_stack=100, sb_amt=1, bb_amt=2)
+        for _ in range(50):
+            eng.stacks = [100] * 3
+            history = play_hand(eng, [random_policy] * 3)
+            self.assertEqual(eng.stage, "complete")
+            self.assertFalse(eng.hand_histories)
+            self.assertLessEqual(sum(history["final_stacks"]), 300)
+            self.assertGreater(sum(history["final_stacks"]), 300 - 3)
+
+    def test_simulate_table(self):
+        config = EngineConfig(starting_stack=200, sb_amt=1, bb_amt=2)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "hands.jsonl"
+            result = simulate_table(
+                ["random", "random", "random"],
+                100,
+                config=config,
+                seed=0,
+                history_path=path,
+            )
+            lines = path.read_text().splitlines()
+
+        self.assertEqual(result.hand_count, 100)
+        self.assertEqual(len(lines), 100)
+        self.assertIn("winners", json.loads(lines[0]))
+        self.assertLessEqual(sum(result.totals), 0)
+        self.assertEqual(
+            simulate_table(["random"] * 3, 100, config=config, seed=0).totals,
+            result.totals,
+        )
+
+    def test_simulate_tables(self):
+        result = simulate(["random", "random"], 101, table_count=2, processes=2, seed=1)
+        self.assertEqual(result.hand_count, 101)
+        self.assertEqual(len(result.totals), 2)
+        self.assertEqual(
+            simulate(["random", "random"], 101, table_count=2, seed=1).totals,
+            result.totals,
+        )
+
+    def test_result_statistics(self):
+        result = SimulationResult()
+        for winnings in ([1.0, -1.0], [3.0, -3.0]):
+            result.add_hand(winnings)
+        result.elapsed = 0.5
+
+        self.assertEqual(result.hands_per_second, 4)
+        self.assertEqual(result.bb_per_100(), [200.0, -200.0])
+        low, high = result.confidence_intervals()[0]
+        self.assertAlmostEqual((low + high) / 2, 200)
+        self.assertAlmostEqual(high - low, 2 * 1.96 * 100)
+
+        merged = result.merge(result)
+        self.assertEqual(merged.hand_count, 4)
+        self.assertEqual(merged.totals, [8.0, -8.0])
+        self.assertEqual(merged.elapsed, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,9 @@
-import json
 import unittest
-from unittest.mock import patch
 
 from engine import PokerEngine
 from ai import solver_ai_move
+import solver_cache
+import solver_service
 
 
 class TestSolverAIMove(unittest.TestCase):
@@ -13,16 +13,35 @@ class TestSolverAIMove(unittest.TestCase):
         seat = eng.turn
         eng.hole_cards[seat] = [(14, 2), (14, 1)]  # AhAd
 
-        sample = json.dumps({
+        sample = {
             "strategy": {
                 "actions": ["CHECK", "BET 50"],
                 "strategy": {"AhAd": [0.1, 0.9]}
             }
-        })
-
-        with patch("texas_solver.run_console_solver", return_value=sample), \
-             patch("texas_solver.simple_parameter_file", return_value="dummy.txt"):
-            action, amt = solver_ai_move(eng, seat, hero_range="AhAd", opp_range="random")
+        }
+        jobs = []
+
+        def solve(settings):
+            jobs.append(settings)
+            return sample
+
+        solver_service.configure_solver_service(
+            lambda: solver_service.SolverService(
+                solver_service.LocalSolverBackend(solve)
+            )
+        )
+        self.addCleanup(
+            solver_service.configure_solver_service, solver_service.SolverService
+        )
+        solver_cache.configure_strategy_cache(lambda: None)
+        self.addCleanup(
+            solver_cache.configure_strategy_cache, solver_cache.default_strategy_cache
+        )
+
+        action, amt = solver_ai_move(eng, seat, hero_range="AhAd", opp_range="random")
+
+        self.assertEqual(jobs[0]["range_ip"], "AhAd")
+        self.assertEqual(jobs[0]["range_oop"], "random")
 
         self.assertEqual(action, "bet")
         self.assertEqual(amt, 50)
@@ -0,0 +1,139 @@
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import solver_cache
+import solver_service
+import texas_solver
+from solver_cache import StrategyCache, canonicalize
+from solver_service import LocalSolverBackend, SolverService
+
+
+def _commands(board, pot=10, stack=100, range_oop="QQ+", range_ip="AKs"):
+    return texas_solver.build_commands(
+        pot=pot, stack=stack, board=board, range_oop=range_oop, range_ip=range_ip
+    )
+
+
+class TestCanonicalize(unittest.TestCase):
+    def test_suit_isomorphic_spots_share_key(self):
+        first = canonicalize(_commands(["Ah", "Kh", "2c"], range_ip="AhKh,AcKc"))
+        second = canonicalize(_commands(["As", "Ks", "2d"], range_ip="AsKs,AdKd"))
+        self.assertEqual(first.key, second.key)
+
+    def test_scaled_spots_share_key(self):
+        first = canonicalize(_commands(["Ah", "Kh", "2c"], pot=10, stack=100))
+        second = canonicalize(_commands(["Ah", "Kh", "2c"], pot=20, stack=200))
+        self.assertEqual(first.key, second.key)
+
+    def test_different_spots(self):
+        key = canonicalize(_commands(["Ah", "Kh", "2c"])).key
+        self.assertNotEqual(key, canonicalize(_commands(["Ah", "Kc", "2d"])).key)
+        self.assertNotEqual(
+            key, canonicalize(_commands(["Ah", "Kh", "2c"], stack=50)).key
+        )
+        self.assertNotEqual(
+            key, canonicalize(_commands(["Ah", "Kh", "2c"], range_ip="AKo")).key
+        )
+        # the suited combos differ in whether they block the flush draw
+        self.assertNotEqual(
+            canonicalize(_commands(["Ah", "Kh", "2c"], range_ip="AhKh")).key,
+            canonicalize(_commands(["Ah", "Kh", "2c"], range_ip="AsKs")).key,
+        )
+
+    def test_ignores_thread_count(self):
+        commands = _commands(["Ah", "Kh", "2c"])
+        self.assertEqual(
+            canonicalize(commands).key,
+            canonicalize(solver_service.set_thread_count(commands, 8)).key,
+        )
+
+
+class TestStrategyCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "strategies.sqlite"
+
+        self.jobs = []
+
+        def solve(settings):
+            self.jobs.append(settings)
+            hearts = "h" in settings["board"].split(",")[0]
+            return {
+                "strategy": {
+                    "actions": ["CHECK", f"BET {float(settings['pot']) / 2}"],
+                    "strategy": {
+                        "AhKh" if hearts else "AsKs": [0.2, 0.8],
+                        "AcKc": [0.7, 0.3],
+                    },
+                }
+            }
+
+        solver_service.configure_solver_service(
+            lambda: SolverService(LocalSolverBackend(solve))
+        )
+        self.addCleanup(solver_service.configure_solver_service, SolverService)
+        solver_cache.configure_strategy_cache(lambda: StrategyCache(self.path))
+        self.addCleanup(
+            solver_cache.configure_strategy_cache, solver_cache.default_strategy_cache
+        )
+
+    def test_isomorphic_hit(self):
+        strategy = solver_cache.solve_strategy(_commands(["Ah", "Kh", "2c"]))
+        self.assertEqual(texas_solver.choose_action(strategy, "AhKh"), ("bet", 5))
+
+        # hearts become spades, clubs become diamonds and the pot doubles
+        strategy = solver_cache.solve_strategy(
+            _commands(["As", "Ks", "2d"], pot=20, stack=200)
+        )
+        self.assertEqual(len(self.jobs), 1)
+        self.assertEqual(strategy["actions"], ["CHECK", "BET 10"])
+        self.assertEqual(strategy["strategy"]["AsKs"], [0.2, 0.8])
+        self.assertEqual(strategy["strategy"]["AdKd"], [0.7, 0.3])
+        self.assertEqual(texas_solver.choose_action(strategy, "AsKs"), ("bet", 10))
+        self.assertEqual(texas_solver.choose_action(strategy, "AdKd"), ("check", 0))
+
+        solver_cache.solve_strategy(_commands(["As", "Ks", "2d"], stack=50))
+        self.assertEqual(len(self.jobs), 2)
+
+    def test_solve_output(self):
+        output = solver_cache.solve_output(_commands(["Ah", "Kh", "2c"]))
+        cached = solver_cache.solve_output(_commands(["Ah", "Kh", "2c"]))
+        self.assertEqual(len(self.jobs), 1)
+        self.assertEqual(
+            texas_solver.parse_solver_strategy(cached)["strategy"],
+            json.loads(output)["strategy"]["strategy"],
+        )
+
+    def test_persistent(self):
+        solver_cache.solve_strategy(_commands(["Ah", "Kh", "2c"]))
+        solver_cache.configure_strategy_cache(lambda: StrategyCache(self.path))
+        solver_cache.solve_strategy(_commands(["Ah", "Kh", "2c"]))
+        self.assertEqual(len(self.jobs), 1)
+
+    def test_lookup_speed(self):
+        commands = _commands(["Ah", "Kh", "2c"])
+        solver_cache.solve_strategy(commands)
+        start = time.perf_counter()
+        for _ in range(100):
+            solver_cache.solve_strategy(commands)
+        self.assertLess((time.perf_counter() - start) / 100, 0.002)
+
+    def test_eviction(self):
+        cache = StrategyCache(self.path, max_bytes=1000)
+        self.addCleanup(cache.close)
+        strategy = {"actions": [["CHECK", None]], "strategy": {"AhKh": [1.0] * 50}}
+        for i in range(20):
+            cache.put(str(i), strategy)
+            cache.get("0")
+        self.assertLess(len(cache), 20)
+        self.assertIsNotNone(cache.get("0"))
+        self.assertIsNone(cache.get("1"))
+        self.assertIsNotNone(cache.get("19"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import threading
+import time
+import unittest
+
+import solver_cache
+import solver_service
+from engine import PokerEngine
+from solver_service import LocalSolverBackend, SolverService
+
+
+class _CountingBackend(LocalSolverBackend):
+    def __init__(self, solve):
+        super().__init__(solve)
+        self.starts = 0
+        self.closes = 0
+
+    def start(self):
+        self.starts += 1
+
+    def close(self):
+        self.closes += 1
+
+
+class TestSolverService(unittest.TestCase):
+    def test_jobs_share_one_backend(self):
+        backend = _CountingBackend(lambda settings: {"pot": settings["pot"]})
+        service = SolverService(backend, max_workers=2, thread_budget=8)
+        outputs = [service.solve(f"set_pot {pot}\nbuild_tree") for pot in range(5)]
+        service.shutdown()
+
+        self.assertEqual(outputs[3], '{"pot": "3"}')
+        self.assertEqual((backend.starts, backend.closes), (1, 1))
+
+    def test_thread_budget(self):
+        seen = []
+        service = SolverService(
+            LocalSolverBackend(lambda settings: seen.append(settings["thread_num"])),
+            max_workers=3,
+            thread_budget=12,
+        )
+        service.solve("set_pot 1\nset_thread_num 32\nbuild_tree\nstart_solve")
+        service.shutdown()
+        self.assertEqual(seen, ["4"])
+        self.assertEqual(
+            solver_service.set_thread_count("build_tree\nstart_solve", 2),
+            "build_tree\nset_thread_num 2\nstart_solve",
+        )
+
+    def test_streams_results_in_completion_order(self):
+        release = threading.Event()
+
+        def solve(settings):
+            if settings["pot"] == "0":
+                release.wait(5)
+                return "slow"
+            return "fast"
+
+        service = SolverService(LocalSolverBackend(solve), max_workers=2)
+        stream = service.solve_all(["set_pot 0", "set_pot 1"])
+        # the slow job only finishes once the fast result was streamed
+        results = [next(stream)]
+        release.set()
+        results.extend(stream)
+        service.shutdown()
+        self.assertEqual(results, [(1, '"fast"'), (0, '"slow"')])
+
+    def test_timeouts_and_errors(self):
+        def solve(settings):
+            if settings["pot"] == "1":
+                raise ValueError("bad spot")
+            time.sleep(0.05)
+            return {}
+
+        service = SolverService(LocalSolverBackend(solve), timeout=0.01)
+        results = dict(service.solve_all(["set_pot 0", "set_pot 1"]))
+        self.assertIsInstance(results[0], TimeoutError)
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(service.solve("set_pot 0", timeout=1), "{}")
+        service.shutdown()
+
+    def test_engine_uses_shared_service(self):
+        solver_service.configure_solver_service(
+            lambda: SolverService(LocalSolverBackend(lambda settings: settings))
+        )
+        self.addCleanup(solver_service.configure_solver_service, SolverService)
+        solver_cache.configure_strategy_cache(lambda: None)
+        self.addCleanup(
+            solver_cache.configure_strategy_cache, solver_cache.default_strategy_cache
+        )
+        first = solver_service.get_solver_service()
+        self.assertIs(solver_service.get_solver_service(), first)
+
+        eng = PokerEngine(num_players=2, starting_stack=100, sb_amt=1, bb_amt=2)
+        eng.new_hand()
+        output = eng.solve_current_spot(range_oop="QQ+", range_ip="AK")
+        self.assertIn('"range_oop": "QQ+"', output)
+        self.assertIn('"pot": "3"', output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent / "TexasSolver-v0.2.0-Windows/resources"))
+
+from python.TreeBuilder import (  # noqa: E402
+    DEALCARD_NODE,
+    SHOWDOWN_NODE,
+    ArrayTreeBuilder,
+    PartGameTreeBuilder,
+    RulesBuilder,
+)
+
+# resources/yamls/general_rule.yaml
+GENERAL_RULE = {
+    "current_player": 1,
+    "rounds": 4,
+    "rounds_cards": [0, 3, 1, 1],
+    "deal_card_number": 2,
+    "players": 2,
+    "actions": ["begin", "bet", "check", "call", "raise", "fold"],
+    "legal_actions_after": {
+        "begin": ["call", "raise", "fold"],
+        "roundbegin": ["check", "bet"],
+        "bet": ["call", "raise", "fold"],
+        "raise": ["call", "raise", "fold"],
+        "check": ["check", "raise", "bet"],
+        "fold": None,
+        "call": ["check", "raise"],
+    },
+}
+
+
+def _rule():
+    return RulesBuilder(
+        GENERAL_RULE,
+        current_commit=[5, 5],
+        current_round=2,
+        raise_limit=2,
+        check_limit=2,
+        stack=100,
+        bet_sizes=["0.5_pot", "1_pot", "all-in"],
+        raise_sizes=["1_pot", "2_pot", "all-in"],
+    )
+
+
+class TestArrayTreeBuilder(unittest.TestCase):
+    def setUp(self):
+        self.tree = ArrayTreeBuilder(_rule())
+
+    def test_matches_node_tree(self):
+        nodes = PartGameTreeBuilder(_rule())
+        with tempfile.TemporaryDirectory() as directory:
+            for prefix, limit in [([], np.inf), (["bet_5"], 3)]:
+                old = Path(directory) / "old.km"
+                new = Path(directory) / "new.km"
+                expected = nodes.gen_km_json(old, prefix, limit, ret_json=True)
+                actual = self.tree.gen_km_json(new, prefix, limit, ret_json=True)
+                self.assertEqual(new.read_text(), old.read_text())
+                self.assertEqual(actual, json.loads(json.dumps(expected)))
+
+    def test_lookup(self):
+        tree = self.tree
+        node = tree.find(["check", "bet_5", "raise_25"])
+        self.assertEqual(tree.bet_history(node), ["check", "bet_5", "raise_25"])
+        self.assertEqual(tree.committed[node].tolist(), [10, 30])
+        self.assertEqual(tree.pot(node), 40)
+        self.assertEqual(tree.player[node], 0)
+
+        actions = [tree.actions[tree.action[i]] for i in tree.children(node)]
+        self.assertEqual(actions, ["call", "raise_90", "fold"])
+        self.assertEqual(tree.parent[tree.child(node, "fold")], node)
+        with self.assertRaises(KeyError):
+            tree.child(node, "bet_5")
+
+        turn = tree.find(["check", "check"])
+        self.assertEqual(tree.kind[turn], DEALCARD_NODE)
+        self.assertEqual(tree.betting_round[turn], 3)
+        allin = tree.find(["bet_95", "call"])
+        self.assertEqual(tree.kind[allin], SHOWDOWN_NODE)
+        self.assertEqual(len(tree.children(allin)), 0)
+
+    def test_streaming(self):
+        buffer = io.StringIO()
+        self.tree.write_km_json(buffer, ["check"], limit=1)
+        root = json.loads(buffer.getvalue())["root"]
+        node = self.tree.find(["check"])
+        self.assertEqual(
+            root["children_actions"],
+            [self.tree.actions[self.tree.action[i]] for i in self.tree.children(node)],
+        )
+        self.assertTrue(all(not child["children"] for child in root["children"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
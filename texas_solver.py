@@ -81,6 +81,29 @@ def simple_parameter_file(
 ) -> Path:
     """Create a minimal parameter file for a heads-up flop spot."""
 
+    path = Path(output_path)
+    path.write_text(
+        build_commands(
+            pot=pot, stack=stack, board=board, range_oop=range_oop, range_ip=range_ip
+        )
+    )
+    return path
+
+
+def build_commands(
+    *,
+    pot: int,
+    stack: int,
+    board: Iterable[str] | None,
+    range_oop: str,
+    range_ip: str,
+) -> str:
+    """Return the solver commands of :func:`simple_parameter_file`.
+
+    The commands can be queued on a :class:`solver_service.SolverService`
+    without writing a parameter file.
+    """
+
     board_str = ",".join(board) if board else ""
     lines = [
         f"set_pot {pot}",
@@ -91,10 +114,7 @@ def simple_parameter_file(
     lines.append(f"set_range_oop {range_oop}")
     lines.append(f"set_range_ip {range_ip}")
     lines.append("build_tree")
-
-    path = Path(output_path)
-    path.write_text("\n".join(lines))
-    return path
+    return "\n".join(lines)
 
 
 def engine_parameter_file(engine: "PokerEngine", seat: int, path: str) -> str:
@@ -122,15 +142,34 @@ def engine_parameter_file(engine: "PokerEngine", seat: int, path: str) -> str:
     return path
 
 
-def parse_solver_output(output: str, hero_hand: str) -> tuple[str, int]:
-    """Return the highest frequency action from solver output."""
+def parse_solver_strategy(output: str) -> dict:
+    """Return the root strategy of solver output.
+
+    The strategy maps ``"actions"`` to the action names, such as ``"BET 50"``,
+    and ``"strategy"`` to the action frequencies of each combo, such as
+    ``"AhAd"``.
+
+    Raises
+    ------
+    ValueError
+        If the output holds no strategy.
+    """
 
     try:
         data = json.loads(output)
-        actions = data["strategy"]["actions"]
-        combos = data["strategy"]["strategy"]
-    except Exception:  # pragma: no cover - invalid JSON
-        return "check", 0
+        return {
+            "actions": list(data["strategy"]["actions"]),
+            "strategy": dict(data["strategy"]["strategy"]),
+        }
+    except (TypeError, KeyError, ValueError) as error:
+        raise ValueError("Solver output holds no strategy") from error
+
+
+def choose_action(strategy: dict, hero_hand: str) -> tuple[str, int]:
+    """Return the highest frequency action of ``hero_hand`` in ``strategy``."""
+
+    actions = strategy["actions"]
+    combos = strategy["strategy"]
 
     key = hero_hand
     if key not in combos:
@@ -151,3 +190,13 @@ def parse_solver_output(output: str, hero_hand: str) -> tuple[str, int]:
         except ValueError:
             amount = 0
     return name, amount
+
+
+def parse_solver_output(output: str, hero_hand: str) -> tuple[str, int]:
+    """Return the highest frequency action from solver output."""
+
+    try:
+        strategy = parse_solver_strategy(output)
+    except ValueError:  # pragma: no cover - invalid JSON
+        return "check", 0
+    return choose_action(strategy, hero_hand)